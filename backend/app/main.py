@@ -20,7 +20,10 @@ from dotenv import load_dotenv
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.routers import pytest_router, testcases
+from app.prompts.registry import load_prompt_templates
+from app.routers import artifacts, ci_logs, pytest_router, reviews, testcases, webhooks
+from app.services.code_validation import shutdown_validation_executor
+from app.services.github_service import close_github_services
 
 # Load .env from project root (one level up from backend/)
 env_path = Path(__file__).resolve().parent.parent.parent / ".env"
@@ -89,12 +92,16 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     logger.debug("Debug logging is enabled")
     # TODO: Initialize Supabase connection
     # TODO: Initialize Redis connection
-    # TODO: Load prompt templates
+    load_prompt_templates()
+    await webhooks.get_webhook_queue().start()
 
     yield  # App runs here
 
     # Shutdown
     logger.info(f"👋 {APP_NAME} shutting down...")
+    await webhooks.get_webhook_queue().stop()
+    await close_github_services()
+    shutdown_validation_executor()
     # TODO: Close database connections
     # TODO: Close Redis connection
 
@@ -129,6 +136,10 @@ app.add_middleware(
 API_V1_PREFIX = "/api/v1"
 app.include_router(testcases.router, prefix=API_V1_PREFIX)
 app.include_router(pytest_router.router, prefix=API_V1_PREFIX)
+app.include_router(ci_logs.router, prefix=API_V1_PREFIX)
+app.include_router(reviews.router, prefix=API_V1_PREFIX)
+app.include_router(webhooks.router, prefix=API_V1_PREFIX)
+app.include_router(artifacts.router, prefix=API_V1_PREFIX)
 
 
 # =============================================================================
@@ -0,0 +1,76 @@
+"""
+CI Log Models
+=============
+Pydantic models for CI log analysis and defect reports.
+"""
+
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+
+class LogExcerptModel(BaseModel):
+    """Log lines around one or more failure signals."""
+
+    start_line: int = Field(..., description="First line of the excerpt (1-based)")
+    end_line: int = Field(..., description="Last line of the excerpt")
+    kinds: list[str] = Field(..., description="Failure signals in the excerpt")
+    text: str = Field(..., description="Excerpt text (ANSI colors and timestamps removed)")
+
+
+class DefectReport(BaseModel):
+    """Structured defect report drafted from CI log failures."""
+
+    title: str = Field(..., description="Clear, concise issue title")
+    severity: Literal["Critical", "High", "Medium", "Low"] = Field(default="Medium")
+    priority: Literal["P0", "P1", "P2", "P3"] = Field(default="P2")
+    type: Literal["Bug", "Test Failure", "Infrastructure", "Flaky Test"] = Field(
+        default="Test Failure"
+    )
+    component: str = Field(default="", description="Affected component or module")
+    description: str = Field(default="", description="Detailed description of the issue")
+    error_message: str = Field(default="", description="The actual error message from logs")
+    stack_trace: str = Field(default="", description="Relevant stack trace if available")
+    reproduction_steps: list[str] = Field(default_factory=list)
+    expected_behavior: str = Field(default="")
+    actual_behavior: str = Field(default="")
+    environment: dict[str, str] = Field(default_factory=dict)
+    possible_causes: list[str] = Field(default_factory=list)
+    suggested_fixes: list[str] = Field(default_factory=list)
+    related_files: list[str] = Field(default_factory=list)
+    labels: list[str] = Field(default_factory=list)
+    confidence: int = Field(default=50, ge=0, le=100)
+
+
+class LogAnalysisResponse(BaseModel):
+    """Failures extracted from a CI log, with an optional defect report."""
+
+    filename: str | None = Field(default=None, description="Uploaded file name")
+    size_bytes: int = Field(..., description="Size of the log")
+    failed_tests: list[str] = Field(default_factory=list, description="Failed test node ids")
+    errors: list[str] = Field(default_factory=list, description="Distinct error messages")
+    exit_codes: list[int] = Field(default_factory=list, description="Non-zero exit codes")
+    summary: str | None = Field(default=None, description="Test run summary line")
+    excerpts: list[LogExcerptModel] = Field(default_factory=list, description="Failure excerpts")
+    truncated: bool = Field(default=False, description="More failures than excerpts returned")
+    defect_report: DefectReport | None = Field(
+        default=None,
+        description="LLM-drafted defect report (if requested and failures were found)",
+    )
+    llm_provider: str | None = Field(default=None, description="Which LLM was used")
+    signature: str | None = Field(default=None, description="Failure signature fingerprint")
+    duplicate: bool = Field(
+        default=False,
+        description="The failure matched a known failure (no new report or issue)",
+    )
+    similarity: float | None = Field(
+        default=None,
+        description="Estimated similarity to the matched failure (1.0 for an exact repeat)",
+    )
+    occurrences: int = Field(default=1, description="Times this failure has been seen")
+    issue_number: int | None = Field(default=None, description="GitHub issue for the failure")
+    issue_url: str | None = Field(default=None, description="GitHub issue URL")
+    artifact_id: str | None = Field(
+        default=None,
+        description="Stored defect report artifact id (GET /api/v1/artifacts/{artifact_id})",
+    )
@@ -4,8 +4,12 @@ PyTest Generation Models
 Pydantic models for pytest code generation request/response.
 """
 
+from typing import Literal
+
 from pydantic import BaseModel, Field
 
+from app.models.testcase import CachedSource
+
 
 class TestCaseInput(BaseModel):
     """A test case to convert into pytest code."""
@@ -41,6 +45,10 @@ class PyTestGenerateRequest(BaseModel):
         default=False,
         description="Generate a separate conftest.py with shared fixtures",
     )
+    context: str = Field(
+        default="",
+        description="Additional context about the system under test (packed to the token budget)",
+    )
     output_path: str = Field(
         default="./tests",
         description="Directory path to save the generated file. Set to empty string to skip saving.",
@@ -81,6 +89,34 @@ class PyTestGenerateRequest(BaseModel):
     }
 
 
+class CodeDiagnostic(BaseModel):
+    """A problem found when validating generated code."""
+
+    severity: Literal["error", "warning"]
+    code: str = Field(..., description="syntax-error, undefined-name or duplicate-test")
+    message: str
+    file: str = Field(..., description="File the problem is in")
+    line: int | None = Field(default=None, description="Line number (1-based)")
+
+
+class CodeValidation(BaseModel):
+    """Outcome of validating generated code."""
+
+    valid: bool = Field(..., description="True if the code compiles and no errors were found")
+    fixed: bool = Field(default=False, description="A syntax error was repaired automatically")
+    formatted: bool = Field(default=False, description="Formatting was normalized")
+    diagnostics: list[CodeDiagnostic] = Field(default_factory=list)
+
+
+class ContextReport(BaseModel):
+    """What prompt context was sent to the LLM under the token budget."""
+
+    budget_tokens: int = Field(..., description="Tokens available for context")
+    used_tokens: int = Field(..., description="Estimated tokens of context sent")
+    included: list[str] = Field(default_factory=list, description="Snippets included")
+    dropped: list[str] = Field(default_factory=list, description="Snippets dropped to fit")
+
+
 class PyTestGenerateResponse(BaseModel):
     """Response containing generated pytest code."""
 
@@ -91,11 +127,58 @@ class PyTestGenerateResponse(BaseModel):
         description="Generated conftest.py code (if requested)",
     )
     test_count: int = Field(..., description="Number of test functions generated")
+    test_names: list[str] = Field(
+        default_factory=list,
+        description="Test functions, as name or Class.name",
+    )
+    markers: list[str] = Field(default_factory=list, description="pytest markers used")
+    fixtures: list[str] = Field(default_factory=list, description="Fixtures defined")
     llm_provider: str = Field(..., description="Which LLM was used (groq/gemini)")
     saved_to: str | None = Field(
         default=None,
         description="File path where the code was saved (if output_path was provided)",
     )
+    context_report: ContextReport | None = Field(
+        default=None,
+        description="Prompt context included or dropped to fit the token budget",
+    )
+    validation: CodeValidation | None = Field(
+        default=None,
+        description="Compile, name and duplicate-test checks of the generated code",
+    )
+    cached_from: CachedSource | None = Field(
+        default=None, description="Set when a stored result was served instead of generating"
+    )
+    artifact_id: str | None = Field(
+        default=None,
+        description="Stored artifact id (GET /api/v1/artifacts/{artifact_id})",
+    )
+
+
+class RepositoryCodeContext(BaseModel):
+    """Code in a GitHub repository to generate tests against."""
+
+    repository: str = Field(
+        ...,
+        description="Repository as 'owner/repo' or a GitHub URL",
+    )
+    symbols: list[str] = Field(
+        ...,
+        description="Functions, classes or Class.method names under test",
+        min_length=1,
+    )
+    ref: str | None = Field(
+        default=None,
+        description="Branch, tag or commit (uses the default branch if not specified)",
+    )
+    path: str = Field(
+        default="",
+        description="Only index Python files under this directory",
+    )
+    github_token: str | None = Field(
+        default=None,
+        description="GitHub token for private repositories (falls back to GITHUB_TOKEN)",
+    )
 
 
 class PyTestFromRequirementRequest(BaseModel):
@@ -129,6 +212,17 @@ class PyTestFromRequirementRequest(BaseModel):
         default=None,
         description="Override the default system prompt (for advanced users)",
     )
+    code: RepositoryCodeContext | None = Field(
+        default=None,
+        description="Repository code under test (only the targets and their direct dependencies are sent)",
+    )
+    use_cache: bool = Field(
+        default=True,
+        description=(
+            "Serve the stored result of a near-duplicate requirement with the same settings "
+            "(not used with code)"
+        ),
+    )
 
     model_config = {
         "json_schema_extra": {
@@ -143,3 +237,240 @@ class PyTestFromRequirementRequest(BaseModel):
             ]
         }
     }
+
+
+class PyTestFromSourceRequest(BaseModel):
+    """Request to generate pytest code for a Python file in a GitHub repository."""
+
+    source: str = Field(
+        ...,
+        description="File to test as 'owner/repo/path/to/file.py@ref' (ref is optional)",
+    )
+    units: list[str] | None = Field(
+        default=None,
+        description="Only these functions/classes (all public ones if not specified)",
+    )
+    include_private: bool = Field(
+        default=False,
+        description="Also generate tests for names starting with an underscore",
+    )
+    tests_per_unit: int = Field(
+        default=3,
+        ge=1,
+        le=10,
+        description="Approximate number of test functions per function or class",
+    )
+    max_units: int = Field(
+        default=30,
+        ge=1,
+        le=100,
+        description="Maximum number of functions/classes to generate tests for",
+    )
+    module_name: str | None = Field(
+        default=None,
+        description="Name for the generated test module (defaults to test_<file name>)",
+        pattern=r"^[a-z][a-z0-9_]*$",
+    )
+    output_path: str = Field(
+        default="./tests",
+        description="Directory path to save the generated file. Set to empty string to skip saving.",
+    )
+    system_prompt: str | None = Field(
+        default=None,
+        description="Override the default system prompt (for advanced users)",
+    )
+    github_token: str | None = Field(
+        default=None,
+        description="GitHub token for private repositories (falls back to GITHUB_TOKEN)",
+    )
+
+    model_config = {
+        "json_schema_extra": {
+            "examples": [
+                {
+                    "source": "octo/shop/app/cart.py@main",
+                    "tests_per_unit": 3,
+                    "output_path": "./tests",
+                }
+            ]
+        }
+    }
+
+
+class UnitTestResult(BaseModel):
+    """Outcome of test generation for one function or class."""
+
+    name: str = Field(..., description="Function or class name")
+    kind: str = Field(..., description="function or class")
+    test_count: int = Field(default=0, description="Number of test functions generated")
+    error: str | None = Field(default=None, description="Why no tests were generated")
+
+
+class PyTestFromSourceResponse(BaseModel):
+    """Response containing pytest code generated per function of a source file."""
+
+    source: str = Field(..., description="Resolved source as owner/repo/path@commit")
+    module_name: str = Field(..., description="Name of the generated module")
+    code: str = Field(..., description="Merged pytest code for all units")
+    test_count: int = Field(..., description="Number of test functions generated")
+    test_names: list[str] = Field(
+        default_factory=list,
+        description="Test functions, as name or Class.name",
+    )
+    markers: list[str] = Field(default_factory=list, description="pytest markers used")
+    fixtures: list[str] = Field(default_factory=list, description="Fixtures defined")
+    llm_provider: str = Field(..., description="Which LLM was used (groq/gemini)")
+    saved_to: str | None = Field(
+        default=None,
+        description="File path where the code was saved (if output_path was provided)",
+    )
+    units: list[UnitTestResult] = Field(
+        default_factory=list,
+        description="Per-function/class generation results",
+    )
+    validation: CodeValidation | None = Field(
+        default=None,
+        description="Compile, name and duplicate-test checks of the generated code",
+    )
+    artifact_id: str | None = Field(
+        default=None,
+        description="Stored artifact id (GET /api/v1/artifacts/{artifact_id})",
+    )
+
+
+class PyTestFromRepositoryRequest(BaseModel):
+    """Request to generate pytest code per function for a repository, incrementally."""
+
+    repository: str = Field(..., description="Repository as 'owner/repo' or a GitHub URL")
+    ref: str | None = Field(
+        default=None, description="Branch, tag or commit (default branch if not specified)"
+    )
+    path: str = Field(default="", description="Only analyze files under this directory")
+    max_files: int = Field(
+        default=50, ge=1, le=500, description="File limit for the first (full) analysis"
+    )
+    tests_per_unit: int = Field(
+        default=3,
+        ge=1,
+        le=10,
+        description="Approximate number of test functions per function or class",
+    )
+    system_prompt: str | None = Field(
+        default=None,
+        description="Override the default system prompt (for advanced users)",
+    )
+    github_token: str | None = Field(
+        default=None,
+        description="GitHub token for private repositories (falls back to GITHUB_TOKEN)",
+    )
+
+    model_config = {"json_schema_extra": {"examples": [{"repository": "octo/shop", "path": "app"}]}}
+
+
+class RepositoryUnitTests(BaseModel):
+    """Generated tests for one function or class of a repository."""
+
+    path: str = Field(..., description="File the unit is defined in")
+    name: str = Field(..., description="Function or class name")
+    code: str = Field(..., description="pytest code for the unit")
+    reused: bool = Field(..., description="Unchanged since the last analysis; not regenerated")
+
+
+class PyTestFromRepositoryResponse(BaseModel):
+    """Response with per-unit pytest code for a repository."""
+
+    repository: str = Field(..., description="Repository as owner/repo")
+    head_sha: str = Field(..., description="Commit analyzed")
+    base_sha: str | None = Field(
+        default=None, description="Previously analyzed commit (None for a full analysis)"
+    )
+    files_fetched: int = Field(..., description="Files downloaded for this run")
+    units_generated: int = Field(..., description="Units whose tests were generated")
+    units_reused: int = Field(..., description="Units whose stored tests were reused")
+    removed_paths: list[str] = Field(
+        default_factory=list, description="Files removed since the last analysis"
+    )
+    units: list[RepositoryUnitTests] = Field(default_factory=list, description="Tests per unit")
+    llm_provider: str | None = Field(
+        default=None, description="Which LLM was used (None if nothing was generated)"
+    )
+    artifact_id: str | None = Field(
+        default=None,
+        description="Stored artifact id (GET /api/v1/artifacts/{artifact_id})",
+    )
+
+
+class PyTestRunRequest(BaseModel):
+    """Request model for running a pytest module in the sandbox."""
+
+    code: str = Field(..., min_length=1, description="pytest module source")
+    conftest_code: str | None = Field(default=None, description="Optional conftest.py source")
+    module_name: str = Field(
+        default="test_generated",
+        description="Module file name (without .py)",
+        pattern=r"^[a-z][a-z0-9_]*$",
+    )
+    timeout_seconds: float | None = Field(
+        default=None,
+        ge=1,
+        le=600,
+        description="Wall-clock limit (RUNNER_TIMEOUT_SECONDS if unset)",
+    )
+    use_cache: bool = Field(
+        default=True,
+        description="Reuse the result of an earlier run of identical code",
+    )
+
+    model_config = {
+        "json_schema_extra": {
+            "examples": [
+                {
+                    "code": "def test_addition():\n    assert 1 + 1 == 2\n",
+                    "module_name": "test_math",
+                    "timeout_seconds": 30,
+                }
+            ]
+        }
+    }
+
+
+class PyTestOutcome(BaseModel):
+    """Outcome of one test in a run."""
+
+    nodeid: str = Field(..., description="pytest node id")
+    outcome: Literal["passed", "failed", "error", "skipped"]
+    duration: float = Field(..., description="Seconds")
+    message: str | None = Field(default=None, description="Failure, error or skip reason")
+
+
+class PyTestRunResponse(BaseModel):
+    """Result of running a pytest module."""
+
+    module_name: str
+    status: Literal["passed", "failed", "error", "timeout"]
+    exit_code: int | None = Field(default=None, description="pytest exit code")
+    duration: float = Field(..., description="Wall-clock seconds")
+    passed: int = 0
+    failed: int = 0
+    errors: int = 0
+    skipped: int = 0
+    tests: list[PyTestOutcome] = Field(default_factory=list)
+    output: str = Field(default="", description="Tail of the pytest output")
+    code_hash: str = Field(..., description="Cache key of the code and run settings")
+    cached: bool = Field(default=False, description="Result reused from an earlier run")
+
+
+class PyTestRunBatchRequest(BaseModel):
+    """Request model for running several modules in parallel."""
+
+    modules: list[PyTestRunRequest] = Field(..., min_length=1, max_length=500)
+
+
+class PyTestRunBatchResponse(BaseModel):
+    """Results of a batch run, in request order."""
+
+    results: list[PyTestRunResponse]
+    total: int = Field(..., description="Modules run")
+    passed: int = Field(..., description="Modules whose tests all passed")
+    cached: int = Field(..., description="Results reused from earlier runs")
+    duration: float = Field(..., description="Wall-clock seconds for the batch")
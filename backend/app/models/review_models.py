@@ -0,0 +1,108 @@
+"""
+Review Models
+=============
+Pydantic models for pull request reviews.
+"""
+
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+
+class ReviewComment(BaseModel):
+    """One review finding on a changed line."""
+
+    severity: Literal["Critical", "High", "Medium", "Low", "Info"] = Field(default="Info")
+    category: Literal["Bug", "Security", "Performance", "Style", "Maintainability"] = Field(
+        default="Maintainability"
+    )
+    file: str = Field(..., description="File path")
+    line: int | None = Field(default=None, description="Line in the new version of the file")
+    title: str = Field(..., description="Brief issue title")
+    description: str = Field(default="", description="Detailed description of the issue")
+    suggestion: str = Field(default="", description="How to fix it")
+    code_suggestion: str | None = Field(default=None, description="Optional code snippet")
+    confidence: int = Field(default=50, ge=0, le=100)
+
+
+class ReviewStats(BaseModel):
+    """Comment counts by severity."""
+
+    critical: int = 0
+    high: int = 0
+    medium: int = 0
+    low: int = 0
+    info: int = 0
+
+
+class ReviewChunkResult(BaseModel):
+    """Outcome of reviewing one chunk of the diff."""
+
+    files: list[str] = Field(..., description="Files with hunks in the chunk")
+    hunks: int = Field(..., description="Number of hunks in the chunk")
+    tokens: int = Field(..., description="Estimated diff tokens in the chunk")
+    comment_count: int = Field(default=0, description="Comments returned for the chunk")
+    error: str | None = Field(default=None, description="Why the chunk review failed")
+
+
+class PRReviewRequest(BaseModel):
+    """Request model for reviewing a pull request."""
+
+    pull_request: str = Field(
+        ...,
+        description="Pull request URL or reference (owner/repo#number)",
+    )
+    chunk_tokens: int | None = Field(
+        default=None,
+        ge=500,
+        le=32000,
+        description="Token budget for the diff in one review call (REVIEW_CHUNK_TOKENS if unset)",
+    )
+    use_cache: bool = Field(
+        default=True,
+        description="Reuse comments for hunks unchanged since the last review",
+    )
+    system_prompt: str | None = Field(
+        default=None,
+        description="Custom system prompt (optional)",
+    )
+    github_token: str | None = Field(
+        default=None,
+        description="GitHub token (falls back to GITHUB_TOKEN)",
+    )
+
+    model_config = {
+        "json_schema_extra": {
+            "examples": [
+                {
+                    "pull_request": "https://github.com/octo/shop/pull/42",
+                    "chunk_tokens": 3000,
+                }
+            ]
+        }
+    }
+
+
+class PRReviewResponse(BaseModel):
+    """Response model for a pull request review."""
+
+    pull_request: str = Field(..., description="Pull request URL")
+    head_sha: str = Field(..., description="Reviewed head commit")
+    summary: str = Field(..., description="Overall assessment of the PR")
+    approval_recommendation: Literal["APPROVE", "REQUEST_CHANGES", "COMMENT"]
+    stats: ReviewStats
+    comments: list[ReviewComment] = Field(default_factory=list)
+    positive_feedback: list[str] = Field(default_factory=list)
+    hunks_total: int = Field(..., description="Hunks in the diff")
+    hunks_reviewed: int = Field(..., description="Hunks sent to the LLM")
+    hunks_reused: int = Field(..., description="Unchanged hunks whose comments were reused")
+    files_skipped: list[str] = Field(
+        default_factory=list,
+        description="Files without a reviewable patch (binary, too large or deleted)",
+    )
+    chunks: list[ReviewChunkResult] = Field(default_factory=list)
+    llm_provider: str | None = Field(default=None, description="Which LLM was used")
+    artifact_id: str | None = Field(
+        default=None,
+        description="Stored artifact id (GET /api/v1/artifacts/{artifact_id})",
+    )
@@ -28,6 +28,15 @@ class TestCaseType(str, Enum):
     PERFORMANCE = "performance"
 
 
+# Personas with a system prompt in app/prompts/templates/testcase/personas/
+Persona = Literal[
+    "qa_engineer", "security_analyst", "performance_engineer", "mobile_qa", "api_tester"
+]
+
+# What to do with near-duplicate test cases
+DuplicateMode = Literal["drop", "flag", "keep"]
+
+
 class TestCase(BaseModel):
     """A single generated test case."""
 
@@ -39,6 +48,22 @@ class TestCase(BaseModel):
     expected_result: str = Field(..., description="Expected outcome")
     priority: Priority = Field(default=Priority.MEDIUM, description="Test priority")
     test_type: TestCaseType = Field(default=TestCaseType.FUNCTIONAL, description="Type of test")
+    persona: Persona | None = Field(
+        default=None, description="Persona that generated this test case (multi-persona mode)"
+    )
+    duplicate_of: str | None = Field(
+        default=None, description="ID of the test case this one repeats (duplicates='flag')"
+    )
+
+
+class CachedSource(BaseModel):
+    """Stored result served for a near-duplicate requirement."""
+
+    artifact_id: str = Field(..., description="Artifact the result was served from")
+    requirement: str = Field(..., description="Requirement the result was generated for")
+    similarity: float = Field(
+        ..., description="Estimated similarity of the requirements (1.0: same once normalized)"
+    )
 
 
 class TestCaseGenerateRequest(BaseModel):
@@ -71,6 +96,27 @@ class TestCaseGenerateRequest(BaseModel):
         default=None,
         description="Override the default QA engineer system prompt (for advanced users)",
     )
+    personas: list[Persona] = Field(
+        default_factory=list,
+        max_length=5,
+        description=(
+            "Generate with each of these personas concurrently and merge the results "
+            "(num_cases per persona, near-duplicates removed; json output only, "
+            "system_prompt is not used)"
+        ),
+    )
+    duplicates: DuplicateMode = Field(
+        default="drop",
+        description=("Near-duplicate test cases: drop them, flag them (duplicate_of) or keep them"),
+    )
+    few_shot: bool = Field(
+        default=True,
+        description="Show accepted test cases of similar requirements to the LLM as examples",
+    )
+    use_cache: bool = Field(
+        default=True,
+        description="Serve the stored result of a near-duplicate requirement with the same settings",
+    )
 
     model_config = {
         "json_schema_extra": {
@@ -95,3 +141,138 @@ class TestCaseGenerateResponse(BaseModel):
     test_cases: list[TestCase] = Field(..., description="Generated test cases")
     total_count: int = Field(..., description="Number of test cases generated")
     llm_provider: str = Field(..., description="Which LLM was used (groq/gemini)")
+    personas: list[Persona] = Field(
+        default_factory=list, description="Personas whose test cases were merged"
+    )
+    failed_personas: list[Persona] = Field(
+        default_factory=list, description="Personas whose generation failed"
+    )
+    duplicates_removed: int = Field(default=0, description="Near-duplicate test cases dropped")
+    duplicates_flagged: int = Field(default=0, description="Near-duplicate test cases flagged")
+    few_shot_examples: int = Field(
+        default=0, description="Accepted test cases of similar requirements used as examples"
+    )
+    cached_from: CachedSource | None = Field(
+        default=None, description="Set when a stored result was served instead of generating"
+    )
+    artifact_id: str | None = Field(
+        default=None,
+        description="Stored artifact id (GET /api/v1/artifacts/{artifact_id})",
+    )
+
+
+class TestCaseAcceptRequest(BaseModel):
+    """Request to store accepted test cases as few-shot examples."""
+
+    requirement: str = Field(
+        ...,
+        min_length=10,
+        description="The requirement the test cases were written for",
+    )
+    context: str = Field(default="", description="Additional context about the system")
+    test_cases: list[TestCase] = Field(
+        ..., min_length=1, description="Test cases accepted for the requirement"
+    )
+
+
+class TestCaseAcceptResponse(BaseModel):
+    """Response after storing accepted test cases."""
+
+    key: str = Field(
+        ..., description="Example key (replaced when the requirement is accepted again)"
+    )
+    total_examples: int = Field(..., description="Requirements with accepted test cases")
+
+
+class IssueIngestRequest(BaseModel):
+    """Request to generate test cases for the issues of a GitHub repository."""
+
+    repository: str = Field(..., description="Repository as 'owner/repo' or a GitHub URL")
+    labels: list[str] = Field(
+        default_factory=list,
+        description="Only issues with any of these labels",
+    )
+    milestones: list[str] = Field(
+        default_factory=list,
+        description="Only issues in any of these milestones (milestone numbers)",
+    )
+    state: Literal["open", "closed", "all"] = Field(
+        default="open",
+        description="Issue state to ingest",
+    )
+    max_issues: int = Field(default=20, ge=1, le=100, description="Maximum issues to ingest")
+    include_comments: bool = Field(
+        default=True,
+        description="Include issue comments in the requirement text",
+    )
+    context: str = Field(
+        default="",
+        description="Additional context about the system, tech stack, or constraints",
+    )
+    num_cases: int = Field(default=5, ge=1, le=20, description="Test cases per issue")
+    include_edge_cases: bool = Field(
+        default=True,
+        description="Include edge case and negative test scenarios",
+    )
+    force: bool = Field(
+        default=False,
+        description="Regenerate test cases even for issues that have not changed",
+    )
+    duplicates: DuplicateMode = Field(
+        default="drop",
+        description=("Near-duplicate test cases: drop them, flag them (duplicate_of) or keep them"),
+    )
+    few_shot: bool = Field(
+        default=True,
+        description="Show accepted test cases of similar requirements to the LLM as examples",
+    )
+    system_prompt: str | None = Field(
+        default=None,
+        description="Override the default QA engineer system prompt (for advanced users)",
+    )
+    github_token: str | None = Field(
+        default=None,
+        description="GitHub token (falls back to GITHUB_TOKEN; the GraphQL API requires one)",
+    )
+
+    model_config = {
+        "json_schema_extra": {
+            "examples": [
+                {
+                    "repository": "octo/shop",
+                    "labels": ["feature"],
+                    "milestones": ["3"],
+                    "max_issues": 10,
+                    "num_cases": 5,
+                }
+            ]
+        }
+    }
+
+
+class IssueTestCases(BaseModel):
+    """Test cases generated (or reused) for one issue."""
+
+    number: int = Field(..., description="Issue number")
+    title: str = Field(..., description="Issue title")
+    url: str = Field(..., description="Issue URL")
+    content_hash: str = Field(..., description="Hash of the issue text and generation settings")
+    status: Literal["generated", "unchanged", "failed"] = Field(
+        ..., description="Whether test cases were generated, reused or failed"
+    )
+    test_cases: list[TestCase] = Field(default_factory=list, description="Test cases")
+    error: str | None = Field(default=None, description="Why generation failed")
+
+
+class IssueIngestResponse(BaseModel):
+    """Response for issue ingestion."""
+
+    repository: str = Field(..., description="owner/repo")
+    issues: list[IssueTestCases] = Field(..., description="Per-issue results")
+    generated: int = Field(..., description="Issues with newly generated test cases")
+    unchanged: int = Field(..., description="Issues skipped because they did not change")
+    failed: int = Field(..., description="Issues whose generation failed")
+    artifact_id: str | None = Field(
+        default=None,
+        description="Stored artifact id (GET /api/v1/artifacts/{artifact_id})",
+    )
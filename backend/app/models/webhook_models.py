@@ -0,0 +1,31 @@
+"""
+Webhook Models
+==============
+Pydantic models for GitHub webhook ingestion.
+"""
+
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+
+class WebhookAck(BaseModel):
+    """Acknowledgement returned to GitHub for a delivery."""
+
+    status: Literal["queued", "duplicate", "cancelled", "ignored", "pong"]
+    event: str = Field(..., description="X-GitHub-Event of the delivery")
+    key: str | None = Field(default=None, description="Work item the event was queued under")
+
+
+class WebhookQueueStatus(BaseModel):
+    """State of the webhook work queue."""
+
+    pending: int = Field(..., description="Work items waiting for their debounce window")
+    running: int = Field(..., description="Work items being processed")
+    received: int = Field(..., description="Events received")
+    duplicates: int = Field(..., description="Redelivered events dropped")
+    coalesced: int = Field(..., description="Events superseded by a newer event for the same key")
+    cancelled: int = Field(..., description="Pending work items cancelled")
+    processed: int = Field(..., description="Work items processed")
+    skipped: int = Field(..., description="Work items skipped (head SHA already processed)")
+    failed: int = Field(..., description="Work items that failed")
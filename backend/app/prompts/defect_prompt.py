@@ -0,0 +1,46 @@
+"""
+Defect Report Prompts
+=====================
+Prompt templates for turning CI log failures into defect reports.
+"""
+
+from app.prompts.registry import get_prompt_registry
+
+
+def get_defect_system_prompt() -> str:
+    """System prompt for defect reports."""
+    return get_prompt_registry().render_static("defect/system.j2")
+
+
+def get_defect_report_prompt(
+    excerpts: str,
+    failed_tests: list[str],
+    errors: list[str],
+    exit_codes: list[int],
+    summary: str | None = None,
+) -> str:
+    """
+    Build the prompt for a defect report from extracted log failures.
+
+    Only excerpts around failures are included, not the whole log.
+
+    Args:
+        excerpts: Log excerpts around each failure, with line markers
+        failed_tests: Failed test node ids
+        errors: Distinct error messages
+        exit_codes: Non-zero exit codes seen in the log
+        summary: Test run summary line (e.g. "1 failed, 23 passed in 4.52s")
+
+    Returns:
+        Formatted prompt string
+    """
+    registry = get_prompt_registry()
+    return registry.render(
+        "defect/report.j2",
+        excerpts=excerpts,
+        failed_tests=failed_tests,
+        errors=errors,
+        exit_codes=exit_codes,
+        summary=summary,
+        json_schema=registry.render_static("defect/json_schema.j2"),
+    )
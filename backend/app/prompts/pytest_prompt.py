@@ -2,23 +2,79 @@
 PyTest Generation Prompts
 =========================
 Prompt templates for generating pytest skeleton code from test cases.
+
+Static instructions come first and request data (module name, context,
+test cases) last, so the system prompt and instructions form a prefix that
+is identical across requests and can be reused by provider prompt caching.
+Test cases are sent in a compact encoding (see encode_test_cases()).
 """
 
-PYTEST_SYSTEM_PROMPT = """You are an expert Python test automation engineer with deep knowledge of pytest.
-Your task is to generate production-ready pytest code from test case specifications.
+from app.prompts.registry import get_prompt_registry
+
+# Fields omitted from the compact encoding when they have these values
+_DEFAULT_PRIORITY = "medium"
+_DEFAULT_TEST_TYPE = "functional"
+_LIST_SEPARATOR = " | "
+
 
-Follow these best practices:
-1. Use descriptive test function names following `test_<feature>_<scenario>` pattern
-2. Use pytest fixtures for setup/teardown and shared resources
-3. Use pytest.mark decorators for categorization (smoke, regression, etc.)
-4. Use pytest.param for parametrized tests when applicable
-5. Include clear docstrings explaining what each test validates
-6. Use appropriate assertions with helpful error messages
-7. Follow AAA pattern: Arrange, Act, Assert
-8. Handle expected exceptions with pytest.raises
-9. Use conftest.py for shared fixtures when appropriate
+def _one_line(value) -> str:
+    return " ".join(str(value).split())
 
-Output clean, runnable Python code that follows PEP 8 style guidelines."""
+
+def encode_test_cases(test_cases: list[dict]) -> str:
+    """
+    Encode test cases compactly for a prompt.
+
+    Each case is a "<id> <title>" line followed by indented fields with
+    short keys (format in templates/pytest/test_case_format.j2). Empty and
+    default fields are omitted, as is a description equal to the title.
+    Preconditions shared by several cases are listed once and referenced
+    as "@n".
+
+    Args:
+        test_cases: Test case dictionaries with id, title, description, etc.
+
+    Returns:
+        Encoded test cases
+    """
+    counts: dict[str, int] = {}
+    for tc in test_cases:
+        for precondition in dict.fromkeys(_one_line(p) for p in tc.get("preconditions") or []):
+            counts[precondition] = counts.get(precondition, 0) + 1
+    shared = {p: f"@{i}" for i, p in enumerate((p for p, n in counts.items() if n > 1), 1)}
+
+    lines = []
+    if shared:
+        lines.append("Shared preconditions:")
+        lines.extend(f"{ref} {precondition}" for precondition, ref in shared.items())
+        lines.append("")
+
+    for i, tc in enumerate(test_cases, 1):
+        title = _one_line(tc.get("title") or "Untitled")
+        lines.append(f"{_one_line(tc.get('id') or f'TC{i:03d}')} {title}")
+        description = _one_line(tc.get("description") or "")
+        preconditions = [
+            shared.get(p, p) for p in (_one_line(p) for p in tc.get("preconditions") or []) if p
+        ]
+        fields = {
+            "d": description if description != title else "",
+            "pre": _LIST_SEPARATOR.join(preconditions),
+            "s": _LIST_SEPARATOR.join(_one_line(s) for s in tc.get("steps") or []),
+            "exp": _one_line(tc.get("expected_result") or ""),
+            "p": _one_line(tc.get("priority") or _DEFAULT_PRIORITY),
+            "ty": _one_line(tc.get("test_type") or _DEFAULT_TEST_TYPE),
+        }
+        if fields["p"] == _DEFAULT_PRIORITY:
+            fields["p"] = ""
+        if fields["ty"] == _DEFAULT_TEST_TYPE:
+            fields["ty"] = ""
+        lines.extend(f" {key}: {value}" for key, value in fields.items() if value)
+    return "\n".join(lines)
+
+
+def get_pytest_system_prompt() -> str:
+    """Default system prompt for pytest generation."""
+    return get_prompt_registry().render_static("pytest/system.j2")
 
 
 def get_pytest_generation_prompt(
@@ -26,6 +82,7 @@ def get_pytest_generation_prompt(
     module_name: str = "test_generated",
     include_fixtures: bool = True,
     include_conftest: bool = False,
+    context: str = "",
 ) -> str:
     """
     Build the prompt for pytest code generation.
@@ -35,67 +92,20 @@ def get_pytest_generation_prompt(
         module_name: Name for the generated test module
         include_fixtures: Whether to generate fixture suggestions
         include_conftest: Whether to generate a separate conftest.py
+        context: Additional context about the system under test
 
     Returns:
         Formatted prompt string
     """
-    # Format test cases for the prompt
-    tc_text = ""
-    for i, tc in enumerate(test_cases, 1):
-        tc_text += f"""
-### Test Case {i}: {tc.get('id', f'TC{i:03d}')}
-- **Title:** {tc.get('title', 'Untitled')}
-- **Description:** {tc.get('description', 'No description')}
-- **Preconditions:** {', '.join(tc.get('preconditions', [])) or 'None'}
-- **Steps:**
-{chr(10).join(f'  {j}. {step}' for j, step in enumerate(tc.get('steps', []), 1)) or '  None'}
-- **Expected Result:** {tc.get('expected_result', 'Not specified')}
-- **Priority:** {tc.get('priority', 'medium')}
-- **Type:** {tc.get('test_type', 'functional')}
-"""
-
-    fixture_instruction = ""
-    if include_fixtures:
-        fixture_instruction = """
-## Fixtures
-Generate appropriate pytest fixtures for:
-- Test data setup
-- Mock objects (if external services are implied)
-- Resource cleanup
-Place fixtures at the top of the test file."""
-
-    conftest_instruction = ""
-    if include_conftest:
-        conftest_instruction = """
-## Conftest
-Also generate a conftest.py file with shared fixtures that could be reused across test modules.
-Return it as a separate code block labeled "conftest.py"."""
-
-    prompt = f"""Generate pytest code for the following test cases.
-
-# Test Cases to Implement
-{tc_text}
-
-{fixture_instruction}
-
-{conftest_instruction}
-
-## Output Requirements
-
-1. Generate a complete pytest file named `{module_name}.py`
-2. Include all necessary imports (pytest, unittest.mock if needed, etc.)
-3. Add pytest markers: @pytest.mark.parametrize where applicable
-4. Use descriptive assertion messages
-5. Add type hints to function signatures
-6. Include module-level docstring explaining test coverage
-
-## Output Format
-
-Return ONLY the Python code. Do not include markdown code fences or explanations.
-The code should be immediately runnable with `pytest {module_name}.py`.
-"""
-
-    return prompt
+    return get_prompt_registry().render(
+        "pytest/generation.j2",
+        test_cases=test_cases,
+        test_cases_text=encode_test_cases(test_cases),
+        module_name=module_name,
+        include_fixtures=include_fixtures,
+        include_conftest=include_conftest,
+        context=context,
+    )
 
 
 def get_pytest_from_requirement_prompt(
@@ -103,6 +113,7 @@ def get_pytest_from_requirement_prompt(
     context: str = "",
     num_tests: int = 5,
     test_framework: str = "pytest",
+    code_context: str = "",
 ) -> str:
     """
     Generate pytest code directly from a requirement (skipping test case JSON).
@@ -114,31 +125,63 @@ def get_pytest_from_requirement_prompt(
         context: Additional context about the system
         num_tests: Approximate number of test functions to generate
         test_framework: Testing framework (pytest, unittest)
+        code_context: Source of the code under test and its direct dependencies
 
     Returns:
         Formatted prompt string
     """
-    context_section = f"\n## Context\n{context}" if context else ""
-
-    prompt = f"""Generate {test_framework} test code for the following requirement.
+    return get_prompt_registry().render(
+        "pytest/from_requirement.j2",
+        requirement=requirement,
+        context=context,
+        num_tests=num_tests,
+        test_framework=test_framework,
+        code_context=code_context,
+    )
+
+
+def get_pytest_from_code_prompt(
+    unit_name: str,
+    unit_kind: str,
+    module_path: str,
+    code_context: str,
+    num_tests: int = 3,
+) -> str:
+    """
+    Build the prompt for generating tests for one function or class.
 
-## Requirement
-{requirement}
-{context_section}
+    Args:
+        unit_name: Name of the function or class under test
+        unit_kind: "function" or "class"
+        module_path: Dotted import path of the module defining the unit
+        code_context: Source of the unit, the imports it uses and its dependencies
+        num_tests: Approximate number of test functions to generate
 
-## Instructions
+    Returns:
+        Formatted prompt string
+    """
+    return get_prompt_registry().render(
+        "pytest/from_code.j2",
+        unit_name=unit_name,
+        unit_kind=unit_kind,
+        module_path=module_path,
+        code_context=code_context,
+        num_tests=num_tests,
+    )
 
-1. Analyze the requirement and identify ~{num_tests} test scenarios
-2. Include positive tests, negative tests, and edge cases
-3. Generate complete, runnable {test_framework} code
-4. Use fixtures for setup/teardown
-5. Add appropriate markers (@pytest.mark.smoke, @pytest.mark.regression, etc.)
-6. Include clear docstrings and assertion messages
 
-## Output Format
+def get_syntax_fix_prompt(snippet: str, error: str, line: int) -> str:
+    """
+    Build the prompt for repairing a syntax error in part of a generated module.
 
-Return ONLY the Python code. Do not include markdown code fences.
-The code should be immediately runnable with `pytest`.
-"""
+    Args:
+        snippet: Lines around the error
+        error: Syntax error message
+        line: Error line, relative to the start of the snippet (1-based)
 
-    return prompt
+    Returns:
+        Formatted prompt string
+    """
+    return get_prompt_registry().render(
+        "pytest/syntax_fix.j2", snippet=snippet, error=error, line=line
+    )
@@ -0,0 +1,108 @@
+"""
+Prompt Registry
+===============
+Jinja2 prompt templates, compiled once and reloaded when their files change.
+
+Templates are packaged in `app/prompts/templates/`. A template with the same
+name in PROMPT_TEMPLATES_DIR (the `prompts/` volume in docker-compose)
+overrides the packaged one, so prompts can be tuned without a rebuild.
+
+All templates are compiled at startup. With auto-reload on, a template is
+recompiled when its file changes, with no restart. Templates without
+variables (system prompts, personas, JSON schemas) are rendered once and the
+text is reused until the template is reloaded.
+
+Example:
+    registry = get_prompt_registry()
+    system_prompt = registry.render_static("pytest/system.j2")
+    prompt = registry.render("pytest/generation.j2", test_cases=test_cases)
+"""
+
+import logging
+import os
+from pathlib import Path
+
+from jinja2 import ChoiceLoader, Environment, FileSystemLoader, StrictUndefined, Template
+
+logger = logging.getLogger("ai_sdlc_copilot")
+
+PACKAGED_TEMPLATES_DIR = Path(__file__).parent / "templates"
+
+# Overrides and reload (override via environment)
+PROMPT_TEMPLATES_DIR = os.getenv("PROMPT_TEMPLATES_DIR", "prompts")
+PROMPT_TEMPLATES_AUTO_RELOAD = os.getenv("PROMPT_TEMPLATES_AUTO_RELOAD", "true").lower() == "true"
+
+
+class PromptRegistry:
+    """Compiled prompt templates with cached renders of static ones."""
+
+    def __init__(
+        self,
+        override_dir: str | Path | None = PROMPT_TEMPLATES_DIR,
+        auto_reload: bool = PROMPT_TEMPLATES_AUTO_RELOAD,
+    ):
+        """
+        Initialize the registry.
+
+        Args:
+            override_dir: Directory whose templates take precedence (may not exist)
+            auto_reload: Recompile templates whose files changed
+        """
+        loaders = [FileSystemLoader(PACKAGED_TEMPLATES_DIR)]
+        if override_dir:
+            loaders.insert(0, FileSystemLoader(override_dir))
+        self.env = Environment(
+            loader=ChoiceLoader(loaders),
+            auto_reload=auto_reload,
+            undefined=StrictUndefined,
+            trim_blocks=True,
+            lstrip_blocks=True,
+            autoescape=False,
+        )
+        self._static: dict[str, tuple[Template, str]] = {}
+
+    def load(self) -> int:
+        """
+        Compile every template (called at startup, so errors surface early).
+
+        Returns:
+            Number of templates compiled
+        """
+        names = self.env.list_templates(extensions=["j2"])
+        for name in names:
+            self.env.get_template(name)
+        return len(names)
+
+    def render(self, name: str, /, **context) -> str:
+        """Render a template with variables."""
+        return self.env.get_template(name).render(**context)
+
+    def render_static(self, name: str) -> str:
+        """Render a template without variables, reusing the text until it is reloaded."""
+        template = self.env.get_template(name)
+        cached = self._static.get(name)
+        if cached is not None and cached[0] is template:
+            return cached[1]
+        text = template.render()
+        self._static[name] = (template, text)
+        return text
+
+
+# Singleton instance
+_prompt_registry: PromptRegistry | None = None
+
+
+def get_prompt_registry() -> PromptRegistry:
+    """Get or create the prompt registry."""
+    global _prompt_registry
+    if _prompt_registry is None:
+        _prompt_registry = PromptRegistry()
+    return _prompt_registry
+
+
+def load_prompt_templates() -> None:
+    """Compile all prompt templates (app startup)."""
+    registry = get_prompt_registry()
+    count = registry.load()
+    reload_mode = "on" if registry.env.auto_reload else "off"
+    logger.info(f"✅ Loaded {count} prompt templates (auto-reload {reload_mode})")
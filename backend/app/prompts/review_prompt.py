@@ -0,0 +1,47 @@
+"""
+PR Review Prompts
+=================
+Prompt templates for reviewing pull request diffs.
+"""
+
+from app.prompts.registry import get_prompt_registry
+
+
+def get_review_system_prompt() -> str:
+    """Default system prompt for pull request reviews."""
+    return get_prompt_registry().render_static("review/system.j2")
+
+
+def get_pr_review_prompt(
+    diff_content: str,
+    pr_title: str,
+    pr_description: str = "",
+    part: int = 1,
+    total_parts: int = 1,
+) -> str:
+    """
+    Build the prompt for reviewing (part of) a pull request diff.
+
+    Large diffs are split into parts that are reviewed independently, so
+    the prompt only asks about the hunks it contains.
+
+    Args:
+        diff_content: Unified diff hunks, grouped by file
+        pr_title: Pull request title
+        pr_description: Pull request description
+        part: Index of this part (1-based)
+        total_parts: Number of parts the diff was split into
+
+    Returns:
+        Formatted prompt string
+    """
+    registry = get_prompt_registry()
+    return registry.render(
+        "review/pr_review.j2",
+        diff_content=diff_content,
+        pr_title=pr_title,
+        pr_description=pr_description,
+        part=part,
+        total_parts=total_parts,
+        json_schema=registry.render_static("review/json_schema.j2"),
+    )
@@ -0,0 +1,48 @@
+"""
+Artifacts Router
+================
+Serve stored generations by id, with ETags for conditional requests.
+"""
+
+import asyncio
+import os
+
+from fastapi import APIRouter, Header, HTTPException, Response
+
+from app.services.artifact_store import get_artifact_store
+
+router = APIRouter(prefix="/artifacts", tags=["Artifacts"])
+
+# Artifacts can be replaced by a regeneration, so clients revalidate (cheaply, via 304)
+ARTIFACT_CACHE_CONTROL = os.getenv("ARTIFACT_CACHE_CONTROL", "private, no-cache")
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Check an If-None-Match header (weak comparison, as RFC 9110 requires)."""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in [tag.removeprefix("W/") for tag in candidates]
+
+
+@router.get("/{artifact_id}")
+async def get_artifact(
+    artifact_id: str,
+    if_none_match: str | None = Header(default=None),
+):
+    """
+    Get a stored artifact: its inputs, metadata (provider, model, latency,
+    tokens) and generated content.
+
+    Responses carry a strong ETag; send it back in If-None-Match to get a
+    304 Not Modified while the artifact is unchanged.
+    """
+    # File reads block, so they run off the event loop
+    stored = await asyncio.to_thread(get_artifact_store().get, artifact_id)
+    if stored is None:
+        raise HTTPException(status_code=404, detail=f"Artifact not found: {artifact_id}")
+
+    headers = {"ETag": stored.etag, "Cache-Control": ARTIFACT_CACHE_CONTROL}
+    if etag_matches(if_none_match, stored.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=stored.body, media_type="application/json", headers=headers)
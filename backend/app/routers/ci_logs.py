@@ -0,0 +1,287 @@
+"""
+CI Logs Router
+==============
+API endpoints for extracting failures from CI logs and drafting defect reports.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import tempfile
+from contextlib import nullcontext
+from dataclasses import asdict
+
+from fastapi import APIRouter, File, Form, HTTPException, UploadFile
+from pydantic import ValidationError
+
+from app.models.ci_log_models import DefectReport, LogAnalysisResponse, LogExcerptModel
+from app.prompts.defect_prompt import get_defect_report_prompt, get_defect_system_prompt
+from app.services.artifact_store import save_generation
+from app.services.failure_signatures import (
+    FailureSignature,
+    failure_signature,
+    get_failure_index,
+)
+from app.services.github_service import GitHubService, GitHubServiceError, get_github_service
+from app.services.llm_service import get_llm_service, track_llm_usage
+from app.services.log_parser import LogAnalysis, analyze_log_file
+
+logger = logging.getLogger("ai_sdlc_copilot")
+
+router = APIRouter(prefix="/ci-logs", tags=["CI Logs"])
+
+# Largest accepted log upload (override via environment)
+LOG_MAX_UPLOAD_BYTES = int(os.getenv("LOG_MAX_UPLOAD_BYTES", str(1024 * 1024 * 1024)))
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+
+def save_upload(upload: UploadFile, max_bytes: int = LOG_MAX_UPLOAD_BYTES) -> str:
+    """
+    Copy an uploaded log to a temporary file in fixed-size chunks.
+
+    Returns:
+        Path of the temporary file (the caller removes it)
+
+    Raises:
+        HTTPException: If the upload is larger than max_bytes
+    """
+    fd, path = tempfile.mkstemp(prefix="ci-log-", suffix=".log")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            size = 0
+            while chunk := upload.file.read(UPLOAD_CHUNK_BYTES):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"Log is larger than {max_bytes // (1024 * 1024)} MB",
+                    )
+                out.write(chunk)
+    except BaseException:
+        os.unlink(path)
+        raise
+    return path
+
+
+def parse_defect_report(response_text: str) -> DefectReport:
+    """
+    Parse an LLM JSON response into a DefectReport.
+
+    Raises:
+        ValueError: If the response is not a valid defect report
+    """
+    cleaned = response_text.strip()
+    if cleaned.startswith("```"):
+        lines = cleaned.split("\n")
+        cleaned = "\n".join(lines[1:-1])
+
+    try:
+        data = json.loads(cleaned)
+        data["environment"] = {k: str(v) for k, v in (data.get("environment") or {}).items()}
+        return DefectReport(**data)
+    except (json.JSONDecodeError, ValidationError, TypeError, AttributeError) as e:
+        raise ValueError(f"LLM returned an invalid defect report: {e}") from e
+
+
+async def draft_defect_report(analysis: LogAnalysis) -> tuple[DefectReport, str]:
+    """
+    Draft a defect report from the extracted failures (not the whole log).
+
+    Returns:
+        Tuple of (DefectReport, LLM provider)
+    """
+    llm = get_llm_service()
+    prompt = get_defect_report_prompt(
+        excerpts=analysis.excerpt_text(),
+        failed_tests=analysis.failed_tests,
+        errors=analysis.errors,
+        exit_codes=analysis.exit_codes,
+        summary=analysis.summary,
+    )
+    response_text = await llm.generate(
+        prompt=prompt,
+        system_prompt=get_defect_system_prompt(),
+        max_tokens=2048,
+        temperature=0.3,
+    )
+    llm_provider = "groq" if llm._groq_client else "gemini"
+    return parse_defect_report(response_text), llm_provider
+
+
+def format_issue_body(report: DefectReport, signature: FailureSignature | None) -> str:
+    """Render a defect report as a GitHub issue body, with the signature marker (if any)."""
+    sections = [report.description]
+    if report.error_message:
+        sections.append(f"**Error:** `{report.error_message}`")
+    if report.reproduction_steps:
+        steps = "\n".join(f"{i}. {step}" for i, step in enumerate(report.reproduction_steps, 1))
+        sections.append(f"### Reproduction steps\n{steps}")
+    if report.expected_behavior or report.actual_behavior:
+        sections.append(
+            f"### Expected\n{report.expected_behavior}\n\n### Actual\n{report.actual_behavior}"
+        )
+    if report.stack_trace:
+        sections.append(f"### Stack trace\n```\n{report.stack_trace}\n```")
+    if report.suggested_fixes:
+        sections.append(
+            "### Suggested fixes\n" + "\n".join(f"- {fix}" for fix in report.suggested_fixes)
+        )
+    footer = f"_Severity: {report.severity} · Priority: {report.priority} · Type: {report.type}_"
+    if signature is not None:
+        footer += f"\n\n{signature.marker}"
+    sections.append(footer)
+    return "\n\n".join(s for s in sections if s)
+
+
+@router.post("/analyze", response_model=LogAnalysisResponse)
+async def analyze_ci_log(
+    file: UploadFile = File(..., description="CI log file"),
+    generate_report: bool = Form(default=True, description="Draft a defect report with the LLM"),
+    context_lines: int = Form(default=10, ge=0, le=50, description="Context lines per failure"),
+    repository: str | None = Form(default=None, description="Repository as 'owner/repo'"),
+    create_issue: bool = Form(default=False, description="Create a GitHub issue for new failures"),
+    github_token: str | None = Form(default=None, description="Token (falls back to GITHUB_TOKEN)"),
+):
+    """
+    Extract failures from a CI log and draft a defect report.
+
+    The log is written to disk in chunks and scanned through a memory map,
+    so memory use does not grow with the log size. Failed tests, errors,
+    exit codes and bounded excerpts around each failure are returned; only
+    the excerpts are sent to the LLM for the defect report.
+
+    Failures are de-duplicated by signature first: a failure already seen
+    (exactly or nearly) for the repository returns its earlier report and
+    issue without an LLM call or a GitHub write. Logs without a repository,
+    or whose failure has an empty signature, are always reported.
+    """
+    logger.info(f"Analyzing CI log: {file.filename}")
+
+    path = await asyncio.to_thread(save_upload, file)
+    try:
+        # The scan is CPU and I/O bound; keep it off the event loop
+        analysis = await asyncio.to_thread(analyze_log_file, path, context_lines=context_lines)
+    finally:
+        os.unlink(path)
+
+    response = LogAnalysisResponse(
+        filename=file.filename,
+        size_bytes=analysis.size_bytes,
+        failed_tests=analysis.failed_tests,
+        errors=analysis.errors,
+        exit_codes=analysis.exit_codes,
+        summary=analysis.summary,
+        excerpts=[LogExcerptModel(**asdict(e)) for e in analysis.excerpts],
+        truncated=analysis.truncated,
+    )
+
+    if not analysis.has_failures:
+        return response
+
+    if create_issue and not repository:
+        raise HTTPException(status_code=400, detail="create_issue requires a repository")
+    if repository:
+        try:
+            owner, repo = GitHubService.parse_github_url(repository)
+        except GitHubServiceError as e:
+            raise HTTPException(status_code=400, detail=str(e)) from e
+        repository = f"{owner}/{repo}"
+
+    signature = failure_signature(analysis)
+    index = get_failure_index(repository) if repository and not signature.is_empty else None
+    if index is not None:
+        response.signature = signature.fingerprint
+
+    async with index.reserve(signature) if index is not None else nullcontext():
+        # Known failure: one local lookup, no LLM call or API write
+        match = index.match(signature) if index is not None else None
+        if match is not None:
+            await index.record_occurrence(match.cluster)
+            cluster = match.cluster
+            logger.info(
+                f"♻️ Failure matches {cluster.fingerprint[:8]} "
+                f"(similarity {match.similarity:.2f}, seen {cluster.occurrences}x)"
+            )
+            response.duplicate = True
+            response.similarity = match.similarity
+            response.occurrences = cluster.occurrences
+            response.issue_number = cluster.issue_number
+            response.issue_url = cluster.issue_url
+            if cluster.defect_report:
+                response.defect_report = DefectReport(**cluster.defect_report)
+            return response
+
+        try:
+            service = None
+            if create_issue:
+                service = get_github_service(github_token or os.getenv("GITHUB_TOKEN"))
+                # The issue may exist already (e.g. created before the local index)
+                existing = (
+                    await service.find_issue(owner, repo, signature.marker)
+                    if index is not None
+                    else None
+                )
+                if existing is not None:
+                    await index.add(signature, existing["number"], existing["html_url"])
+                    response.duplicate = True
+                    response.issue_number = existing["number"]
+                    response.issue_url = existing["html_url"]
+                    return response
+
+            if not generate_report and not create_issue:
+                return response
+
+            with track_llm_usage() as usage:
+                response.defect_report, response.llm_provider = await draft_defect_report(analysis)
+            logger.info(f"✅ Drafted defect report: {response.defect_report.title}")
+            response.artifact_id = await asyncio.to_thread(
+                save_generation,
+                "defect-report",
+                {
+                    "signature": signature.fingerprint,
+                    "repository": repository,
+                    "context_lines": context_lines,
+                },
+                response.defect_report,
+                usage,
+            )
+
+            if service is not None:
+                issue = await service.create_issue(
+                    owner,
+                    repo,
+                    title=response.defect_report.title,
+                    body=format_issue_body(
+                        response.defect_report, signature if index is not None else None
+                    ),
+                    labels=response.defect_report.labels,
+                )
+                response.issue_number = issue["number"]
+                response.issue_url = issue["html_url"]
+                logger.info(f"✅ Created issue {repository}#{issue['number']}")
+
+        except GitHubServiceError as e:
+            raise HTTPException(status_code=400, detail=str(e)) from e
+        except ValueError as e:
+            logger.error(f"Defect report drafting failed: {e}")
+            raise HTTPException(
+                status_code=500,
+                detail=f"{e}. Please try again.",
+            ) from None
+        except Exception as e:
+            logger.error(f"Defect report drafting failed: {e}")
+            raise HTTPException(
+                status_code=500,
+                detail=f"Failed to draft defect report: {str(e)}",
+            ) from e
+
+        if index is not None:
+            await index.add(
+                signature,
+                issue_number=response.issue_number,
+                issue_url=response.issue_url,
+                defect_report=response.defect_report.model_dump(),
+            )
+
+    return response
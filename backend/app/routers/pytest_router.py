@@ -4,29 +4,84 @@ PyTest Generation Router
 API endpoints for generating pytest skeleton code from test cases.
 """
 
+import asyncio
 import logging
-import re
-from pathlib import Path
+import os
+import time
+from dataclasses import asdict
 
 from fastapi import APIRouter, HTTPException
 
 from app.models.pytest_models import (
+    CodeDiagnostic,
+    CodeValidation,
+    ContextReport,
+    PyTestFromRepositoryRequest,
+    PyTestFromRepositoryResponse,
     PyTestFromRequirementRequest,
+    PyTestFromSourceRequest,
+    PyTestFromSourceResponse,
     PyTestGenerateRequest,
     PyTestGenerateResponse,
+    PyTestOutcome,
+    PyTestRunBatchRequest,
+    PyTestRunBatchResponse,
+    PyTestRunRequest,
+    PyTestRunResponse,
+    RepositoryCodeContext,
+    RepositoryUnitTests,
+    UnitTestResult,
 )
 from app.prompts.pytest_prompt import (
-    PYTEST_SYSTEM_PROMPT,
+    get_pytest_from_code_prompt,
     get_pytest_from_requirement_prompt,
     get_pytest_generation_prompt,
+    get_pytest_system_prompt,
+    get_syntax_fix_prompt,
 )
-from app.services.llm_service import get_llm_service
+from app.services.artifact_store import save_generation
+from app.services.code_units import CodeUnit
+from app.services.code_validation import (
+    Diagnostic,
+    SnippetFixer,
+    ValidationResult,
+    validate_and_fix,
+)
+from app.services.context_packer import (
+    ContextPacker,
+    Snippet,
+    estimate_tokens,
+    split_paragraphs,
+)
+from app.services.file_output import write_files
+from app.services.github_service import GitHubService, GitHubServiceError, get_github_service
+from app.services.incremental_analysis import IncrementalAnalyzer
+from app.services.llm_service import LLMService, get_llm_service, track_llm_usage
+from app.services.requirement_cache import find_cached_response, remember_response
+from app.services.response_analysis import analyze_module, analyze_response, extract_code
+from app.services.sandbox_runner import (
+    RUNNER_ENABLED,
+    RUNNER_TIMEOUT_SECONDS,
+    get_test_runner,
+)
+from app.services.source_generation import (
+    SourceSpec,
+    UnitTarget,
+    generate_unit_tests,
+    merge_test_modules,
+    parse_source_spec,
+    plan_units,
+)
+from app.services.symbol_index import get_repository_index
 
 router = APIRouter(prefix="/pytest", tags=["PyTest"])
 logger = logging.getLogger("ai_sdlc_copilot")
 
+# Output token limit for pytest generation (also reserved in the prompt budget)
+MAX_OUTPUT_TOKENS = 4096
+
 
-def save_code_to_file(
+async def save_code_to_file(
     code: str,
     output_path: str,
     filename: str,
@@ -35,6 +90,9 @@ def save_code_to_file(
     """
     Save generated code to a file.
 
+    The test module and conftest.py are written atomically as one batch,
+    so concurrent generations into the same directory do not interleave.
+
     Args:
         code: The pytest code to save
         output_path: Directory path to save to
@@ -44,51 +102,78 @@ def save_code_to_file(
     Returns:
         Full path to the saved file
     """
-    # Create directory if it doesn't exist
-    output_dir = Path(output_path)
-    output_dir.mkdir(parents=True, exist_ok=True)
-
-    # Save main test file
-    file_path = output_dir / f"{filename}.py"
-    file_path.write_text(code, encoding="utf-8")
-    logger.info(f"📁 Saved pytest code to: {file_path}")
-
-    # Save conftest if provided
+    files = {f"{filename}.py": code}
     if conftest_code:
-        conftest_path = output_dir / "conftest.py"
-        conftest_path.write_text(conftest_code, encoding="utf-8")
-        logger.info(f"📁 Saved conftest.py to: {conftest_path}")
+        files["conftest.py"] = conftest_code
 
-    return str(file_path.resolve())
+    written = await write_files(output_path, files)
+    for path in written.values():
+        logger.info(f"📁 Saved {path.name} to: {path}")
 
+    return str(written[f"{filename}.py"])
 
-def clean_code_response(response: str) -> str:
+
+async def build_code_context(code: RepositoryCodeContext) -> list[tuple[str, str]]:
     """
-    Clean up LLM response to extract pure Python code.
-    Removes markdown code fences and extra whitespace.
+    Build prompt context for repository code under test.
+
+    Only the requested symbols, the imports they use and the signatures of
+    their direct dependencies are included - not whole files.
+
+    Returns:
+        List of (symbol, context) pairs for the symbols that were found
+
+    Raises:
+        HTTPException: If the repository cannot be read or no symbol is found
     """
-    # Remove markdown code fences if present
-    cleaned = response.strip()
+    try:
+        owner, repo = GitHubService.parse_github_url(code.repository)
+        service = get_github_service(code.github_token or os.getenv("GITHUB_TOKEN"))
+        commit_sha, index = await get_repository_index(service, owner, repo, code.ref, code.path)
+    except GitHubServiceError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+    sections = [index.context_for(symbol) for symbol in code.symbols]
+    missing = [
+        symbol for symbol, section in zip(code.symbols, sections, strict=True) if not section
+    ]
+    if len(missing) == len(code.symbols):
+        raise HTTPException(
+            status_code=404,
+            detail=f"Symbols not found in {owner}/{repo}@{commit_sha[:7]}: {', '.join(missing)}",
+        )
+    if missing:
+        logger.warning(f"Symbols not found in {owner}/{repo}: {', '.join(missing)}")
+
+    return [
+        (symbol, section) for symbol, section in zip(code.symbols, sections, strict=True) if section
+    ]
+
+
+def syntax_fixer(llm: LLMService) -> SnippetFixer:
+    """Repair a syntax error by sending only the lines around it to the LLM."""
 
-    # Handle ```python ... ``` blocks
-    if cleaned.startswith("```"):
-        lines = cleaned.split("\n")
-        # Remove first line (```python or ```)
-        lines = lines[1:]
-        # Remove last line if it's ```
-        if lines and lines[-1].strip() == "```":
-            lines = lines[:-1]
-        cleaned = "\n".join(lines)
+    async def fix(snippet: str, error: Diagnostic) -> str:
+        response_text = await llm.generate(
+            prompt=get_syntax_fix_prompt(snippet, error.message, error.line or 1),
+            system_prompt=get_pytest_system_prompt(),
+            max_tokens=1024,
+            temperature=0.0,
+        )
+        return extract_code(response_text)
 
-    return cleaned.strip()
+    return fix
 
 
-def count_test_functions(code: str) -> int:
-    """Count the number of test functions in the generated code."""
-    # Match function definitions starting with 'test_'
-    pattern = r"^(?:async\s+)?def\s+test_\w+\s*\("
-    matches = re.findall(pattern, code, re.MULTILINE)
-    return len(matches)
+def to_validation(results: list[ValidationResult], fixed: bool = False) -> CodeValidation:
+    """Combine the validation results of the generated files for the response."""
+    diagnostics = [CodeDiagnostic(**asdict(d)) for r in results for d in r.diagnostics]
+    return CodeValidation(
+        valid=not any(d.severity == "error" for d in diagnostics),
+        fixed=fixed,
+        formatted=any(r.formatted for r in results),
+        diagnostics=diagnostics,
+    )
 
 
 @router.post("/generate", response_model=PyTestGenerateResponse)
@@ -120,50 +205,68 @@ async def generate_pytest_from_testcases(request: PyTestGenerateRequest):
         # Convert test cases to dict format for prompt
         test_cases_data = [tc.model_dump() for tc in request.test_cases]
 
+        # Use custom or default system prompt
+        system_prompt = request.system_prompt or get_pytest_system_prompt()
+
+        # Test cases are always sent; free-text context fills what budget is left
+        prompt_args = {
+            "module_name": request.module_name,
+            "include_fixtures": request.include_fixtures,
+            "include_conftest": request.include_conftest,
+        }
+        fixed_tokens = estimate_tokens(system_prompt) + estimate_tokens(
+            get_pytest_generation_prompt(test_cases=test_cases_data, **prompt_args)
+        )
+        snippets = split_paragraphs(request.context)
+        query = " ".join(f"{tc['title']} {tc['description']}" for tc in test_cases_data)
+        packed = ContextPacker(reserve_output=MAX_OUTPUT_TOKENS).pack(query, snippets, fixed_tokens)
+
         # Build the prompt
         prompt = get_pytest_generation_prompt(
             test_cases=test_cases_data,
-            module_name=request.module_name,
-            include_fixtures=request.include_fixtures,
-            include_conftest=request.include_conftest,
+            context=packed.text("context"),
+            **prompt_args,
         )
 
-        # Use custom or default system prompt
-        system_prompt = request.system_prompt or PYTEST_SYSTEM_PROMPT
-
         # Generate pytest code
-        response_text = await llm.generate(
-            prompt=prompt,
-            system_prompt=system_prompt,
-            max_tokens=4096,
-            temperature=0.3,  # Lower temperature for code generation
-        )
+        with track_llm_usage() as usage:
+            response_text = await llm.generate(
+                prompt=prompt,
+                system_prompt=system_prompt,
+                max_tokens=MAX_OUTPUT_TOKENS,
+                temperature=0.3,  # Lower temperature for code generation
+            )
 
         # Determine which provider was used
         llm_provider = "groq" if llm._groq_client else "gemini"
 
-        # Clean the response
-        code = clean_code_response(response_text)
-
-        # Handle conftest if requested (split from main response if present)
-        conftest_code = None
-        if request.include_conftest and "conftest.py" in response_text.lower():
-            # Try to extract conftest section
-            conftest_match = re.search(
-                r"(?:#+\s*conftest\.py|# conftest\.py).*?```python\s*(.*?)```",
-                response_text,
-                re.IGNORECASE | re.DOTALL,
-            )
-            if conftest_match:
-                conftest_code = conftest_match.group(1).strip()
+        # Split the response into the module and conftest.py (if requested)
+        extracted = analyze_response(response_text, split_conftest=request.include_conftest)
+        code, conftest_code = extracted.code, extracted.conftest_code
 
-        # Count test functions
-        test_count = count_test_functions(code)
+        # Validate off the event loop; a syntax error gets a targeted fix
+        with track_llm_usage(usage):
+            result, fixed = await validate_and_fix(
+                code, syntax_fixer(llm), filename=f"{request.module_name}.py"
+            )
+            results = [result]
+            if conftest_code:
+                conftest, conftest_fixed = await validate_and_fix(
+                    conftest_code, syntax_fixer(llm), filename="conftest.py"
+                )
+                results.append(conftest)
+                conftest_code = conftest.code
+                fixed = fixed or conftest_fixed
+        code = result.code
+        validation = to_validation(results, fixed)
+        analysis = analyze_module(code)
+        conftest_fixtures = analyze_module(conftest_code).fixtures if conftest_code else []
+        test_count = analysis.test_count
 
         # Save to file if output_path provided
         saved_to = None
         if request.output_path:
-            saved_to = save_code_to_file(
+            saved_to = await save_code_to_file(
                 code=code,
                 output_path=request.output_path,
                 filename=request.module_name,
@@ -172,14 +275,23 @@ async def generate_pytest_from_testcases(request: PyTestGenerateRequest):
 
         logger.info(f"✅ Generated {test_count} test functions using {llm_provider}")
 
-        return PyTestGenerateResponse(
+        response = PyTestGenerateResponse(
             module_name=request.module_name,
             code=code,
             conftest_code=conftest_code,
             test_count=test_count,
+            test_names=analysis.test_names,
+            markers=analysis.markers,
+            fixtures=analysis.fixtures + conftest_fixtures,
             llm_provider=llm_provider,
             saved_to=saved_to,
+            context_report=ContextReport(**packed.report()),
+            validation=validation,
+        )
+        response.artifact_id = await asyncio.to_thread(
+            save_generation, "pytest", request, response, usage
         )
+        return response
 
     except Exception as e:
         logger.error(f"PyTest generation failed: {e}")
@@ -200,44 +312,90 @@ async def generate_pytest_from_requirement(request: PyTestFromRequirementRequest
     **For more control**, use the two-step process:
     1. `/api/v1/testcases/generate` - Get structured test cases
     2. `/api/v1/pytest/generate` - Convert to pytest code
+
+    Without `code`, a requirement that matches an earlier one with the same
+    settings is served from its stored result (see `cached_from`);
+    `use_cache` turns this off.
     """
     logger.info(f"Generating pytest code directly from requirement -> {request.module_name}.py")
 
     try:
+        # Code under test is fetched per request and may have changed, so it is never cached
+        cached = (
+            find_cached_response("pytest", request, PyTestGenerateResponse)
+            if request.code is None
+            else None
+        )
+        if cached is not None:
+            if request.output_path:
+                cached.saved_to = await save_code_to_file(
+                    code=cached.code,
+                    output_path=request.output_path,
+                    filename=request.module_name,
+                )
+            return cached
+
         # Get LLM service
         llm = get_llm_service()
 
+        # Pull in only the code under test (and its direct dependencies)
+        code_sections = await build_code_context(request.code) if request.code else []
+
+        # Use custom or default system prompt
+        system_prompt = request.system_prompt or get_pytest_system_prompt()
+
+        # Rank context and code by relevance and fit them into the token budget
+        fixed_tokens = estimate_tokens(system_prompt) + estimate_tokens(
+            get_pytest_from_requirement_prompt(requirement="", num_tests=request.num_tests)
+        )
+        snippets = [
+            Snippet(kind="requirement", text=request.requirement, required=True),
+            *split_paragraphs(request.context),
+            *(
+                Snippet(kind="code", text=text, label=f"code:{name}")
+                for name, text in code_sections
+            ),
+        ]
+        packed = ContextPacker(reserve_output=MAX_OUTPUT_TOKENS).pack(
+            request.requirement, snippets, fixed_tokens
+        )
+
         # Build the prompt
         prompt = get_pytest_from_requirement_prompt(
             requirement=request.requirement,
-            context=request.context,
+            context=packed.text("context"),
             num_tests=request.num_tests,
+            code_context=packed.text("code"),
         )
 
-        # Use custom or default system prompt
-        system_prompt = request.system_prompt or PYTEST_SYSTEM_PROMPT
-
         # Generate pytest code
-        response_text = await llm.generate(
-            prompt=prompt,
-            system_prompt=system_prompt,
-            max_tokens=4096,
-            temperature=0.3,
-        )
+        with track_llm_usage() as usage:
+            response_text = await llm.generate(
+                prompt=prompt,
+                system_prompt=system_prompt,
+                max_tokens=MAX_OUTPUT_TOKENS,
+                temperature=0.3,
+            )
 
         # Determine which provider was used
         llm_provider = "groq" if llm._groq_client else "gemini"
 
-        # Clean the response
-        code = clean_code_response(response_text)
+        code = extract_code(response_text)
 
-        # Count test functions
-        test_count = count_test_functions(code)
+        # Validate off the event loop; a syntax error gets a targeted fix
+        with track_llm_usage(usage):
+            result, fixed = await validate_and_fix(
+                code, syntax_fixer(llm), filename=f"{request.module_name}.py"
+            )
+        code = result.code
+        validation = to_validation([result], fixed)
+        analysis = analyze_module(code)
+        test_count = analysis.test_count
 
         # Save to file if output_path provided
         saved_to = None
         if request.output_path:
-            saved_to = save_code_to_file(
+            saved_to = await save_code_to_file(
                 code=code,
                 output_path=request.output_path,
                 filename=request.module_name,
@@ -245,18 +403,376 @@ async def generate_pytest_from_requirement(request: PyTestFromRequirementRequest
 
         logger.info(f"✅ Generated {test_count} test functions using {llm_provider}")
 
-        return PyTestGenerateResponse(
+        response = PyTestGenerateResponse(
             module_name=request.module_name,
             code=code,
             conftest_code=None,
             test_count=test_count,
+            test_names=analysis.test_names,
+            markers=analysis.markers,
+            fixtures=analysis.fixtures,
             llm_provider=llm_provider,
             saved_to=saved_to,
+            context_report=ContextReport(**packed.report()),
+            validation=validation,
+        )
+        response.artifact_id = await asyncio.to_thread(
+            save_generation, "pytest", request, response, usage
         )
+        if request.code is None:
+            await remember_response("pytest", request, response.artifact_id)
+        return response
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"PyTest generation from requirement failed: {e}")
         raise HTTPException(
             status_code=500,
             detail=f"Failed to generate pytest code: {str(e)}",
         ) from e
+
+
+@router.post("/generate-from-source", response_model=PyTestFromSourceResponse)
+async def generate_pytest_from_source(request: PyTestFromSourceRequest):
+    """
+    Generate pytest code for a Python file in a GitHub repository.
+
+    The file is split into functions and classes, tests for each are
+    generated concurrently, and the results are merged into one module.
+    Units whose generation fails are reported in `units` without failing
+    the whole request.
+
+    **Example:** `{"source": "octo/shop/app/cart.py@main"}`
+    """
+    try:
+        spec = parse_source_spec(request.source)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+    module_name = request.module_name or f"test_{spec.path.rsplit('/', 1)[-1][:-3].lower()}"
+    logger.info(f"Generating pytest code per function for {request.source} -> {module_name}.py")
+
+    try:
+        # Fetch the file at a fixed commit
+        service = get_github_service(request.github_token or os.getenv("GITHUB_TOKEN"))
+        try:
+            commit_sha = await service.get_commit_sha(spec.owner, spec.repo, spec.ref)
+            file = await service.get_file_content(spec.owner, spec.repo, spec.path, commit_sha)
+            source = file.content
+        except GitHubServiceError as e:
+            raise HTTPException(status_code=400, detail=str(e)) from e
+        except UnicodeDecodeError as e:
+            raise HTTPException(status_code=400, detail=f"{spec.path} is not UTF-8") from e
+
+        try:
+            targets = plan_units(source, spec.path, request.units, request.include_private)
+        except SyntaxError as e:
+            raise HTTPException(
+                status_code=422, detail=f"Cannot parse {spec.path}: {e.msg} (line {e.lineno})"
+            ) from e
+        if not targets:
+            raise HTTPException(
+                status_code=404, detail=f"No functions or classes to test in {spec.path}"
+            )
+        if len(targets) > request.max_units:
+            logger.warning(f"Limiting {spec.path} to {request.max_units} of {len(targets)} units")
+            targets = targets[: request.max_units]
+
+        llm = get_llm_service()
+        system_prompt = request.system_prompt or get_pytest_system_prompt()
+
+        fix = syntax_fixer(llm)
+        repaired: set[str] = set()
+
+        async def generate(target: UnitTarget) -> str:
+            prompt = get_pytest_from_code_prompt(
+                unit_name=target.unit.name,
+                unit_kind=target.unit.kind,
+                module_path=spec.module_path,
+                code_context=target.context,
+                num_tests=request.tests_per_unit,
+            )
+            response_text = await llm.generate(
+                prompt=prompt,
+                system_prompt=system_prompt,
+                max_tokens=MAX_OUTPUT_TOKENS,
+                temperature=0.3,
+            )
+            # Repaired per unit, so one broken unit does not cost a regeneration
+            result, fixed = await validate_and_fix(
+                extract_code(response_text), fix, filename=f"{target.unit.name}.py"
+            )
+            if fixed:
+                repaired.add(target.unit.name)
+            return result.code
+
+        # All units run concurrently; the LLM service paces calls per provider
+        with track_llm_usage() as usage:
+            unit_tests = await generate_unit_tests(targets, generate)
+        generated = [u for u in unit_tests if u.error is None]
+        if not generated:
+            raise HTTPException(
+                status_code=502,
+                detail=f"Test generation failed for every unit: {unit_tests[0].error}",
+            )
+
+        code = merge_test_modules(
+            [u.code for u in generated],
+            docstring=f"Tests for {spec.module_path} (generated per function).",
+        )
+        result, _ = await validate_and_fix(code, filename=f"{module_name}.py")
+        code = result.code
+        validation = to_validation([result], fixed=bool(repaired))
+        analysis = analyze_module(code)
+        test_count = analysis.test_count
+        llm_provider = "groq" if llm._groq_client else "gemini"
+
+        saved_to = None
+        if request.output_path:
+            saved_to = await save_code_to_file(
+                code=code,
+                output_path=request.output_path,
+                filename=module_name,
+            )
+
+        logger.info(
+            f"✅ Generated {test_count} test functions for {len(generated)}/{len(targets)} "
+            f"units of {spec.path} using {llm_provider}"
+        )
+
+        response = PyTestFromSourceResponse(
+            source=f"{spec.owner}/{spec.repo}/{spec.path}@{commit_sha}",
+            module_name=module_name,
+            code=code,
+            test_count=test_count,
+            test_names=analysis.test_names,
+            markers=analysis.markers,
+            fixtures=analysis.fixtures,
+            llm_provider=llm_provider,
+            saved_to=saved_to,
+            units=[
+                UnitTestResult(
+                    name=u.name,
+                    kind=u.kind,
+                    test_count=analyze_module(u.code).test_count,
+                    error=u.error,
+                )
+                for u in unit_tests
+            ],
+            validation=validation,
+        )
+        # Keyed by the resolved commit, so a moving ref gets a new artifact per commit
+        response.artifact_id = await asyncio.to_thread(
+            save_generation,
+            "pytest-from-source",
+            request,
+            response,
+            usage,
+            extra_inputs={"commit": commit_sha},
+        )
+        return response
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"PyTest generation from source failed: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to generate pytest code: {str(e)}",
+        ) from e
+
+
+@router.post("/generate-from-repository", response_model=PyTestFromRepositoryResponse)
+async def generate_pytest_from_repository(request: PyTestFromRepositoryRequest):
+    """
+    Generate pytest code for every function and class of a repository.
+
+    The last analyzed commit is recorded per repository and scope (ref,
+    path, max_files). A repeated request only fetches the files changed
+    since then and only regenerates units whose code changed; the stored
+    tests of everything else are returned with `reused: true`.
+
+    **Example:** `{"repository": "octo/shop", "path": "app"}`
+    """
+    try:
+        owner, repo = GitHubService.parse_github_url(request.repository)
+    except GitHubServiceError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+    logger.info(f"Generating pytest code per function for {owner}/{repo}/{request.path}")
+
+    try:
+        service = get_github_service(request.github_token or os.getenv("GITHUB_TOKEN"))
+        llm = get_llm_service()
+        system_prompt = request.system_prompt or get_pytest_system_prompt()
+
+        async def generate(path: str, unit: CodeUnit) -> str:
+            prompt = get_pytest_from_code_prompt(
+                unit_name=unit.name,
+                unit_kind=unit.kind,
+                module_path=SourceSpec(owner, repo, path).module_path,
+                code_context=unit.source,
+                num_tests=request.tests_per_unit,
+            )
+            response_text = await llm.generate(
+                prompt=prompt,
+                system_prompt=system_prompt,
+                max_tokens=MAX_OUTPUT_TOKENS,
+                temperature=0.3,
+            )
+            return extract_code(response_text)
+
+        with track_llm_usage() as usage:
+            try:
+                result = await IncrementalAnalyzer(service).analyze(
+                    owner,
+                    repo,
+                    generate,
+                    ref=request.ref,
+                    path=request.path,
+                    max_files=request.max_files,
+                )
+            except GitHubServiceError as e:
+                raise HTTPException(status_code=400, detail=str(e)) from e
+
+        logger.info(
+            f"✅ Analyzed {owner}/{repo}@{result.head_sha[:7]}: "
+            f"{result.units_generated} units generated, {result.units_reused} reused"
+        )
+
+        response = PyTestFromRepositoryResponse(
+            repository=f"{owner}/{repo}",
+            head_sha=result.head_sha,
+            base_sha=result.base_sha,
+            files_fetched=result.files_fetched,
+            units_generated=result.units_generated,
+            units_reused=result.units_reused,
+            removed_paths=result.removed_paths,
+            units=[
+                RepositoryUnitTests(path=r.path, name=r.name, code=r.artifact, reused=r.reused)
+                for r in result.results
+            ],
+            llm_provider=(
+                ("groq" if llm._groq_client else "gemini") if result.units_generated else None
+            ),
+        )
+        response.artifact_id = await asyncio.to_thread(
+            save_generation,
+            "pytest-from-repository",
+            request,
+            response,
+            usage,
+            extra_inputs={"commit": result.head_sha},
+        )
+        return response
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"PyTest generation for repository failed: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to generate pytest code: {str(e)}",
+        ) from e
+
+
+def _require_runner() -> None:
+    if not RUNNER_ENABLED:
+        raise HTTPException(
+            status_code=503, detail="Sandboxed test runs are disabled (set RUNNER_ENABLED=true)"
+        )
+
+
+async def _run(request: PyTestRunRequest) -> PyTestRunResponse:
+    result = await get_test_runner().run(
+        code=request.code,
+        conftest_code=request.conftest_code,
+        module_name=request.module_name,
+        timeout=request.timeout_seconds or RUNNER_TIMEOUT_SECONDS,
+        use_cache=request.use_cache,
+    )
+    counts = result.counts()
+    return PyTestRunResponse(
+        module_name=request.module_name,
+        status=result.status,
+        exit_code=result.exit_code,
+        duration=result.duration,
+        passed=counts["passed"],
+        failed=counts["failed"],
+        errors=counts["error"],
+        skipped=counts["skipped"],
+        tests=[PyTestOutcome(**asdict(t)) for t in result.tests],
+        output=result.output,
+        code_hash=result.code_hash,
+        cached=result.cached,
+    )
+
+
+@router.post("/run", response_model=PyTestRunResponse)
+async def run_pytest_module(request: PyTestRunRequest):
+    """
+    Run a pytest module (and optional conftest.py) in a sandboxed subprocess.
+
+    The run has CPU, memory and wall-clock limits and no access to the
+    server's API keys. Identical code is not run twice: the cached result
+    is returned with `cached: true`. Disabled (503) unless RUNNER_ENABLED
+    is set, since it executes the submitted code.
+
+    **Returns:**
+    - `status`: passed, failed, error (e.g. collection or import error) or timeout
+    - `tests`: Per-test outcome, duration and failure message
+    """
+    _require_runner()
+    logger.info(f"Running {request.module_name}.py in the sandbox")
+
+    try:
+        response = await _run(request)
+        logger.info(
+            f"✅ {request.module_name}.py {response.status}: {response.passed} passed, "
+            f"{response.failed} failed{' (cached)' if response.cached else ''}"
+        )
+        return response
+
+    except Exception as e:
+        logger.error(f"Sandbox run failed: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to run pytest module: {str(e)}",
+        ) from e
+
+
+@router.post("/run/batch", response_model=PyTestRunBatchResponse)
+async def run_pytest_batch(request: PyTestRunBatchRequest):
+    """
+    Run many pytest modules in parallel sandboxes.
+
+    Modules run concurrently on a bounded pool (RUNNER_WORKERS, one per
+    core by default); cached results return immediately. Disabled (503)
+    unless RUNNER_ENABLED is set.
+    """
+    _require_runner()
+    logger.info(f"Running {len(request.modules)} modules in the sandbox")
+    started = time.perf_counter()
+
+    try:
+        results = await asyncio.gather(*(_run(module) for module in request.modules))
+        response = PyTestRunBatchResponse(
+            results=results,
+            total=len(results),
+            passed=sum(r.status == "passed" for r in results),
+            cached=sum(r.cached for r in results),
+            duration=time.perf_counter() - started,
+        )
+        logger.info(
+            f"✅ Ran {response.total} modules in {response.duration:.1f}s: "
+            f"{response.passed} passed, {response.cached} cached"
+        )
+        return response
+
+    except Exception as e:
+        logger.error(f"Sandbox batch run failed: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to run pytest modules: {str(e)}",
+        ) from e
@@ -0,0 +1,199 @@
+"""
+Reviews Router
+==============
+API endpoints for AI pull request reviews.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+
+from fastapi import APIRouter, HTTPException
+
+from app.models.review_models import (
+    PRReviewRequest,
+    PRReviewResponse,
+    ReviewChunkResult,
+    ReviewComment,
+    ReviewStats,
+)
+from app.prompts.review_prompt import get_pr_review_prompt, get_review_system_prompt
+from app.services.artifact_store import save_generation
+from app.services.github_service import (
+    GitHubServiceError,
+    get_github_service,
+    is_generated_path,
+)
+from app.services.llm_service import get_llm_service, track_llm_usage
+from app.services.pr_review import (
+    REVIEW_CHUNK_TOKENS,
+    DiffHunk,
+    ReviewCache,
+    ReviewChunk,
+    approval_for,
+    assign_comments,
+    get_review_cache,
+    group_hunks,
+    merge_comments,
+    parse_patch,
+    parse_pull_request_ref,
+    review_chunks,
+    unreviewed_files,
+)
+
+logger = logging.getLogger("ai_sdlc_copilot")
+
+router = APIRouter(prefix="/reviews", tags=["Reviews"])
+
+
+@router.post("/pull-request", response_model=PRReviewResponse)
+async def review_pull_request(request: PRReviewRequest):
+    """
+    Review a GitHub pull request.
+
+    The diff is split into hunks and packed into chunks of at most
+    `chunk_tokens`; chunks are reviewed concurrently and their comments
+    merged and de-duplicated. Hunks unchanged since the last review of the
+    pull request reuse their earlier comments.
+
+    **Example:** `{"pull_request": "octo/shop#42"}`
+    """
+    try:
+        owner, repo, number = parse_pull_request_ref(request.pull_request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+    logger.info(f"Reviewing pull request {owner}/{repo}#{number}")
+
+    try:
+        service = get_github_service(request.github_token or os.getenv("GITHUB_TOKEN"))
+        try:
+            pull = await service.get_pull_request(owner, repo, number)
+            files = await service.get_pull_request_files(owner, repo, number)
+        except GitHubServiceError as e:
+            raise HTTPException(status_code=400, detail=str(e)) from e
+
+        hunks: list[DiffHunk] = []
+        files_skipped = []
+        for f in files:
+            if f["status"] == "removed" or not f.get("patch") or is_generated_path(f["filename"]):
+                files_skipped.append(f["filename"])
+                continue
+            hunks.extend(parse_patch(f["filename"], f["patch"]))
+
+        system_prompt = request.system_prompt or get_review_system_prompt()
+        settings = hashlib.sha256(system_prompt.encode()).hexdigest()[:16]
+        cache = get_review_cache()
+        cached = cache.load(owner, repo, number, settings) if request.use_cache else {}
+
+        # Unchanged hunks keep their comments; only new or edited ones are reviewed
+        reused = [h for h in hunks if h.content_hash in cached]
+        fresh = [h for h in hunks if h.content_hash not in cached]
+        chunks = group_hunks(fresh, request.chunk_tokens or REVIEW_CHUNK_TOKENS)
+
+        llm = get_llm_service()
+
+        async def review(chunk: ReviewChunk, part: int, total_parts: int) -> str:
+            prompt = get_pr_review_prompt(
+                diff_content=chunk.diff(),
+                pr_title=pull.title,
+                pr_description=pull.body,
+                part=part,
+                total_parts=total_parts,
+            )
+            return await llm.generate(
+                prompt=prompt,
+                system_prompt=system_prompt,
+                max_tokens=2048,
+                temperature=0.3,
+            )
+
+        # All chunks run concurrently; the LLM service paces calls per provider
+        with track_llm_usage() as usage:
+            reviews = await review_chunks(chunks, review)
+        succeeded = [r for r in reviews if r.error is None]
+        if chunks and not succeeded:
+            raise HTTPException(
+                status_code=502,
+                detail=f"Review failed for every chunk: {reviews[0].error}",
+            )
+
+        comments: list[ReviewComment] = []
+        entries: dict[str, list[dict]] = {}
+        for hunk in reused:
+            carried = ReviewCache.from_cached(cached[hunk.content_hash], hunk)
+            comments.extend(carried)
+            entries[hunk.content_hash] = cached[hunk.content_hash]
+        for result in succeeded:
+            assigned = assign_comments(result.comments, result.chunk.hunks)
+            for hunk in result.chunk.hunks:
+                hunk_comments = assigned.get(hunk.content_hash, [])
+                comments.extend(hunk_comments)
+                entries[hunk.content_hash] = ReviewCache.to_cached(hunk_comments, hunk)
+        cache.save(owner, repo, number, entries, settings)
+
+        comments = merge_comments(comments)
+        stats = ReviewStats()
+        for comment in comments:
+            key = comment.severity.lower()
+            setattr(stats, key, getattr(stats, key) + 1)
+
+        summaries = list(dict.fromkeys(r.summary for r in succeeded if r.summary))
+        if reused:
+            summaries.append(
+                f"{len(reused)} unchanged hunk(s) kept their comments from the previous review."
+            )
+        not_reviewed = unreviewed_files(reviews)
+        if not_reviewed:
+            summaries.append(f"Not reviewed (review failed): {', '.join(not_reviewed)}.")
+        positive_feedback = list(dict.fromkeys(p for r in succeeded for p in r.positive_feedback))
+        llm_provider = ("groq" if llm._groq_client else "gemini") if chunks else None
+
+        logger.info(
+            f"✅ Reviewed {owner}/{repo}#{number}: {len(fresh)} hunks in {len(chunks)} chunks, "
+            f"{len(reused)} reused, {len(comments)} comments"
+        )
+
+        response = PRReviewResponse(
+            pull_request=pull.url,
+            head_sha=pull.head_sha,
+            summary=" ".join(summaries) or "No reviewable changes.",
+            approval_recommendation=approval_for(comments, reviews),
+            stats=stats,
+            comments=comments,
+            positive_feedback=positive_feedback,
+            hunks_total=len(hunks),
+            hunks_reviewed=sum(len(r.chunk.hunks) for r in succeeded),
+            hunks_reused=len(reused),
+            files_skipped=files_skipped,
+            chunks=[
+                ReviewChunkResult(
+                    files=r.chunk.files,
+                    hunks=len(r.chunk.hunks),
+                    tokens=r.chunk.tokens,
+                    comment_count=len(r.comments),
+                    error=r.error,
+                )
+                for r in reviews
+            ],
+            llm_provider=llm_provider,
+        )
+        response.artifact_id = await asyncio.to_thread(
+            save_generation,
+            "pr-review",
+            request,
+            response,
+            usage,
+            extra_inputs={"head_sha": pull.head_sha},
+        )
+        return response
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"PR review failed: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to review pull request: {str(e)}",
+        ) from e
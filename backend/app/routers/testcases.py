@@ -4,22 +4,51 @@ Test Cases Router
 API endpoints for test case generation.
 """
 
+import asyncio
+import hashlib
 import json
 import logging
+import os
 
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
 
 from app.models.testcase import (
+    CachedSource,
+    IssueIngestRequest,
+    IssueIngestResponse,
+    IssueTestCases,
     TestCase,
+    TestCaseAcceptRequest,
+    TestCaseAcceptResponse,
     TestCaseGenerateRequest,
     TestCaseGenerateResponse,
 )
 from app.prompts.testcase_prompt import (
-    TESTCASE_SYSTEM_PROMPT,
+    get_system_prompt,
     get_testcase_generation_prompt,
 )
-from app.services.llm_service import get_llm_service
+from app.services.artifact_store import save_generation
+from app.services.github_service import (
+    GitHubIssue,
+    GitHubService,
+    GitHubServiceError,
+    get_github_service,
+)
+from app.services.llm_service import get_llm_service, track_llm_usage
+from app.services.requirement_cache import find_cached_response, remember_response
+from app.services.requirement_ledger import LedgerEntry, get_requirement_ledger
+from app.services.testcase_generation import (
+    accept_test_cases,
+    dedupe_test_cases,
+    find_examples,
+    generate_multi_persona_test_cases,
+    get_example_index,
+    parse_test_cases,
+)
+from app.services.testcase_generation import (
+    generate_test_cases as generate_structured_test_cases,
+)
 
 
 class MarkdownResponse(BaseModel):
@@ -29,6 +58,13 @@ class MarkdownResponse(BaseModel):
     markdown: str = Field(..., description="Test cases in markdown format")
     total_count: int = Field(..., description="Approximate number of test cases")
     llm_provider: str = Field(..., description="Which LLM was used")
+    cached_from: CachedSource | None = Field(
+        default=None, description="Set when a stored result was served instead of generating"
+    )
+    artifact_id: str | None = Field(
+        default=None,
+        description="Stored artifact id (GET /api/v1/artifacts/{artifact_id})",
+    )
 
 
 logger = logging.getLogger("ai_sdlc_copilot")
@@ -43,10 +79,39 @@ async def generate_test_cases(request: TestCaseGenerateRequest):
 
     Takes a software requirement and generates comprehensive test cases
     including functional, edge case, and negative scenarios.
+
+    With `personas`, each persona generates concurrently and the results
+    are merged: IDs are renumbered and each case is tagged with its persona.
+
+    Near-duplicate test cases (rephrasings of an earlier case) are dropped
+    by default; `duplicates` can flag them instead or keep them.
+
+    Accepted test cases of the most similar requirements (see /accept) are
+    included in the prompt as examples unless `few_shot` is false.
+
+    A requirement that matches an earlier one (ignoring case, punctuation,
+    whitespace and the order of context sentences, or a close rewording)
+    with the same settings is served from its stored result without an LLM
+    call; `cached_from` names that result. `use_cache` turns this off.
     """
+    if request.personas and request.output_format != "json":
+        raise HTTPException(status_code=400, detail="personas requires output_format 'json'")
+
     logger.info(f"Generating {request.num_cases} test cases for: {request.requirement[:50]}...")
 
     try:
+        cached = find_cached_response(
+            "testcases",
+            request,
+            MarkdownResponse if request.output_format == "markdown" else TestCaseGenerateResponse,
+        )
+        if cached is not None:
+            return cached
+
+        examples = find_examples(request.requirement) if request.few_shot else []
+        if request.personas:
+            return await _generate_with_personas(request, examples)
+
         # Get LLM service
         llm = get_llm_service()
 
@@ -57,18 +122,20 @@ async def generate_test_cases(request: TestCaseGenerateRequest):
             include_edge_cases=request.include_edge_cases,
             context=request.context,
             output_format=request.output_format,
+            examples=examples,
         )
 
         # Use custom system prompt if provided, otherwise default
-        system_prompt = request.system_prompt or TESTCASE_SYSTEM_PROMPT
+        system_prompt = request.system_prompt or get_system_prompt()
 
         # Generate test cases
-        response_text = await llm.generate(
-            prompt=prompt,
-            system_prompt=system_prompt,
-            max_tokens=4096,
-            temperature=0.7,
-        )
+        with track_llm_usage() as usage:
+            response_text = await llm.generate(
+                prompt=prompt,
+                system_prompt=system_prompt,
+                max_tokens=4096,
+                temperature=0.7,
+            )
 
         # Determine which provider was used
         llm_provider = "groq" if llm._groq_client else "gemini"
@@ -82,23 +149,26 @@ async def generate_test_cases(request: TestCaseGenerateRequest):
 
             logger.info(f"✅ Generated ~{tc_count} test cases (markdown) using {llm_provider}")
 
-            return MarkdownResponse(
+            response = MarkdownResponse(
                 requirement=request.requirement,
                 markdown=response_text,
                 total_count=tc_count,
                 llm_provider=llm_provider,
             )
+            response.artifact_id = await asyncio.to_thread(
+                save_generation,
+                "testcases",
+                request,
+                response,
+                usage,
+                extra_inputs=_example_inputs(examples),
+            )
+            await remember_response("testcases", request, response.artifact_id)
+            return response
 
         # Parse JSON response
         try:
-            # Clean up response (remove markdown code blocks if present)
-            cleaned = response_text.strip()
-            if cleaned.startswith("```"):
-                # Remove ```json and ``` markers
-                lines = cleaned.split("\n")
-                cleaned = "\n".join(lines[1:-1])
-
-            data = json.loads(cleaned)
+            test_cases = parse_test_cases(response_text)
         except json.JSONDecodeError as e:
             logger.error(f"Failed to parse LLM response as JSON: {e}")
             logger.error(f"Raw response: {response_text[:500]}")
@@ -107,39 +177,33 @@ async def generate_test_cases(request: TestCaseGenerateRequest):
                 detail=f"LLM returned invalid JSON. Please try again. Error: {str(e)}",
             ) from None
 
-        # Validate and build test cases
-        test_cases = []
-        for tc_data in data.get("test_cases", []):
-            try:
-                test_case = TestCase(
-                    id=tc_data.get("id", f"TC{len(test_cases)+1:03d}"),
-                    title=tc_data.get("title", "Untitled"),
-                    description=tc_data.get("description", ""),
-                    preconditions=tc_data.get("preconditions", []),
-                    steps=tc_data.get("steps", []),
-                    expected_result=tc_data.get("expected_result", ""),
-                    priority=tc_data.get("priority", "medium"),
-                    test_type=tc_data.get("test_type", "functional"),
-                )
-                test_cases.append(test_case)
-            except Exception as e:
-                logger.warning(f"Skipping invalid test case: {e}")
-                continue
-
         if not test_cases:
             raise HTTPException(
                 status_code=500,
                 detail="No valid test cases could be generated. Please try again.",
             )
+        test_cases, duplicates = dedupe_test_cases(test_cases, request.duplicates)
 
         logger.info(f"✅ Generated {len(test_cases)} test cases using {llm_provider}")
 
-        return TestCaseGenerateResponse(
+        response = TestCaseGenerateResponse(
             requirement=request.requirement,
             test_cases=test_cases,
             total_count=len(test_cases),
             llm_provider=llm_provider,
+            few_shot_examples=len(examples),
+            **_duplicate_counts(request.duplicates, duplicates),
         )
+        response.artifact_id = await asyncio.to_thread(
+            save_generation,
+            "testcases",
+            request,
+            response,
+            usage,
+            extra_inputs=_example_inputs(examples),
+        )
+        await remember_response("testcases", request, response.artifact_id)
+        return response
 
     except HTTPException:
         raise
@@ -149,3 +213,196 @@ async def generate_test_cases(request: TestCaseGenerateRequest):
             status_code=500,
             detail=f"Failed to generate test cases: {str(e)}",
         ) from e
+
+
+def _duplicate_counts(mode: str, count: int) -> dict[str, int]:
+    return {"duplicates_flagged" if mode == "flag" else "duplicates_removed": count}
+
+
+def _example_inputs(examples: list[dict]) -> dict[str, list[str]]:
+    # Examples change the prompt, so they are inputs of the artifact
+    return {"examples": [example["key"] for example in examples]}
+
+
+async def _generate_with_personas(
+    request: TestCaseGenerateRequest, examples: list[dict]
+) -> TestCaseGenerateResponse:
+    """Multi-persona mode of generate_test_cases()."""
+    llm = get_llm_service()
+    with track_llm_usage() as usage:
+        try:
+            test_cases, duplicates, failed = await generate_multi_persona_test_cases(
+                requirement=request.requirement,
+                personas=request.personas,
+                context=request.context,
+                num_cases=request.num_cases,
+                include_edge_cases=request.include_edge_cases,
+                duplicates=request.duplicates,
+                examples=examples,
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=500, detail=str(e)) from e
+
+    llm_provider = "groq" if llm._groq_client else "gemini"
+    merged = [p for p in dict.fromkeys(request.personas) if p not in failed]
+    logger.info(
+        f"✅ Merged {len(test_cases)} test cases from {len(merged)} personas "
+        f"({duplicates} near-duplicates, duplicates={request.duplicates}) using {llm_provider}"
+    )
+
+    response = TestCaseGenerateResponse(
+        requirement=request.requirement,
+        test_cases=test_cases,
+        total_count=len(test_cases),
+        llm_provider=llm_provider,
+        personas=merged,
+        failed_personas=failed,
+        few_shot_examples=len(examples),
+        **_duplicate_counts(request.duplicates, duplicates),
+    )
+    response.artifact_id = await asyncio.to_thread(
+        save_generation,
+        "testcases",
+        request,
+        response,
+        usage,
+        extra_inputs=_example_inputs(examples),
+    )
+    if not failed:  # A partial merge is not reused for later requests
+        await remember_response("testcases", request, response.artifact_id)
+    return response
+
+
+@router.post("/accept", response_model=TestCaseAcceptResponse)
+async def accept_generated_test_cases(request: TestCaseAcceptRequest):
+    """
+    Store accepted test cases for a requirement.
+
+    They are indexed locally by the requirement text and shown to the LLM
+    as examples when test cases are generated for similar requirements.
+    Accepting test cases for the same requirement again replaces them.
+    """
+    try:
+        key = accept_test_cases(request.requirement, request.test_cases, request.context)
+        total = len(get_example_index())
+        logger.info(f"✅ Accepted {len(request.test_cases)} test cases ({total} examples)")
+        return TestCaseAcceptResponse(key=key, total_examples=total)
+    except Exception as e:
+        logger.error(f"Accepting test cases failed: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to accept test cases: {str(e)}",
+        ) from e
+
+
+@router.post("/from-issues", response_model=IssueIngestResponse)
+async def generate_test_cases_from_issues(request: IssueIngestRequest):
+    """
+    Generate test cases for the issues of a GitHub repository.
+
+    Issues (with comments) are fetched in bulk through the GraphQL API,
+    filtered by labels and milestones. Each issue's text is hashed together
+    with the generation settings; issues that have not changed since the
+    last ingest return their stored test cases without an LLM call, so
+    re-ingesting a repository only pays for new or edited issues.
+    """
+    try:
+        owner, repo = GitHubService.parse_github_url(request.repository)
+        service = get_github_service(request.github_token or os.getenv("GITHUB_TOKEN"))
+        issues = await service.get_issues(
+            owner,
+            repo,
+            labels=request.labels,
+            milestones=request.milestones,
+            state=request.state,
+            max_issues=request.max_issues,
+            max_comments=20 if request.include_comments else 0,
+        )
+    except GitHubServiceError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+    logger.info(f"Ingesting {len(issues)} issues from {owner}/{repo}")
+
+    try:
+        ledger = get_requirement_ledger()
+        entries = ledger.load(owner, repo)
+        settings = (
+            f"{request.num_cases}:{request.include_edge_cases}:"
+            f"{request.context}:{request.system_prompt or ''}:{request.duplicates}:"
+            f"{request.few_shot}"
+        )
+
+        async def _ingest(issue: GitHubIssue) -> IssueTestCases:
+            key = f"issue#{issue.number}"
+            content_hash = hashlib.sha256(f"{issue.content_hash}:{settings}".encode()).hexdigest()
+            result = IssueTestCases(
+                number=issue.number,
+                title=issue.title,
+                url=issue.url,
+                content_hash=content_hash,
+                status="unchanged",
+            )
+
+            entry = entries.get(key)
+            if entry is not None and entry.content_hash == content_hash and not request.force:
+                result.test_cases = [TestCase(**tc) for tc in entry.test_cases]
+                return result
+
+            try:
+                test_cases = await generate_structured_test_cases(
+                    requirement=issue.requirement,
+                    context=request.context,
+                    num_cases=request.num_cases,
+                    include_edge_cases=request.include_edge_cases,
+                    system_prompt=request.system_prompt,
+                    duplicates=request.duplicates,
+                    examples=find_examples(issue.requirement) if request.few_shot else None,
+                )
+            except Exception as e:
+                logger.warning(
+                    f"Test case generation for {owner}/{repo}#{issue.number} failed: {e}"
+                )
+                result.status = "failed"
+                result.error = str(e)
+                return result
+
+            entries[key] = LedgerEntry(
+                content_hash=content_hash,
+                test_cases=[tc.model_dump(mode="json") for tc in test_cases],
+            )
+            result.status = "generated"
+            result.test_cases = test_cases
+            return result
+
+        # Issues are generated concurrently; the LLM service paces provider calls
+        with track_llm_usage() as usage:
+            results = await asyncio.gather(*(_ingest(issue) for issue in issues))
+        ledger.save(owner, repo, entries)
+
+        counts = {
+            status: sum(1 for r in results if r.status == status)
+            for status in ("generated", "unchanged", "failed")
+        }
+        logger.info(
+            f"✅ Ingested {owner}/{repo}: {counts['generated']} generated, "
+            f"{counts['unchanged']} unchanged, {counts['failed']} failed"
+        )
+
+        response = IssueIngestResponse(repository=f"{owner}/{repo}", issues=results, **counts)
+        # The issue hashes are inputs too, so an edited issue gives a new artifact
+        response.artifact_id = await asyncio.to_thread(
+            save_generation,
+            "testcases-from-issues",
+            request,
+            response,
+            usage,
+            extra_inputs={"issues": [r.content_hash for r in results]},
+        )
+        return response
+
+    except Exception as e:
+        logger.error(f"Issue ingestion failed: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to ingest issues: {str(e)}",
+        ) from e
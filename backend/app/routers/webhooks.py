@@ -0,0 +1,113 @@
+"""
+Webhooks Router
+===============
+GitHub webhook endpoint; events are debounced and processed in the background.
+"""
+
+import json
+import logging
+import os
+from dataclasses import asdict
+
+from fastapi import APIRouter, Header, HTTPException, Request
+
+from app.models.review_models import PRReviewRequest
+from app.models.testcase import IssueIngestRequest
+from app.models.webhook_models import WebhookAck, WebhookQueueStatus
+from app.routers.reviews import review_pull_request
+from app.routers.testcases import generate_test_cases_from_issues
+from app.services.github_service import get_github_service
+from app.services.symbol_index import get_repository_index
+from app.services.webhooks import (
+    DebouncedEventQueue,
+    WebhookEvent,
+    parse_github_event,
+    verify_signature,
+)
+
+logger = logging.getLogger("ai_sdlc_copilot")
+
+router = APIRouter(prefix="/webhooks", tags=["Webhooks"])
+
+
+async def process_event(event: WebhookEvent) -> None:
+    """Run the work for a debounced event (called by the background worker)."""
+    if event.kind == "pull_request":
+        await review_pull_request(
+            PRReviewRequest(pull_request=f"{event.repository}#{event.number}")
+        )
+    elif event.kind == "issues":
+        await generate_test_cases_from_issues(IssueIngestRequest(repository=event.repository))
+    elif event.kind == "push":
+        # Warm the symbol index for the new head; unchanged files come from the blob cache
+        owner, repo = event.repository.split("/", 1)
+        service = get_github_service(os.getenv("GITHUB_TOKEN"))
+        await get_repository_index(service, owner, repo, event.head_sha)
+
+
+# Singleton instance
+_webhook_queue: DebouncedEventQueue | None = None
+
+
+def get_webhook_queue() -> DebouncedEventQueue:
+    """Get or create the webhook work queue."""
+    global _webhook_queue
+    if _webhook_queue is None:
+        _webhook_queue = DebouncedEventQueue(process_event)
+    return _webhook_queue
+
+
+@router.post("/github", response_model=WebhookAck, status_code=202)
+async def github_webhook(
+    request: Request,
+    x_github_event: str = Header(..., description="GitHub event name"),
+    x_hub_signature_256: str | None = Header(default=None),
+    x_github_delivery: str | None = Header(default=None),
+):
+    """
+    Receive a GitHub webhook delivery (content type `application/json`).
+
+    The signature is checked against GITHUB_WEBHOOK_SECRET and the event is
+    queued; work runs in the background after the debounce window, so the
+    response returns immediately. Rapid events for the same pull request,
+    branch or issue list are coalesced into one run at the latest head SHA.
+    """
+    secret = os.getenv("GITHUB_WEBHOOK_SECRET")
+    if not secret:
+        raise HTTPException(status_code=503, detail="GITHUB_WEBHOOK_SECRET is not configured")
+
+    body = await request.body()
+    if not verify_signature(secret, body, x_hub_signature_256):
+        raise HTTPException(status_code=401, detail="Invalid webhook signature")
+
+    if x_github_event == "ping":
+        return WebhookAck(status="pong", event=x_github_event)
+
+    try:
+        payload = json.loads(body)
+        action = parse_github_event(x_github_event, payload, x_github_delivery)
+    except (ValueError, KeyError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid webhook payload: {e}") from e
+
+    queue = get_webhook_queue()
+    if action.cancel:
+        queue.cancel(action.cancel)
+        return WebhookAck(status="cancelled", event=x_github_event, key=action.cancel)
+    if action.event is None:
+        return WebhookAck(status="ignored", event=x_github_event)
+
+    queued = queue.submit(action.event)
+    if queued:
+        logger.info(f"Queued {x_github_event} event for {action.event.key}")
+    return WebhookAck(
+        status="queued" if queued else "duplicate",
+        event=x_github_event,
+        key=action.event.key,
+    )
+
+
+@router.get("/status", response_model=WebhookQueueStatus)
+async def webhook_status():
+    """Get the webhook queue counters."""
+    queue = get_webhook_queue()
+    return WebhookQueueStatus(pending=queue.pending, running=queue.running, **asdict(queue.stats))
@@ -0,0 +1,168 @@
+"""
+Artifact Store
+==============
+Durable storage for generated artifacts (test cases, pytest modules,
+reviews, defect reports), so results can be re-read without an LLM call.
+
+An artifact's id is the SHA-256 of its kind and generation inputs, so the
+same request always maps to the same id; regenerating it replaces the
+content. Each artifact is one JSON file holding the inputs, the generated
+content and metadata (provider, model, latency, tokens). Files are served
+as stored, with a strong ETag over their bytes.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from pydantic import BaseModel
+
+from app.services.llm_service import LLMUsage
+
+logger = logging.getLogger("ai_sdlc_copilot")
+
+DEFAULT_ARTIFACT_DIR = os.getenv("ARTIFACT_DIR", ".cache/artifacts")
+
+# Request fields never stored with an artifact
+SECRET_FIELDS = frozenset({"github_token"})
+
+_ARTIFACT_ID_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+
+def artifact_id(kind: str, inputs: dict) -> str:
+    """Content hash of an artifact's kind and inputs (canonical JSON)."""
+    canonical = json.dumps({"kind": kind, "inputs": inputs}, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def is_artifact_id(value: str) -> bool:
+    return bool(_ARTIFACT_ID_PATTERN.match(value))
+
+
+@dataclass
+class StoredArtifact:
+    """An artifact's serialized bytes and strong ETag."""
+
+    id: str
+    body: bytes
+    etag: str
+
+
+class ArtifactStore:
+    """
+    JSON-file store of artifacts, fanned out by id prefix.
+
+    Example:
+        store = get_artifact_store()
+        artifact_id = store.put("pytest", inputs, content, metadata)
+        stored = store.get(artifact_id)
+    """
+
+    def __init__(self, root: str | Path = DEFAULT_ARTIFACT_DIR):
+        self.root = Path(root)
+
+    def _path(self, artifact_id: str) -> Path:
+        return self.root / artifact_id[:2] / f"{artifact_id}.json"
+
+    def put(self, kind: str, inputs: dict, content: dict, metadata: dict | None = None) -> str:
+        """
+        Store an artifact atomically, replacing any earlier one for the same inputs.
+
+        Args:
+            kind: Artifact kind (e.g. "testcases", "pytest")
+            inputs: Generation inputs the id is derived from
+            content: Generated content
+            metadata: Provider, model, latency, tokens, ...
+
+        Returns:
+            Artifact id
+        """
+        key = artifact_id(kind, inputs)
+        document = {
+            "id": key,
+            "kind": kind,
+            "created_at": time.time(),
+            "inputs": inputs,
+            "metadata": metadata or {},
+            "content": content,
+        }
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(document, f, separators=(",", ":"))
+        os.replace(tmp_name, path)
+        return key
+
+    def get(self, artifact_id: str) -> StoredArtifact | None:
+        """Read an artifact's bytes, or None if it does not exist."""
+        if not is_artifact_id(artifact_id):
+            return None
+        try:
+            body = self._path(artifact_id).read_bytes()
+        except FileNotFoundError:
+            return None
+        etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+        return StoredArtifact(id=artifact_id, body=body, etag=etag)
+
+
+def save_generation(
+    kind: str,
+    request: BaseModel | dict,
+    response: BaseModel,
+    usage: LLMUsage | None = None,
+    extra_inputs: dict | None = None,
+) -> str | None:
+    """
+    Store a generation response as an artifact.
+
+    Tokens in the request are left out of the inputs. Storage errors are
+    logged rather than raised, so a full disk does not fail the generation.
+
+    Writing blocks on file I/O and fsync, so async callers run it with
+    asyncio.to_thread().
+
+    Args:
+        kind: Artifact kind
+        request: Request model (or inputs dict) the response was generated from
+        response: Response model; its artifact_id field is not stored
+        usage: LLM calls made for the response
+        extra_inputs: Inputs not in the request (e.g. a resolved commit SHA)
+
+    Returns:
+        Artifact id, or None if it could not be stored
+    """
+    if isinstance(request, BaseModel):
+        inputs = request.model_dump(mode="json", exclude=SECRET_FIELDS)
+    else:
+        inputs = dict(request)
+    inputs.update(extra_inputs or {})
+    metadata = usage.summary() if usage is not None else {}
+    try:
+        return get_artifact_store().put(
+            kind,
+            inputs,
+            response.model_dump(mode="json", exclude={"artifact_id"}),
+            metadata,
+        )
+    except OSError as e:
+        logger.warning(f"Could not store {kind} artifact: {e}")
+        return None
+
+
+# Singleton instance
+_artifact_store: ArtifactStore | None = None
+
+
+def get_artifact_store() -> ArtifactStore:
+    """Get or create the shared artifact store."""
+    global _artifact_store
+    if _artifact_store is None:
+        _artifact_store = ArtifactStore()
+    return _artifact_store
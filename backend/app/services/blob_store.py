@@ -0,0 +1,238 @@
+"""
+Blob Store
+==========
+Content-addressable cache for file contents fetched from GitHub.
+
+Blobs are keyed by their git blob SHA, so a file that is unchanged across
+branches and commits is downloaded and decoded exactly once. Lookups go
+through a bounded in-memory LRU first, then an on-disk store. Large files
+are returned as a memoryview over an mmap of the blob file, so they are
+never copied into the process heap (the OS page cache holds them instead).
+
+Stored content is checked against the SHA it is stored under, so a stale
+SHA from a listing cannot put the wrong bytes in the cache. Blobs of
+private repositories must only be served to callers that can read them:
+each GitHub token gets its own namespace (see BlobStore.scoped), which
+shares the memory budget but not the blobs.
+"""
+
+import hashlib
+import logging
+import mmap
+import os
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+logger = logging.getLogger("ai_sdlc_copilot")
+
+# Defaults (override via environment)
+DEFAULT_CACHE_DIR = os.getenv("BLOB_CACHE_DIR", ".cache/blobs")
+DEFAULT_MEMORY_BYTES = int(os.getenv("BLOB_CACHE_MEMORY_BYTES", str(64 * 1024 * 1024)))
+MMAP_THRESHOLD_BYTES = 256 * 1024
+
+_SHA_PATTERN = re.compile(r"^[0-9a-f]{40}$")
+_NAMESPACE_PATTERN = re.compile(r"^[0-9a-z_-]+$")
+
+
+def git_blob_sha(data: bytes) -> str:
+    """
+    Compute the git blob SHA-1 for raw file bytes.
+
+    This matches the `sha` GitHub reports for files and tree entries,
+    so locally fetched content can be addressed the same way.
+    """
+    digest = hashlib.sha1(usedforsecurity=False)
+    digest.update(f"blob {len(data)}\0".encode())
+    digest.update(data)
+    return digest.hexdigest()
+
+
+class BlobStore:
+    """
+    Two-tier blob cache keyed by git blob SHA.
+
+    - Memory: LRU bounded by total bytes (shared by all namespaces)
+    - Disk: one file per blob, sharded by the first two hex digits (one
+      directory per namespace)
+    """
+
+    def __init__(
+        self,
+        cache_dir: str | Path | None = DEFAULT_CACHE_DIR,
+        max_memory_bytes: int = DEFAULT_MEMORY_BYTES,
+    ):
+        """
+        Initialize the blob store.
+
+        Args:
+            cache_dir: Directory for on-disk blobs (None disables the disk tier)
+            max_memory_bytes: Upper bound for blobs kept in memory
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.max_memory_bytes = max_memory_bytes
+        self.namespace = ""
+        self._memory = _MemoryTier(max_memory_bytes)
+
+    def scoped(self, namespace: str) -> "BlobStore":
+        """
+        A view of this store whose blobs are only visible through the same namespace.
+
+        Args:
+            namespace: Lowercase letters, digits, "-" and "_" (e.g. a token hash)
+
+        Raises:
+            ValueError: If the namespace has other characters
+        """
+        if not _NAMESPACE_PATTERN.match(namespace):
+            raise ValueError(f"Invalid blob store namespace: {namespace!r}")
+        view = BlobStore.__new__(BlobStore)
+        view.cache_dir = self.cache_dir / namespace if self.cache_dir is not None else None
+        view.max_memory_bytes = self.max_memory_bytes
+        view.namespace = f"{self.namespace}/{namespace}" if self.namespace else namespace
+        view._memory = self._memory
+        return view
+
+    def _key(self, sha: str) -> str:
+        return f"{self.namespace}:{sha}"
+
+    def _blob_path(self, sha: str) -> Path | None:
+        if self.cache_dir is None or not _SHA_PATTERN.match(sha):
+            return None
+        return self.cache_dir / sha[:2] / sha[2:]
+
+    def contains(self, sha: str) -> bool:
+        """Check whether a blob is cached in either tier."""
+        if self._key(sha) in self._memory:
+            return True
+        path = self._blob_path(sha)
+        return path is not None and path.exists()
+
+    def get(self, sha: str) -> bytes | memoryview | None:
+        """
+        Get blob bytes by SHA.
+
+        Returns:
+            The blob content (a read-only memoryview over the mapped file for
+            large blobs on disk), or None if it is not cached
+        """
+        data = self._memory.get(self._key(sha))
+        if data is not None:
+            return data
+
+        path = self._blob_path(sha)
+        if path is None:
+            return None
+
+        try:
+            with path.open("rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                if size >= MMAP_THRESHOLD_BYTES:
+                    # The map is released together with the last view of it;
+                    # it stays out of the memory tier, which only bounds heap bytes
+                    return memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f"Failed to read cached blob {sha}: {e}")
+            return None
+
+        self._memory.remember(self._key(sha), data)
+        return data
+
+    def put(self, data: bytes, sha: str | None = None) -> str:
+        """
+        Store blob bytes under their git blob SHA.
+
+        Args:
+            data: Raw file content
+            sha: Expected git blob SHA, checked against the content
+
+        Returns:
+            The blob SHA the content is stored under
+
+        Raises:
+            ValueError: If the content does not match the expected SHA
+        """
+        actual = git_blob_sha(data)
+        if sha is not None and sha != actual:
+            raise ValueError(f"Content does not match blob {sha} (it is {actual})")
+        sha = actual
+        self._memory.remember(self._key(sha), data)
+
+        path = self._blob_path(sha)
+        if path is None or path.exists():
+            return sha
+
+        tmp_name = None
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temp file and rename so readers never see partial blobs
+            fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_name, path)
+        except OSError as e:
+            logger.warning(f"Failed to persist blob {sha}: {e}")
+            if tmp_name is not None:
+                Path(tmp_name).unlink(missing_ok=True)
+
+        return sha
+
+    def clear_memory(self) -> None:
+        """Drop all in-memory blobs of every namespace (disk tier is kept)."""
+        self._memory.clear()
+
+
+class _MemoryTier:
+    """Thread-safe LRU of blobs bounded by total bytes."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._blobs: OrderedDict[str, bytes] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._blobs
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            data = self._blobs.get(key)
+            if data is not None:
+                self._blobs.move_to_end(key)
+            return data
+
+    def remember(self, key: str, data: bytes) -> None:
+        """Insert a blob, evicting the oldest blobs as needed."""
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._blobs:
+                self._blobs.move_to_end(key)
+                return
+            self._blobs[key] = data
+            self._bytes += len(data)
+            while self._bytes > self.max_bytes:
+                _, evicted = self._blobs.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._blobs.clear()
+            self._bytes = 0
+
+
+# Singleton instance
+_blob_store: BlobStore | None = None
+
+
+def get_blob_store() -> BlobStore:
+    """Get or create the shared blob store instance."""
+    global _blob_store
+    if _blob_store is None:
+        _blob_store = BlobStore()
+    return _blob_store
@@ -0,0 +1,82 @@
+"""
+Code Units
+==========
+Split Python source into top-level functions and classes with `ast`.
+
+Each unit carries a fingerprint of its AST (positions, comments and
+formatting excluded), so callers can tell which units actually changed
+between two versions of a file.
+"""
+
+import ast
+import hashlib
+from dataclasses import dataclass
+from typing import Literal
+
+
+@dataclass(frozen=True)
+class CodeUnit:
+    """A top-level function or class extracted from a module."""
+
+    name: str
+    kind: Literal["function", "class"]
+    lineno: int
+    end_lineno: int
+    source: str
+    fingerprint: str
+
+
+def fingerprint_node(node: ast.AST) -> str:
+    """
+    Hash an AST node independent of line numbers and formatting.
+
+    Args:
+        node: Any AST node
+
+    Returns:
+        Hex digest that changes only when the node's structure changes
+    """
+    dump = ast.dump(node, annotate_fields=False, include_attributes=False)
+    return hashlib.sha256(dump.encode()).hexdigest()
+
+
+def extract_units(source: str) -> list[CodeUnit]:
+    """
+    Extract top-level functions and classes from Python source.
+
+    Args:
+        source: Python module source
+
+    Returns:
+        List of CodeUnit objects in source order
+
+    Raises:
+        SyntaxError: If the source cannot be parsed
+    """
+    tree = ast.parse(source)
+    lines = source.splitlines(keepends=True)
+    units = []
+
+    for node in tree.body:
+        if isinstance(node, ast.FunctionDef | ast.AsyncFunctionDef):
+            kind: Literal["function", "class"] = "function"
+        elif isinstance(node, ast.ClassDef):
+            kind = "class"
+        else:
+            continue
+
+        # Include decorators in the unit's source
+        start = min([node.lineno, *(d.lineno for d in node.decorator_list)])
+        end = node.end_lineno or node.lineno
+        units.append(
+            CodeUnit(
+                name=node.name,
+                kind=kind,
+                lineno=start,
+                end_lineno=end,
+                source="".join(lines[start - 1 : end]),
+                fingerprint=fingerprint_node(node),
+            )
+        )
+
+    return units
@@ -0,0 +1,268 @@
+"""
+Code Validation
+===============
+Post-generation checks for LLM-written pytest modules.
+
+A module is parsed and compiled, checked for names that are never bound
+(NameError when the test runs) and for test functions defined twice (the
+later definition silently replaces the earlier one), and its formatting is
+normalized. The checks are CPU-bound, so they run in a process pool and
+never block the event loop.
+
+When a module does not parse, only a window of lines around the syntax
+error is sent back to the LLM for repair, which is much cheaper than
+regenerating the whole module.
+"""
+
+import ast
+import asyncio
+import builtins
+import logging
+import os
+import re
+from collections.abc import Awaitable, Callable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from typing import Literal
+
+from app.services.response_analysis import collect_tests
+
+logger = logging.getLogger("ai_sdlc_copilot")
+
+# Worker processes for validation (override via environment)
+VALIDATION_WORKERS = int(os.getenv("VALIDATION_WORKERS", "2"))
+
+# Targeted repair attempts for a module with a syntax error
+VALIDATION_FIX_ATTEMPTS = int(os.getenv("VALIDATION_FIX_ATTEMPTS", "1"))
+
+# Lines on each side of a syntax error sent for repair
+FIX_WINDOW_LINES = 15
+
+_KNOWN_NAMES = frozenset(dir(builtins)) | {"__file__", "__name__", "__doc__", "__spec__"}
+
+_BLANK_RUNS = re.compile(r"\n{4,}")
+
+
+@dataclass
+class Diagnostic:
+    """One problem found in a generated module."""
+
+    severity: Literal["error", "warning"]
+    code: str
+    message: str
+    file: str
+    line: int | None = None
+
+
+@dataclass
+class ValidationResult:
+    """Outcome of validating a module."""
+
+    code: str
+    diagnostics: list[Diagnostic] = field(default_factory=list)
+    syntax_ok: bool = True
+    formatted: bool = False
+    test_names: list[str] = field(default_factory=list)
+
+    @property
+    def syntax_error(self) -> Diagnostic | None:
+        return next((d for d in self.diagnostics if d.code == "syntax-error"), None)
+
+
+def _bound_names(tree: ast.Module) -> set[str]:
+    """Every name bound anywhere in the module (scope-insensitive)."""
+    names: set[str] = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Store | ast.Del):
+            names.add(node.id)
+        elif isinstance(node, ast.FunctionDef | ast.AsyncFunctionDef | ast.ClassDef):
+            names.add(node.name)
+        elif isinstance(node, ast.arg):
+            names.add(node.arg)
+        elif isinstance(node, ast.alias):
+            names.add((node.asname or node.name).split(".")[0])
+        elif isinstance(node, ast.ExceptHandler) and node.name:
+            names.add(node.name)
+        elif isinstance(node, ast.Global | ast.Nonlocal):
+            names.update(node.names)
+        elif isinstance(node, ast.MatchAs | ast.MatchStar) and node.name:
+            names.add(node.name)
+        elif isinstance(node, ast.MatchMapping) and node.rest:
+            names.add(node.rest)
+    return names
+
+
+def _undefined_names(tree: ast.Module, filename: str) -> list[Diagnostic]:
+    if any(
+        isinstance(node, ast.ImportFrom) and any(a.name == "*" for a in node.names)
+        for node in ast.walk(tree)
+    ):
+        return []  # Star imports bind names we cannot see
+    known = _bound_names(tree) | _KNOWN_NAMES
+    diagnostics: dict[str, Diagnostic] = {}
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load):
+            if node.id not in known and node.id not in diagnostics:
+                diagnostics[node.id] = Diagnostic(
+                    "error", "undefined-name", f"Undefined name '{node.id}'", filename, node.lineno
+                )
+    return sorted(diagnostics.values(), key=lambda d: d.line or 0)
+
+
+def _duplicate_tests(tests: list[tuple[str, ast.AST]], filename: str) -> list[Diagnostic]:
+    seen: set[str] = set()
+    diagnostics = []
+    for name, node in tests:
+        if name in seen:
+            diagnostics.append(
+                Diagnostic(
+                    "warning",
+                    "duplicate-test",
+                    f"'{name}' is defined more than once; only the last definition runs",
+                    filename,
+                    node.lineno,
+                )
+            )
+        seen.add(name)
+    return diagnostics
+
+
+def normalize_formatting(code: str) -> str:
+    """
+    Normalize a module's formatting without changing its meaning.
+
+    Uses black when it is installed; otherwise line endings, trailing
+    whitespace and runs of blank lines are normalized. The result is
+    discarded if its AST differs from the original's (e.g. trailing
+    whitespace inside a multi-line string).
+    """
+    try:
+        import black
+
+        formatted = black.format_str(code, mode=black.Mode(line_length=100))
+    except ImportError:
+        lines = [line.rstrip() for line in code.replace("\r\n", "\n").split("\n")]
+        formatted = _BLANK_RUNS.sub("\n\n\n", "\n".join(lines)).strip("\n") + "\n"
+    except Exception:
+        return code
+
+    if ast.dump(ast.parse(formatted)) != ast.dump(ast.parse(code)):
+        return code
+    return formatted
+
+
+def validate_module(code: str, filename: str = "test_module.py") -> ValidationResult:
+    """
+    Validate and format a generated module (runs in a worker process).
+
+    Args:
+        code: Module source
+        filename: File name used in diagnostics
+
+    Returns:
+        ValidationResult with the (formatted) code and diagnostics
+    """
+    try:
+        tree = ast.parse(code, filename=filename)
+        compile(tree, filename, "exec")
+    except SyntaxError as e:
+        return ValidationResult(
+            code=code,
+            syntax_ok=False,
+            diagnostics=[Diagnostic("error", "syntax-error", e.msg, filename, e.lineno)],
+        )
+
+    tests = collect_tests(tree)
+    diagnostics = _undefined_names(tree, filename) + _duplicate_tests(tests, filename)
+    formatted = normalize_formatting(code)
+    return ValidationResult(
+        code=formatted,
+        diagnostics=sorted(diagnostics, key=lambda d: d.line or 0),
+        formatted=formatted != code,
+        test_names=[name for name, _ in tests],
+    )
+
+
+def error_window(code: str, line: int, radius: int = FIX_WINDOW_LINES) -> tuple[int, int]:
+    """0-based [start, end) line range around a 1-based error line."""
+    total = len(code.splitlines())
+    line = min(max(line, 1), max(total, 1))
+    return max(line - 1 - radius, 0), min(line + radius, total)
+
+
+def splice_lines(code: str, start: int, end: int, replacement: str) -> str:
+    """Replace lines [start, end) of code with replacement."""
+    lines = code.splitlines()
+    return "\n".join(lines[:start] + replacement.strip("\n").splitlines() + lines[end:]) + "\n"
+
+
+# Singleton instance
+_executor: ProcessPoolExecutor | None = None
+
+
+def get_validation_executor() -> ProcessPoolExecutor:
+    """Get or create the validation process pool."""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=VALIDATION_WORKERS)
+    return _executor
+
+
+def shutdown_validation_executor() -> None:
+    """Stop the validation worker processes (called on app shutdown)."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def validate_code(code: str, filename: str = "test_module.py") -> ValidationResult:
+    """Run validate_module() in the process pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_validation_executor(), validate_module, code, filename)
+
+
+SnippetFixer = Callable[[str, Diagnostic], Awaitable[str]]
+
+
+async def validate_and_fix(
+    code: str,
+    fix: SnippetFixer | None = None,
+    filename: str = "test_module.py",
+    attempts: int = VALIDATION_FIX_ATTEMPTS,
+) -> tuple[ValidationResult, bool]:
+    """
+    Validate a module, repairing a syntax error by fixing only its surroundings.
+
+    Args:
+        code: Module source
+        fix: Coroutine returning a corrected version of the snippet it is given
+            (with the error, its line relative to the snippet)
+        filename: File name used in diagnostics
+        attempts: Maximum repair attempts
+
+    Returns:
+        (result, fixed): the final validation result, and whether a repair made it parse
+    """
+    result = await validate_code(code, filename)
+    repaired = False
+    for _ in range(attempts if fix is not None else 0):
+        error = result.syntax_error
+        if error is None:
+            break
+        start, end = error_window(result.code, error.line or 1)
+        snippet = "\n".join(result.code.splitlines()[start:end])
+        try:
+            replacement = await fix(snippet, replace(error, line=(error.line or 1) - start))
+        except Exception as e:
+            logger.warning(f"Syntax repair for {filename} failed: {e}")
+            break
+        candidate = await validate_code(
+            splice_lines(result.code, start, end, replacement), filename
+        )
+        # Keep a repair that parses or at least moves the error further down
+        if candidate.syntax_ok or (candidate.syntax_error.line or 0) > (error.line or 0):
+            result, repaired = candidate, True
+        else:
+            break
+    return result, repaired and result.syntax_ok
@@ -0,0 +1,178 @@
+"""
+Context Packer
+==============
+Fits prompt context into a token budget.
+
+Candidate snippets (requirement, free-text context, related code, historical
+cases) are ranked by relevance to the request and packed greedily into the
+tokens left after the fixed prompt and the room reserved for the model's
+output. What was included and dropped is reported back, so prompt size stays
+predictable no matter how much context a caller sends.
+"""
+
+import logging
+import math
+import os
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+
+logger = logging.getLogger("ai_sdlc_copilot")
+
+# Model context window in tokens (Groq llama-3.3 / Gemini free tiers are far larger,
+# but per-minute token limits make smaller prompts faster and cheaper)
+PROMPT_CONTEXT_WINDOW = int(os.getenv("PROMPT_CONTEXT_WINDOW", "8192"))
+
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+_TERM_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Relative importance of snippet kinds when relevance is otherwise equal
+KIND_WEIGHTS = {
+    "requirement": 3.0,
+    "code": 1.5,
+    "context": 1.0,
+    "history": 0.8,
+}
+
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it of on or that the this to was "
+    "were will with should can user users".split()
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the token count of text without a tokenizer.
+
+    Words count as one token per ~4 characters and punctuation as one token
+    each, which tracks BPE tokenizers closely for English and code.
+    """
+    return sum(max(1, math.ceil(len(piece) / 4)) for piece in _TOKEN_PATTERN.findall(text))
+
+
+def _terms(text: str) -> Counter[str]:
+    return Counter(t for t in _TERM_PATTERN.findall(text.lower()) if t not in _STOPWORDS)
+
+
+@dataclass
+class Snippet:
+    """A candidate piece of prompt context."""
+
+    kind: str
+    text: str
+    label: str = ""
+    required: bool = False
+
+    @property
+    def tokens(self) -> int:
+        return estimate_tokens(self.text)
+
+
+@dataclass
+class PackedContext:
+    """Result of packing snippets into a budget."""
+
+    budget: int
+    included: list[Snippet] = field(default_factory=list)
+    dropped: list[Snippet] = field(default_factory=list)
+
+    @property
+    def used_tokens(self) -> int:
+        return sum(s.tokens for s in self.included)
+
+    def text(self, kind: str | None = None, separator: str = "\n\n") -> str:
+        """Join included snippets (optionally of one kind) in their original order."""
+        return separator.join(s.text for s in self.included if kind is None or s.kind == kind)
+
+    def report(self) -> dict:
+        """Summary of what was packed, for logs and API responses."""
+        return {
+            "budget_tokens": self.budget,
+            "used_tokens": self.used_tokens,
+            "included": [s.label or s.kind for s in self.included],
+            "dropped": [s.label or s.kind for s in self.dropped],
+        }
+
+
+class ContextPacker:
+    """
+    Ranks snippets by relevance and greedily fills a token budget.
+
+    Example:
+        packer = ContextPacker(reserve_output=4096)
+        packed = packer.pack(query, snippets, fixed_tokens=estimate_tokens(template))
+    """
+
+    def __init__(
+        self,
+        context_window: int = PROMPT_CONTEXT_WINDOW,
+        reserve_output: int = 2048,
+    ):
+        """
+        Initialize the packer.
+
+        Args:
+            context_window: Model context window in tokens
+            reserve_output: Tokens kept free for the model's response
+        """
+        self.context_window = context_window
+        self.reserve_output = reserve_output
+
+    def score(self, query_terms: Counter[str], snippet: Snippet) -> float:
+        """Relevance of a snippet: weighted term overlap, normalized by length."""
+        terms = _terms(snippet.text)
+        if not terms:
+            return 0.0
+        overlap = sum(min(count, terms[t]) for t, count in query_terms.items() if t in terms)
+        weight = KIND_WEIGHTS.get(snippet.kind, 1.0)
+        return weight * (overlap + 1) / math.sqrt(sum(terms.values()))
+
+    def pack(self, query: str, snippets: list[Snippet], fixed_tokens: int = 0) -> PackedContext:
+        """
+        Pack the most relevant snippets into the available budget.
+
+        Required snippets are always included first. The rest are taken in
+        order of relevance, skipping any that no longer fit.
+
+        Args:
+            query: Text the context should be relevant to (e.g. the requirement)
+            snippets: Candidate snippets
+            fixed_tokens: Tokens already used by the prompt template and system prompt
+
+        Returns:
+            PackedContext with included snippets in their original order
+        """
+        budget = max(self.context_window - self.reserve_output - fixed_tokens, 0)
+        query_terms = _terms(query)
+        order = {id(s): i for i, s in enumerate(snippets)}
+
+        required = [s for s in snippets if s.required]
+        optional = sorted(
+            (s for s in snippets if not s.required),
+            key=lambda s: self.score(query_terms, s),
+            reverse=True,
+        )
+
+        packed = PackedContext(budget=budget)
+        used = 0
+        for snippet in required + optional:
+            tokens = snippet.tokens
+            if snippet.required or used + tokens <= budget:
+                packed.included.append(snippet)
+                used += tokens
+            else:
+                packed.dropped.append(snippet)
+
+        packed.included.sort(key=lambda s: order[id(s)])
+        if packed.dropped:
+            logger.info(
+                f"Context packed {used}/{budget} tokens, dropped "
+                f"{len(packed.dropped)} snippet(s): {packed.report()['dropped']}"
+            )
+        return packed
+
+
+def split_paragraphs(text: str, kind: str = "context", label: str = "context") -> list[Snippet]:
+    """Split free text into paragraph snippets (numbered labels)."""
+    paragraphs = [p.strip() for p in re.split(r"\n\s*\n", text) if p.strip()]
+    return [Snippet(kind=kind, text=p, label=f"{label}#{i}") for i, p in enumerate(paragraphs, 1)]
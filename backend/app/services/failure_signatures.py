@@ -0,0 +1,329 @@
+"""
+Failure Signatures
+==================
+De-duplicate CI failures before drafting defects or creating issues.
+
+A failure's signature is built from its failed tests, error messages and
+traceback excerpts after normalizing away run-specific noise (memory
+addresses, timestamps, temp paths, durations, ids); a log that only failed
+with an exit code is identified by the exit line and the lines before it.
+The SHA-256 of the normalized text identifies exact repeats; a MinHash
+signature with an LSH index finds near-duplicates (e.g. the same flaky test
+failing with a slightly different message). An empty signature never
+matches anything.
+
+Known failures are kept per repository in a local JSON index, so a repeated
+failure costs one lookup instead of an LLM call and a GitHub write. The
+index is written in a worker thread, one write at a time; changes made while
+a write is running are batched into the next one.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from app.services.log_parser import LogAnalysis
+from app.services.minhash import LSHIndex, MinHasher, Signature, similarity
+
+logger = logging.getLogger("ai_sdlc_copilot")
+
+DEFAULT_INDEX_DIR = os.getenv("FAILURE_INDEX_DIR", ".cache/failures")
+
+# Estimated Jaccard similarity above which two failures are the same defect
+FAILURE_SIMILARITY_THRESHOLD = float(os.getenv("FAILURE_SIMILARITY_THRESHOLD", "0.8"))
+
+# Most failure clusters kept per repository (least recently seen are dropped)
+MAX_FAILURE_CLUSTERS = 5000
+
+# Marker embedded in created issues so they can be found again by fingerprint
+SIGNATURE_MARKER = "failure-signature"
+
+_NUM_PERM = 64
+_hasher = MinHasher(num_perm=_NUM_PERM)
+
+# Run-specific noise, replaced in order
+_NORMALIZERS = [
+    (re.compile(r"\x1b\[[0-9;]*[A-Za-z]"), ""),
+    (re.compile(r"0x[0-9a-fA-F]+"), "0xADDR"),
+    (
+        re.compile(r"\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b", re.I),
+        "<uuid>",
+    ),
+    (re.compile(r"\d{4}-\d\d-\d\d[T ][\d:.,]+(?:Z|[+-]\d\d:?\d\d)?"), "<timestamp>"),
+    (re.compile(r"\b\d\d:\d\d:\d\d(?:[.,]\d+)?\b"), "<time>"),
+    (
+        re.compile(
+            r"(?:/tmp|/var/folders|/private/var/folders|[A-Za-z]:\\[^\s]*?\\Temp)"
+            r"[/\\][^\s'\":]*"
+        ),
+        "<tmp>",
+    ),
+    (re.compile(r"/(?:home|Users)/[^/\s]+/"), "~/"),
+    (re.compile(r"\b\d+(?:\.\d+)?\s?(?:s|ms|sec|seconds)\b"), "<duration>"),
+    (re.compile(r"\bpid[ =:]?\d+\b", re.I), "pid <n>"),
+    (re.compile(r"\b[0-9a-f]{40}\b"), "<sha>"),
+    (re.compile(r"[ \t]+"), " "),
+]
+
+
+def normalize_failure(text: str) -> str:
+    """
+    Strip run-specific noise from failure text.
+
+    Args:
+        text: Failure messages and traceback lines
+
+    Returns:
+        Normalized text that is stable across runs of the same failure
+    """
+    for pattern, replacement in _NORMALIZERS:
+        text = pattern.sub(replacement, text)
+    return "\n".join(line.strip() for line in text.splitlines() if line.strip())
+
+
+@dataclass(frozen=True)
+class FailureSignature:
+    """Exact and near-duplicate identity of a failure."""
+
+    fingerprint: str
+    minhash: Signature
+    text: str
+
+    @property
+    def is_empty(self) -> bool:
+        """True if nothing identifies the failure (it must not be de-duplicated)."""
+        return not self.text
+
+    @property
+    def marker(self) -> str:
+        """HTML comment embedded in issue bodies to find the issue again."""
+        return f"<!-- {SIGNATURE_MARKER}: {self.fingerprint} -->"
+
+
+def failure_signature(analysis: LogAnalysis) -> FailureSignature:
+    """
+    Compute the signature of the failures in a log.
+
+    Uses failed test ids, error messages and the traceback/error excerpts;
+    exit codes and summaries are left out because they vary between runs.
+    Only when none of those are found (e.g. a build step that exited with
+    an error code) are the exit excerpts (exit line and context) used.
+    """
+    parts = sorted(analysis.failed_tests) + sorted(analysis.errors)
+    parts += [
+        e.text for e in analysis.excerpts if {"traceback", "error", "assertion"} & set(e.kinds)
+    ]
+    if not parts:
+        parts = [e.text for e in analysis.excerpts if "exit" in e.kinds]
+    text = normalize_failure("\n".join(parts))
+    return FailureSignature(
+        fingerprint=hashlib.sha256(text.encode()).hexdigest()[:32],
+        minhash=_hasher.text_signature(text),
+        text=text,
+    )
+
+
+@dataclass
+class FailureCluster:
+    """A known failure and where it was reported."""
+
+    fingerprint: str
+    minhash: list[int]
+    occurrences: int = 1
+    first_seen: float = field(default_factory=time.time)
+    last_seen: float = field(default_factory=time.time)
+    issue_number: int | None = None
+    issue_url: str | None = None
+    defect_report: dict | None = None
+
+
+@dataclass
+class FailureMatch:
+    """A lookup hit: the cluster and how similar the new failure is."""
+
+    cluster: FailureCluster
+    similarity: float
+
+
+class FailureSignatureIndex:
+    """
+    Known failure clusters for one repository, with exact and LSH lookup.
+
+    Example:
+        index = get_failure_index("octo/shop")
+        match = index.match(signature)
+    """
+
+    def __init__(self, path: str | Path, threshold: float = FAILURE_SIMILARITY_THRESHOLD):
+        """
+        Initialize the index, loading it from disk if it exists.
+
+        Args:
+            path: JSON file the index is persisted to
+            threshold: Minimum estimated similarity for a near-duplicate match
+        """
+        self.path = Path(path)
+        self.threshold = threshold
+        self._clusters: dict[str, FailureCluster] = {}
+        self._lsh = LSHIndex(num_perm=_NUM_PERM)
+        # fingerprint -> (lock, number of holders and waiters)
+        self._locks: dict[str, tuple[asyncio.Lock, int]] = {}
+        self._write_lock = asyncio.Lock()
+        self._dirty = False
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._clusters)
+
+    def _load(self) -> None:
+        try:
+            raw = json.loads(self.path.read_text(encoding="utf-8"))
+            for data in raw:
+                cluster = FailureCluster(**data)
+                self._clusters[cluster.fingerprint] = cluster
+                self._lsh.insert(cluster.fingerprint, tuple(cluster.minhash))
+        except FileNotFoundError:
+            pass
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable failure index {self.path}: {e}")
+
+    def _write(self, clusters: list[dict]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self.path.parent, prefix=".tmp-")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(clusters, f)
+        os.replace(tmp_name, self.path)
+
+    def save(self) -> None:
+        """Persist the index atomically."""
+        self._write([asdict(c) for c in self._clusters.values()])
+
+    async def persist(self) -> None:
+        """
+        Persist the index without blocking the event loop.
+
+        Callers that arrive while a write is running wait for it, then the
+        first of them writes all their changes at once.
+        """
+        self._dirty = True
+        async with self._write_lock:
+            if not self._dirty:
+                return  # Written by an earlier caller
+            self._dirty = False
+            clusters = [asdict(c) for c in self._clusters.values()]
+            try:
+                await asyncio.to_thread(self._write, clusters)
+            except BaseException:
+                self._dirty = True
+                raise
+
+    @asynccontextmanager
+    async def reserve(self, signature: FailureSignature) -> AsyncIterator[None]:
+        """
+        Serialize reporting of one fingerprint.
+
+        Concurrent runs hitting the same failure wait here, then find the
+        cluster the first one added instead of reporting it again.
+        """
+        key = signature.fingerprint
+        lock, users = self._locks.get(key, (None, 0))
+        lock = lock or asyncio.Lock()
+        self._locks[key] = (lock, users + 1)
+        try:
+            async with lock:
+                yield
+        finally:
+            lock, users = self._locks[key]
+            if users == 1:
+                del self._locks[key]
+            else:
+                self._locks[key] = (lock, users - 1)
+
+    def match(self, signature: FailureSignature) -> FailureMatch | None:
+        """
+        Find the cluster a failure belongs to.
+
+        Returns:
+            The exact fingerprint match, else the most similar LSH candidate
+            above the threshold, else None (always for an empty signature)
+        """
+        if signature.is_empty:
+            return None
+        cluster = self._clusters.get(signature.fingerprint)
+        if cluster is not None:
+            return FailureMatch(cluster, 1.0)
+
+        best: FailureMatch | None = None
+        for key in self._lsh.query(signature.minhash):
+            candidate = self._clusters[key]
+            score = similarity(signature.minhash, tuple(candidate.minhash))
+            if score >= self.threshold and (best is None or score > best.similarity):
+                best = FailureMatch(candidate, score)
+        return best
+
+    async def record_occurrence(self, cluster: FailureCluster) -> None:
+        """Count another occurrence of a known failure and persist."""
+        cluster.occurrences += 1
+        cluster.last_seen = time.time()
+        await self.persist()
+
+    async def add(
+        self,
+        signature: FailureSignature,
+        issue_number: int | None = None,
+        issue_url: str | None = None,
+        defect_report: dict | None = None,
+    ) -> FailureCluster:
+        """
+        Add a new failure cluster and persist.
+
+        Raises:
+            ValueError: If the signature is empty
+        """
+        if signature.is_empty:
+            raise ValueError("Cannot index an empty failure signature")
+        cluster = FailureCluster(
+            fingerprint=signature.fingerprint,
+            minhash=list(signature.minhash),
+            issue_number=issue_number,
+            issue_url=issue_url,
+            defect_report=defect_report,
+        )
+        self._clusters[cluster.fingerprint] = cluster
+        self._lsh.insert(cluster.fingerprint, signature.minhash)
+
+        while len(self._clusters) > MAX_FAILURE_CLUSTERS:
+            stale = min(self._clusters.values(), key=lambda c: c.last_seen)
+            del self._clusters[stale.fingerprint]
+            self._lsh.remove(stale.fingerprint, tuple(stale.minhash))
+
+        await self.persist()
+        return cluster
+
+
+# Loaded indexes, one per repository
+_failure_indexes: dict[str, FailureSignatureIndex] = {}
+
+
+def get_failure_index(repository: str) -> FailureSignatureIndex:
+    """
+    Get the failure index for a repository ("owner/repo"), loading it once.
+
+    There is no index for failures without a repository: logs from unknown
+    sources are never de-duplicated against each other.
+    """
+    scope = repository.replace("/", "__")
+    index = _failure_indexes.get(scope)
+    if index is None:
+        index = FailureSignatureIndex(Path(DEFAULT_INDEX_DIR) / f"{scope}.json")
+        _failure_indexes[scope] = index
+    return index
@@ -0,0 +1,76 @@
+"""
+File Output
+===========
+Async, atomic writes of generated files.
+
+Each file is written to a temporary file in its target directory and then
+renamed over the target, so readers never see a partly written file. A
+batch (e.g. a test module and its conftest.py) is renamed into place while
+holding a per-directory lock, so concurrent generations into the same
+directory cannot interleave their files.
+"""
+
+import asyncio
+import logging
+import uuid
+import weakref
+from pathlib import Path
+
+import aiofiles
+import aiofiles.os
+
+logger = logging.getLogger("ai_sdlc_copilot")
+
+# One lock per resolved output directory, dropped once no writer holds or awaits it
+_directory_locks: weakref.WeakValueDictionary[Path, asyncio.Lock] = weakref.WeakValueDictionary()
+
+
+def _directory_lock(directory: Path) -> asyncio.Lock:
+    lock = _directory_locks.get(directory)
+    if lock is None:
+        lock = _directory_locks[directory] = asyncio.Lock()
+    return lock
+
+
+async def write_files(output_dir: str | Path, files: dict[str, str]) -> dict[str, Path]:
+    """
+    Write several files into one directory as a single batch.
+
+    All files are written to temporary files first; only if every write
+    succeeds are they renamed into place (under the directory's lock).
+    On failure the temporary files are removed and no target is touched.
+
+    Args:
+        output_dir: Directory to write to (created if missing)
+        files: File name -> content
+
+    Returns:
+        File name -> absolute path written
+
+    Raises:
+        OSError: If the directory or a file cannot be written
+    """
+    directory = Path(output_dir).resolve()
+    await aiofiles.os.makedirs(directory, exist_ok=True)
+
+    staged: list[tuple[Path, Path]] = []
+    try:
+        for name, content in files.items():
+            target = directory / name
+            tmp = directory / f".{name}.{uuid.uuid4().hex}.tmp"
+            staged.append((tmp, target))
+            async with aiofiles.open(tmp, "w", encoding="utf-8") as f:
+                await f.write(content)
+
+        async with _directory_lock(directory):
+            for tmp, target in staged:
+                await aiofiles.os.replace(tmp, target)
+    except BaseException:
+        for tmp, _ in staged:
+            try:
+                await aiofiles.os.remove(tmp)
+            except FileNotFoundError:
+                pass
+        raise
+
+    return {target.name: target for _, target in staged}
@@ -0,0 +1,264 @@
+"""
+GitHub Rate Limit Scheduler
+===========================
+Paces GitHub API calls against the budget reported in response headers.
+
+GitHub reports the primary budget per resource (core, search, graphql) via
+`X-RateLimit-Limit`, `X-RateLimit-Remaining`, `X-RateLimit-Reset` and
+`X-RateLimit-Resource`. Secondary (abuse) limits come back as 403/429 with a
+`Retry-After` header. The scheduler tracks both, spreads the remaining budget
+over the reset window as it runs low, and grants request slots in priority
+order so interactive UI calls overtake background scans.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from enum import IntEnum
+
+import httpx
+
+logger = logging.getLogger("ai_sdlc_copilot")
+
+# GitHub asks clients to wait at least a minute on secondary limits without Retry-After
+SECONDARY_LIMIT_BACKOFF = 60.0
+
+
+class RequestPriority(IntEnum):
+    """Scheduling priority for GitHub requests (lower runs first)."""
+
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+_current_priority: ContextVar[RequestPriority] = ContextVar(
+    "github_request_priority", default=RequestPriority.INTERACTIVE
+)
+
+
+@contextmanager
+def request_priority(priority: RequestPriority) -> Iterator[None]:
+    """
+    Run GitHub calls made inside the block at the given priority.
+
+    Example:
+        with request_priority(RequestPriority.BACKGROUND):
+            await service.find_python_files(owner, repo)
+    """
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def current_priority() -> RequestPriority:
+    """Get the priority for requests made in the current context."""
+    return _current_priority.get()
+
+
+@dataclass
+class RateLimitBudget:
+    """Last known budget for one GitHub rate limit resource."""
+
+    limit: int | None = None
+    remaining: int | None = None
+    reset_at: float = 0.0
+    blocked_until: float = 0.0
+
+
+class RateLimitScheduler:
+    """
+    Per-token scheduler for GitHub API requests.
+
+    - Tracks the remaining budget per resource from response headers
+    - Paces requests as the budget nears zero instead of running dry
+    - Keeps a reserve of the budget for interactive requests
+    - Grants concurrency slots in priority order
+    - Computes back-off for primary and secondary rate limits
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        pace_threshold: float = 0.1,
+        background_reserve: float = 0.2,
+        max_wait: dict[RequestPriority, float] | None = None,
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            max_concurrency: Maximum in-flight requests for this token
+            pace_threshold: Fraction of the budget below which requests are paced
+            background_reserve: Fraction of the budget background requests may not use
+            max_wait: Longest wait (seconds) per priority before giving up
+        """
+        self.max_concurrency = max_concurrency
+        self.pace_threshold = pace_threshold
+        self.background_reserve = background_reserve
+        self.max_wait = max_wait or {
+            RequestPriority.INTERACTIVE: 60.0,
+            RequestPriority.BACKGROUND: 3600.0,
+        }
+        self._budgets: dict[str, RateLimitBudget] = {}
+        self._active = 0
+        self._waiters: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._sequence = itertools.count()
+        self._clock = time.time
+        self._sleep = asyncio.sleep
+
+    def budget(self, resource: str = "core") -> RateLimitBudget:
+        """Get the tracked budget for a resource."""
+        return self._budgets.setdefault(resource, RateLimitBudget())
+
+    def delay_for(self, resource: str, priority: RequestPriority) -> float:
+        """
+        Compute how long a request should wait before it is sent.
+
+        Args:
+            resource: Rate limit resource (core, search, graphql)
+            priority: Request priority
+
+        Returns:
+            Delay in seconds (0 if the request can go now)
+        """
+        budget = self.budget(resource)
+        now = self._clock()
+
+        if budget.blocked_until > now:
+            return budget.blocked_until - now
+        if budget.remaining is None or budget.limit is None or budget.reset_at <= now:
+            return 0.0
+
+        window = budget.reset_at - now
+        background = priority == RequestPriority.BACKGROUND
+        reserve = budget.limit * self.background_reserve if background else 0.0
+        usable = budget.remaining - reserve
+        if usable < 1:
+            return window
+
+        if budget.remaining > budget.limit * self.pace_threshold + reserve:
+            return 0.0
+
+        # Spread what is left evenly over the rest of the window
+        return window / usable
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        resource: str = "core",
+        priority: RequestPriority | None = None,
+    ) -> AsyncIterator[None]:
+        """
+        Wait for budget and a concurrency slot, then hold the slot.
+
+        Raises:
+            RateLimitExceeded: If the wait would exceed max_wait for the priority
+        """
+        priority = current_priority() if priority is None else priority
+
+        delay = self.delay_for(resource, priority)
+        if delay > self.max_wait[priority]:
+            raise RateLimitExceeded(resource, delay)
+        while delay > 0:
+            logger.debug(f"GitHub {resource} budget low, pacing request by {delay:.1f}s")
+            await self._sleep(delay)
+            delay = self.delay_for(resource, priority)
+
+        await self._acquire(priority)
+        try:
+            budget = self.budget(resource)
+            if budget.remaining:
+                budget.remaining -= 1  # Optimistic until the response headers arrive
+            yield
+        finally:
+            self._release()
+
+    async def _acquire(self, priority: RequestPriority) -> None:
+        if self._active < self.max_concurrency and not self._waiters:
+            self._active += 1
+            return
+
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (int(priority), next(self._sequence), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            # The slot may have been handed over just before cancellation
+            if future.done() and not future.cancelled():
+                self._release()
+            raise
+
+    def _release(self) -> None:
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)  # Hand the slot straight to the next waiter
+                return
+        self._active -= 1
+
+    def update(self, response: httpx.Response, resource: str = "core") -> float | None:
+        """
+        Record the budget reported by a response.
+
+        Args:
+            response: GitHub API response
+            resource: Resource the request was scheduled under
+
+        Returns:
+            Seconds to wait before retrying if the response was rate limited,
+            otherwise None
+        """
+        headers = response.headers
+        resource = headers.get("x-ratelimit-resource", resource)
+        budget = self.budget(resource)
+        now = self._clock()
+
+        if "x-ratelimit-remaining" in headers:
+            try:
+                budget.limit = int(headers.get("x-ratelimit-limit", budget.limit or 0))
+                budget.remaining = int(headers["x-ratelimit-remaining"])
+                budget.reset_at = float(headers.get("x-ratelimit-reset", budget.reset_at))
+            except ValueError:
+                logger.debug("Ignoring malformed GitHub rate limit headers")
+
+        if response.status_code not in (403, 429):
+            return None
+
+        retry_after = headers.get("retry-after")
+        if retry_after is not None:
+            # Secondary limit: GitHub tells us exactly how long to wait
+            try:
+                delay = max(float(retry_after), 1.0)
+            except ValueError:
+                delay = SECONDARY_LIMIT_BACKOFF
+        elif budget.remaining == 0 and budget.reset_at > now:
+            # Primary limit exhausted: wait for the window to reset
+            delay = budget.reset_at - now + 1.0
+        elif response.status_code == 429 or "secondary rate limit" in response.text.lower():
+            delay = SECONDARY_LIMIT_BACKOFF
+        else:
+            return None  # A real permission error, not a rate limit
+
+        budget.blocked_until = max(budget.blocked_until, now + delay)
+        logger.warning(f"GitHub {resource} rate limit hit, backing off {delay:.0f}s")
+        return delay
+
+
+class RateLimitExceeded(Exception):
+    """Raised when waiting for the GitHub rate limit would take too long."""
+
+    def __init__(self, resource: str, wait_seconds: float):
+        self.resource = resource
+        self.wait_seconds = wait_seconds
+        super().__init__(
+            f"GitHub API rate limit exceeded for '{resource}' "
+            f"(resets in {wait_seconds:.0f}s). Please provide a GitHub token or retry later."
+        )
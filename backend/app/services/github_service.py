@@ -5,26 +5,110 @@ Service for fetching code from GitHub repositories.
 Supports both public repos and authenticated access via personal access tokens.
 """
 
-import base64
+import asyncio
+import hashlib
 import logging
+import os
 import re
-from dataclasses import dataclass
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Callable
+from dataclasses import dataclass, field
+from typing import Literal
 
 import httpx
 
+from app.services.blob_store import BlobStore, get_blob_store
+from app.services.github_rate_limit import RateLimitExceeded, RateLimitScheduler
+
 logger = logging.getLogger("ai_sdlc_copilot")
 
+# Size guards for fetched files (override via environment)
+MAX_FILE_BYTES = int(os.getenv("GITHUB_MAX_FILE_BYTES", str(1024 * 1024)))
+
+# Maximum number of per-token service instances kept warm
+GITHUB_SERVICE_POOL_SIZE = int(os.getenv("GITHUB_SERVICE_POOL_SIZE", "32"))
+
+# Code search result cache (per service instance, i.e. per token)
+SEARCH_CACHE_TTL = float(os.getenv("GITHUB_SEARCH_CACHE_TTL", "600"))
+SEARCH_CACHE_SIZE = 256
+
+# Path patterns for generated sources that are not worth analyzing
+GENERATED_PATH_PATTERN = re.compile(
+    r"(_pb2(_grpc)?\.py|\.min\.js|(^|/)migrations/\d+\w*\.py|(^|/)generated/)"
+)
+
+# Header markers tools put at the top of generated files
+GENERATED_MARKERS = (b"@generated", b"DO NOT EDIT", b"Code generated by", b"Autogenerated")
+
 
-@dataclass
 class GitHubFile:
-    """Represents a file fetched from GitHub."""
+    """
+    Represents a file fetched from GitHub.
 
-    path: str
-    name: str
-    content: str
-    sha: str
-    size: int
-    url: str
+    Content is loaded lazily: when a loader is given, the bytes are pulled
+    from the blob store on access instead of being held by the instance,
+    so large repository scans keep memory bounded.
+    """
+
+    __slots__ = ("path", "name", "sha", "size", "url", "truncated", "_content", "_loader")
+
+    def __init__(
+        self,
+        path: str,
+        name: str,
+        content: str | None = None,
+        sha: str = "",
+        size: int = 0,
+        url: str = "",
+        *,
+        loader: Callable[[], bytes | memoryview | None] | None = None,
+        truncated: bool = False,
+    ):
+        self.path = path
+        self.name = name
+        self.sha = sha
+        self.size = size
+        self.url = url
+        self.truncated = truncated
+        self._content = content
+        self._loader = loader
+
+    @property
+    def content(self) -> str:
+        """File content decoded as UTF-8 (loaded on access)."""
+        if self._content is not None:
+            return self._content
+        data = self._loader() if self._loader else None
+        if data is None:
+            raise GitHubServiceError(f"Content for {self.path} is no longer cached")
+        # str() decodes a mapped blob without copying it to bytes first
+        return str(data, "utf-8", errors="replace" if self.truncated else "strict")
+
+    @property
+    def is_loaded(self) -> bool:
+        """Whether the content is held in memory by this instance."""
+        return self._content is not None
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, GitHubFile):
+            return NotImplemented
+        return (self.path, self.sha, self.truncated) == (other.path, other.sha, other.truncated)
+
+    def __hash__(self) -> int:
+        return hash((self.path, self.sha, self.truncated))
+
+    def __repr__(self) -> str:
+        return f"GitHubFile(path={self.path!r}, sha={self.sha!r}, size={self.size})"
+
+
+@dataclass
+class _SearchCacheEntry:
+    """Cached code search results for one query."""
+
+    items: list[dict]
+    complete: bool
+    expires_at: float
 
 
 @dataclass
@@ -39,34 +123,162 @@ class RepoInfo:
     private: bool
 
 
+@dataclass
+class GitHubIssue:
+    """An issue with its comments, as a requirement source."""
+
+    number: int
+    title: str
+    body: str
+    url: str
+    updated_at: str
+    labels: list[str] = field(default_factory=list)
+    milestone: str | None = None
+    comments: list[str] = field(default_factory=list)
+
+    @property
+    def requirement(self) -> str:
+        """Issue title, body and comments as requirement text."""
+        parts = [self.title, self.body.strip()]
+        if self.comments:
+            parts.append("Discussion:\n" + "\n\n".join(c.strip() for c in self.comments))
+        return "\n\n".join(p for p in parts if p)
+
+    @property
+    def content_hash(self) -> str:
+        """SHA-256 of the requirement text (changes when the issue is edited)."""
+        return hashlib.sha256(self.requirement.encode()).hexdigest()
+
+
+@dataclass
+class PullRequest:
+    """Pull request metadata needed for a review."""
+
+    number: int
+    title: str
+    body: str
+    url: str
+    state: str
+    head_sha: str
+    base_sha: str
+    changed_files: int
+
+
+# Fields fetched per issue; comments are fetched in the same query
+ISSUES_QUERY = """
+query($owner: String!, $repo: String!, $first: Int!, $after: String,
+      $states: [IssueState!], $labels: [String!], $filterBy: IssueFilters,
+      $comments: Int!) {
+  repository(owner: $owner, name: $repo) {
+    issues(first: $first, after: $after, states: $states, labels: $labels,
+           filterBy: $filterBy, orderBy: {field: UPDATED_AT, direction: DESC}) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        number
+        title
+        body
+        url
+        updatedAt
+        labels(first: 20) { nodes { name } }
+        milestone { title }
+        comments(first: $comments) { nodes { body } }
+      }
+    }
+  }
+}
+"""
+
+
+# Common non-source directories skipped when scanning a repository
+SKIP_DIRECTORIES = frozenset(
+    {
+        "__pycache__",
+        ".git",
+        "node_modules",
+        "venv",
+        ".venv",
+        "env",
+        ".env",
+        "dist",
+        "build",
+        ".tox",
+        ".pytest_cache",
+    }
+)
+
+
 class GitHubServiceError(Exception):
     """Custom exception for GitHub service errors."""
 
     pass
 
 
+class GitHubFileSkipped(GitHubServiceError):
+    """Raised when a file is skipped by the size or generated-file guards."""
+
+    pass
+
+
+def is_generated_path(path: str) -> bool:
+    """Check whether a path looks like a generated source file."""
+    return bool(GENERATED_PATH_PATTERN.search(path))
+
+
 class GitHubService:
     """
     Service for interacting with GitHub repositories.
 
+    Each instance serves a single token and owns its connection pool and
+    RateLimitScheduler, which paces requests against the budget GitHub
+    reports and backs off on limits. Use get_github_service() to share
+    instances per token.
+
     Supports:
     - Fetching repository information
     - Listing files in a directory
-    - Fetching file contents
-    - Searching for files by pattern
+    - Fetching file contents (cached by blob SHA)
+    - Comparing commits for incremental analysis
+    - Searching code (paginated, de-duplicated and cached)
+    - Listing issues with comments (GraphQL, one query per page)
+    - Creating issues and finding them by body text
+    - Fetching pull requests with their changed files and patches
     """
 
     BASE_URL = "https://api.github.com"
+    GRAPHQL_URL = "https://api.github.com/graphql"
+    HTML_URL = "https://github.com"
 
-    def __init__(self, token: str | None = None):
+    RAW_MEDIA_TYPE = "application/vnd.github.raw"
+    MAX_RATE_LIMIT_RETRIES = 3
+
+    def __init__(
+        self,
+        token: str | None = None,
+        blob_store: BlobStore | None = None,
+        max_file_bytes: int = MAX_FILE_BYTES,
+        oversize: Literal["skip", "truncate"] = "skip",
+    ):
         """
         Initialize GitHub service.
 
         Args:
             token: Optional GitHub personal access token for private repos
                    or higher rate limits
+            blob_store: Blob cache for file contents (if not specified, this
+                        token's namespace of the shared store, so cached
+                        private content is never served to another token)
+            max_file_bytes: Largest file fetched in full
+            oversize: What to do with larger files - skip them or truncate the content
         """
         self.token = token
+        self.blob_store = blob_store or get_blob_store().scoped(GitHubServicePool.key_for(token))
+        self.max_file_bytes = max_file_bytes
+        self.oversize = oversize
+        self.scheduler = RateLimitScheduler()
+        self._client: httpx.AsyncClient | None = None
+        self._in_flight = 0
+        self._retired = False
+        self._search_cache: OrderedDict[tuple[str, str | None], _SearchCacheEntry] = OrderedDict()
         self.headers = {
             "Accept": "application/vnd.github.v3+json",
             "User-Agent": "AI-SDLC-Copilot",
@@ -74,6 +286,95 @@ class GitHubService:
         if token:
             self.headers["Authorization"] = f"Bearer {token}"
 
+    def _get_client(self) -> httpx.AsyncClient:
+        """Get this instance's HTTP client (one connection pool per token)."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(timeout=httpx.Timeout(30.0))
+        return self._client
+
+    def _finish_request(self) -> None:
+        """Mark a request done; close the client once a retired instance is idle."""
+        self._in_flight -= 1
+        if self._retired and self._in_flight == 0:
+            asyncio.get_running_loop().create_task(self.aclose())
+
+    def retire(self) -> None:
+        """Close the HTTP client as soon as in-flight requests have finished."""
+        self._retired = True
+        if self._in_flight == 0 and self._client is not None:
+            try:
+                asyncio.get_running_loop().create_task(self.aclose())
+            except RuntimeError:
+                pass  # No running loop; the client is released with the instance
+
+    async def aclose(self) -> None:
+        """Close the HTTP client and its connection pool."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        *,
+        resource: str = "core",
+        stream: bool = False,
+        **kwargs,
+    ) -> httpx.Response:
+        """
+        Send a request through the rate limit scheduler.
+
+        Rate limited responses (primary or secondary) are retried after the
+        back-off GitHub asks for. Streamed responses must be closed by the
+        caller, followed by _finish_request().
+
+        Args:
+            method: HTTP method
+            url: Request URL
+            resource: Rate limit resource (core, search, graphql)
+            stream: Return without reading the body
+            **kwargs: Passed to httpx (params, json, headers)
+
+        Returns:
+            The HTTP response
+
+        Raises:
+            GitHubServiceError: If the rate limit does not clear in time
+        """
+        kwargs.setdefault("headers", self.headers)
+        client = self._get_client()
+        self._in_flight += 1
+        try:
+            for attempt in range(self.MAX_RATE_LIMIT_RETRIES + 1):
+                try:
+                    async with self.scheduler.slot(resource):
+                        request = client.build_request(method, url, **kwargs)
+                        response = await client.send(request, stream=stream)
+                except RateLimitExceeded as e:
+                    raise GitHubServiceError(str(e)) from e
+
+                if stream and response.status_code in (403, 429):
+                    await response.aread()
+
+                delay = self.scheduler.update(response, resource)
+                if delay is None:
+                    if not stream:
+                        self._finish_request()
+                    return response
+
+                if stream:
+                    await response.aclose()
+                logger.info(
+                    f"Retrying {method} {url} after rate limit "
+                    f"(attempt {attempt + 1}/{self.MAX_RATE_LIMIT_RETRIES})"
+                )
+
+            raise GitHubServiceError("GitHub API rate limit exceeded. Please retry later.")
+        except BaseException:
+            self._finish_request()
+            raise
+
     @staticmethod
     def parse_github_url(url: str) -> tuple[str, str]:
         """
@@ -124,35 +425,29 @@ class GitHubService:
         Returns:
             RepoInfo object with repository details
         """
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.BASE_URL}/repos/{owner}/{repo}",
-                headers=self.headers,
-            )
-
-            if response.status_code == 404:
-                raise GitHubServiceError(
-                    f"Repository not found: {owner}/{repo}. "
-                    "Make sure the repository exists and is public (or provide a token for private repos)."
-                )
-            elif response.status_code == 403:
-                raise GitHubServiceError(
-                    "GitHub API rate limit exceeded. Please provide a GitHub token."
-                )
-            elif response.status_code != 200:
-                raise GitHubServiceError(
-                    f"GitHub API error: {response.status_code} - {response.text}"
-                )
+        response = await self._request("GET", f"{self.BASE_URL}/repos/{owner}/{repo}")
 
-            data = response.json()
-            return RepoInfo(
-                owner=owner,
-                repo=repo,
-                default_branch=data.get("default_branch", "main"),
-                description=data.get("description"),
-                language=data.get("language"),
-                private=data.get("private", False),
+        if response.status_code == 404:
+            raise GitHubServiceError(
+                f"Repository not found: {owner}/{repo}. "
+                "Make sure the repository exists and is public (or provide a token for private repos)."
             )
+        elif response.status_code == 403:
+            raise GitHubServiceError(
+                f"Access denied to {owner}/{repo}. Please provide a GitHub token with access."
+            )
+        elif response.status_code != 200:
+            raise GitHubServiceError(f"GitHub API error: {response.status_code} - {response.text}")
+
+        data = response.json()
+        return RepoInfo(
+            owner=owner,
+            repo=repo,
+            default_branch=data.get("default_branch", "main"),
+            description=data.get("description"),
+            language=data.get("language"),
+            private=data.get("private", False),
+        )
 
     async def list_directory(
         self,
@@ -173,22 +468,113 @@ class GitHubService:
         Returns:
             List of file/directory info dicts
         """
-        async with httpx.AsyncClient() as client:
-            url = f"{self.BASE_URL}/repos/{owner}/{repo}/contents/{path}"
-            params = {}
-            if branch:
-                params["ref"] = branch
+        url = f"{self.BASE_URL}/repos/{owner}/{repo}/contents/{path}"
+        params = {}
+        if branch:
+            params["ref"] = branch
+
+        response = await self._request("GET", url, params=params)
+
+        if response.status_code == 404:
+            raise GitHubServiceError(f"Path not found: {path}")
+        elif response.status_code != 200:
+            raise GitHubServiceError(f"GitHub API error: {response.status_code} - {response.text}")
+
+        return response.json()
+
+    def _make_file(
+        self,
+        owner: str,
+        repo: str,
+        path: str,
+        sha: str,
+        size: int,
+        branch: str | None = None,
+        data: bytes | memoryview | None = None,
+        truncated: bool = False,
+    ) -> GitHubFile:
+        """
+        Build a GitHubFile backed by the blob store.
+
+        Cached content is loaded on access; truncated content (which is not
+        the real blob) and stores without a disk tier keep it on the instance.
+        """
+        url = f"{self.HTML_URL}/{owner}/{repo}/blob/{branch or 'HEAD'}/{path}"
+        name = path.rsplit("/", 1)[-1]
 
-            response = await client.get(url, headers=self.headers, params=params)
+        if truncated or self.blob_store.cache_dir is None:
+            if data is None:
+                data = self.blob_store.get(sha) or b""
+            content = str(data, "utf-8", errors="replace" if truncated else "strict")
+            return GitHubFile(path, name, content, sha, size, url, truncated=truncated)
 
+        return GitHubFile(path, name, None, sha, size, url, loader=lambda: self.blob_store.get(sha))
+
+    def _check_generated(self, path: str, data: bytes | memoryview) -> None:
+        """Raise GitHubFileSkipped for generated files (by path or header marker)."""
+        head = bytes(data[:1024])
+        if is_generated_path(path) or any(marker in head for marker in GENERATED_MARKERS):
+            raise GitHubFileSkipped(f"Skipping generated file: {path}")
+
+    async def _fetch_raw(
+        self,
+        url: str,
+        path: str,
+        params: dict | None = None,
+    ) -> tuple[bytes, bool]:
+        """
+        Stream a raw (non-base64) response into a bounded buffer.
+
+        Args:
+            url: API URL that supports the raw media type
+            path: File path (for error messages)
+            params: Query parameters
+
+        Returns:
+            Tuple of (content bytes, truncated flag)
+        """
+        headers = {**self.headers, "Accept": self.RAW_MEDIA_TYPE}
+        buffer = bytearray()
+        truncated = False
+
+        response = await self._request("GET", url, headers=headers, params=params, stream=True)
+        try:
             if response.status_code == 404:
-                raise GitHubServiceError(f"Path not found: {path}")
+                raise GitHubServiceError(f"File not found: {path}")
             elif response.status_code != 200:
+                await response.aread()
                 raise GitHubServiceError(
                     f"GitHub API error: {response.status_code} - {response.text}"
                 )
 
-            return response.json()
+            # Directories come back as a JSON listing even with the raw media type
+            if response.headers.get("content-type", "").startswith("application/json"):
+                raise GitHubServiceError(f"Path is not a file: {path}")
+
+            declared = int(response.headers.get("content-length") or 0)
+            if declared > self.max_file_bytes and self.oversize == "skip":
+                raise GitHubFileSkipped(
+                    f"Skipping {path}: {declared} bytes exceeds limit of {self.max_file_bytes}"
+                )
+
+            async for chunk in response.aiter_bytes():
+                remaining = self.max_file_bytes - len(buffer)
+                if len(chunk) > remaining:
+                    if self.oversize == "skip":
+                        raise GitHubFileSkipped(
+                            f"Skipping {path}: exceeds limit of {self.max_file_bytes} bytes"
+                        )
+                    buffer.extend(chunk[:remaining])
+                    truncated = True
+                    break
+                buffer.extend(chunk)
+        finally:
+            await response.aclose()
+            self._finish_request()
+
+        if truncated:
+            logger.info(f"Truncated {path} to {self.max_file_bytes} bytes")
+        return bytes(buffer), truncated
 
     async def get_file_content(
         self,
@@ -196,50 +582,254 @@ class GitHubService:
         repo: str,
         path: str,
         branch: str | None = None,
+        sha: str | None = None,
+        skip_generated: bool = False,
     ) -> GitHubFile:
         """
         Get the content of a file from the repository.
 
+        The file is fetched with the raw media type (no base64 inflation)
+        and streamed into a buffer bounded by max_file_bytes.
+
         Args:
             owner: Repository owner
             repo: Repository name
             path: Path to the file
             branch: Branch name (uses default branch if not specified)
+            sha: Known blob SHA (from a listing); skips the download if cached.
+                 Downloaded content is stored under its own SHA, so a stale
+                 listing SHA is not cached with the current content
+            skip_generated: Raise GitHubFileSkipped for generated files
+
+        Returns:
+            GitHubFile object with lazily loaded content
+        """
+        cached = self.blob_store.get(sha) if sha else None
+        if sha and cached is not None:
+            if skip_generated:
+                self._check_generated(path, cached)
+            return self._make_file(owner, repo, path, sha, len(cached), branch, data=cached)
+
+        if skip_generated and is_generated_path(path):
+            raise GitHubFileSkipped(f"Skipping generated file: {path}")
+
+        params = {"ref": branch} if branch else None
+        data, truncated = await self._fetch_raw(
+            f"{self.BASE_URL}/repos/{owner}/{repo}/contents/{path}", path, params
+        )
+        if skip_generated:
+            self._check_generated(path, data)
+
+        if truncated:
+            return self._make_file(
+                owner, repo, path, sha or "", len(data), branch, data=data, truncated=True
+            )
+
+        blob_sha = self.blob_store.put(data)
+        if sha and blob_sha != sha:
+            logger.warning(f"{path} at {branch or 'HEAD'} is blob {blob_sha}, not {sha}")
+        return self._make_file(owner, repo, path, blob_sha, len(data), branch, data=data)
+
+    async def _load_blob(self, owner: str, repo: str, sha: str) -> tuple[bytes | memoryview, bool]:
+        """Load blob bytes (cache first), returning (content, truncated flag)."""
+        cached = self.blob_store.get(sha)
+        if cached is not None:
+            return cached, False
+
+        data, truncated = await self._fetch_raw(
+            f"{self.BASE_URL}/repos/{owner}/{repo}/git/blobs/{sha}", sha
+        )
+        if not truncated:
+            try:
+                self.blob_store.put(data, sha=sha)
+            except ValueError as e:
+                logger.warning(f"Not caching blob from {owner}/{repo}: {e}")
+        return data, truncated
+
+    async def get_blob(self, owner: str, repo: str, sha: str) -> bytes | memoryview:
+        """
+        Get raw blob bytes by SHA (cache first, then the git blobs API).
+
+        Args:
+            owner: Repository owner
+            repo: Repository name
+            sha: Git blob SHA
+
+        Returns:
+            Raw blob content (truncated if it exceeds max_file_bytes; a
+            memoryview over the mapped file for large cached blobs)
+        """
+        data, _ = await self._load_blob(owner, repo, sha)
+        return data
+
+    async def get_tree(
+        self,
+        owner: str,
+        repo: str,
+        branch: str | None = None,
+    ) -> list[dict]:
+        """
+        List every file in the repository in one call (recursive git tree).
+
+        Each entry carries its blob SHA, so unchanged files can be served
+        from the blob cache without downloading them again.
+
+        Args:
+            owner: Repository owner
+            repo: Repository name
+            branch: Branch, tag or commit (uses HEAD if not specified)
+
+        Returns:
+            List of blob entries with path, sha and size
+        """
+        response = await self._request(
+            "GET",
+            f"{self.BASE_URL}/repos/{owner}/{repo}/git/trees/{branch or 'HEAD'}",
+            params={"recursive": "1"},
+        )
+
+        if response.status_code == 404:
+            raise GitHubServiceError(f"Tree not found: {branch or 'HEAD'}")
+        elif response.status_code != 200:
+            raise GitHubServiceError(f"GitHub API error: {response.status_code} - {response.text}")
+
+        data = response.json()
+        if data.get("truncated"):
+            logger.warning(f"Tree listing for {owner}/{repo} was truncated by GitHub")
+
+        return [item for item in data.get("tree", []) if item.get("type") == "blob"]
+
+    async def get_commit_sha(self, owner: str, repo: str, ref: str | None = None) -> str:
+        """
+        Resolve a branch, tag or commit to its full commit SHA.
+
+        Args:
+            owner: Repository owner
+            repo: Repository name
+            ref: Branch, tag or SHA (uses HEAD if not specified)
+
+        Returns:
+            40-character commit SHA
+        """
+        response = await self._request(
+            "GET",
+            f"{self.BASE_URL}/repos/{owner}/{repo}/commits/{ref or 'HEAD'}",
+            headers={**self.headers, "Accept": "application/vnd.github.sha"},
+        )
+
+        if response.status_code in (404, 422):
+            raise GitHubServiceError(f"Commit not found: {ref or 'HEAD'}")
+        elif response.status_code != 200:
+            raise GitHubServiceError(f"GitHub API error: {response.status_code} - {response.text}")
+
+        return response.text.strip()
+
+    async def compare_commits(
+        self,
+        owner: str,
+        repo: str,
+        base: str,
+        head: str,
+        extension: str | None = ".py",
+    ) -> list[dict]:
+        """
+        List files changed between two commits (compare API, paginated).
+
+        Args:
+            owner: Repository owner
+            repo: Repository name
+            base: Base commit SHA
+            head: Head commit SHA
+            extension: Only return files with this extension (None for all)
 
         Returns:
-            GitHubFile object with file content
+            List of changed file dicts (filename, status, sha, previous_filename)
         """
-        async with httpx.AsyncClient() as client:
-            url = f"{self.BASE_URL}/repos/{owner}/{repo}/contents/{path}"
-            params = {}
-            if branch:
-                params["ref"] = branch
+        url = f"{self.BASE_URL}/repos/{owner}/{repo}/compare/{base}...{head}"
+        files: list[dict] = []
+        page = 1
 
-            response = await client.get(url, headers=self.headers, params=params)
+        while True:
+            response = await self._request("GET", url, params={"per_page": 100, "page": page})
 
             if response.status_code == 404:
-                raise GitHubServiceError(f"File not found: {path}")
+                raise GitHubServiceError(f"Cannot compare {base[:7]}...{head[:7]}")
             elif response.status_code != 200:
                 raise GitHubServiceError(
                     f"GitHub API error: {response.status_code} - {response.text}"
                 )
 
-            data = response.json()
+            batch = response.json().get("files", [])
+            files.extend(batch)
+            if len(batch) < 100:
+                break
+            page += 1
+
+        if extension:
+            files = [
+                f
+                for f in files
+                if f["filename"].endswith(extension)
+                or (f.get("previous_filename") or "").endswith(extension)
+            ]
+        return files
 
-            if data.get("type") != "file":
-                raise GitHubServiceError(f"Path is not a file: {path}")
+    async def get_files_from_entries(
+        self,
+        owner: str,
+        repo: str,
+        entries: list[dict],
+        branch: str | None = None,
+        skip_generated: bool = True,
+    ) -> list[GitHubFile]:
+        """
+        Get contents for directory or tree entries that already carry SHAs.
 
-            # Decode base64 content
-            content = base64.b64decode(data["content"]).decode("utf-8")
+        Cached blobs are returned without any API call; only new or changed
+        files are downloaded. Oversized and generated files are filtered
+        using the listing metadata before anything is fetched.
 
-            return GitHubFile(
-                path=data["path"],
-                name=data["name"],
-                content=content,
-                sha=data["sha"],
-                size=data["size"],
-                url=data["html_url"],
-            )
+        Args:
+            owner: Repository owner
+            repo: Repository name
+            entries: Items from list_directory() or get_tree()
+            branch: Branch name (used for the file URL only)
+            skip_generated: Skip generated files (protobuf stubs, migrations, ...)
+
+        Returns:
+            List of GitHubFile objects
+        """
+        files = []
+        hits = 0
+        for entry in entries:
+            path, sha = entry["path"], entry["sha"]
+            size = entry.get("size") or 0
+
+            if skip_generated and is_generated_path(path):
+                logger.debug(f"Skipping generated file: {path}")
+                continue
+            if size > self.max_file_bytes and self.oversize == "skip":
+                logger.info(f"Skipping {path}: {size} bytes exceeds limit of {self.max_file_bytes}")
+                continue
+
+            try:
+                if self.blob_store.contains(sha):
+                    hits += 1
+                data, truncated = await self._load_blob(owner, repo, sha)
+                if skip_generated:
+                    self._check_generated(path, data)
+                files.append(
+                    self._make_file(
+                        owner, repo, path, sha, size or len(data), branch, data, truncated
+                    )
+                )
+            except GitHubFileSkipped as e:
+                logger.info(str(e))
+            except GitHubServiceError as e:
+                logger.warning(f"Failed to fetch {path}: {e}")
+
+        logger.debug(f"Blob cache: {hits}/{len(entries)} files served without download")
+        return files
 
     async def get_multiple_files(
         self,
@@ -247,6 +837,8 @@ class GitHubService:
         repo: str,
         paths: list[str],
         branch: str | None = None,
+        shas: dict[str, str] | None = None,
+        skip_generated: bool = True,
     ) -> list[GitHubFile]:
         """
         Get contents of multiple files.
@@ -256,15 +848,22 @@ class GitHubService:
             repo: Repository name
             paths: List of file paths
             branch: Branch name
+            shas: Optional mapping of path -> known blob SHA (enables cache hits)
+            skip_generated: Skip generated files (protobuf stubs, migrations, ...)
 
         Returns:
             List of GitHubFile objects
         """
+        shas = shas or {}
         files = []
         for path in paths:
             try:
-                file = await self.get_file_content(owner, repo, path, branch)
+                file = await self.get_file_content(
+                    owner, repo, path, branch, sha=shas.get(path), skip_generated=skip_generated
+                )
                 files.append(file)
+            except GitHubFileSkipped as e:
+                logger.info(str(e))
             except GitHubServiceError as e:
                 logger.warning(f"Failed to fetch {path}: {e}")
         return files
@@ -290,7 +889,34 @@ class GitHubService:
         Returns:
             List of Python file paths
         """
-        python_files = []
+        entries = await self.find_python_entries(owner, repo, path, branch, max_files)
+        return [entry["path"] for entry in entries]
+
+    async def find_python_entries(
+        self,
+        owner: str,
+        repo: str,
+        path: str = "",
+        branch: str | None = None,
+        max_files: int = 50,
+    ) -> list[dict]:
+        """
+        Recursively find all Python files, keeping the listing entries.
+
+        The entries include blob SHAs, so they can be passed straight to
+        get_files_from_entries() to skip downloads of unchanged files.
+
+        Args:
+            owner: Repository owner
+            repo: Repository name
+            path: Starting path (empty for root)
+            branch: Branch name
+            max_files: Maximum number of files to return
+
+        Returns:
+            List of directory entries (path, name, sha, size, ...)
+        """
+        python_files: list[dict] = []
 
         async def _scan_directory(dir_path: str):
             if len(python_files) >= max_files:
@@ -304,22 +930,10 @@ class GitHubService:
                         break
 
                     if item["type"] == "file" and item["name"].endswith(".py"):
-                        python_files.append(item["path"])
+                        python_files.append(item)
                     elif item["type"] == "dir":
                         # Skip common non-source directories
-                        if item["name"] not in {
-                            "__pycache__",
-                            ".git",
-                            "node_modules",
-                            "venv",
-                            ".venv",
-                            "env",
-                            ".env",
-                            "dist",
-                            "build",
-                            ".tox",
-                            ".pytest_cache",
-                        }:
+                        if item["name"] not in SKIP_DIRECTORIES:
                             await _scan_directory(item["path"])
             except GitHubServiceError:
                 pass  # Skip directories we can't access
@@ -334,6 +948,7 @@ class GitHubService:
         query: str,
         extension: str = "py",
         max_results: int = 10,
+        commit_sha: str | None = None,
     ) -> list[dict]:
         """
         Search for code in the repository using GitHub code search.
@@ -346,45 +961,464 @@ class GitHubService:
             query: Search query
             extension: File extension to filter by
             max_results: Maximum number of results
+            commit_sha: Commit the results are valid for (part of the cache key)
 
         Returns:
             List of search result items
         """
-        async with httpx.AsyncClient() as client:
-            search_query = f"{query} repo:{owner}/{repo} extension:{extension}"
-            url = f"{self.BASE_URL}/search/code"
-            params = {"q": search_query, "per_page": min(max_results, 100)}
+        return [
+            item
+            async for item in self.iter_search_code(
+                owner, repo, query, extension, max_results, commit_sha
+            )
+        ]
+
+    async def iter_search_code(
+        self,
+        owner: str,
+        repo: str,
+        query: str,
+        extension: str = "py",
+        max_results: int = 100,
+        commit_sha: str | None = None,
+    ) -> AsyncIterator[dict]:
+        """
+        Lazily page through code search results.
 
-            response = await client.get(url, headers=self.headers, params=params)
+        Pages are only requested as the caller consumes results, hits are
+        de-duplicated by (path, sha), and requests are paced by the search
+        API's own rate limit. Results are cached per query and commit SHA
+        for SEARCH_CACHE_TTL seconds, so repeated lookups are nearly free.
 
-            if response.status_code == 403:
-                raise GitHubServiceError(
-                    "GitHub code search requires authentication. Please provide a token."
+        Args:
+            owner: Repository owner
+            repo: Repository name
+            query: Search query
+            extension: File extension to filter by
+            max_results: Maximum number of results (GitHub caps search at 1000)
+            commit_sha: Commit the results are valid for (part of the cache key)
+
+        Yields:
+            Search result items
+        """
+        search_query = f"{query} repo:{owner}/{repo} extension:{extension}"
+        key = (search_query, commit_sha)
+        max_results = min(max_results, 1000)
+
+        entry = self._search_cache.get(key)
+        if entry is not None and entry.expires_at > time.monotonic():
+            self._search_cache.move_to_end(key)
+            if entry.complete or len(entry.items) >= max_results:
+                for item in entry.items[:max_results]:
+                    yield item
+                return
+
+        items: list[dict] = []
+        seen: set[tuple[str, str]] = set()
+        complete = False
+        per_page = min(max(max_results, 1), 100)
+        page = 1
+
+        try:
+            while len(items) < max_results:
+                response = await self._request(
+                    "GET",
+                    f"{self.BASE_URL}/search/code",
+                    resource="search",
+                    params={"q": search_query, "per_page": per_page, "page": page},
+                )
+
+                if response.status_code == 403:
+                    raise GitHubServiceError(
+                        "GitHub code search requires authentication. Please provide a token."
+                    )
+                elif response.status_code != 200:
+                    raise GitHubServiceError(
+                        f"GitHub API error: {response.status_code} - {response.text}"
+                    )
+
+                batch = response.json().get("items", [])
+                for item in batch:
+                    identity = (item.get("path", ""), item.get("sha", ""))
+                    if identity in seen:
+                        continue
+                    seen.add(identity)
+                    items.append(item)
+                    yield item
+                    if len(items) >= max_results:
+                        break
+
+                if len(batch) < per_page or page * per_page >= 1000:
+                    complete = True
+                    break
+                page += 1
+        finally:
+            # Cache whatever was fetched, even if the caller stopped early
+            if items:
+                self._search_cache[key] = _SearchCacheEntry(
+                    items=items,
+                    complete=complete,
+                    expires_at=time.monotonic() + SEARCH_CACHE_TTL,
                 )
+                self._search_cache.move_to_end(key)
+                while len(self._search_cache) > SEARCH_CACHE_SIZE:
+                    self._search_cache.popitem(last=False)
+
+    async def graphql(self, query: str, variables: dict) -> dict:
+        """
+        Run a GraphQL query.
+
+        Args:
+            query: GraphQL query document
+            variables: Query variables
+
+        Returns:
+            The `data` object of the response
+
+        Raises:
+            GitHubServiceError: If the request fails or returns errors
+        """
+        if not self.token:
+            raise GitHubServiceError(
+                "The GitHub GraphQL API requires authentication. Please provide a token."
+            )
+
+        response = await self._request(
+            "POST",
+            self.GRAPHQL_URL,
+            resource="graphql",
+            json={"query": query, "variables": variables},
+        )
+        if response.status_code != 200:
+            raise GitHubServiceError(f"GitHub API error: {response.status_code} - {response.text}")
+
+        payload = response.json()
+        if payload.get("errors"):
+            messages = "; ".join(e.get("message", "unknown error") for e in payload["errors"])
+            raise GitHubServiceError(f"GitHub GraphQL error: {messages}")
+        return payload["data"]
+
+    async def iter_issues(
+        self,
+        owner: str,
+        repo: str,
+        labels: list[str] | None = None,
+        milestone: str | None = None,
+        state: Literal["open", "closed", "all"] = "open",
+        max_issues: int = 100,
+        max_comments: int = 20,
+    ) -> AsyncIterator[GitHubIssue]:
+        """
+        Lazily page through a repository's issues with their comments.
+
+        Each page of issues, including their labels, milestone and first
+        comments, is a single GraphQL query. Pull requests are not included.
+
+        Args:
+            owner: Repository owner
+            repo: Repository name
+            labels: Only issues with any of these labels
+            milestone: Only issues in this milestone (number, or "none")
+            state: Issue state to include
+            max_issues: Maximum number of issues
+            max_comments: Comments fetched per issue (0 for none)
+
+        Yields:
+            GitHubIssue objects, most recently updated first
+        """
+        states = {"open": ["OPEN"], "closed": ["CLOSED"], "all": ["OPEN", "CLOSED"]}[state]
+        variables = {
+            "owner": owner,
+            "repo": repo,
+            "states": states,
+            "labels": labels or None,
+            "filterBy": {"milestoneNumber": milestone} if milestone else None,
+            "comments": max_comments,
+            "after": None,
+        }
+        fetched = 0
+
+        while fetched < max_issues:
+            variables["first"] = min(max_issues - fetched, 100)
+            data = await self.graphql(ISSUES_QUERY, variables)
+            if data.get("repository") is None:
+                raise GitHubServiceError(f"Repository not found: {owner}/{repo}")
+
+            connection = data["repository"]["issues"]
+            for node in connection["nodes"]:
+                fetched += 1
+                yield GitHubIssue(
+                    number=node["number"],
+                    title=node["title"],
+                    body=node.get("body") or "",
+                    url=node["url"],
+                    updated_at=node["updatedAt"],
+                    labels=[label["name"] for label in node["labels"]["nodes"]],
+                    milestone=(node.get("milestone") or {}).get("title"),
+                    comments=[c["body"] for c in node["comments"]["nodes"] if c.get("body")],
+                )
+
+            page_info = connection["pageInfo"]
+            if not page_info["hasNextPage"] or not connection["nodes"]:
+                break
+            variables["after"] = page_info["endCursor"]
+
+    async def get_issues(
+        self,
+        owner: str,
+        repo: str,
+        labels: list[str] | None = None,
+        milestones: list[str] | None = None,
+        state: Literal["open", "closed", "all"] = "open",
+        max_issues: int = 100,
+        max_comments: int = 20,
+    ) -> list[GitHubIssue]:
+        """
+        Get issues matching labels and (any of several) milestones.
+
+        GraphQL filters one milestone per query, so each milestone is listed
+        separately and the results are merged by issue number.
+
+        Args:
+            owner: Repository owner
+            repo: Repository name
+            labels: Only issues with any of these labels
+            milestones: Only issues in any of these milestones (numbers)
+            state: Issue state to include
+            max_issues: Maximum number of issues
+            max_comments: Comments fetched per issue
+
+        Returns:
+            List of GitHubIssue objects (at most max_issues)
+        """
+        issues: dict[int, GitHubIssue] = {}
+        for milestone in milestones or [None]:
+            async for issue in self.iter_issues(
+                owner, repo, labels, milestone, state, max_issues - len(issues), max_comments
+            ):
+                issues.setdefault(issue.number, issue)
+            if len(issues) >= max_issues:
+                break
+        return list(issues.values())
+
+    async def find_issue(self, owner: str, repo: str, text: str) -> dict | None:
+        """
+        Find an issue (open or closed) whose body contains the exact text.
+
+        Args:
+            owner: Repository owner
+            repo: Repository name
+            text: Text to search for (e.g. a hidden marker)
+
+        Returns:
+            The first matching issue item, or None
+        """
+        response = await self._request(
+            "GET",
+            f"{self.BASE_URL}/search/issues",
+            resource="search",
+            params={"q": f'repo:{owner}/{repo} is:issue in:body "{text}"', "per_page": 1},
+        )
+        if response.status_code != 200:
+            raise GitHubServiceError(f"GitHub API error: {response.status_code} - {response.text}")
+
+        items = response.json().get("items", [])
+        return items[0] if items else None
+
+    async def create_issue(
+        self,
+        owner: str,
+        repo: str,
+        title: str,
+        body: str,
+        labels: list[str] | None = None,
+    ) -> dict:
+        """
+        Create an issue.
+
+        Args:
+            owner: Repository owner
+            repo: Repository name
+            title: Issue title
+            body: Issue body (Markdown)
+            labels: Labels to apply (must exist or be creatable by the token)
+
+        Returns:
+            The created issue (number, html_url, ...)
+        """
+        if not self.token:
+            raise GitHubServiceError("Creating issues requires a GitHub token.")
+
+        response = await self._request(
+            "POST",
+            f"{self.BASE_URL}/repos/{owner}/{repo}/issues",
+            json={"title": title, "body": body, "labels": labels or []},
+        )
+        if response.status_code == 404:
+            raise GitHubServiceError(f"Repository not found: {owner}/{repo}")
+        elif response.status_code == 403:
+            raise GitHubServiceError(f"Access denied creating issues in {owner}/{repo}")
+        elif response.status_code != 201:
+            raise GitHubServiceError(f"GitHub API error: {response.status_code} - {response.text}")
+        return response.json()
+
+    async def get_pull_request(self, owner: str, repo: str, number: int) -> PullRequest:
+        """
+        Get pull request metadata.
+
+        Args:
+            owner: Repository owner
+            repo: Repository name
+            number: Pull request number
+
+        Returns:
+            PullRequest
+        """
+        response = await self._request(
+            "GET", f"{self.BASE_URL}/repos/{owner}/{repo}/pulls/{number}"
+        )
+        if response.status_code == 404:
+            raise GitHubServiceError(f"Pull request not found: {owner}/{repo}#{number}")
+        elif response.status_code != 200:
+            raise GitHubServiceError(f"GitHub API error: {response.status_code} - {response.text}")
+
+        data = response.json()
+        return PullRequest(
+            number=data["number"],
+            title=data["title"],
+            body=data.get("body") or "",
+            url=data["html_url"],
+            state=data["state"],
+            head_sha=data["head"]["sha"],
+            base_sha=data["base"]["sha"],
+            changed_files=data.get("changed_files", 0),
+        )
+
+    async def get_pull_request_files(
+        self,
+        owner: str,
+        repo: str,
+        number: int,
+        max_files: int = 3000,
+    ) -> list[dict]:
+        """
+        List the files changed in a pull request, with their patches (paginated).
+
+        GitHub omits `patch` for binary files and very large diffs, and
+        returns at most 3000 files per pull request.
+
+        Args:
+            owner: Repository owner
+            repo: Repository name
+            number: Pull request number
+            max_files: Stop after this many files
+
+        Returns:
+            List of file dicts (filename, status, sha, patch, previous_filename)
+        """
+        url = f"{self.BASE_URL}/repos/{owner}/{repo}/pulls/{number}/files"
+        files: list[dict] = []
+        page = 1
+
+        while len(files) < max_files:
+            response = await self._request("GET", url, params={"per_page": 100, "page": page})
+
+            if response.status_code == 404:
+                raise GitHubServiceError(f"Pull request not found: {owner}/{repo}#{number}")
             elif response.status_code != 200:
                 raise GitHubServiceError(
                     f"GitHub API error: {response.status_code} - {response.text}"
                 )
 
-            data = response.json()
-            return data.get("items", [])[:max_results]
+            batch = response.json()
+            files.extend(batch)
+            if len(batch) < 100:
+                break
+            page += 1
+
+        return files[:max_files]
+
+
+class GitHubServicePool:
+    """
+    Bounded pool of GitHubService instances keyed by a hash of the token.
+
+    Each token keeps a warm instance (connection pool, rate limit budget,
+    caches) across requests; the least recently used instance is retired
+    when the pool is full. Cached file contents are isolated the same way:
+    each instance uses the token's namespace of the blob store. Raw tokens
+    are never used as keys.
+    """
+
+    def __init__(self, max_size: int = GITHUB_SERVICE_POOL_SIZE):
+        """
+        Initialize the pool.
 
+        Args:
+            max_size: Maximum number of live service instances
+        """
+        self.max_size = max_size
+        self._services: OrderedDict[str, GitHubService] = OrderedDict()
 
-# Singleton instance
-_github_service: GitHubService | None = None
+    @staticmethod
+    def key_for(token: str | None) -> str:
+        """Pool key for a token (anonymous access shares one instance)."""
+        if not token:
+            return "anonymous"
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token: str | None = None) -> GitHubService:
+        """Get the instance for a token, creating it if needed."""
+        key = self.key_for(token)
+        service = self._services.get(key)
+        if service is not None:
+            self._services.move_to_end(key)
+            return service
+
+        service = GitHubService(token)
+        self._services[key] = service
+        while len(self._services) > self.max_size:
+            _, evicted = self._services.popitem(last=False)
+            evicted.retire()
+        return service
+
+    def __len__(self) -> int:
+        return len(self._services)
+
+    async def aclose(self) -> None:
+        """Close every pooled instance."""
+        services = list(self._services.values())
+        self._services.clear()
+        for service in services:
+            await service.aclose()
+
+
+# Singleton pool
+_github_service_pool: GitHubServicePool | None = None
+
+
+def get_github_service_pool() -> GitHubServicePool:
+    """Get or create the shared GitHub service pool."""
+    global _github_service_pool
+    if _github_service_pool is None:
+        _github_service_pool = GitHubServicePool()
+    return _github_service_pool
 
 
 def get_github_service(token: str | None = None) -> GitHubService:
     """
-    Get or create the GitHub service instance.
+    Get the GitHub service instance for a token.
 
     Args:
         token: Optional GitHub token
 
     Returns:
-        GitHubService instance
+        GitHubService instance (shared by all requests using the same token)
     """
-    global _github_service
-    if _github_service is None or token:
-        _github_service = GitHubService(token)
-    return _github_service
+    return get_github_service_pool().get(token)
+
+
+async def close_github_services() -> None:
+    """Close all pooled GitHub service instances (call on shutdown)."""
+    if _github_service_pool is not None:
+        await _github_service_pool.aclose()
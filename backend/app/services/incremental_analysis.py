@@ -0,0 +1,301 @@
+"""
+Incremental Repository Analysis
+===============================
+Re-analyze a repository in proportion to what changed since the last run.
+
+The first run fetches every Python file. Afterwards the last analyzed commit
+is recorded per repository and scope (ref, directory and file limit, since
+a run only sees the files in its scope), and later runs with the same scope
+use the compare API to fetch only the Python files changed since then. Within those files, only functions and
+classes whose AST changed are regenerated; everything else reuses the stored
+artifacts. Artifacts are keyed by path and AST fingerprint, since an artifact
+such as a test module imports the unit from its own file.
+
+Used by POST /api/v1/pytest/generate-from-repository.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from app.services.code_units import CodeUnit, extract_units
+from app.services.github_service import GitHubService, GitHubServiceError
+
+logger = logging.getLogger("ai_sdlc_copilot")
+
+DEFAULT_STATE_DIR = os.getenv("ANALYSIS_STATE_DIR", ".cache/analysis")
+
+# Generates an artifact (e.g. pytest code) for one unit of a file
+UnitGenerator = Callable[[str, CodeUnit], Awaitable[str]]
+
+
+@dataclass
+class RepoAnalysisState:
+    """What was analyzed for a repository, and at which commit."""
+
+    commit_sha: str
+    # path -> {unit name -> AST fingerprint}
+    units: dict[str, dict[str, str]] = field(default_factory=dict)
+    # artifact_key(path, AST fingerprint) -> generated artifact
+    artifacts: dict[str, str] = field(default_factory=dict)
+
+
+def artifact_key(path: str, fingerprint: str) -> str:
+    """Key of the artifact for a unit of a file."""
+    return f"{path}:{fingerprint}"
+
+
+def analysis_scope(ref: str | None, path: str, max_files: int) -> str:
+    """Short hash of the settings that decide which files a run sees."""
+    canonical = json.dumps([ref, path.strip("/"), max_files])
+    return hashlib.sha256(canonical.encode()).hexdigest()[:16]
+
+
+@dataclass
+class UnitResult:
+    """Artifact for a single function or class."""
+
+    path: str
+    name: str
+    fingerprint: str
+    artifact: str
+    reused: bool
+
+
+@dataclass
+class AnalysisResult:
+    """Outcome of an (incremental) repository analysis."""
+
+    owner: str
+    repo: str
+    head_sha: str
+    base_sha: str | None
+    files_fetched: int
+    units_generated: int
+    units_reused: int
+    removed_paths: list[str] = field(default_factory=list)
+    results: list[UnitResult] = field(default_factory=list)
+
+
+class AnalysisStateStore:
+    """JSON-file store of RepoAnalysisState, one file per repository and scope."""
+
+    def __init__(self, state_dir: str | Path = DEFAULT_STATE_DIR):
+        self.state_dir = Path(state_dir)
+
+    def _path(self, owner: str, repo: str, scope: str) -> Path:
+        return self.state_dir / f"{owner}__{repo}__{scope}.json"
+
+    def load(self, owner: str, repo: str, scope: str) -> RepoAnalysisState | None:
+        """Load the state for a repository and scope (None if never analyzed)."""
+        path = self._path(owner, repo, scope)
+        try:
+            return RepoAnalysisState(**json.loads(path.read_text(encoding="utf-8")))
+        except FileNotFoundError:
+            return None
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable analysis state {path}: {e}")
+            return None
+
+    def save(self, owner: str, repo: str, scope: str, state: RepoAnalysisState) -> None:
+        """Persist the state for a repository and scope atomically."""
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self.state_dir, prefix=".tmp-")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(asdict(state), f)
+        os.replace(tmp_name, self._path(owner, repo, scope))
+
+
+class IncrementalAnalyzer:
+    """
+    Runs per-unit generation over a repository, reusing prior results.
+
+    Example:
+        analyzer = IncrementalAnalyzer(get_github_service(token))
+        result = await analyzer.analyze("octo", "repo", generate=generate_tests)
+    """
+
+    def __init__(
+        self,
+        service: GitHubService,
+        store: AnalysisStateStore | None = None,
+        max_concurrency: int = 4,
+    ):
+        """
+        Initialize the analyzer.
+
+        Args:
+            service: GitHub service used to fetch commits and files
+            store: Where analysis state is kept (shared store if not specified)
+            max_concurrency: Maximum units generated at once
+        """
+        self.service = service
+        self.store = store or get_analysis_state_store()
+        self.max_concurrency = max_concurrency
+
+    async def _changed_entries(
+        self,
+        owner: str,
+        repo: str,
+        base: str,
+        head: str,
+    ) -> tuple[list[dict], list[str]] | None:
+        """Get (entries to fetch, removed paths) from the compare API, or None to rescan."""
+        try:
+            changed = await self.service.compare_commits(owner, repo, base, head)
+        except GitHubServiceError as e:
+            # e.g. the base commit disappeared after a force-push
+            logger.warning(f"Compare failed for {owner}/{repo}, running full analysis: {e}")
+            return None
+
+        entries, removed = [], []
+        for item in changed:
+            if item.get("previous_filename"):
+                removed.append(item["previous_filename"])
+            if item["status"] == "removed":
+                removed.append(item["filename"])
+            elif item["filename"].endswith(".py"):
+                entries.append({"path": item["filename"], "sha": item["sha"]})
+        return entries, removed
+
+    async def analyze(
+        self,
+        owner: str,
+        repo: str,
+        generate: UnitGenerator,
+        ref: str | None = None,
+        path: str = "",
+        max_files: int = 50,
+    ) -> AnalysisResult:
+        """
+        Analyze a repository, regenerating only changed units.
+
+        Args:
+            owner: Repository owner
+            repo: Repository name
+            generate: Coroutine producing the artifact for a (path, unit)
+            ref: Branch, tag or commit to analyze (default branch if not specified)
+            path: Only analyze files under this directory
+            max_files: File limit for a full (first) analysis
+
+        Runs with a different ref, path or max_files do not share state, so
+        each scope starts with a full analysis of its own files.
+
+        Returns:
+            AnalysisResult with per-unit artifacts
+        """
+        scope = analysis_scope(ref, path, max_files)
+        head = await self.service.get_commit_sha(owner, repo, ref)
+        previous = self.store.load(owner, repo, scope)
+        base = previous.commit_sha if previous else None
+
+        units = dict(previous.units) if previous else {}
+        artifacts = previous.artifacts if previous else {}
+        removed: list[str] = []
+
+        if previous and previous.commit_sha == head:
+            entries: list[dict] = []
+        else:
+            changes = None
+            if previous:
+                changes = await self._changed_entries(owner, repo, previous.commit_sha, head)
+            if changes is None:
+                base = None
+                units = {}
+                entries = await self.service.find_python_entries(owner, repo, path, head, max_files)
+            else:
+                entries, removed = changes
+
+        prefix = path.rstrip("/") + "/" if path else ""
+        entries = [e for e in entries if e["path"].startswith(prefix)]
+        for removed_path in removed:
+            units.pop(removed_path, None)
+
+        files = await self.service.get_files_from_entries(owner, repo, entries, head)
+
+        # Work out which units need generating
+        pending: dict[str, tuple[str, CodeUnit]] = {}
+        for file in files:
+            try:
+                file_units = extract_units(file.content)
+            except (SyntaxError, UnicodeDecodeError) as e:
+                logger.warning(f"Skipping {file.path}: {e}")
+                units.pop(file.path, None)
+                continue
+            units[file.path] = {unit.name: unit.fingerprint for unit in file_units}
+            for unit in file_units:
+                key = artifact_key(file.path, unit.fingerprint)
+                if key not in artifacts:
+                    pending[key] = (file.path, unit)
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def _generate(file_path: str, unit: CodeUnit) -> tuple[str, str]:
+            async with semaphore:
+                return artifact_key(file_path, unit.fingerprint), await generate(file_path, unit)
+
+        generated = dict(await asyncio.gather(*(_generate(p, u) for p, u in pending.values())))
+        new_artifacts = {**artifacts, **generated}
+
+        results = [
+            UnitResult(
+                path=file_path,
+                name=name,
+                fingerprint=fingerprint,
+                artifact=new_artifacts[artifact_key(file_path, fingerprint)],
+                reused=artifact_key(file_path, fingerprint) not in generated,
+            )
+            for file_path, file_units in sorted(units.items())
+            for name, fingerprint in file_units.items()
+            if artifact_key(file_path, fingerprint) in new_artifacts
+        ]
+
+        reused = sum(1 for r in results if r.reused)
+
+        # Keep only artifacts still referenced at this commit
+        live = {artifact_key(r.path, r.fingerprint) for r in results}
+        self.store.save(
+            owner,
+            repo,
+            scope,
+            RepoAnalysisState(
+                commit_sha=head,
+                units=units,
+                artifacts={k: v for k, v in new_artifacts.items() if k in live},
+            ),
+        )
+
+        logger.info(
+            f"Analyzed {owner}/{repo}@{head[:7]}: fetched {len(files)} files, "
+            f"generated {len(generated)} units, reused {reused}"
+        )
+
+        return AnalysisResult(
+            owner=owner,
+            repo=repo,
+            head_sha=head,
+            base_sha=base,
+            files_fetched=len(files),
+            units_generated=len(generated),
+            units_reused=reused,
+            removed_paths=removed,
+            results=results,
+        )
+
+
+# Singleton instance
+_analysis_state_store: AnalysisStateStore | None = None
+
+
+def get_analysis_state_store() -> AnalysisStateStore:
+    """Get or create the shared analysis state store."""
+    global _analysis_state_store
+    if _analysis_state_store is None:
+        _analysis_state_store = AnalysisStateStore()
+    return _analysis_state_store
@@ -5,13 +5,137 @@ Primary: Groq (free tier, fast)
 Fallback: Google Gemini (free tier)
 """
 
+import asyncio
 import logging
 import os
+import time
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
 
 import google.generativeai as genai
 
 logger = logging.getLogger("ai_sdlc_copilot")
 
+# Client-side limits on LLM calls, so fan-out requests stay inside free tier quotas
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+GROQ_REQUESTS_PER_MINUTE = int(os.getenv("GROQ_REQUESTS_PER_MINUTE", "30"))
+GEMINI_REQUESTS_PER_MINUTE = int(os.getenv("GEMINI_REQUESTS_PER_MINUTE", "15"))
+
+GROQ_MODEL = "llama-3.3-70b-versatile"
+GEMINI_MODEL = "gemini-2.0-flash"
+
+
+@dataclass
+class LLMResult:
+    """Generated text with the provider, model, latency and token usage of the call."""
+
+    text: str
+    provider: str
+    model: str
+    latency_ms: float
+    prompt_tokens: int | None = None
+    completion_tokens: int | None = None
+
+
+@dataclass
+class LLMUsage:
+    """LLM calls made while tracking was active (see track_llm_usage())."""
+
+    calls: list[LLMResult] = field(default_factory=list)
+
+    @property
+    def providers(self) -> list[str]:
+        return list(dict.fromkeys(c.provider for c in self.calls))
+
+    @property
+    def models(self) -> list[str]:
+        return list(dict.fromkeys(c.model for c in self.calls))
+
+    @property
+    def latency_ms(self) -> float:
+        """Summed latency of the calls (concurrent calls overlap in wall time)."""
+        return round(sum(c.latency_ms for c in self.calls), 1)
+
+    @property
+    def prompt_tokens(self) -> int:
+        return sum(c.prompt_tokens or 0 for c in self.calls)
+
+    @property
+    def completion_tokens(self) -> int:
+        return sum(c.completion_tokens or 0 for c in self.calls)
+
+    def summary(self) -> dict:
+        """Usage as a JSON-serializable dict."""
+        return {
+            "llm_calls": len(self.calls),
+            "providers": self.providers,
+            "models": self.models,
+            "latency_ms": self.latency_ms,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+        }
+
+
+_usage: ContextVar[LLMUsage | None] = ContextVar("llm_usage", default=None)
+
+
+@contextmanager
+def track_llm_usage(usage: LLMUsage | None = None) -> Iterator[LLMUsage]:
+    """
+    Record the LLM calls made in this context, including concurrent tasks it starts.
+
+    Pass an existing LLMUsage to keep adding to it.
+
+    Example:
+        with track_llm_usage() as usage:
+            await llm.generate(prompt)
+        usage.prompt_tokens
+    """
+    usage = usage if usage is not None else LLMUsage()
+    token = _usage.set(usage)
+    try:
+        yield usage
+    finally:
+        _usage.reset(token)
+
+
+class LLMRateLimiter:
+    """
+    Caps concurrent calls to a provider and spaces their start times.
+
+    Example:
+        limiter = LLMRateLimiter(max_concurrency=4, requests_per_minute=30)
+        async with limiter.slot():
+            ...
+    """
+
+    def __init__(self, max_concurrency: int, requests_per_minute: int):
+        """
+        Initialize the limiter.
+
+        Args:
+            max_concurrency: Maximum calls in flight at once
+            requests_per_minute: Maximum calls started per minute (0 for no limit)
+        """
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._interval = 60 / requests_per_minute if requests_per_minute > 0 else 0.0
+        self._next_start = 0.0
+        self._clock = time.monotonic
+        self._sleep = asyncio.sleep
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Wait for a free slot and the next start time in the per-minute budget."""
+        async with self._semaphore:
+            now = self._clock()
+            start = max(now, self._next_start)
+            self._next_start = start + self._interval
+            if start > now:
+                await self._sleep(start - now)
+            yield
+
 
 class LLMService:
     """Service for interacting with LLM providers."""
@@ -21,6 +145,10 @@ class LLMService:
         self.groq_key = os.getenv("GROQ_API_KEY")
         self._gemini_model = None
         self._groq_client = None
+        self._limiters = {
+            "groq": LLMRateLimiter(LLM_MAX_CONCURRENCY, GROQ_REQUESTS_PER_MINUTE),
+            "gemini": LLMRateLimiter(LLM_MAX_CONCURRENCY, GEMINI_REQUESTS_PER_MINUTE),
+        }
 
         if self.groq_key:
             from groq import Groq
@@ -32,7 +160,7 @@ class LLMService:
 
         if self.gemini_key:
             genai.configure(api_key=self.gemini_key)
-            self._gemini_model = genai.GenerativeModel("gemini-2.0-flash")
+            self._gemini_model = genai.GenerativeModel(GEMINI_MODEL)
             logger.info("✅ Gemini configured (fallback ready)")
         else:
             logger.warning("⚠️ GEMINI_API_KEY not set (no fallback)")
@@ -47,7 +175,38 @@ class LLMService:
         """
         Generate text using available LLM.
         Tries Groq first (fast), falls back to Gemini if configured.
+
+        Calls are rate limited per provider and run in worker threads, so
+        concurrent callers (e.g. per-function generation) overlap.
+        """
+        result = await self.generate_with_metadata(prompt, system_prompt, max_tokens, temperature)
+        return result.text
+
+    async def generate_with_metadata(
+        self,
+        prompt: str,
+        system_prompt: str | None = None,
+        max_tokens: int = 2048,
+        temperature: float = 0.7,
+    ) -> LLMResult:
         """
+        Generate text like generate(), returning the provider, model, latency and tokens.
+
+        The result is also recorded in the active track_llm_usage() context.
+        """
+        result = await self._generate(prompt, system_prompt, max_tokens, temperature)
+        usage = _usage.get()
+        if usage is not None:
+            usage.calls.append(result)
+        return result
+
+    async def _generate(
+        self,
+        prompt: str,
+        system_prompt: str | None,
+        max_tokens: int,
+        temperature: float,
+    ) -> LLMResult:
         # Try Groq first (primary)
         if self._groq_client:
             try:
@@ -74,20 +233,31 @@ class LLMService:
         system_prompt: str | None,
         max_tokens: int,
         temperature: float = 0.7,
-    ) -> str:
+    ) -> LLMResult:
         """Generate using Google Gemini."""
         full_prompt = prompt
         if system_prompt:
             full_prompt = f"{system_prompt}\n\n{prompt}"
 
-        response = self._gemini_model.generate_content(
-            full_prompt,
-            generation_config=genai.types.GenerationConfig(
-                max_output_tokens=max_tokens,
-                temperature=temperature,
-            ),
+        async with self._limiters["gemini"].slot():
+            started = time.perf_counter()
+            response = await asyncio.to_thread(
+                self._gemini_model.generate_content,
+                full_prompt,
+                generation_config=genai.types.GenerationConfig(
+                    max_output_tokens=max_tokens,
+                    temperature=temperature,
+                ),
+            )
+        usage = getattr(response, "usage_metadata", None)
+        return LLMResult(
+            text=response.text,
+            provider="gemini",
+            model=GEMINI_MODEL,
+            latency_ms=round((time.perf_counter() - started) * 1000, 1),
+            prompt_tokens=getattr(usage, "prompt_token_count", None),
+            completion_tokens=getattr(usage, "candidates_token_count", None),
         )
-        return response.text
 
     async def _generate_groq(
         self,
@@ -95,20 +265,31 @@ class LLMService:
         system_prompt: str | None,
         max_tokens: int,
         temperature: float = 0.7,
-    ) -> str:
+    ) -> LLMResult:
         """Generate using Groq (Llama 3.3)."""
         messages = []
         if system_prompt:
             messages.append({"role": "system", "content": system_prompt})
         messages.append({"role": "user", "content": prompt})
 
-        response = self._groq_client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=messages,
-            max_tokens=max_tokens,
-            temperature=temperature,
+        async with self._limiters["groq"].slot():
+            started = time.perf_counter()
+            response = await asyncio.to_thread(
+                self._groq_client.chat.completions.create,
+                model=GROQ_MODEL,
+                messages=messages,
+                max_tokens=max_tokens,
+                temperature=temperature,
+            )
+        usage = getattr(response, "usage", None)
+        return LLMResult(
+            text=response.choices[0].message.content,
+            provider="groq",
+            model=GROQ_MODEL,
+            latency_ms=round((time.perf_counter() - started) * 1000, 1),
+            prompt_tokens=getattr(usage, "prompt_tokens", None),
+            completion_tokens=getattr(usage, "completion_tokens", None),
         )
-        return response.choices[0].message.content
 
 
 # Singleton instance
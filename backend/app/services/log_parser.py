@@ -0,0 +1,227 @@
+"""
+CI Log Parser
+=============
+Extract failures from CI logs without loading them into memory.
+
+Logs are memory-mapped and scanned once with a single precompiled pattern
+that matches every failure signal at the same time (pytest FAILED/ERROR
+lines, tracebacks, `E` assertion lines, non-zero exit codes and the pytest
+summary). The pattern starts with a literal newline, which lets the regex
+engine skip ahead to line starts instead of trying every byte. Around each hit a window of lines, bounded in bytes, is cut out;
+overlapping windows are merged. Only these excerpts are sent to the LLM, so
+a multi-hundred-MB log costs one sequential scan and a few KB of prompt.
+"""
+
+import logging
+import mmap
+import os
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+
+logger = logging.getLogger("ai_sdlc_copilot")
+
+# Bounds on what is extracted from a log (override via environment)
+LOG_CONTEXT_LINES = int(os.getenv("LOG_CONTEXT_LINES", "10"))
+LOG_MAX_EXCERPTS = int(os.getenv("LOG_MAX_EXCERPTS", "20"))
+LOG_MAX_EXCERPT_BYTES = int(os.getenv("LOG_MAX_EXCERPT_BYTES", "4096"))
+
+# GitHub Actions prefixes each line with an ISO timestamp
+_LINE_PREFIX = rb"\n(?:\d{4}-\d\d-\d\dT[\d:.]+Z )?"
+
+# One alternation per failure signal; the group name is the match kind
+FAILURE_PATTERN = re.compile(
+    _LINE_PREFIX
+    + rb"(?:"
+    + rb"(?:FAILED|ERROR) (?P<test>[\w/.\-\[\]]+\.py::\S+)"
+    + rb"|(?P<traceback>Traceback \(most recent call last\):)"
+    + rb"|E +(?P<assertion>(?:AssertionError|assert )[^\r\n]*)"
+    + rb"|(?P<summary>=+ [^\r\n]*\b\d+ (?:failed|errors?)\b[^\r\n]*=+)"
+    + rb"|(?P<exit>(?:##\[error\]|Error: |ERROR: Job failed: )?"
+    + rb"(?:Process completed with exit code|exit code|Command exited with code"
+    + rb"|make: \*\*\* \[[^\]\r\n]*\] Error) (?P<code>[1-9]\d*))"
+    + rb"|(?P<error>(?:E +\w+(?:Error|Exception)\b|[A-Za-z_][\w.]*(?:Error|Exception): )[^\r\n]*)"
+    + rb")"
+)
+
+_ANSI_PATTERN = re.compile(r"\x1b\[[0-9;]*[A-Za-z]")
+_TIMESTAMP_PATTERN = re.compile(r"^\d{4}-\d\d-\d\dT[\d:.]+Z ", re.MULTILINE)
+_ERROR_PREFIX = re.compile(r"^E +")
+
+_NEWLINE_CHUNK = 1024 * 1024
+_FIRST_LINE_BYTES = 4096
+
+
+@dataclass
+class LogExcerpt:
+    """A bounded window of log lines around one or more failure signals."""
+
+    start_line: int
+    end_line: int
+    kinds: list[str]
+    text: str
+
+
+@dataclass
+class LogAnalysis:
+    """Failures found in a log, with the excerpts worth sending to an LLM."""
+
+    size_bytes: int
+    failed_tests: list[str] = field(default_factory=list)
+    errors: list[str] = field(default_factory=list)
+    exit_codes: list[int] = field(default_factory=list)
+    summary: str | None = None
+    excerpts: list[LogExcerpt] = field(default_factory=list)
+    truncated: bool = False
+
+    @property
+    def has_failures(self) -> bool:
+        return bool(self.failed_tests or self.errors or self.exit_codes or self.excerpts)
+
+    def excerpt_text(self) -> str:
+        """Excerpts joined with line markers, for prompts."""
+        return "\n\n".join(
+            f"--- lines {e.start_line}-{e.end_line} ({', '.join(e.kinds)}) ---\n{e.text}"
+            for e in self.excerpts
+        )
+
+
+def _clean(raw: bytes) -> str:
+    """Decode log bytes and drop ANSI colors and Actions timestamps."""
+    text = raw.decode("utf-8", errors="replace")
+    return _TIMESTAMP_PATTERN.sub("", _ANSI_PATTERN.sub("", text))
+
+
+def _count_newlines(buffer: bytes | mmap.mmap, start: int, end: int) -> int:
+    """Count newlines in buffer[start:end], copying at most one chunk at a time."""
+    count = 0
+    for chunk_start in range(start, end, _NEWLINE_CHUNK):
+        chunk_end = min(chunk_start + _NEWLINE_CHUNK, end)
+        count += buffer[chunk_start:chunk_end].count(b"\n")
+    return count
+
+
+def _window(
+    buffer: bytes | mmap.mmap, start: int, end: int, context_lines: int, max_bytes: int
+) -> tuple[int, int]:
+    """Byte range of context_lines around [start, end), at most max_bytes long."""
+    lo = buffer.rfind(b"\n", 0, start) + 1
+    half = max_bytes // 2
+    for _ in range(context_lines):
+        if lo == 0 or start - lo >= half:
+            break
+        lo = buffer.rfind(b"\n", 0, lo - 1) + 1
+    lo = max(lo, start - half)
+
+    hi = buffer.find(b"\n", end)
+    hi = len(buffer) if hi == -1 else hi
+    for _ in range(context_lines):
+        if hi >= len(buffer) or hi - lo >= max_bytes:
+            break
+        next_hi = buffer.find(b"\n", hi + 1)
+        hi = len(buffer) if next_hi == -1 else next_hi
+    return lo, min(hi, lo + max_bytes)
+
+
+def analyze_buffer(
+    buffer: bytes | mmap.mmap,
+    context_lines: int = LOG_CONTEXT_LINES,
+    max_excerpts: int = LOG_MAX_EXCERPTS,
+    max_excerpt_bytes: int = LOG_MAX_EXCERPT_BYTES,
+) -> LogAnalysis:
+    """
+    Scan a log buffer for failures.
+
+    Args:
+        buffer: Log contents (bytes or a memory map)
+        context_lines: Lines of context kept before and after each signal
+        max_excerpts: Maximum number of excerpts returned
+        max_excerpt_bytes: Maximum size of one excerpt
+
+    Returns:
+        LogAnalysis
+    """
+    analysis = LogAnalysis(size_bytes=len(buffer))
+    seen_tests: set[str] = set()
+    seen_errors: set[str] = set()
+
+    # (lo, hi, kinds) windows in log order, merged as they are found
+    windows: list[list] = []
+
+    # The pattern anchors on "\n", so the first line is matched separately
+    first_line = b"\n" + bytes(buffer[:_FIRST_LINE_BYTES]).split(b"\n", 1)[0]
+    head = FAILURE_PATTERN.match(first_line)
+    signals = [(head, -1)] if head else []
+
+    for match, shift in [*signals, *((m, 0) for m in FAILURE_PATTERN.finditer(buffer))]:
+        kind = match.lastgroup if match.lastgroup != "code" else "exit"
+        start, end = match.start() + 1 + shift, match.end() + shift
+
+        if kind == "test":
+            test = match.group("test").decode("utf-8", errors="replace")
+            if test not in seen_tests:
+                seen_tests.add(test)
+                analysis.failed_tests.append(test)
+            continue  # Summary lines only name the test; the failure body has the context
+        if kind == "summary":
+            analysis.summary = _clean(match.group("summary")).strip("= ")
+            continue
+        if kind == "exit":
+            analysis.exit_codes.append(int(match.group("code")))
+        if kind in ("assertion", "error"):
+            message = _ERROR_PREFIX.sub("", _clean(match.group(kind))).strip()
+            if message not in seen_errors:
+                seen_errors.add(message)
+                analysis.errors.append(message)
+
+        lo, hi = _window(buffer, start, end, context_lines, max_excerpt_bytes)
+        if windows and lo <= windows[-1][1]:
+            if hi - windows[-1][0] <= max_excerpt_bytes:
+                windows[-1][1] = max(windows[-1][1], hi)
+                if kind not in windows[-1][2]:
+                    windows[-1][2].append(kind)
+                continue
+            lo = windows[-1][1]  # Too big to merge; start where the last excerpt ended
+        if len(windows) < max_excerpts:
+            windows.append([lo, hi, [kind]])
+        else:
+            analysis.truncated = True
+
+    line = 1
+    position = 0
+    for lo, hi, kinds in windows:
+        line += _count_newlines(buffer, position, lo)
+        text = _clean(buffer[lo:hi]).rstrip("\n")
+        end_line = line + text.count("\n")
+        analysis.excerpts.append(LogExcerpt(line, end_line, kinds, text))
+        position = lo
+
+    return analysis
+
+
+def analyze_log_file(path: str | Path, **kwargs) -> LogAnalysis:
+    """
+    Scan a log file for failures using a read-only memory map.
+
+    The file is never read into memory as a whole; the OS pages it in as
+    the scan progresses.
+
+    Args:
+        path: Path to the log file
+        **kwargs: Limits passed to analyze_buffer()
+
+    Returns:
+        LogAnalysis
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return LogAnalysis(size_bytes=0)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            analysis = analyze_buffer(buffer, **kwargs)
+
+    logger.info(
+        f"Parsed {size / 1024 / 1024:.1f} MB log: {len(analysis.failed_tests)} failed tests, "
+        f"{len(analysis.excerpts)} excerpts"
+    )
+    return analysis
@@ -0,0 +1,146 @@
+"""
+MinHash
+=======
+MinHash signatures and a banded LSH index for near-duplicate text lookup.
+
+A signature is a fixed number of minimum hash values over a text's word
+shingles; the fraction of equal positions in two signatures estimates the
+Jaccard similarity of their shingle sets. The LSH index splits signatures
+into bands so candidate near-duplicates are found with a few dict lookups
+instead of comparing against every stored signature.
+"""
+
+import hashlib
+import random
+import re
+from collections import defaultdict
+from collections.abc import Iterable
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_WORD_PATTERN = re.compile(r"\w+")
+
+Signature = tuple[int, ...]
+
+
+def shingles(text: str, k: int = 3) -> set[str]:
+    """
+    Word k-grams of a text (lowercased).
+
+    Args:
+        text: Input text
+        k: Words per shingle
+
+    Returns:
+        Set of shingles (the whole text as one shingle if it has fewer than k words)
+    """
+    words = _WORD_PATTERN.findall(text.lower())
+    if len(words) < k:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i : i + k]) for i in range(len(words) - k + 1)}
+
+
+class MinHasher:
+    """
+    Computes MinHash signatures with a fixed set of hash permutations.
+
+    Signatures are only comparable between hashers with the same num_perm
+    and seed.
+    """
+
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        """
+        Initialize the hasher.
+
+        Args:
+            num_perm: Signature length (more is more accurate and slower)
+            seed: Seed for the permutation parameters
+        """
+        self.num_perm = num_perm
+        rng = random.Random(seed)
+        self._perms = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+            for _ in range(num_perm)
+        ]
+
+    def signature(self, features: Iterable[str]) -> Signature:
+        """
+        MinHash signature of a set of features (e.g. shingles).
+
+        Args:
+            features: Features of the text
+
+        Returns:
+            Tuple of num_perm minimum hash values
+        """
+        hashes = {
+            int.from_bytes(hashlib.blake2b(f.encode(), digest_size=4).digest(), "big")
+            for f in features
+        }
+        if not hashes:
+            return (_MAX_HASH,) * self.num_perm
+        return tuple(
+            min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes) for a, b in self._perms
+        )
+
+    def text_signature(self, text: str, k: int = 3) -> Signature:
+        """MinHash signature of a text's word shingles."""
+        return self.signature(shingles(text, k))
+
+
+def similarity(a: Signature, b: Signature) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    if not a or len(a) != len(b):
+        return 0.0
+    return sum(1 for x, y in zip(a, b, strict=True) if x == y) / len(a)
+
+
+class LSHIndex:
+    """
+    Banded locality-sensitive hashing index over MinHash signatures.
+
+    Two signatures become candidates when all rows of any band match, which
+    happens with high probability above a similarity of roughly
+    (1 / bands) ** (1 / rows).
+    """
+
+    def __init__(self, num_perm: int = 64, bands: int = 16):
+        """
+        Initialize the index.
+
+        Args:
+            num_perm: Signature length
+            bands: Number of bands (num_perm must be divisible by it)
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._buckets: dict[tuple[int, Signature], set[str]] = defaultdict(set)
+
+    def _band_keys(self, signature: Signature) -> list[tuple[int, Signature]]:
+        return [
+            (band, signature[band * self.rows : (band + 1) * self.rows])
+            for band in range(self.bands)
+        ]
+
+    def insert(self, key: str, signature: Signature) -> None:
+        """Add a signature under a key."""
+        for band_key in self._band_keys(signature):
+            self._buckets[band_key].add(key)
+
+    def remove(self, key: str, signature: Signature) -> None:
+        """Remove a key previously inserted with this signature."""
+        for band_key in self._band_keys(signature):
+            bucket = self._buckets.get(band_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band_key]
+
+    def query(self, signature: Signature) -> set[str]:
+        """Keys that share at least one band with the signature."""
+        candidates: set[str] = set()
+        for band_key in self._band_keys(signature):
+            candidates |= self._buckets.get(band_key, set())
+        return candidates
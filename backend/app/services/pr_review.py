@@ -0,0 +1,459 @@
+"""
+PR Review
+=========
+Review pull requests in parallel chunks of diff hunks.
+
+A pull request's patches are split into hunks, and hunks are packed into
+chunks under a token budget, keeping each file's hunks together where they
+fit. Chunks are reviewed concurrently (the LLM service enforces the
+provider rate limits), so review latency tracks the largest chunk rather
+than the size of the whole diff. Comments are mapped back to the hunk they
+refer to, merged across chunks and de-duplicated.
+
+Review comments are cached per pull request by hunk content hash. When the
+branch is pushed again, hunks whose content did not change reuse their
+comments (moved to the hunk's new line numbers) instead of being reviewed
+again.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from pydantic import ValidationError
+
+from app.models.review_models import ReviewComment
+from app.services.context_packer import estimate_tokens
+
+logger = logging.getLogger("ai_sdlc_copilot")
+
+# Token budget for the diff in one review call (override via environment)
+REVIEW_CHUNK_TOKENS = int(os.getenv("REVIEW_CHUNK_TOKENS", "3000"))
+
+DEFAULT_REVIEW_CACHE_DIR = os.getenv("REVIEW_CACHE_DIR", ".cache/reviews")
+
+SEVERITIES = ("Critical", "High", "Medium", "Low", "Info")
+
+_PULL_REQUEST_PATTERN = re.compile(
+    r"^(?:https?://github\.com/)?(?P<owner>[\w.-]+)/(?P<repo>[\w.-]+)"
+    r"(?:/pulls?/|#)(?P<number>\d+)/?$"
+)
+_HUNK_HEADER = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+_TITLE_WORDS = re.compile(r"\w+")
+
+# Comments on the same file this close together may describe the same issue
+_DUPLICATE_LINE_DISTANCE = 2
+_DUPLICATE_TITLE_SIMILARITY = 0.5
+
+
+def parse_pull_request_ref(ref: str) -> tuple[str, str, int]:
+    """
+    Parse a pull request reference.
+
+    Accepts `https://github.com/owner/repo/pull/12`, `owner/repo/pull/12`
+    and `owner/repo#12`.
+
+    Returns:
+        Tuple of (owner, repo, number)
+
+    Raises:
+        ValueError: If the reference is not a pull request
+    """
+    match = _PULL_REQUEST_PATTERN.match(ref.strip())
+    if not match:
+        raise ValueError(f"Invalid pull request reference: {ref}. Expected owner/repo#number")
+    return match["owner"], match["repo"].removesuffix(".git"), int(match["number"])
+
+
+@dataclass(frozen=True)
+class DiffHunk:
+    """One `@@` hunk of a file's patch."""
+
+    path: str
+    old_start: int
+    old_lines: int
+    new_start: int
+    new_lines: int
+    text: str
+
+    @property
+    def content_hash(self) -> str:
+        """Hash of the path and changed lines, independent of the hunk's position."""
+        body = self.text.split("\n", 1)[1] if "\n" in self.text else ""
+        return hashlib.sha256(f"{self.path}\0{body}".encode()).hexdigest()[:32]
+
+    @property
+    def new_end(self) -> int:
+        """Last line of the hunk in the new file."""
+        return self.new_start + max(self.new_lines, 1) - 1
+
+    def distance(self, line: int) -> int:
+        """Lines between a new-file line and this hunk (0 if inside)."""
+        if line < self.new_start:
+            return self.new_start - line
+        return max(0, line - self.new_end)
+
+
+def parse_patch(path: str, patch: str) -> list[DiffHunk]:
+    """
+    Split a file's unified diff patch into hunks.
+
+    Args:
+        path: File path (new name for renames)
+        patch: Patch text as returned by the GitHub files API
+
+    Returns:
+        Hunks in file order
+    """
+    hunks: list[DiffHunk] = []
+    header: re.Match | None = None
+    lines: list[str] = []
+
+    def flush() -> None:
+        if header is not None:
+            hunks.append(
+                DiffHunk(
+                    path=path,
+                    old_start=int(header[1]),
+                    old_lines=int(header[2] or 1),
+                    new_start=int(header[3]),
+                    new_lines=int(header[4] or 1),
+                    text="\n".join(lines),
+                )
+            )
+
+    for line in patch.splitlines():
+        match = _HUNK_HEADER.match(line)
+        if match:
+            flush()
+            header, lines = match, [line]
+        elif header is not None:
+            lines.append(line)
+    flush()
+    return hunks
+
+
+@dataclass
+class ReviewChunk:
+    """Hunks reviewed together in one LLM call."""
+
+    hunks: list[DiffHunk] = field(default_factory=list)
+    tokens: int = 0
+
+    @property
+    def files(self) -> list[str]:
+        return list(dict.fromkeys(h.path for h in self.hunks))
+
+    def diff(self) -> str:
+        """The chunk's hunks as a unified diff, grouped by file."""
+        parts = []
+        for path in self.files:
+            parts.append(f"--- a/{path}\n+++ b/{path}")
+            parts.extend(h.text for h in self.hunks if h.path == path)
+        return "\n".join(parts)
+
+
+def group_hunks(
+    hunks: list[DiffHunk], budget_tokens: int = REVIEW_CHUNK_TOKENS
+) -> list[ReviewChunk]:
+    """
+    Pack hunks into chunks of at most budget_tokens.
+
+    A file's hunks stay in one chunk when they fit; larger files are split
+    at hunk boundaries. A single hunk over the budget gets a chunk of its
+    own rather than being cut.
+
+    Args:
+        hunks: Hunks in diff order
+        budget_tokens: Token budget per chunk
+
+    Returns:
+        Chunks in diff order
+    """
+    files: dict[str, list[tuple[DiffHunk, int]]] = {}
+    for hunk in hunks:
+        # +1 for the newline joining hunks
+        files.setdefault(hunk.path, []).append((hunk, estimate_tokens(hunk.text) + 1))
+
+    chunks: list[ReviewChunk] = []
+    current = ReviewChunk()
+
+    def start_chunk() -> ReviewChunk:
+        if current.hunks:
+            chunks.append(current)
+        return ReviewChunk()
+
+    for path, sized in files.items():
+        header_tokens = estimate_tokens(f"--- a/{path}\n+++ b/{path}")
+        file_tokens = header_tokens + sum(tokens for _, tokens in sized)
+        # Move a file that fits a chunk on its own rather than splitting it;
+        # the file header is repeated in each chunk a split file appears in
+        if current.tokens + file_tokens > budget_tokens and file_tokens <= budget_tokens:
+            current = start_chunk()
+
+        in_chunk = False
+        for hunk, tokens in sized:
+            cost = tokens if in_chunk else tokens + header_tokens
+            if current.hunks and current.tokens + cost > budget_tokens:
+                current = start_chunk()
+                cost = tokens + header_tokens
+            current.hunks.append(hunk)
+            current.tokens += cost
+            in_chunk = True
+
+    start_chunk()
+    return chunks
+
+
+@dataclass
+class ChunkReview:
+    """The review of one chunk, or why it failed."""
+
+    chunk: ReviewChunk
+    summary: str = ""
+    approval_recommendation: str = "COMMENT"
+    comments: list[ReviewComment] = field(default_factory=list)
+    positive_feedback: list[str] = field(default_factory=list)
+    error: str | None = None
+
+
+ChunkReviewer = Callable[[ReviewChunk, int, int], Awaitable[str]]
+
+
+def parse_review(response_text: str, chunk: ReviewChunk) -> ChunkReview:
+    """
+    Parse an LLM JSON review of a chunk.
+
+    Comments that do not validate are dropped individually, so one odd
+    category does not lose the rest of the review.
+
+    Raises:
+        ValueError: If the response is not a JSON review
+    """
+    cleaned = response_text.strip()
+    if cleaned.startswith("```"):
+        lines = cleaned.split("\n")
+        cleaned = "\n".join(lines[1:-1])
+
+    try:
+        data = json.loads(cleaned)
+        raw_comments = data.get("comments") or []
+        review = ChunkReview(
+            chunk=chunk,
+            summary=str(data.get("summary") or ""),
+            approval_recommendation=str(data.get("approval_recommendation") or "COMMENT"),
+            positive_feedback=[str(p) for p in data.get("positive_feedback") or []],
+        )
+    except (json.JSONDecodeError, AttributeError, TypeError) as e:
+        raise ValueError(f"LLM returned an invalid review: {e}") from e
+
+    for raw in raw_comments:
+        try:
+            review.comments.append(ReviewComment(**raw))
+        except (ValidationError, TypeError) as e:
+            logger.warning(f"Dropping invalid review comment: {e}")
+    return review
+
+
+async def review_chunks(chunks: list[ReviewChunk], review: ChunkReviewer) -> list[ChunkReview]:
+    """
+    Review all chunks concurrently.
+
+    A chunk whose review fails, or cannot be parsed, is reported with an
+    error instead of failing the whole pull request.
+
+    Args:
+        chunks: Chunks to review
+        review: Coroutine returning the LLM response for (chunk, part, total_parts)
+
+    Returns:
+        ChunkReview objects in the same order as chunks
+    """
+
+    async def _review(chunk: ReviewChunk, part: int) -> ChunkReview:
+        try:
+            return parse_review(await review(chunk, part, len(chunks)), chunk)
+        except Exception as e:
+            logger.error(
+                f"Review of chunk {part}/{len(chunks)} ({', '.join(chunk.files)}) failed: {e}"
+            )
+            return ChunkReview(chunk=chunk, error=str(e))
+
+    return list(await asyncio.gather(*(_review(c, i) for i, c in enumerate(chunks, 1))))
+
+
+def assign_comments(
+    comments: list[ReviewComment], hunks: list[DiffHunk]
+) -> dict[str, list[ReviewComment]]:
+    """
+    Attach comments to the hunk they refer to (by file and nearest line).
+
+    Comments on files outside the hunks are dropped; comments without a
+    line go to the file's first hunk.
+
+    Returns:
+        Comments keyed by hunk content hash
+    """
+    assigned: dict[str, list[ReviewComment]] = {}
+    for comment in comments:
+        candidates = [h for h in hunks if h.path == comment.file.lstrip("/").removeprefix("b/")]
+        if not candidates:
+            logger.debug(f"Dropping comment on {comment.file}, which is not in the chunk")
+            continue
+        hunk = candidates[0]
+        if comment.line is not None:
+            hunk = min(candidates, key=lambda h: h.distance(comment.line))
+        comment.file = hunk.path
+        assigned.setdefault(hunk.content_hash, []).append(comment)
+    return assigned
+
+
+def _title_similarity(a: str, b: str) -> float:
+    words_a = set(_TITLE_WORDS.findall(a.lower()))
+    words_b = set(_TITLE_WORDS.findall(b.lower()))
+    if not words_a or not words_b:
+        return 0.0
+    return len(words_a & words_b) / len(words_a | words_b)
+
+
+def _rank(comment: ReviewComment) -> tuple[int, int]:
+    return -SEVERITIES.index(comment.severity), comment.confidence
+
+
+def merge_comments(comments: list[ReviewComment]) -> list[ReviewComment]:
+    """
+    De-duplicate comments and sort them by file and line.
+
+    Two comments are duplicates when they are on the same file, within a
+    couple of lines, in the same category and with similar titles; the more
+    severe (then more confident) one is kept.
+    """
+    kept: list[ReviewComment] = []
+    for comment in sorted(comments, key=_rank, reverse=True):
+        duplicate = any(
+            other.file == comment.file
+            and other.category == comment.category
+            and abs((other.line or 0) - (comment.line or 0)) <= _DUPLICATE_LINE_DISTANCE
+            and _title_similarity(other.title, comment.title) >= _DUPLICATE_TITLE_SIMILARITY
+            for other in kept
+        )
+        if not duplicate:
+            kept.append(comment)
+    return sorted(kept, key=lambda c: (c.file, c.line or 0, SEVERITIES.index(c.severity)))
+
+
+def approval_for(comments: list[ReviewComment], reviews: list[ChunkReview]) -> str:
+    """
+    Overall recommendation: request changes on any serious issue.
+
+    A review with failed chunks is never an approval, since part of the
+    diff was not looked at.
+    """
+    if any(c.severity in ("Critical", "High") for c in comments) or any(
+        r.approval_recommendation == "REQUEST_CHANGES" for r in reviews if r.error is None
+    ):
+        return "REQUEST_CHANGES"
+    if comments or any(r.error is not None for r in reviews):
+        return "COMMENT"
+    return "APPROVE"
+
+
+def unreviewed_files(reviews: list[ChunkReview]) -> list[str]:
+    """Files with hunks in chunks whose review failed, in diff order."""
+    return list(dict.fromkeys(f for r in reviews if r.error is not None for f in r.chunk.files))
+
+
+class ReviewCache:
+    """
+    Review comments per pull request, keyed by hunk content hash.
+
+    Line numbers are stored relative to the hunk, so a comment is placed
+    correctly when its hunk moves after a re-push. One JSON file per pull
+    request holds the hunks of the latest review only.
+    """
+
+    def __init__(self, cache_dir: str | Path = DEFAULT_REVIEW_CACHE_DIR):
+        self.cache_dir = Path(cache_dir)
+
+    def _path(self, owner: str, repo: str, number: int) -> Path:
+        return self.cache_dir / f"{owner}__{repo}__{number}.json"
+
+    def load(self, owner: str, repo: str, number: int, settings: str = "") -> dict[str, list[dict]]:
+        """
+        Load cached comments for a pull request.
+
+        Args:
+            owner: Repository owner
+            repo: Repository name
+            number: Pull request number
+            settings: Review settings key; a different key invalidates the cache
+
+        Returns:
+            Relative comment dicts keyed by hunk content hash
+        """
+        path = self._path(owner, repo, number)
+        try:
+            raw = json.loads(path.read_text(encoding="utf-8"))
+            return raw["hunks"] if raw.get("settings") == settings else {}
+        except FileNotFoundError:
+            return {}
+        except (OSError, KeyError, TypeError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable review cache {path}: {e}")
+            return {}
+
+    def save(
+        self,
+        owner: str,
+        repo: str,
+        number: int,
+        hunks: dict[str, list[dict]],
+        settings: str = "",
+    ) -> None:
+        """Persist the cached comments for a pull request atomically."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self.cache_dir, prefix=".tmp-")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"settings": settings, "hunks": hunks}, f)
+        os.replace(tmp_name, self._path(owner, repo, number))
+
+    @staticmethod
+    def to_cached(comments: list[ReviewComment], hunk: DiffHunk) -> list[dict]:
+        """Comments with lines made relative to the hunk start."""
+        return [
+            c.model_dump(exclude={"file"})
+            | {"line": None if c.line is None else c.line - hunk.new_start}
+            for c in comments
+        ]
+
+    @staticmethod
+    def from_cached(cached: list[dict], hunk: DiffHunk) -> list[ReviewComment]:
+        """Cached comments placed at the hunk's current position."""
+        return [
+            ReviewComment(
+                **c
+                | {
+                    "file": hunk.path,
+                    "line": None if c.get("line") is None else hunk.new_start + c["line"],
+                }
+            )
+            for c in cached
+        ]
+
+
+# Singleton instance
+_review_cache: ReviewCache | None = None
+
+
+def get_review_cache() -> ReviewCache:
+    """Get or create the shared review cache."""
+    global _review_cache
+    if _review_cache is None:
+        _review_cache = ReviewCache()
+    return _review_cache
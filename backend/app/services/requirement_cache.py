@@ -0,0 +1,369 @@
+"""
+Requirement Cache
+=================
+Serve stored generations for requirements that were already generated for.
+
+An exact prompt cache misses whenever a requirement is re-typed with
+different whitespace, casing or punctuation, or its context is given in a
+different order. Here requirement and context are normalized first
+(lowercased, punctuation and extra whitespace removed; context sentences
+are de-duplicated and sorted). A cached result is served when:
+
+- the generation settings (every request field except requirement,
+  context and use_cache: num_cases, personas, output format, system
+  prompt, ...) and the normalized context are the same, and
+- the normalized requirement is the same (SHA-256), or its MinHash
+  signature over word bigrams, found through an LSH index, estimates a
+  Jaccard similarity of at least REQUIREMENT_CACHE_THRESHOLD and both
+  requirements use the same negation and modal words ("must" vs "must
+  not", "should" vs "may") and the same numbers ("30 minutes" vs "5
+  minutes"), which similarity alone cannot tell apart.
+
+Entries only point at stored artifacts (see artifact_store), so the cache
+itself holds hashes and signatures and stays small. It is written in a
+worker thread, one write at a time; changes made during a write are
+batched into the next one.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import time
+from collections import Counter, OrderedDict
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import TypeVar
+
+from pydantic import BaseModel, ValidationError
+
+from app.models.testcase import CachedSource
+from app.services.artifact_store import SECRET_FIELDS, get_artifact_store
+from app.services.minhash import LSHIndex, MinHasher, similarity
+
+logger = logging.getLogger("ai_sdlc_copilot")
+
+DEFAULT_CACHE_DIR = os.getenv("REQUIREMENT_CACHE_DIR", ".cache/requirements")
+
+# Estimated Jaccard similarity at which two requirements share a result (override via environment)
+REQUIREMENT_CACHE_THRESHOLD = float(os.getenv("REQUIREMENT_CACHE_THRESHOLD", "0.9"))
+
+# Most cached requirements kept (least recently used are dropped)
+MAX_CACHE_ENTRIES = 5000
+
+# Request fields that are matched by similarity (or control the cache) rather than exactly
+_MATCHED_FIELDS = frozenset({"requirement", "context", "use_cache"}) | SECRET_FIELDS
+
+# 128 permutations keep the estimate within a few points, so a requirement
+# that differs by a word or two is not mistaken for a repeat
+_NUM_PERM = 128
+_LSH_BANDS = 32
+# Word bigrams: short requirements still get enough shingles to compare
+_SHINGLE_SIZE = 2
+_hasher = MinHasher(num_perm=_NUM_PERM)
+
+_PUNCTUATION = re.compile(r"[^\w\s]+")
+_WHITESPACE = re.compile(r"\s+")
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?;])\s+|\n+")
+
+# Words that flip or weaken a requirement; near matches must use the same ones.
+# "t" is what is left of "n't" after normalization ("can't" -> "can t").
+_POLARITY_WORDS = frozenset(
+    {
+        *("not", "no", "never", "none", "nothing", "nobody", "neither", "nor", "t"),
+        *("without", "except", "unless", "cannot", "only"),
+        *("must", "shall", "should", "may", "might", "can", "could", "will", "would"),
+    }
+)
+
+ResponseT = TypeVar("ResponseT", bound=BaseModel)
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase a text and strip punctuation and extra whitespace."""
+    return _WHITESPACE.sub(" ", _PUNCTUATION.sub(" ", text.lower())).strip()
+
+
+def normalize_context(context: str) -> str:
+    """Normalize context sentences, independent of their order."""
+    sentences = {normalize_text(sentence) for sentence in _SENTENCE_BREAK.split(context)}
+    return "\n".join(sorted(sentence for sentence in sentences if sentence))
+
+
+def polarity_words(normalized: str) -> Counter[str]:
+    """Negation and modal words of a normalized requirement, with their counts."""
+    return Counter(word for word in normalized.split() if word in _POLARITY_WORDS)
+
+
+def numeric_tokens(normalized: str) -> Counter[str]:
+    """Words with digits in a normalized requirement (amounts, limits, versions), with counts."""
+    return Counter(word for word in normalized.split() if any(c.isdigit() for c in word))
+
+
+def _scope(kind: str, context: str, settings: dict) -> str:
+    """Hash of everything that must match exactly."""
+    canonical = json.dumps(
+        {"kind": kind, "context": normalize_context(context), "settings": settings},
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def _fingerprint(scope: str, normalized_requirement: str) -> str:
+    return hashlib.sha256(f"{scope}:{normalized_requirement}".encode()).hexdigest()
+
+
+@dataclass
+class CacheEntry:
+    """A requirement and the artifact generated for it."""
+
+    fingerprint: str
+    scope: str
+    minhash: list[int]
+    requirement: str
+    artifact_id: str
+    last_used: float = field(default_factory=time.time)
+
+
+@dataclass
+class CacheMatch:
+    """A lookup hit: the stored result and how similar its requirement is."""
+
+    entry: CacheEntry
+    similarity: float
+    content: dict
+
+
+class RequirementCache:
+    """
+    Near-duplicate requirement index over stored artifacts.
+
+    Example:
+        cache = get_requirement_cache()
+        match = cache.lookup("testcases", requirement, context, settings)
+    """
+
+    def __init__(self, path: str | Path, threshold: float = REQUIREMENT_CACHE_THRESHOLD):
+        """
+        Initialize the cache, loading it from disk if it exists.
+
+        Args:
+            path: JSON file the cache is persisted to
+            threshold: Minimum estimated similarity for a near-duplicate match
+        """
+        self.path = Path(path)
+        self.threshold = threshold
+        # Least recently used first
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._lsh = LSHIndex(num_perm=_NUM_PERM, bands=_LSH_BANDS)
+        self._write_lock = asyncio.Lock()
+        self._dirty = False
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _load(self) -> None:
+        try:
+            raw = json.loads(self.path.read_text(encoding="utf-8"))
+            for entry in sorted((CacheEntry(**data) for data in raw), key=lambda e: e.last_used):
+                self._entries[entry.fingerprint] = entry
+                self._lsh.insert(entry.fingerprint, tuple(entry.minhash))
+        except FileNotFoundError:
+            pass
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable requirement cache {self.path}: {e}")
+
+    def _write(self, entries: list[CacheEntry]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self.path.parent, prefix=".tmp-")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump([asdict(e) for e in entries], f)
+        os.replace(tmp_name, self.path)
+
+    def save(self) -> None:
+        """Persist the cache atomically."""
+        self._write(list(self._entries.values()))
+
+    async def persist(self) -> None:
+        """
+        Persist the cache without blocking the event loop.
+
+        Callers that arrive while a write is running wait for it, then the
+        first of them writes all their changes at once.
+        """
+        self._dirty = True
+        async with self._write_lock:
+            if not self._dirty:
+                return  # Written by an earlier caller
+            self._dirty = False
+            # Entries are not modified once added (except last_used), so a
+            # shallow copy is a consistent snapshot
+            entries = list(self._entries.values())
+            try:
+                await asyncio.to_thread(self._write, entries)
+            except BaseException:
+                self._dirty = True
+                raise
+
+    def _remove(self, entry: CacheEntry) -> None:
+        del self._entries[entry.fingerprint]
+        self._lsh.remove(entry.fingerprint, tuple(entry.minhash))
+
+    def lookup(
+        self, kind: str, requirement: str, context: str, settings: dict
+    ) -> CacheMatch | None:
+        """
+        Find a stored result for a requirement.
+
+        Args:
+            kind: Artifact kind
+            requirement: The requirement
+            context: Additional context (must match after normalization)
+            settings: Generation settings (must match exactly)
+
+        Returns:
+            The exact match, else the most similar requirement above the
+            threshold with the same negation and modal words and the same
+            numbers, else None
+            (also when its artifact no longer exists; the entry is then
+            dropped, and left out of the file from the next write)
+        """
+        scope = _scope(kind, context, settings)
+        normalized = normalize_text(requirement)
+        entry = self._entries.get(_fingerprint(scope, normalized))
+        score = 1.0
+        if entry is None:
+            signature = _hasher.text_signature(normalized, _SHINGLE_SIZE)
+            polarity = polarity_words(normalized)
+            numbers = numeric_tokens(normalized)
+            score = 0.0
+            for key in self._lsh.query(signature):
+                candidate = self._entries[key]
+                if candidate.scope != scope:
+                    continue
+                candidate_score = similarity(signature, tuple(candidate.minhash))
+                if candidate_score < self.threshold or candidate_score <= score:
+                    continue
+                candidate_text = normalize_text(candidate.requirement)
+                if (
+                    polarity_words(candidate_text) == polarity
+                    and numeric_tokens(candidate_text) == numbers
+                ):
+                    entry, score = candidate, candidate_score
+        if entry is None:
+            return None
+
+        stored = get_artifact_store().get(entry.artifact_id)
+        if stored is None:
+            self._remove(entry)
+            return None
+        entry.last_used = time.time()
+        self._entries.move_to_end(entry.fingerprint)
+        return CacheMatch(entry, score, json.loads(stored.body)["content"])
+
+    async def add(
+        self, kind: str, requirement: str, context: str, settings: dict, artifact_id: str
+    ) -> None:
+        """Remember the artifact generated for a requirement and persist."""
+        scope = _scope(kind, context, settings)
+        normalized = normalize_text(requirement)
+        fingerprint = _fingerprint(scope, normalized)
+        if fingerprint in self._entries:
+            self._remove(self._entries[fingerprint])
+        entry = CacheEntry(
+            fingerprint=fingerprint,
+            scope=scope,
+            minhash=list(_hasher.text_signature(normalized, _SHINGLE_SIZE)),
+            requirement=requirement,
+            artifact_id=artifact_id,
+        )
+        self._entries[fingerprint] = entry
+        self._lsh.insert(fingerprint, tuple(entry.minhash))
+
+        while len(self._entries) > MAX_CACHE_ENTRIES:
+            self._remove(next(iter(self._entries.values())))
+
+        await self.persist()
+
+
+# Singleton instance
+_requirement_cache: RequirementCache | None = None
+
+
+def get_requirement_cache() -> RequirementCache:
+    """Get or create the shared requirement cache."""
+    global _requirement_cache
+    if _requirement_cache is None:
+        _requirement_cache = RequirementCache(Path(DEFAULT_CACHE_DIR) / "index.json")
+    return _requirement_cache
+
+
+def cache_settings(request: BaseModel) -> dict:
+    """Request fields a cached result must have been generated with."""
+    return request.model_dump(mode="json", exclude=_MATCHED_FIELDS)
+
+
+def find_cached_response(
+    kind: str, request: BaseModel, response_model: type[ResponseT]
+) -> ResponseT | None:
+    """
+    Serve a stored response for a near-duplicate of a request.
+
+    Args:
+        kind: Artifact kind
+        request: Request with requirement, context and use_cache fields
+        response_model: Response model the artifact content is read as
+
+    Returns:
+        The stored response with cached_from (and requirement, if the model
+        has one) set for this request, or None
+    """
+    if not request.use_cache:
+        return None
+    match = get_requirement_cache().lookup(
+        kind, request.requirement, request.context, cache_settings(request)
+    )
+    if match is None:
+        return None
+    try:
+        response = response_model.model_validate(match.content)
+    except ValidationError as e:
+        logger.warning(f"Ignoring cached {kind} artifact {match.entry.artifact_id}: {e}")
+        return None
+
+    update = {
+        "artifact_id": match.entry.artifact_id,
+        "cached_from": CachedSource(
+            artifact_id=match.entry.artifact_id,
+            requirement=match.entry.requirement,
+            similarity=match.similarity,
+        ),
+    }
+    if "requirement" in response_model.model_fields:
+        update["requirement"] = request.requirement
+    logger.info(
+        f"✅ Served cached {kind} for a near-duplicate requirement "
+        f"(similarity {match.similarity:.2f})"
+    )
+    return response.model_copy(update=update)
+
+
+async def remember_response(kind: str, request: BaseModel, artifact_id: str | None) -> None:
+    """
+    Cache a generated response (by its artifact) for near-duplicates of the request.
+
+    Storage errors are logged rather than raised.
+    """
+    if artifact_id is None:
+        return
+    try:
+        await get_requirement_cache().add(
+            kind, request.requirement, request.context, cache_settings(request), artifact_id
+        )
+    except OSError as e:
+        logger.warning(f"Could not cache {kind} requirement: {e}")
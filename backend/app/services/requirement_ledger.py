@@ -0,0 +1,70 @@
+"""
+Requirement Ledger
+==================
+Remembers which external requirements (e.g. GitHub issues) were already
+turned into test cases, keyed by a hash of their content.
+
+Re-ingesting a repository only regenerates requirements whose text changed;
+unchanged ones return the stored test cases without an LLM call.
+"""
+
+import json
+import logging
+import os
+import tempfile
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+logger = logging.getLogger("ai_sdlc_copilot")
+
+DEFAULT_LEDGER_DIR = os.getenv("REQUIREMENT_LEDGER_DIR", ".cache/requirements")
+
+
+@dataclass
+class LedgerEntry:
+    """Test cases generated for one requirement at a given content hash."""
+
+    content_hash: str
+    test_cases: list[dict] = field(default_factory=list)
+
+
+class RequirementLedger:
+    """JSON-file store of LedgerEntry objects, one file per repository."""
+
+    def __init__(self, ledger_dir: str | Path = DEFAULT_LEDGER_DIR):
+        self.ledger_dir = Path(ledger_dir)
+
+    def _path(self, owner: str, repo: str) -> Path:
+        return self.ledger_dir / f"{owner}__{repo}.json"
+
+    def load(self, owner: str, repo: str) -> dict[str, LedgerEntry]:
+        """Load the entries for a repository, keyed by requirement id (e.g. "issue#12")."""
+        path = self._path(owner, repo)
+        try:
+            raw = json.loads(path.read_text(encoding="utf-8"))
+            return {key: LedgerEntry(**entry) for key, entry in raw.items()}
+        except FileNotFoundError:
+            return {}
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable requirement ledger {path}: {e}")
+            return {}
+
+    def save(self, owner: str, repo: str, entries: dict[str, LedgerEntry]) -> None:
+        """Persist the entries for a repository atomically."""
+        self.ledger_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self.ledger_dir, prefix=".tmp-")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({key: asdict(entry) for key, entry in entries.items()}, f)
+        os.replace(tmp_name, self._path(owner, repo))
+
+
+# Singleton instance
+_requirement_ledger: RequirementLedger | None = None
+
+
+def get_requirement_ledger() -> RequirementLedger:
+    """Get or create the shared requirement ledger."""
+    global _requirement_ledger
+    if _requirement_ledger is None:
+        _requirement_ledger = RequirementLedger()
+    return _requirement_ledger
@@ -0,0 +1,259 @@
+"""
+Response Analysis
+=================
+Single-pass analysis of LLM responses containing pytest code.
+
+A response is scanned once for fenced code blocks (``` or ~~~, any length,
+with or without a language tag); a block is attributed to conftest.py when
+its fence line, the line before it or its first comment names that file. Each resulting
+module is parsed with `ast` once, giving its test functions (including
+methods of Test* classes), markers and fixtures. Module analyses are
+memoized by a hash of the code, so the same code is never parsed twice.
+"""
+
+import ast
+import hashlib
+import re
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+# Memoized module analyses
+_CACHE_SIZE = 256
+
+_FENCE = re.compile(r"^\s*(?P<fence>`{3,}|~{3,})\s*(?P<lang>[\w+-]*)[^`]*$")
+_FILENAME = re.compile(r"\b([\w-]+\.py)\b")
+_PYTHON_LANGS = frozenset({"", "python", "python3", "py"})
+
+
+@dataclass
+class CodeBlock:
+    """A code block in a response."""
+
+    code: str
+    language: str = ""
+    filename: str | None = None
+
+
+@dataclass
+class ModuleAnalysis:
+    """What one parse of a pytest module found."""
+
+    code: str
+    syntax_error: str | None = None
+    test_names: list[str] = field(default_factory=list)
+    markers: list[str] = field(default_factory=list)
+    fixtures: list[str] = field(default_factory=list)
+
+    @property
+    def parses(self) -> bool:
+        return self.syntax_error is None
+
+    @property
+    def test_count(self) -> int:
+        return len(self.test_names)
+
+
+@dataclass
+class ResponseAnalysis:
+    """A response split into the test module and conftest.py, each analysed."""
+
+    module: ModuleAnalysis
+    conftest: ModuleAnalysis | None = None
+
+    @property
+    def code(self) -> str:
+        return self.module.code
+
+    @property
+    def conftest_code(self) -> str | None:
+        return self.conftest.code if self.conftest is not None else None
+
+
+def extract_code_blocks(text: str) -> list[CodeBlock]:
+    """
+    Extract the fenced code blocks of a response in one pass over its lines.
+
+    A response without fences is returned as a single block; an unclosed
+    fence (e.g. a truncated response) runs to the end of the text.
+    """
+    lines = text.splitlines()
+    blocks: list[CodeBlock] = []
+    fence: str | None = None
+    language = ""
+    previous = ""
+    body: list[str] = []
+
+    for line in lines:
+        if fence is None:
+            match = _FENCE.match(line)
+            if match:
+                fence, language, body = match["fence"], match["lang"].lower(), []
+                filename = _FILENAME.search(line) or _FILENAME.search(previous)
+            elif line.strip():
+                previous = line
+            continue
+        stripped = line.strip()
+        if stripped.startswith(fence[0] * len(fence)) and not stripped.strip(fence[0]):
+            blocks.append(_block(body, language, filename))
+            fence, previous = None, ""
+        else:
+            body.append(line)
+
+    if fence is not None:
+        blocks.append(_block(body, language, filename))
+    if not blocks and text.strip():
+        blocks.append(_block(lines, "", None))
+    return blocks
+
+
+def _block(lines: list[str], language: str, filename: re.Match | None) -> CodeBlock:
+    # Drop surrounding blank lines but keep the first line's indentation
+    while lines and not lines[0].strip():
+        lines = lines[1:]
+    while lines and not lines[-1].strip():
+        lines = lines[:-1]
+    name = filename[1] if filename else None
+    if name is None and lines and lines[0].lstrip().startswith("#"):
+        match = _FILENAME.search(lines[0])
+        name = match[1] if match else None
+    return CodeBlock("\n".join(lines), language, name)
+
+
+def collect_tests(tree: ast.Module) -> list[tuple[str, ast.FunctionDef | ast.AsyncFunctionDef]]:
+    """(qualified name, node) of module-level test functions and Test* class methods."""
+    tests = []
+    for node in tree.body:
+        if isinstance(node, ast.FunctionDef | ast.AsyncFunctionDef):
+            if node.name.startswith("test"):
+                tests.append((node.name, node))
+        elif isinstance(node, ast.ClassDef) and node.name.startswith("Test"):
+            for item in node.body:
+                if isinstance(item, ast.FunctionDef | ast.AsyncFunctionDef):
+                    if item.name.startswith("test"):
+                        tests.append((f"{node.name}.{item.name}", item))
+    return tests
+
+
+def _dotted(node: ast.expr) -> str:
+    """Dotted name of a decorator or marker expression ("pytest.mark.slow")."""
+    if isinstance(node, ast.Call):
+        node = node.func
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if isinstance(node, ast.Name):
+        parts.append(node.id)
+    return ".".join(reversed(parts))
+
+
+def _marker(node: ast.expr) -> str | None:
+    parts = _dotted(node).split(".")
+    if len(parts) >= 2 and parts[-2] == "mark":
+        return parts[-1]
+    return None
+
+
+def _fixture_name(node: ast.FunctionDef | ast.AsyncFunctionDef) -> str | None:
+    for decorator in node.decorator_list:
+        if _dotted(decorator).split(".")[-1] != "fixture":
+            continue
+        if isinstance(decorator, ast.Call):
+            for keyword in decorator.keywords:
+                if keyword.arg == "name" and isinstance(keyword.value, ast.Constant):
+                    return str(keyword.value.value)
+        return node.name
+    return None
+
+
+def _analyze(code: str) -> ModuleAnalysis:
+    try:
+        tree = ast.parse(code)
+    except SyntaxError as e:
+        return ModuleAnalysis(code=code, syntax_error=f"{e.msg} (line {e.lineno})")
+
+    markers: dict[str, None] = {}
+    fixtures: dict[str, None] = {}
+    for node in ast.walk(tree):
+        if isinstance(node, ast.FunctionDef | ast.AsyncFunctionDef | ast.ClassDef):
+            for decorator in node.decorator_list:
+                if name := _marker(decorator):
+                    markers.setdefault(name)
+            if not isinstance(node, ast.ClassDef) and (fixture := _fixture_name(node)):
+                fixtures.setdefault(fixture)
+        elif isinstance(node, ast.Assign) and any(
+            isinstance(t, ast.Name) and t.id == "pytestmark" for t in node.targets
+        ):
+            values = (
+                node.value.elts if isinstance(node.value, ast.List | ast.Tuple) else [node.value]
+            )
+            for value in values:
+                if name := _marker(value):
+                    markers.setdefault(name)
+
+    return ModuleAnalysis(
+        code=code,
+        test_names=[name for name, _ in collect_tests(tree)],
+        markers=list(markers),
+        fixtures=list(fixtures),
+    )
+
+
+_analyses: OrderedDict[str, ModuleAnalysis] = OrderedDict()
+
+
+def analyze_module(code: str) -> ModuleAnalysis:
+    """
+    Analyse a pytest module (memoized by code hash).
+
+    Args:
+        code: Module source
+
+    Returns:
+        ModuleAnalysis (with syntax_error set if the code does not parse)
+    """
+    key = hashlib.sha256(code.encode()).hexdigest()
+    analysis = _analyses.get(key)
+    if analysis is None:
+        analysis = _analyses[key] = _analyze(code)
+        if len(_analyses) > _CACHE_SIZE:
+            _analyses.popitem(last=False)
+    else:
+        _analyses.move_to_end(key)
+    return analysis
+
+
+def analyze_response(text: str, split_conftest: bool = True) -> ResponseAnalysis:
+    """
+    Split an LLM response into a test module and conftest.py and analyse both.
+
+    Python blocks that are not conftest.py are joined into the module. With
+    split_conftest=False, conftest.py blocks are treated as module code.
+
+    Args:
+        text: Raw LLM response
+        split_conftest: Return conftest.py blocks separately
+
+    Returns:
+        ResponseAnalysis
+    """
+    blocks = extract_code_blocks(text)
+    module_blocks: list[str] = []
+    conftest_blocks: list[str] = []
+    for block in blocks:
+        if block.language not in _PYTHON_LANGS:
+            continue
+        if split_conftest and block.filename == "conftest.py":
+            conftest_blocks.append(block.code)
+        else:
+            module_blocks.append(block.code)
+    if not module_blocks and not conftest_blocks and blocks:
+        module_blocks.append(blocks[0].code)  # Only non-Python tags (e.g. ```text)
+
+    conftest = analyze_module("\n\n\n".join(conftest_blocks)) if conftest_blocks else None
+    return ResponseAnalysis(module=analyze_module("\n\n\n".join(module_blocks)), conftest=conftest)
+
+
+def extract_code(text: str) -> str:
+    """The Python code of a response, without fences or surrounding prose."""
+    return analyze_response(text, split_conftest=False).code
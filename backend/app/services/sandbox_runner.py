@@ -0,0 +1,360 @@
+"""
+Sandbox Runner
+==============
+Run generated pytest modules in isolated subprocesses.
+
+Sandboxed runs execute submitted code, so they are off unless
+RUNNER_ENABLED is set. Each run gets a fresh temporary directory holding
+the module, an optional conftest.py and an empty pytest.ini (so no project
+configuration leaks in), and a `python -m pytest` subprocess with:
+- CPU-time, address-space and file-size limits (POSIX rlimits, set by a
+  small wrapper interpreter that then execs pytest, not in preexec_fn,
+  which is unsafe in a server with threads)
+- A wall-clock timeout; the whole process group is killed when it expires
+- A minimal environment without API keys or tokens
+
+Runs go through a bounded pool (one per core by default), so a batch of
+modules uses every core without oversubscribing. Per-test outcomes come
+from pytest's JUnit XML report; a run that wrote no report (e.g. pytest is
+not installed, or the process was killed) is an error, whatever its exit
+code. Results are cached by a hash of the code and run settings, so
+re-validating an unchanged module is free; runs that did not produce a
+report are not cached.
+
+The sandbox limits resources, not capabilities: generated code can still
+use the network and read files the server user can read. Run the service
+in a container when executing untrusted code.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import signal
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Literal
+
+try:
+    import resource
+except ImportError:  # Windows: no rlimits
+    resource = None
+
+logger = logging.getLogger("ai_sdlc_copilot")
+
+# Sandboxed runs execute submitted code; disabled unless set to true (override via environment)
+RUNNER_ENABLED = os.getenv("RUNNER_ENABLED", "false").lower() == "true"
+
+# Limits and pool size (override via environment)
+RUNNER_WORKERS = int(os.getenv("RUNNER_WORKERS", str(os.cpu_count() or 2)))
+RUNNER_TIMEOUT_SECONDS = float(os.getenv("RUNNER_TIMEOUT_SECONDS", "60"))
+RUNNER_CPU_SECONDS = int(os.getenv("RUNNER_CPU_SECONDS", "60"))
+RUNNER_MEMORY_MB = int(os.getenv("RUNNER_MEMORY_MB", "1024"))
+RUNNER_MAX_FILE_MB = 16
+DEFAULT_RUN_CACHE_DIR = os.getenv("RUN_CACHE_DIR", ".cache/test-runs")
+
+# Tail of the pytest output returned with a run
+MAX_OUTPUT_CHARS = 8000
+
+# Child interpreter that applies the limits to itself, then becomes pytest
+_LIMITED_PYTEST = """
+import os, resource, sys
+cpu, memory, file_size = (int(arg) for arg in sys.argv[1:4])
+resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu + 5))
+resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+resource.setrlimit(resource.RLIMIT_FSIZE, (file_size, file_size))
+resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+os.execv(sys.executable, [sys.executable, "-m", "pytest", *sys.argv[4:]])
+"""
+
+# Bumped when the runner changes in a way that invalidates cached results
+_RUNNER_VERSION = "2"
+
+RunStatus = Literal["passed", "failed", "error", "timeout"]
+TestStatus = Literal["passed", "failed", "error", "skipped"]
+
+
+@dataclass
+class TestOutcome:
+    """Result of one test."""
+
+    __test__ = False  # Not a pytest test class
+
+    nodeid: str
+    outcome: TestStatus
+    duration: float
+    message: str | None = None
+
+
+@dataclass
+class RunResult:
+    """Result of running one module."""
+
+    status: RunStatus
+    exit_code: int | None
+    duration: float
+    tests: list[TestOutcome] = field(default_factory=list)
+    output: str = ""
+    code_hash: str = ""
+    cached: bool = False
+    # False when pytest wrote no report, so the result says nothing about the code
+    reported: bool = True
+
+    def counts(self) -> dict[str, int]:
+        counts = dict.fromkeys(("passed", "failed", "error", "skipped"), 0)
+        for test in self.tests:
+            counts[test.outcome] += 1
+        return counts
+
+
+def run_key(module_name: str, code: str, conftest_code: str | None, timeout: float) -> str:
+    """Hash of everything that determines a run's result."""
+    digest = hashlib.sha256()
+    for part in (
+        _RUNNER_VERSION,
+        sys.version,
+        module_name,
+        code,
+        conftest_code or "",
+        str(timeout),
+        str(RUNNER_CPU_SECONDS),
+        str(RUNNER_MEMORY_MB),
+    ):
+        digest.update(part.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def parse_junit_xml(xml: str | bytes) -> list[TestOutcome]:
+    """
+    Per-test outcomes from a pytest JUnit XML report.
+
+    Args:
+        xml: Report contents
+
+    Returns:
+        TestOutcome per <testcase>, in report order
+    """
+    outcomes = []
+    for case in ET.fromstring(xml).iter("testcase"):
+        classname = case.get("classname", "")
+        module, _, cls = classname.partition(".")
+        nodeid = "::".join(
+            p for p in (f"{module}.py" if module else "", cls, case.get("name")) if p
+        )
+
+        outcome: TestStatus = "passed"
+        message = None
+        for tag in ("failure", "error", "skipped"):
+            child = case.find(tag)
+            if child is not None:
+                outcome = "failed" if tag == "failure" else tag
+                message = child.get("message") or (child.text or "").strip() or None
+                break
+        outcomes.append(TestOutcome(nodeid, outcome, float(case.get("time") or 0), message))
+    return outcomes
+
+
+def _pytest_command(args: list[str]) -> list[str]:
+    """Command line running pytest with args under the resource limits."""
+    if resource is None:
+        return [sys.executable, "-m", "pytest", *args]
+    limits = (
+        RUNNER_CPU_SECONDS,
+        RUNNER_MEMORY_MB * 1024 * 1024,
+        RUNNER_MAX_FILE_MB * 1024 * 1024,
+    )
+    return [sys.executable, "-c", _LIMITED_PYTEST, *map(str, limits), *args]
+
+
+def _sandbox_env(workdir: str) -> dict[str, str]:
+    return {
+        "PATH": os.environ.get("PATH", "/usr/bin:/bin"),
+        "HOME": workdir,
+        "TMPDIR": workdir,
+        "LANG": "C.UTF-8",
+        "PYTHONDONTWRITEBYTECODE": "1",
+        "PYTHONHASHSEED": "0",
+    }
+
+
+async def run_module_uncached(
+    code: str,
+    conftest_code: str | None = None,
+    module_name: str = "test_generated",
+    timeout: float = RUNNER_TIMEOUT_SECONDS,
+) -> RunResult:
+    """
+    Run one module in a subprocess sandbox (no cache, no pool).
+
+    Args:
+        code: pytest module source
+        conftest_code: Optional conftest.py source
+        module_name: Module file name (without .py)
+        timeout: Wall-clock limit in seconds
+
+    Returns:
+        RunResult
+    """
+    started = time.perf_counter()
+    with tempfile.TemporaryDirectory(prefix="pytest-run-") as workdir:
+        root = Path(workdir)
+        (root / f"{module_name}.py").write_text(code, encoding="utf-8")
+        if conftest_code:
+            (root / "conftest.py").write_text(conftest_code, encoding="utf-8")
+        (root / "pytest.ini").write_text("[pytest]\n", encoding="utf-8")
+        report = root / "report.xml"
+
+        process = await asyncio.create_subprocess_exec(
+            *_pytest_command(
+                ["-q", "-p", "no:cacheprovider", f"--junitxml={report}", f"{module_name}.py"]
+            ),
+            cwd=workdir,
+            env=_sandbox_env(workdir),
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+            start_new_session=True,
+        )
+        try:
+            stdout, _ = await asyncio.wait_for(process.communicate(), timeout)
+        except TimeoutError:
+            # Kill the whole session, including processes the tests started
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+            await process.wait()
+            return RunResult(
+                status="timeout",
+                exit_code=None,
+                duration=time.perf_counter() - started,
+                output=f"Timed out after {timeout:g}s",
+                reported=False,
+            )
+
+        output = stdout.decode("utf-8", errors="replace")[-MAX_OUTPUT_CHARS:]
+        try:
+            tests = parse_junit_xml(report.read_bytes())
+            reported = True
+        except (OSError, ET.ParseError):
+            tests = []
+            reported = False
+
+    # pytest exit codes: 0 passed, 1 tests failed, anything else is a usage/collection error.
+    # Without a report, exit code 1 is the interpreter's (e.g. "No module named pytest").
+    exit_code = process.returncode
+    status: RunStatus = {0: "passed", 1: "failed" if reported else "error"}.get(exit_code, "error")
+    if exit_code < 0:
+        output += f"\nKilled by signal {-exit_code} (resource limit exceeded?)"
+    elif not reported:
+        logger.warning(f"Sandbox run wrote no test report (exit code {exit_code})")
+    return RunResult(
+        status=status,
+        exit_code=exit_code,
+        duration=time.perf_counter() - started,
+        tests=tests,
+        output=output,
+        reported=reported,
+    )
+
+
+class TestRunner:
+    """
+    Bounded pool of sandboxed pytest runs with a result cache.
+
+    Example:
+        runner = get_test_runner()
+        result = await runner.run(code, conftest_code)
+    """
+
+    __test__ = False  # Not a pytest test class
+
+    def __init__(
+        self,
+        workers: int = RUNNER_WORKERS,
+        cache_dir: str | Path | None = DEFAULT_RUN_CACHE_DIR,
+    ):
+        """
+        Initialize the runner.
+
+        Args:
+            workers: Maximum concurrent subprocesses
+            cache_dir: Directory for cached results (None to disable caching)
+        """
+        self.workers = workers
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self._semaphore = asyncio.Semaphore(workers)
+
+    def _cache_path(self, key: str) -> Path | None:
+        return self.cache_dir / f"{key}.json" if self.cache_dir is not None else None
+
+    def _load(self, key: str) -> RunResult | None:
+        path = self._cache_path(key)
+        if path is None:
+            return None
+        try:
+            raw = json.loads(path.read_text(encoding="utf-8"))
+            raw["tests"] = [TestOutcome(**t) for t in raw["tests"]]
+            return RunResult(**raw)
+        except FileNotFoundError:
+            return None
+        except (OSError, KeyError, TypeError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable test run cache {path}: {e}")
+            return None
+
+    def _save(self, key: str, result: RunResult) -> None:
+        path = self._cache_path(key)
+        if path is None:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(asdict(result) | {"cached": False}, f)
+            os.replace(tmp_name, path)
+        except OSError as e:
+            logger.warning(f"Could not cache test run {key[:12]}: {e}")
+
+    async def run(
+        self,
+        code: str,
+        conftest_code: str | None = None,
+        module_name: str = "test_generated",
+        timeout: float = RUNNER_TIMEOUT_SECONDS,
+        use_cache: bool = True,
+    ) -> RunResult:
+        """
+        Run a module, reusing the cached result for identical code and settings.
+
+        Timeouts are not cached, since they may come from a busy host, and
+        neither are runs without a report (a missing or broken runner).
+        """
+        key = run_key(module_name, code, conftest_code, timeout)
+        if use_cache and (cached := self._load(key)) is not None:
+            cached.cached = True
+            return cached
+
+        async with self._semaphore:
+            result = await run_module_uncached(code, conftest_code, module_name, timeout)
+        result.code_hash = key
+        if result.status != "timeout" and result.reported:
+            self._save(key, result)
+        return result
+
+
+# Singleton instance
+_test_runner: TestRunner | None = None
+
+
+def get_test_runner() -> TestRunner:
+    """Get or create the shared test runner."""
+    global _test_runner
+    if _test_runner is None:
+        _test_runner = TestRunner()
+    return _test_runner
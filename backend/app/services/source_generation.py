@@ -0,0 +1,272 @@
+"""
+Source Test Generation
+======================
+Generate pytest tests for a Python source file one unit at a time.
+
+The file is split into top-level functions and classes with `ast`. Each unit
+gets its own prompt containing just its source, the imports it uses and the
+signatures of what it calls, and all units are generated concurrently (the
+LLM service enforces the provider rate limits). The per-unit test modules are
+then merged into one module with shared imports and unique test names, so a
+large file takes about as long as its slowest unit.
+"""
+
+import ast
+import asyncio
+import io
+import logging
+import re
+import tokenize
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+from app.services.code_units import CodeUnit, extract_units
+from app.services.symbol_index import SymbolIndex
+
+logger = logging.getLogger("ai_sdlc_copilot")
+
+_SOURCE_SPEC_PATTERN = re.compile(
+    r"^(?P<owner>[\w.-]+)/(?P<repo>[\w.-]+)/(?P<path>[^@]+\.py)(?:@(?P<ref>[^@\s]+))?$"
+)
+
+
+@dataclass(frozen=True)
+class SourceSpec:
+    """A Python file in a GitHub repository, as `owner/repo/path@ref`."""
+
+    owner: str
+    repo: str
+    path: str
+    ref: str | None = None
+
+    @property
+    def module_path(self) -> str:
+        """Dotted import path of the file (a leading `src/` is dropped)."""
+        parts = self.path.removesuffix(".py").split("/")
+        if parts[0] == "src" and len(parts) > 1:
+            parts = parts[1:]
+        if parts[-1] == "__init__" and len(parts) > 1:
+            parts = parts[:-1]
+        return ".".join(parts)
+
+
+@dataclass
+class UnitTarget:
+    """A unit to generate tests for, with its prompt context."""
+
+    unit: CodeUnit
+    context: str
+
+
+@dataclass
+class UnitTests:
+    """Generated tests for one unit (or the reason there are none)."""
+
+    name: str
+    kind: str
+    code: str = ""
+    error: str | None = None
+
+
+# Produces cleaned pytest code for one unit
+UnitTestGenerator = Callable[[UnitTarget], Awaitable[str]]
+
+
+def parse_source_spec(spec: str) -> SourceSpec:
+    """
+    Parse an `owner/repo/path/to/file.py@ref` source reference.
+
+    Args:
+        spec: Source reference (the `@ref` part is optional)
+
+    Returns:
+        SourceSpec
+
+    Raises:
+        ValueError: If the reference is malformed or not a Python file
+    """
+    match = _SOURCE_SPEC_PATTERN.match(spec.strip())
+    if not match:
+        raise ValueError(f"Invalid source reference (expected owner/repo/path.py@ref): {spec}")
+    return SourceSpec(**match.groupdict())
+
+
+def plan_units(
+    source: str,
+    path: str,
+    names: list[str] | None = None,
+    include_private: bool = False,
+) -> list[UnitTarget]:
+    """
+    Split a file into units and build the prompt context for each.
+
+    Args:
+        source: Python source of the file
+        path: Path of the file in the repository
+        names: Only these units (all public units if not specified)
+        include_private: Also include units whose name starts with an underscore
+
+    Returns:
+        UnitTargets in source order
+
+    Raises:
+        SyntaxError: If the source cannot be parsed
+    """
+    units = extract_units(source)
+    if names is not None:
+        wanted = set(names)
+        units = [u for u in units if u.name in wanted]
+    elif not include_private:
+        units = [u for u in units if not u.name.startswith("_")]
+
+    index = SymbolIndex.build({path: source})
+    return [UnitTarget(unit=u, context=index.context_for(u.name, path)) for u in units]
+
+
+async def generate_unit_tests(
+    targets: list[UnitTarget],
+    generate: UnitTestGenerator,
+) -> list[UnitTests]:
+    """
+    Generate tests for all units concurrently.
+
+    A unit whose generation fails, or whose output does not parse, is
+    reported with an error instead of failing the whole file.
+
+    Args:
+        targets: Units to generate tests for
+        generate: Coroutine producing pytest code for a unit
+
+    Returns:
+        UnitTests in the same order as targets
+    """
+
+    async def _generate(target: UnitTarget) -> UnitTests:
+        unit = target.unit
+        try:
+            code = await generate(target)
+            ast.parse(code)
+        except SyntaxError as e:
+            logger.warning(f"Generated tests for {unit.name} do not parse: {e}")
+            return UnitTests(unit.name, unit.kind, error=f"Generated code is invalid: {e.msg}")
+        except Exception as e:
+            logger.error(f"Test generation for {unit.name} failed: {e}")
+            return UnitTests(unit.name, unit.kind, error=str(e))
+        return UnitTests(unit.name, unit.kind, code=code)
+
+    return list(await asyncio.gather(*(_generate(t) for t in targets)))
+
+
+def _top_level_name(node: ast.stmt) -> str | None:
+    """Name a top-level statement defines (def, class or single-name assignment)."""
+    if isinstance(node, ast.FunctionDef | ast.AsyncFunctionDef | ast.ClassDef):
+        return node.name
+    if isinstance(node, ast.Assign) and len(node.targets) == 1:
+        target = node.targets[0]
+        if isinstance(target, ast.Name):
+            return target.id
+    if isinstance(node, ast.AnnAssign) and isinstance(node.target, ast.Name):
+        return node.target.id
+    return None
+
+
+def _rename_names(segment: str, renames: dict[str, str]) -> str:
+    """
+    Rename references to top-level names in a statement's source.
+
+    Only identifiers are renamed: the statement's own name, names used as
+    variables and parameter names (fixture requests). Attributes, keyword
+    argument names and text inside strings or comments are left alone.
+    """
+    tree = ast.parse(segment)
+    positions = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and node.id in renames:
+            positions.add((node.lineno, node.col_offset))
+        elif isinstance(node, ast.arg) and node.arg in renames:
+            positions.add((node.lineno, node.col_offset))
+
+    lines = segment.splitlines(keepends=True)
+    edits = []
+    previous = None
+    for token in tokenize.generate_tokens(io.StringIO(segment).readline):
+        if token.type == tokenize.NAME and token.string in renames:
+            defines = previous is not None and previous.string in ("def", "class")
+            if defines or token.start in positions:
+                edits.append(token)
+        if token.type not in (tokenize.NL, tokenize.COMMENT):
+            previous = token
+    for token in reversed(edits):
+        row, col = token.start
+        line = lines[row - 1]
+        lines[row - 1] = line[:col] + renames[token.string] + line[col + len(token.string) :]
+    return "".join(lines)
+
+
+def merge_test_modules(modules: list[str], docstring: str = "") -> str:
+    """
+    Merge several pytest modules into one.
+
+    Imports are de-duplicated and hoisted to the top. Definitions repeated
+    verbatim (e.g. the same fixture generated for two units) are kept once;
+    different definitions with the same name are renamed with a numeric
+    suffix, along with the references to them in their own module.
+
+    Args:
+        modules: Source of each module (must parse)
+        docstring: Module docstring for the merged module
+
+    Returns:
+        Merged module source
+    """
+    future_imports: dict[str, None] = {}
+    imports: dict[str, None] = {}
+    definitions: dict[str, str] = {}
+    segments: list[str] = []
+
+    for module in modules:
+        tree = ast.parse(module)
+        lines = module.splitlines(keepends=True)
+        body = tree.body
+        if ast.get_docstring(tree) is not None:
+            body = body[1:]
+
+        pending: list[tuple[str | None, str]] = []
+        for node in body:
+            if isinstance(node, ast.ImportFrom) and node.module == "__future__":
+                future_imports.setdefault(ast.unparse(node))
+                continue
+            if isinstance(node, ast.Import | ast.ImportFrom):
+                imports.setdefault(ast.unparse(node))
+                continue
+            decorators = getattr(node, "decorator_list", [])
+            start = min([node.lineno, *(d.lineno for d in decorators)])
+            end = node.end_lineno or node.lineno
+            pending.append((_top_level_name(node), "".join(lines[start - 1 : end]).rstrip()))
+
+        # Rename clashing definitions before adding this module's segments
+        renames: dict[str, str] = {}
+        for name, segment in pending:
+            if name is None or name not in definitions or definitions[name] == segment:
+                continue
+            suffix = 2
+            while f"{name}_{suffix}" in definitions or f"{name}_{suffix}" in renames.values():
+                suffix += 1
+            renames[name] = f"{name}_{suffix}"
+
+        for name, segment in pending:
+            if name is not None and name not in renames and definitions.get(name) == segment:
+                continue  # Identical duplicate
+            if renames:
+                segment = _rename_names(segment, renames)
+                name = renames.get(name, name) if name is not None else None
+            if name is not None:
+                definitions[name] = segment
+            segments.append(segment)
+
+    header = [f'"""{docstring}"""'] if docstring else []
+    if future_imports or imports:
+        header.append("\n".join([*future_imports, *imports]))
+    parts = ["\n\n".join(header)] if header else []
+    parts.extend(segments)
+    return "\n\n\n".join(parts) + "\n"
@@ -0,0 +1,347 @@
+"""
+Symbol Index
+============
+Local `ast` index over Python files fetched from GitHub.
+
+The index records functions, classes and methods with their signatures,
+docstrings, imports and call edges, so prompts can include just the target
+symbol and its direct dependencies instead of whole files. Indexes are kept
+per commit SHA, since a commit's contents never change.
+"""
+
+import ast
+import logging
+from collections import OrderedDict, defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from typing import Literal
+
+from app.services.github_service import GitHubService
+
+logger = logging.getLogger("ai_sdlc_copilot")
+
+SymbolKind = Literal["function", "class", "method"]
+
+
+@dataclass(frozen=True)
+class Symbol:
+    """A function, class or method defined in an indexed file."""
+
+    name: str
+    qualname: str
+    kind: SymbolKind
+    path: str
+    lineno: int
+    end_lineno: int
+    signature: str
+    docstring: str | None
+    source: str
+    calls: tuple[str, ...] = ()
+    names: frozenset[str] = frozenset()
+
+
+@dataclass
+class ModuleImports:
+    """Import statements of a file, keyed by the name each one binds."""
+
+    path: str
+    # bound name -> import statement source
+    bindings: dict[str, str] = field(default_factory=dict)
+
+
+def _signature(node: ast.FunctionDef | ast.AsyncFunctionDef | ast.ClassDef) -> str:
+    """Render a one-line signature for a definition."""
+    if isinstance(node, ast.ClassDef):
+        bases = ", ".join(ast.unparse(b) for b in node.bases)
+        return f"class {node.name}({bases})" if bases else f"class {node.name}"
+
+    prefix = "async def" if isinstance(node, ast.AsyncFunctionDef) else "def"
+    returns = f" -> {ast.unparse(node.returns)}" if node.returns else ""
+    return f"{prefix} {node.name}({ast.unparse(node.args)}){returns}"
+
+
+def _called_names(node: ast.AST) -> tuple[str, ...]:
+    """Names of everything called inside a node (foo(), obj.foo(), self.foo())."""
+    calls: dict[str, None] = {}
+    for child in ast.walk(node):
+        if isinstance(child, ast.Call):
+            func = child.func
+            if isinstance(func, ast.Name):
+                calls[func.id] = None
+            elif isinstance(func, ast.Attribute):
+                calls[func.attr] = None
+    return tuple(calls)
+
+
+def _referenced_names(node: ast.AST) -> frozenset[str]:
+    """Top-level names referenced inside a node (used to pick relevant imports)."""
+    names = set()
+    for child in ast.walk(node):
+        if isinstance(child, ast.Name):
+            names.add(child.id)
+        elif isinstance(child, ast.Attribute):
+            root = child.value
+            while isinstance(root, ast.Attribute):
+                root = root.value
+            if isinstance(root, ast.Name):
+                names.add(root.id)
+    return frozenset(names)
+
+
+class SymbolIndex:
+    """
+    In-memory index of symbols across a set of Python files.
+
+    Example:
+        index = SymbolIndex.build({"app/math.py": source})
+        context = index.context_for("add")
+    """
+
+    def __init__(self):
+        self._by_name: dict[str, list[Symbol]] = defaultdict(list)
+        self._by_qualname: dict[tuple[str, str], Symbol] = {}
+        self._imports: dict[str, ModuleImports] = {}
+
+    @classmethod
+    def build(cls, files: dict[str, str] | Iterable[tuple[str, str]]) -> "SymbolIndex":
+        """
+        Build an index from (path, source) pairs.
+
+        Files that fail to parse are skipped with a warning.
+        """
+        index = cls()
+        items = files.items() if isinstance(files, dict) else files
+        for path, source in items:
+            try:
+                index.add_file(path, source)
+            except SyntaxError as e:
+                logger.warning(f"Not indexing {path}: {e}")
+        return index
+
+    def __len__(self) -> int:
+        return len(self._by_qualname)
+
+    @property
+    def paths(self) -> list[str]:
+        """Indexed file paths."""
+        return list(self._imports)
+
+    def add_file(self, path: str, source: str) -> None:
+        """Parse a file and add its imports and definitions to the index."""
+        tree = ast.parse(source)
+        lines = source.splitlines(keepends=True)
+
+        imports = ModuleImports(path=path)
+        for node in tree.body:
+            if isinstance(node, ast.Import | ast.ImportFrom):
+                statement = ast.unparse(node)
+                for alias in node.names:
+                    bound = alias.asname or alias.name.split(".")[0]
+                    imports.bindings[bound] = statement
+        self._imports[path] = imports
+
+        def _add(
+            node: ast.FunctionDef | ast.AsyncFunctionDef | ast.ClassDef,
+            kind: SymbolKind,
+            qualname: str,
+        ) -> None:
+            start = min([node.lineno, *(d.lineno for d in node.decorator_list)])
+            end = node.end_lineno or node.lineno
+            symbol = Symbol(
+                name=node.name,
+                qualname=qualname,
+                kind=kind,
+                path=path,
+                lineno=start,
+                end_lineno=end,
+                signature=_signature(node),
+                docstring=ast.get_docstring(node),
+                source="".join(lines[start - 1 : end]),
+                calls=_called_names(node),
+                names=_referenced_names(node),
+            )
+            self._by_name[node.name].append(symbol)
+            self._by_qualname[(path, qualname)] = symbol
+
+        for node in tree.body:
+            if isinstance(node, ast.FunctionDef | ast.AsyncFunctionDef):
+                _add(node, "function", node.name)
+            elif isinstance(node, ast.ClassDef):
+                _add(node, "class", node.name)
+                for item in node.body:
+                    if isinstance(item, ast.FunctionDef | ast.AsyncFunctionDef):
+                        _add(item, "method", f"{node.name}.{item.name}")
+
+    def find(self, name: str, path: str | None = None) -> list[Symbol]:
+        """
+        Look up symbols by name or qualified name (e.g. "Cart.total").
+
+        Args:
+            name: Symbol name or Class.method qualname
+            path: Restrict matches to one file
+
+        Returns:
+            Matching symbols
+        """
+        if "." in name:
+            matches = [s for s in self._by_qualname.values() if s.qualname == name]
+        else:
+            matches = list(self._by_name.get(name, []))
+        if path is not None:
+            matches = [s for s in matches if s.path == path]
+        return matches
+
+    def dependencies(self, symbol: Symbol) -> list[Symbol]:
+        """
+        Resolve a symbol's direct callees within the index.
+
+        Resolution prefers definitions in the same file (including methods
+        of the same class), then names the file imports, then a unique
+        match anywhere in the index.
+        """
+        imports = self._imports.get(symbol.path, ModuleImports(symbol.path)).bindings
+        owner_class = symbol.qualname.rsplit(".", 1)[0] if symbol.kind == "method" else None
+        resolved: dict[tuple[str, str], Symbol] = {}
+
+        for name in symbol.calls:
+            candidates = [s for s in self._by_name.get(name, []) if s is not symbol]
+            if not candidates:
+                continue
+
+            same_class = [
+                s for s in candidates if owner_class and s.qualname == f"{owner_class}.{name}"
+            ]
+            same_file = [s for s in candidates if s.path == symbol.path and s.kind != "method"]
+            if same_class or same_file:
+                chosen = (same_class or same_file)[0]
+            elif name in imports:
+                chosen = next((s for s in candidates if s.kind != "method"), candidates[0])
+            elif len(candidates) == 1:
+                chosen = candidates[0]
+            else:
+                continue  # Ambiguous - better to leave it out than guess
+
+            resolved[(chosen.path, chosen.qualname)] = chosen
+
+        return list(resolved.values())
+
+    def context_for(self, name: str, path: str | None = None) -> str:
+        """
+        Build a compact prompt context for a symbol.
+
+        Includes the imports the target uses, the target's full source and
+        the signatures and docstrings of its direct dependencies.
+
+        Args:
+            name: Symbol name or Class.method qualname
+            path: Restrict the lookup to one file
+
+        Returns:
+            Context text (empty if the symbol is not indexed)
+        """
+        targets = self.find(name, path)
+        if not targets:
+            return ""
+
+        sections = []
+        for target in targets:
+            bindings = self._imports.get(target.path, ModuleImports(target.path)).bindings
+            used_imports = sorted({bindings[n] for n in target.names if n in bindings})
+
+            parts = [f"# {target.path}"]
+            parts.extend(used_imports)
+            if used_imports:
+                parts.append("")
+            parts.append(target.source.rstrip())
+
+            dependencies = self.dependencies(target)
+            if dependencies:
+                parts.append("")
+                parts.append("# Direct dependencies")
+                for dep in dependencies:
+                    doc = f'\n    """{dep.docstring}"""' if dep.docstring else ""
+                    parts.append(f"# {dep.path}:{dep.lineno}\n{dep.signature}:{doc}\n    ...")
+
+            sections.append("\n".join(parts))
+
+        return "\n\n".join(sections)
+
+
+class SymbolIndexStore:
+    """LRU of symbol indexes keyed by (owner, repo, commit SHA, path)."""
+
+    def __init__(self, max_indexes: int = 16):
+        self.max_indexes = max_indexes
+        self._indexes: OrderedDict[tuple[str, ...], SymbolIndex] = OrderedDict()
+
+    def get(self, key: tuple[str, ...]) -> SymbolIndex | None:
+        index = self._indexes.get(key)
+        if index is not None:
+            self._indexes.move_to_end(key)
+        return index
+
+    def put(self, key: tuple[str, ...], index: SymbolIndex) -> None:
+        self._indexes[key] = index
+        self._indexes.move_to_end(key)
+        while len(self._indexes) > self.max_indexes:
+            self._indexes.popitem(last=False)
+
+
+async def get_repository_index(
+    service: GitHubService,
+    owner: str,
+    repo: str,
+    ref: str | None = None,
+    path: str = "",
+    max_files: int = 200,
+) -> tuple[str, SymbolIndex]:
+    """
+    Get the symbol index for a repository at a commit, building it if needed.
+
+    Files come through the blob cache, so rebuilding for a new commit only
+    downloads the files that changed.
+
+    Args:
+        service: GitHub service for the caller's token
+        owner: Repository owner
+        repo: Repository name
+        ref: Branch, tag or commit (default branch if not specified)
+        path: Only index files under this directory
+        max_files: Maximum number of files to index
+
+    Returns:
+        Tuple of (commit SHA, SymbolIndex)
+    """
+    # Resolving the commit goes through the caller's token, so a cached index
+    # is only reachable by callers that can see the repository
+    commit_sha = await service.get_commit_sha(owner, repo, ref)
+    store = get_symbol_index_store()
+    key = (owner, repo, commit_sha, path)
+
+    index = store.get(key)
+    if index is None:
+        entries = await service.find_python_entries(owner, repo, path, commit_sha, max_files)
+        files = await service.get_files_from_entries(owner, repo, entries, commit_sha)
+        sources = []
+        for file in files:
+            try:
+                sources.append((file.path, file.content))
+            except UnicodeDecodeError:
+                logger.warning(f"Not indexing {file.path}: not valid UTF-8")
+        index = SymbolIndex.build(sources)
+        store.put(key, index)
+        logger.info(f"Indexed {len(index)} symbols from {owner}/{repo}@{commit_sha[:7]}")
+
+    return commit_sha, index
+
+
+# Singleton instance
+_symbol_index_store: SymbolIndexStore | None = None
+
+
+def get_symbol_index_store() -> SymbolIndexStore:
+    """Get or create the shared symbol index store."""
+    global _symbol_index_store
+    if _symbol_index_store is None:
+        _symbol_index_store = SymbolIndexStore()
+    return _symbol_index_store
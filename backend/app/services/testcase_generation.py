@@ -0,0 +1,387 @@
+"""
+Test Case Generation
+====================
+Shared LLM call and response parsing for structured (JSON) test cases,
+used by the single-requirement endpoint and batch ingestion.
+
+Several personas can generate for the same requirement concurrently; their
+test cases are merged locally, so covering a requirement from five angles
+takes the wall time of one call.
+
+LLMs often return rephrasings of the same test case. Every generation
+flow runs the parsed cases through dedupe_test_cases(), which compares
+title, steps and expected result as hashed n-gram vectors (see
+text_vectors) and drops or flags near-duplicates before they cost pytest
+generation tokens downstream.
+
+Accepted test cases are kept in a local vector index keyed by their
+requirement (see vector_index). Generation looks up the requirements most
+similar to the new one and shows their accepted test cases to the LLM as
+few-shot examples, so output follows what the team has already approved.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+
+from app.models.testcase import DuplicateMode, TestCase
+from app.prompts.testcase_prompt import (
+    DEFAULT_PERSONA,
+    get_system_prompt,
+    get_testcase_generation_prompt,
+)
+from app.services.llm_service import get_llm_service
+from app.services.text_vectors import HashingVectorizer, NearDuplicate, find_near_duplicates
+from app.services.vector_index import VectorIndex
+
+logger = logging.getLogger("ai_sdlc_copilot")
+
+# Cosine similarity at which two test cases are duplicates (override via environment)
+TESTCASE_DUPLICATE_THRESHOLD = float(os.getenv("TESTCASE_DUPLICATE_THRESHOLD", "0.8"))
+
+# Accepted test cases used as few-shot examples (override via environment)
+DEFAULT_EXAMPLE_INDEX_DIR = os.getenv("EXAMPLE_INDEX_DIR", ".cache/examples")
+FEW_SHOT_EXAMPLES = int(os.getenv("FEW_SHOT_EXAMPLES", "2"))
+FEW_SHOT_MIN_SIMILARITY = float(os.getenv("FEW_SHOT_MIN_SIMILARITY", "0.3"))
+# Test cases shown per example, to bound the prompt size
+FEW_SHOT_CASES_PER_EXAMPLE = 3
+
+_WHITESPACE = re.compile(r"\s+")
+
+_example_index: VectorIndex | None = None
+
+
+def get_example_index() -> VectorIndex:
+    """Get or create the index of accepted test cases."""
+    global _example_index
+    if _example_index is None:
+        _example_index = VectorIndex(DEFAULT_EXAMPLE_INDEX_DIR)
+    return _example_index
+
+
+def accept_test_cases(requirement: str, test_cases: list[TestCase], context: str = "") -> str:
+    """
+    Store accepted test cases as a few-shot example for similar requirements.
+
+    Accepting test cases for the same requirement again replaces them.
+
+    Args:
+        requirement: The requirement the test cases were written for
+        test_cases: The accepted test cases
+        context: Additional context about the system
+
+    Returns:
+        Example key (a hash of the requirement)
+    """
+    normalized = _WHITESPACE.sub(" ", requirement).strip().lower()
+    key = hashlib.sha256(normalized.encode()).hexdigest()
+    get_example_index().add(
+        key,
+        requirement,
+        {
+            "requirement": requirement,
+            "context": context,
+            "test_cases": [tc.model_dump(mode="json", exclude_none=True) for tc in test_cases],
+        },
+    )
+    return key
+
+
+def find_examples(
+    requirement: str,
+    k: int = FEW_SHOT_EXAMPLES,
+    min_similarity: float = FEW_SHOT_MIN_SIMILARITY,
+) -> list[dict]:
+    """
+    Find accepted test cases of the requirements most similar to a requirement.
+
+    Args:
+        requirement: The requirement to generate test cases for
+        k: Maximum number of examples
+        min_similarity: Minimum cosine similarity of an example's requirement
+
+    Returns:
+        Examples, most similar first: {"key", "requirement", "similarity", "test_cases"}
+    """
+    return [
+        {
+            "key": hit.key,
+            "requirement": hit.payload["requirement"],
+            "similarity": hit.score,
+            "test_cases": hit.payload["test_cases"][:FEW_SHOT_CASES_PER_EXAMPLE],
+        }
+        for hit in get_example_index().search(requirement, k, min_similarity)
+    ]
+
+
+def parse_test_cases(response_text: str) -> list[TestCase]:
+    """
+    Parse an LLM JSON response into test cases.
+
+    Invalid entries are skipped with a warning.
+
+    Args:
+        response_text: Raw LLM response (optionally wrapped in a code fence)
+
+    Returns:
+        List of valid TestCase objects (may be empty)
+
+    Raises:
+        json.JSONDecodeError: If the response is not valid JSON
+    """
+    # Clean up response (remove markdown code blocks if present)
+    cleaned = response_text.strip()
+    if cleaned.startswith("```"):
+        # Remove ```json and ``` markers
+        lines = cleaned.split("\n")
+        cleaned = "\n".join(lines[1:-1])
+
+    data = json.loads(cleaned)
+
+    test_cases = []
+    for tc_data in data.get("test_cases", []):
+        try:
+            test_case = TestCase(
+                id=tc_data.get("id", f"TC{len(test_cases)+1:03d}"),
+                title=tc_data.get("title", "Untitled"),
+                description=tc_data.get("description", ""),
+                preconditions=tc_data.get("preconditions", []),
+                steps=tc_data.get("steps", []),
+                expected_result=tc_data.get("expected_result", ""),
+                priority=tc_data.get("priority", "medium"),
+                test_type=tc_data.get("test_type", "functional"),
+            )
+            test_cases.append(test_case)
+        except Exception as e:
+            logger.warning(f"Skipping invalid test case: {e}")
+            continue
+
+    return test_cases
+
+
+async def generate_test_cases(
+    requirement: str,
+    context: str = "",
+    num_cases: int = 5,
+    include_edge_cases: bool = True,
+    system_prompt: str | None = None,
+    persona: str = DEFAULT_PERSONA,
+    duplicates: DuplicateMode = "drop",
+    examples: list[dict] | None = None,
+) -> list[TestCase]:
+    """
+    Generate structured test cases for a requirement.
+
+    Args:
+        requirement: The requirement or user story
+        context: Additional context about the system
+        num_cases: Number of test cases to generate
+        include_edge_cases: Include edge case and negative scenarios
+        system_prompt: Override the persona's system prompt
+        persona: Persona whose system prompt is used
+        duplicates: What to do with near-duplicate test cases (see dedupe_test_cases())
+        examples: Few-shot examples (see find_examples())
+
+    Returns:
+        List of TestCase objects
+
+    Raises:
+        ValueError: If the LLM response is not valid JSON or has no valid test cases
+    """
+    llm = get_llm_service()
+    prompt = get_testcase_generation_prompt(
+        requirement=requirement,
+        num_cases=num_cases,
+        include_edge_cases=include_edge_cases,
+        context=context,
+        output_format="json",
+        examples=examples,
+    )
+    response_text = await llm.generate(
+        prompt=prompt,
+        system_prompt=get_system_prompt(persona, system_prompt),
+        max_tokens=4096,
+        temperature=0.7,
+    )
+
+    try:
+        test_cases = parse_test_cases(response_text)
+    except json.JSONDecodeError as e:
+        logger.error(f"Failed to parse LLM response as JSON: {e}")
+        raise ValueError(f"LLM returned invalid JSON: {e}") from None
+
+    if not test_cases:
+        raise ValueError("No valid test cases could be generated")
+    test_cases, _ = dedupe_test_cases(test_cases, duplicates)
+    return test_cases
+
+
+def _case_text(test_case: TestCase) -> str:
+    """The text two test cases are compared on."""
+    return " ".join([test_case.title, *test_case.steps, test_case.expected_result])
+
+
+def find_duplicate_test_cases(
+    test_cases: list[TestCase],
+    threshold: float = TESTCASE_DUPLICATE_THRESHOLD,
+) -> list[NearDuplicate]:
+    """
+    Find test cases that are near-duplicates of an earlier one.
+
+    Args:
+        test_cases: Test cases, in priority order (earlier cases are kept)
+        threshold: Cosine similarity at which a case is a duplicate
+
+    Returns:
+        NearDuplicate per duplicate, with indexes into test_cases
+    """
+    if len(test_cases) < 2:
+        return []
+    vectors = HashingVectorizer().transform(_case_text(tc) for tc in test_cases)
+    return find_near_duplicates(vectors, threshold)
+
+
+def dedupe_test_cases(
+    test_cases: list[TestCase],
+    mode: DuplicateMode = "drop",
+    threshold: float = TESTCASE_DUPLICATE_THRESHOLD,
+) -> tuple[list[TestCase], int]:
+    """
+    Drop or flag near-duplicate test cases.
+
+    With "drop" duplicates are removed and the rest renumbered TC001,
+    TC002, ...; with "flag" every case is kept and each duplicate's
+    duplicate_of names the case it repeats; "keep" changes nothing.
+
+    Args:
+        test_cases: Test cases, in priority order (earlier cases are kept)
+        mode: "drop", "flag" or "keep"
+        threshold: Cosine similarity at which a case is a duplicate
+
+    Returns:
+        (test cases, number of duplicates dropped or flagged)
+    """
+    if mode == "keep":
+        return test_cases, 0
+    duplicates = find_duplicate_test_cases(test_cases, threshold)
+    if mode == "flag":
+        flagged = list(test_cases)
+        for d in duplicates:
+            flagged[d.index] = flagged[d.index].model_copy(
+                update={"duplicate_of": test_cases[d.duplicate_of].id}
+            )
+        return flagged, len(duplicates)
+
+    dropped = {d.index for d in duplicates}
+    if not dropped:
+        return test_cases, 0
+    kept = [tc for i, tc in enumerate(test_cases) if i not in dropped]
+    return renumber_test_cases(kept), len(dropped)
+
+
+def renumber_test_cases(test_cases: list[TestCase]) -> list[TestCase]:
+    """Number test cases TC001, TC002, ... (duplicate_of references follow)."""
+    ids = {tc.id: f"TC{i:03d}" for i, tc in reversed(list(enumerate(test_cases, 1)))}
+    return [
+        tc.model_copy(
+            update={
+                "id": f"TC{i:03d}",
+                "duplicate_of": ids.get(tc.duplicate_of) if tc.duplicate_of else None,
+            }
+        )
+        for i, tc in enumerate(test_cases, 1)
+    ]
+
+
+def merge_test_cases(
+    results: dict[str, list[TestCase]],
+    duplicates: DuplicateMode = "drop",
+    threshold: float = TESTCASE_DUPLICATE_THRESHOLD,
+) -> tuple[list[TestCase], int]:
+    """
+    Merge the test cases of several personas into one list.
+
+    Cases are taken in persona order, tagged with their persona and
+    renumbered TC001, TC002, ...; near-duplicates of an earlier case
+    (within or across personas) are then dropped or flagged.
+
+    Args:
+        results: Persona -> its test cases
+        duplicates: What to do with near-duplicates (see dedupe_test_cases())
+        threshold: Cosine similarity at which a case is a duplicate
+
+    Returns:
+        (merged test cases, number of duplicates dropped or flagged)
+    """
+    tagged = [
+        test_case.model_copy(update={"persona": persona, "duplicate_of": None})
+        for persona, test_cases in results.items()
+        for test_case in test_cases
+    ]
+    return dedupe_test_cases(renumber_test_cases(tagged), duplicates, threshold)
+
+
+async def generate_multi_persona_test_cases(
+    requirement: str,
+    personas: list[str],
+    context: str = "",
+    num_cases: int = 5,
+    include_edge_cases: bool = True,
+    duplicates: DuplicateMode = "drop",
+    examples: list[dict] | None = None,
+) -> tuple[list[TestCase], int, list[str]]:
+    """
+    Generate test cases with several personas concurrently and merge them.
+
+    A persona that fails is logged and left out of the merge.
+
+    Args:
+        requirement: The requirement or user story
+        personas: Personas to generate with (duplicates are ignored)
+        context: Additional context about the system
+        num_cases: Test cases per persona
+        include_edge_cases: Include edge case and negative scenarios
+        duplicates: What to do with near-duplicates (see dedupe_test_cases())
+        examples: Few-shot examples shared by every persona (see find_examples())
+
+    Returns:
+        (merged test cases, duplicates dropped or flagged, personas that failed)
+
+    Raises:
+        ValueError: If every persona failed
+    """
+    personas = list(dict.fromkeys(personas))
+    outcomes = await asyncio.gather(
+        *(
+            generate_test_cases(
+                requirement=requirement,
+                context=context,
+                num_cases=num_cases,
+                include_edge_cases=include_edge_cases,
+                persona=persona,
+                duplicates="keep",  # Deduplicated once, after merging
+                examples=examples,
+            )
+            for persona in personas
+        ),
+        return_exceptions=True,
+    )
+
+    results: dict[str, list[TestCase]] = {}
+    failed: list[str] = []
+    for persona, outcome in zip(personas, outcomes, strict=True):
+        if isinstance(outcome, BaseException):
+            if not isinstance(outcome, Exception):
+                raise outcome  # Cancellation
+            logger.warning(f"Test case generation as {persona} failed: {outcome}")
+            failed.append(persona)
+        else:
+            results[persona] = outcome
+    if not results:
+        raise ValueError(f"Test case generation failed for every persona: {', '.join(failed)}")
+
+    merged, count = merge_test_cases(results, duplicates)
+    return merged, count, failed
@@ -0,0 +1,146 @@
+"""
+Text Vectors
+============
+Hashed n-gram vectors and batched cosine similarity with NumPy.
+
+Texts are turned into fixed-size vectors without a vocabulary: every word
+unigram and bigram is hashed (CRC32, so vectors are stable across
+processes) into one of `dim` buckets with a hash-derived sign, counts are
+log-scaled and each vector is L2-normalized. The dot product of two
+vectors is then their cosine similarity, and similarities for a whole
+batch are one matrix product.
+
+Near-duplicate search compares rows in blocks, so memory stays at
+block_size x n floats however many texts there are.
+"""
+
+import re
+import zlib
+from collections.abc import Iterable
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+
+DEFAULT_DIM = 1024
+
+# Rows compared per matrix product in find_near_duplicates()
+DEFAULT_BLOCK_SIZE = 512
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+@dataclass(frozen=True)
+class NearDuplicate:
+    """A text that is a near-duplicate of an earlier one."""
+
+    index: int
+    duplicate_of: int
+    similarity: float
+
+
+def features(text: str) -> list[str]:
+    """Word unigrams and bigrams of a text (lowercased)."""
+    words = _WORD_PATTERN.findall(text.lower())
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:], strict=False)]
+
+
+@lru_cache(maxsize=65536)
+def _hash(feature: str) -> int:
+    return zlib.crc32(feature.encode())
+
+
+class HashingVectorizer:
+    """
+    Vocabulary-free text vectorizer.
+
+    Vectors are only comparable between vectorizers with the same dim.
+
+    Example:
+        vectors = HashingVectorizer().transform(["log in", "sign in"])
+        similarities = vectors @ vectors.T
+    """
+
+    def __init__(self, dim: int = DEFAULT_DIM):
+        """
+        Initialize the vectorizer.
+
+        Args:
+            dim: Vector size (number of hash buckets)
+        """
+        self.dim = dim
+
+    def transform(self, texts: Iterable[str]) -> np.ndarray:
+        """
+        Vectorize texts.
+
+        Args:
+            texts: Input texts
+
+        Returns:
+            float32 array of shape (len(texts), dim) with L2-normalized rows
+            (all-zero for texts without words)
+        """
+        rows: list[int] = []
+        hashes: list[int] = []
+        count = 0
+        for row, text in enumerate(texts):
+            count += 1
+            text_hashes = [_hash(feature) for feature in features(text)]
+            hashes.extend(text_hashes)
+            rows.extend([row] * len(text_hashes))
+
+        # Work on the non-zero cells only, then scatter them into the dense matrix
+        h = np.array(hashes, dtype=np.int64)
+        cells, index = np.unique(
+            np.array(rows, dtype=np.int64) * self.dim + h % self.dim, return_inverse=True
+        )
+        values = np.bincount(index, weights=np.where(h & 0x80000000, 1.0, -1.0))
+        # Sublinear counts, so a repeated word does not dominate
+        values = np.sign(values) * np.log1p(np.abs(values))
+        cell_rows = cells // self.dim
+        norms = np.sqrt(np.bincount(cell_rows, weights=values**2, minlength=count))
+        values = np.divide(values, norms[cell_rows], out=np.zeros_like(values), where=values != 0)
+
+        matrix = np.zeros((count, self.dim), dtype=np.float32)
+        matrix.flat[cells] = values
+        return matrix
+
+
+def find_near_duplicates(
+    vectors: np.ndarray,
+    threshold: float,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+) -> list[NearDuplicate]:
+    """
+    Find rows that are near-duplicates of an earlier row.
+
+    Rows are considered in order; a row is a duplicate when its cosine
+    similarity to an earlier row that is not itself a duplicate reaches the
+    threshold. It is reported against the most similar such row.
+
+    Args:
+        vectors: L2-normalized rows (see HashingVectorizer.transform())
+        threshold: Cosine similarity at or above which rows are duplicates
+        block_size: Rows compared per matrix product
+
+    Returns:
+        NearDuplicate per duplicate row, in row order
+    """
+    n = len(vectors)
+    kept = np.ones(n, dtype=bool)
+    duplicates: list[NearDuplicate] = []
+    for start in range(0, n, block_size):
+        end = min(start + block_size, n)
+        # Similarities of this block to every row up to its end, earlier rows only
+        similarities = vectors[start:end] @ vectors[:end].T
+        similarities[np.triu_indices(end - start, k=start, m=end)] = -1.0
+        candidates = similarities >= threshold
+        for offset in np.flatnonzero(candidates.any(axis=1)):
+            i = start + offset
+            row = np.where(kept[:end], similarities[offset], -1.0)
+            best = int(row.argmax())
+            if row[best] >= threshold:
+                kept[i] = False
+                duplicates.append(NearDuplicate(int(i), best, round(float(row[best]), 4)))
+    return duplicates
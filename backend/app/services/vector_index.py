@@ -0,0 +1,230 @@
+"""
+Vector Index
+============
+Local, persistent top-k similarity search over texts.
+
+Each item is a key, the text it is found by and a JSON payload. Texts are
+embedded by a pluggable embedder (hashed n-gram vectors by default, so no
+model or network is needed) into L2-normalized rows of a float32 matrix
+that lives in a memory-mapped file; a search is one matrix-vector product
+over that file plus a partial sort, cheap enough to run on every request.
+
+Files in the index directory:
+- vectors.f32: the matrix (capacity x dim), grown by doubling
+- records.jsonl: one line per insert ({"key", "row", "payload"}); a later
+  line for the same key replaces its payload, and its vector is
+  overwritten in place
+- meta.json: the vector size, checked when the index is reopened
+
+Inserts write the vector before appending its record, so an interrupted
+insert of a new key leaves at most an unused row. Replacing a key
+overwrites its vector in place, so an interrupted replacement can leave the
+new vector with the old payload until the key is added again.
+"""
+
+import json
+import logging
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from app.services.text_vectors import DEFAULT_DIM, HashingVectorizer
+
+logger = logging.getLogger("ai_sdlc_copilot")
+
+# Texts -> L2-normalized float32 rows
+Embedder = Callable[[list[str]], np.ndarray]
+
+_INITIAL_CAPACITY = 1024
+
+
+@dataclass
+class SearchHit:
+    """An item found by a search."""
+
+    key: str
+    score: float
+    payload: dict
+
+
+class VectorIndex:
+    """
+    Memory-mapped vector index with incremental inserts.
+
+    Example:
+        index = VectorIndex(".cache/examples")
+        index.add("req-1", "Users can reset their password", {"test_cases": [...]})
+        hits = index.search("password reset by email", k=3)
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        embed: Embedder | None = None,
+        dim: int = DEFAULT_DIM,
+    ):
+        """
+        Open (or create) an index.
+
+        Args:
+            directory: Index directory (created on the first insert)
+            embed: Embedder; defaults to a HashingVectorizer of size dim
+            dim: Vector size produced by the embedder
+
+        Raises:
+            ValueError: If the stored index was built with a different vector size
+        """
+        self.directory = Path(directory)
+        self.dim = dim
+        self._embed = embed or HashingVectorizer(dim).transform
+        self._lock = threading.Lock()
+        self._keys: list[str] = []
+        self._rows: dict[str, int] = {}
+        self._payloads: dict[str, dict] = {}
+        self._vectors: np.memmap | None = None
+        self._load()
+
+    @property
+    def _vectors_path(self) -> Path:
+        return self.directory / "vectors.f32"
+
+    @property
+    def _records_path(self) -> Path:
+        return self.directory / "records.jsonl"
+
+    @property
+    def _meta_path(self) -> Path:
+        return self.directory / "meta.json"
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _load(self) -> None:
+        try:
+            meta = json.loads(self._meta_path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return
+        if meta.get("dim") != self.dim:
+            raise ValueError(
+                f"Vector index {self.directory} has dim {meta.get('dim')}, expected {self.dim}"
+            )
+
+        try:
+            with self._records_path.open(encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                        key, row, payload = record["key"], record["row"], record["payload"]
+                    except (ValueError, KeyError, TypeError):
+                        logger.warning(f"Skipping unreadable record in {self._records_path}")
+                        continue
+                    if key not in self._rows:
+                        if row != len(self._keys):
+                            logger.warning(f"Skipping out-of-order record in {self._records_path}")
+                            continue
+                        self._keys.append(key)
+                        self._rows[key] = row
+                    self._payloads[key] = payload
+        except FileNotFoundError:
+            pass
+
+        if self._vectors_path.exists():
+            capacity = self._vectors_path.stat().st_size // (4 * self.dim)
+            if capacity < len(self._keys):
+                raise ValueError(f"Vector index {self.directory} is missing vectors")
+            self._open(capacity)
+
+    def _open(self, capacity: int) -> None:
+        self._vectors = np.memmap(
+            self._vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim)
+        )
+
+    def _ensure_capacity(self, rows: int) -> None:
+        capacity = len(self._vectors) if self._vectors is not None else 0
+        if rows <= capacity:
+            return
+        new_capacity = max(rows, capacity * 2, _INITIAL_CAPACITY)
+        if self._vectors is not None:
+            self._vectors.flush()
+            self._vectors = None
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with self._vectors_path.open("ab") as f:
+            f.truncate(new_capacity * self.dim * 4)
+        self._open(new_capacity)
+
+    def add(self, key: str, text: str, payload: dict) -> None:
+        """Insert an item, or replace the item with the same key."""
+        self.add_many([(key, text, payload)])
+
+    def add_many(self, items: list[tuple[str, str, dict]]) -> None:
+        """
+        Insert or replace several items (embedded in one batch).
+
+        Args:
+            items: (key, text, payload) tuples; for a key given more than
+                once, the last one is kept
+        """
+        items = list({key: (key, text, payload) for key, text, payload in items}.values())
+        if not items:
+            return
+        vectors = self._embed([text for _, text, _ in items])
+        with self._lock:
+            if not self._meta_path.exists():
+                self.directory.mkdir(parents=True, exist_ok=True)
+                self._meta_path.write_text(json.dumps({"dim": self.dim}), encoding="utf-8")
+
+            rows = []
+            new_keys = []
+            for key, _, _ in items:
+                row = self._rows.get(key)
+                if row is None:
+                    row = len(self._keys) + len(new_keys)
+                    new_keys.append(key)
+                rows.append(row)
+            self._ensure_capacity(len(self._keys) + len(new_keys))
+            self._vectors[rows] = vectors
+            self._vectors.flush()
+
+            with self._records_path.open("a", encoding="utf-8") as f:
+                for (key, _, payload), row in zip(items, rows, strict=True):
+                    f.write(json.dumps({"key": key, "row": row, "payload": payload}) + "\n")
+            for key in new_keys:
+                self._rows[key] = len(self._keys)
+                self._keys.append(key)
+            for key, _, payload in items:
+                self._payloads[key] = payload
+
+    def get(self, key: str) -> dict | None:
+        """Payload of an item, or None."""
+        return self._payloads.get(key)
+
+    def search(self, text: str, k: int = 5, min_score: float = 0.0) -> list[SearchHit]:
+        """
+        Find the items whose texts are most similar to a text.
+
+        Args:
+            text: Query text
+            k: Maximum number of hits
+            min_score: Minimum cosine similarity of a hit
+
+        Returns:
+            Hits, most similar first
+        """
+        count = len(self._keys)
+        if count == 0 or k <= 0 or self._vectors is None:
+            return []
+        query = self._embed([text])[0]
+        scores = self._vectors[:count] @ query
+        k = min(k, count)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [
+            SearchHit(
+                self._keys[row], round(float(scores[row]), 4), self._payloads[self._keys[row]]
+            )
+            for row in top
+            if scores[row] >= min_score
+        ]
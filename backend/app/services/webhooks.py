@@ -0,0 +1,331 @@
+"""
+GitHub Webhooks
+===============
+Verify GitHub webhook deliveries and turn them into debounced work items.
+
+Events are keyed by what they would re-process: a pull request, a branch,
+or a repository's issues. A burst of events for one key is debounced (the
+work waits until no new event has arrived for a quiet window, bounded by a
+maximum delay) and coalesced (a newer event replaces the pending one, so
+only the latest head SHA is processed). A background worker runs the work,
+at most one item per key at a time, so the webhook itself only verifies,
+parses and enqueues.
+"""
+
+import asyncio
+import hashlib
+import hmac
+import logging
+import os
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+logger = logging.getLogger("ai_sdlc_copilot")
+
+# Quiet period before a key is processed, and the longest a burst can defer it
+WEBHOOK_DEBOUNCE_SECONDS = float(os.getenv("WEBHOOK_DEBOUNCE_SECONDS", "10"))
+WEBHOOK_MAX_DELAY_SECONDS = float(os.getenv("WEBHOOK_MAX_DELAY_SECONDS", "60"))
+
+# Work items processed concurrently (different keys only)
+WEBHOOK_WORKERS = int(os.getenv("WEBHOOK_WORKERS", "2"))
+
+# Recent delivery ids and processed SHAs remembered to drop redeliveries
+_RECENT_LIMIT = 1000
+
+PULL_REQUEST_ACTIONS = frozenset({"opened", "reopened", "synchronize", "ready_for_review"})
+ISSUE_ACTIONS = frozenset(
+    {"opened", "edited", "reopened", "labeled", "unlabeled", "milestoned", "demilestoned"}
+)
+
+
+def verify_signature(secret: str, body: bytes, signature: str | None) -> bool:
+    """
+    Check a delivery's X-Hub-Signature-256 header.
+
+    Args:
+        secret: Webhook secret configured on GitHub
+        body: Raw request body
+        signature: Header value ("sha256=<hex>")
+
+    Returns:
+        True if the signature matches
+    """
+    if not signature:
+        return False
+    expected = "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature)
+
+
+@dataclass
+class WebhookEvent:
+    """Work derived from a webhook delivery."""
+
+    kind: str
+    repository: str
+    key: str
+    head_sha: str | None = None
+    number: int | None = None
+    delivery_id: str | None = None
+    # Superseded events folded into this one
+    coalesced: int = 0
+
+
+@dataclass
+class WebhookAction:
+    """What a delivery asks for: work to queue, a key to cancel, or nothing."""
+
+    event: WebhookEvent | None = None
+    cancel: str | None = None
+
+
+def parse_github_event(name: str, payload: dict, delivery_id: str | None = None) -> WebhookAction:
+    """
+    Map a GitHub event to queued work.
+
+    - `pull_request` (opened, synchronize, ...) reviews the pull request at
+      its head SHA; a closed pull request cancels pending work.
+    - `issues` and issue comments re-ingest the repository's issues.
+    - `push` to the default branch refreshes the repository analysis.
+
+    Args:
+        name: X-GitHub-Event header
+        payload: Parsed JSON body
+        delivery_id: X-GitHub-Delivery header
+
+    Returns:
+        WebhookAction (empty for events that need no work)
+    """
+    repository = (payload.get("repository") or {}).get("full_name")
+    if not repository:
+        return WebhookAction()
+    action = payload.get("action")
+
+    if name == "pull_request":
+        pull = payload["pull_request"]
+        key = f"{repository}#{pull['number']}"
+        if action == "closed":
+            return WebhookAction(cancel=key)
+        if action not in PULL_REQUEST_ACTIONS:
+            return WebhookAction()
+        return WebhookAction(
+            WebhookEvent(
+                kind="pull_request",
+                repository=repository,
+                key=key,
+                head_sha=pull["head"]["sha"],
+                number=pull["number"],
+                delivery_id=delivery_id,
+            )
+        )
+
+    if name in ("issues", "issue_comment"):
+        issue = payload.get("issue") or {}
+        if "pull_request" in issue:
+            return WebhookAction()  # Comments on pull requests are not requirements
+        if name == "issues" and action not in ISSUE_ACTIONS:
+            return WebhookAction()
+        return WebhookAction(
+            WebhookEvent(
+                kind="issues",
+                repository=repository,
+                key=f"{repository}:issues",
+                number=issue.get("number"),
+                delivery_id=delivery_id,
+            )
+        )
+
+    if name == "push":
+        default_ref = f"refs/heads/{payload['repository'].get('default_branch', 'main')}"
+        if payload.get("ref") != default_ref or payload.get("deleted"):
+            return WebhookAction()
+        return WebhookAction(
+            WebhookEvent(
+                kind="push",
+                repository=repository,
+                key=f"{repository}@{payload['ref']}",
+                head_sha=payload.get("after"),
+                delivery_id=delivery_id,
+            )
+        )
+
+    return WebhookAction()
+
+
+@dataclass
+class _Pending:
+    event: WebhookEvent
+    first_seen: float
+    due: float
+
+
+@dataclass
+class QueueStats:
+    """Counters for the webhook queue."""
+
+    received: int = 0
+    duplicates: int = 0
+    coalesced: int = 0
+    cancelled: int = 0
+    processed: int = 0
+    skipped: int = 0
+    failed: int = 0
+
+
+WebhookHandler = Callable[[WebhookEvent], Awaitable[None]]
+
+
+class DebouncedEventQueue:
+    """
+    Debounces and coalesces webhook events per key for a background worker.
+
+    Example:
+        queue = DebouncedEventQueue(handle_event)
+        await queue.start()
+        queue.submit(event)
+    """
+
+    def __init__(
+        self,
+        handler: WebhookHandler,
+        window: float = WEBHOOK_DEBOUNCE_SECONDS,
+        max_delay: float = WEBHOOK_MAX_DELAY_SECONDS,
+        workers: int = WEBHOOK_WORKERS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize the queue.
+
+        Args:
+            handler: Coroutine that processes one event
+            window: Quiet period after the last event for a key
+            max_delay: Longest a key can be deferred by a continuous burst
+            workers: Maximum events processed concurrently
+            clock: Monotonic clock (injectable for tests)
+        """
+        self.handler = handler
+        self.window = window
+        self.max_delay = max(max_delay, window)
+        self.workers = workers
+        self.stats = QueueStats()
+        self._clock = clock
+        self._pending: dict[str, _Pending] = {}
+        self._running: set[str] = set()
+        self._tasks: set[asyncio.Task] = set()
+        self._deliveries: OrderedDict[str, None] = OrderedDict()
+        self._processed_shas: OrderedDict[str, str] = OrderedDict()
+        self._semaphore = asyncio.Semaphore(workers)
+        self._wakeup = asyncio.Event()
+        self._worker: asyncio.Task | None = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    @property
+    def running(self) -> int:
+        return len(self._running)
+
+    def submit(self, event: WebhookEvent) -> bool:
+        """
+        Queue an event, replacing any pending event for the same key.
+
+        Returns:
+            False if the delivery was already received (GitHub redelivery)
+        """
+        self.stats.received += 1
+        if event.delivery_id:
+            if event.delivery_id in self._deliveries:
+                self.stats.duplicates += 1
+                return False
+            self._remember(self._deliveries, event.delivery_id, None)
+
+        now = self._clock()
+        previous = self._pending.get(event.key)
+        if previous is None:
+            self._pending[event.key] = _Pending(event, now, now + self.window)
+        else:
+            event.coalesced = previous.event.coalesced + 1
+            self.stats.coalesced += 1
+            due = min(now + self.window, previous.first_seen + self.max_delay)
+            self._pending[event.key] = _Pending(event, previous.first_seen, due)
+        self._wakeup.set()
+        return True
+
+    def cancel(self, key: str) -> bool:
+        """Drop pending work for a key (e.g. a closed pull request)."""
+        if self._pending.pop(key, None) is None:
+            return False
+        self.stats.cancelled += 1
+        return True
+
+    async def start(self) -> None:
+        """Start the background worker."""
+        if self._worker is None or self._worker.done():
+            # Loop-bound primitives belong to the loop the worker runs on
+            self._semaphore = asyncio.Semaphore(self.workers)
+            self._wakeup = asyncio.Event()
+            self._worker = asyncio.create_task(self._work())
+
+    async def stop(self) -> None:
+        """Stop the worker and wait for running events; pending events are dropped."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._pending:
+            logger.warning(f"Dropping {len(self._pending)} pending webhook events on shutdown")
+
+    @staticmethod
+    def _remember(recent: OrderedDict, key: str, value) -> None:
+        recent[key] = value
+        recent.move_to_end(key)
+        if len(recent) > _RECENT_LIMIT:
+            recent.popitem(last=False)
+
+    async def _work(self) -> None:
+        while True:
+            now = self._clock()
+            waiting = [p for key, p in self._pending.items() if key not in self._running]
+            for pending in [p for p in waiting if p.due <= now]:
+                event = self._pending.pop(pending.event.key).event
+                self._running.add(event.key)
+                task = asyncio.create_task(self._process(event))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+            upcoming = [p.due for p in waiting if p.due > now]
+            self._wakeup.clear()
+            timeout = min(upcoming) - now if upcoming else None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except TimeoutError:
+                pass
+
+    async def _process(self, event: WebhookEvent) -> None:
+        try:
+            if event.head_sha and self._processed_shas.get(event.key) == event.head_sha:
+                self.stats.skipped += 1
+                logger.info(f"Skipping {event.key}: {event.head_sha[:7]} already processed")
+                return
+            async with self._semaphore:
+                logger.info(
+                    f"Processing {event.kind} event for {event.key}"
+                    + (f" ({event.coalesced} superseded)" if event.coalesced else "")
+                )
+                await self.handler(event)
+            self.stats.processed += 1
+            if event.head_sha:
+                self._remember(self._processed_shas, event.key, event.head_sha)
+        except Exception as e:
+            self.stats.failed += 1
+            logger.error(f"Webhook event for {event.key} failed: {e}")
+        finally:
+            self._running.discard(event.key)
+            self._wakeup.set()
@@ -0,0 +1,70 @@
+"""
+Prompt Build Benchmark
+======================
+Time to build the pytest generation prompt for large test case lists,
+rendered from the compiled template versus the previous f-string builder
+(which grew the test case text with repeated `+=`).
+
+Usage (from backend/):
+    python -m benchmarks.prompt_build
+"""
+
+import timeit
+
+from app.prompts.pytest_prompt import get_pytest_generation_prompt
+from app.prompts.registry import get_prompt_registry
+
+SIZES = (100, 1000, 5000)
+
+
+def make_test_cases(count: int) -> list[dict]:
+    return [
+        {
+            "id": f"TC{i:03d}",
+            "title": f"User can complete checkout step {i}",
+            "description": "Verify the checkout flow with a valid cart",
+            "preconditions": ["User is logged in", "Cart has items"],
+            "steps": ["Open the cart", "Click checkout", "Enter payment details", "Confirm"],
+            "expected_result": "Order is created and a confirmation is shown",
+            "priority": "high",
+            "test_type": "functional",
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def legacy_test_case_text(test_cases: list[dict]) -> str:
+    """The test case section as the f-string builder assembled it."""
+    tc_text = ""
+    for i, tc in enumerate(test_cases, 1):
+        tc_text += f"""
+### Test Case {i}: {tc.get('id', f'TC{i:03d}')}
+- **Title:** {tc.get('title', 'Untitled')}
+- **Description:** {tc.get('description', 'No description')}
+- **Preconditions:** {', '.join(tc.get('preconditions', [])) or 'None'}
+- **Steps:**
+{chr(10).join(f'  {j}. {step}' for j, step in enumerate(tc.get('steps', []), 1)) or '  None'}
+- **Expected Result:** {tc.get('expected_result', 'Not specified')}
+- **Priority:** {tc.get('priority', 'medium')}
+- **Type:** {tc.get('test_type', 'functional')}
+"""
+    return tc_text
+
+
+def best_of(func, repeat: int = 5) -> float:
+    """Best wall time of one call, in milliseconds."""
+    return min(timeit.repeat(func, number=1, repeat=repeat)) * 1000
+
+
+def main() -> None:
+    get_prompt_registry().load()
+    print(f"{'test cases':>10}  {'template (ms)':>13}  {'f-string += (ms)':>16}")
+    for size in SIZES:
+        test_cases = make_test_cases(size)
+        template_ms = best_of(lambda tcs=test_cases: get_pytest_generation_prompt(tcs))
+        legacy_ms = best_of(lambda tcs=test_cases: legacy_test_case_text(tcs))
+        print(f"{size:>10}  {template_ms:>13.2f}  {legacy_ms:>16.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Prompt Token Benchmark
+======================
+Input tokens per generation endpoint, before and after the compact,
+prefix-stable prompt layout.
+
+"Before" renders the same prompt functions with the previous templates
+(kept in benchmarks/baseline_templates/, loaded as registry overrides).
+For each endpoint two different requests are built; "prefix" is the
+number of leading tokens (system prompt + user message) they share,
+i.e. what provider-side prompt caching can reuse between requests.
+
+Usage (from backend/):
+    python -m benchmarks.prompt_tokens
+"""
+
+from collections.abc import Callable
+from pathlib import Path
+
+from app.prompts import registry as prompt_registry
+from app.prompts.pytest_prompt import (
+    get_pytest_from_code_prompt,
+    get_pytest_from_requirement_prompt,
+    get_pytest_generation_prompt,
+    get_pytest_system_prompt,
+)
+from app.prompts.registry import PromptRegistry
+from app.prompts.testcase_prompt import get_system_prompt, get_testcase_generation_prompt
+from app.services.context_packer import estimate_tokens
+from benchmarks.prompt_build import make_test_cases
+
+BASELINE_TEMPLATES_DIR = Path(__file__).parent / "baseline_templates"
+
+REQUIREMENTS = (
+    "Users can reset their password via an emailed link that expires after 30 minutes.",
+    "The cart applies a 10% discount to orders over $100 and shows the saving at checkout.",
+)
+
+SOURCE = '''def apply_discount(total: float, percent: float) -> float:
+    """Apply a percentage discount to an order total."""
+    if not 0 <= percent <= 100:
+        raise ValueError("percent must be between 0 and 100")
+    return round(total * (1 - percent / 100), 2)'''
+
+# Endpoint -> builder of (system prompt, user prompt) for request variant 0 or 1
+Builder = Callable[[int], tuple[str, str]]
+
+
+def _testcases(output_format: str) -> Builder:
+    return lambda v: (
+        get_system_prompt(),
+        get_testcase_generation_prompt(
+            REQUIREMENTS[v], num_cases=5 + v, output_format=output_format
+        ),
+    )
+
+
+def _pytest_generate(count: int) -> Builder:
+    def build(v: int) -> tuple[str, str]:
+        # A different request: other test cases, not the same list with one more
+        test_cases = make_test_cases(count)[:: 1 if v == 0 else -1]
+        return get_pytest_system_prompt(), get_pytest_generation_prompt(
+            test_cases, module_name=f"test_checkout_{v}"
+        )
+
+    return build
+
+
+ENDPOINTS: dict[str, Builder] = {
+    "POST /testcases/generate (json)": _testcases("json"),
+    "POST /testcases/generate (markdown)": _testcases("markdown"),
+    "POST /pytest/generate (10 cases)": _pytest_generate(10),
+    "POST /pytest/generate (50 cases)": _pytest_generate(50),
+    "POST /pytest/generate-from-requirement": lambda v: (
+        get_pytest_system_prompt(),
+        get_pytest_from_requirement_prompt(REQUIREMENTS[v], num_tests=5 + v),
+    ),
+    "POST /pytest/generate-from-source": lambda v: (
+        get_pytest_system_prompt(),
+        get_pytest_from_code_prompt(
+            f"apply_discount_{v}", "function", "shop.pricing", SOURCE, num_tests=3
+        ),
+    ),
+}
+
+
+def measure(build: Builder) -> tuple[int, int]:
+    """(input tokens of the first request, tokens of the prefix both requests share)."""
+    first, second = ("\n\n".join(build(v)) for v in (0, 1))
+    shared = next(
+        (i for i, (a, b) in enumerate(zip(first, second, strict=False)) if a != b),
+        min(len(first), len(second)),
+    )
+    return estimate_tokens(first), estimate_tokens(first[:shared])
+
+
+def measure_all(registry: PromptRegistry) -> dict[str, tuple[int, int]]:
+    previous = prompt_registry._prompt_registry
+    prompt_registry._prompt_registry = registry
+    try:
+        return {name: measure(build) for name, build in ENDPOINTS.items()}
+    finally:
+        prompt_registry._prompt_registry = previous
+
+
+def main() -> None:
+    before = measure_all(PromptRegistry(override_dir=BASELINE_TEMPLATES_DIR))
+    after = measure_all(PromptRegistry(override_dir=None))
+
+    print(
+        f"{'endpoint':<40} {'tokens before':>13} {'after':>7} {'change':>7}"
+        f" {'prefix before':>13} {'after':>7}"
+    )
+    for name in ENDPOINTS:
+        (tokens_before, prefix_before), (tokens_after, prefix_after) = before[name], after[name]
+        change = (tokens_after - tokens_before) / tokens_before * 100
+        print(
+            f"{name:<40} {tokens_before:>13} {tokens_after:>7} {change:>+6.0f}%"
+            f" {prefix_before:>13} {prefix_after:>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
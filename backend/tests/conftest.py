@@ -0,0 +1,34 @@
+"""
+Shared test fixtures.
+"""
+
+import pytest
+
+from app.services import artifact_store, requirement_cache, testcase_generation
+from app.services.artifact_store import ArtifactStore
+from app.services.requirement_cache import RequirementCache
+from app.services.vector_index import VectorIndex
+
+
+@pytest.fixture(autouse=True)
+def artifact_dir(tmp_path, monkeypatch):
+    """Store artifacts generated by endpoint tests in a temporary directory."""
+    store = ArtifactStore(tmp_path / "artifacts")
+    monkeypatch.setattr(artifact_store, "_artifact_store", store)
+    return store
+
+
+@pytest.fixture(autouse=True)
+def example_index(tmp_path, monkeypatch):
+    """Keep accepted test case examples in a temporary directory."""
+    index = VectorIndex(tmp_path / "examples")
+    monkeypatch.setattr(testcase_generation, "_example_index", index)
+    return index
+
+
+@pytest.fixture(autouse=True)
+def requirement_cache_file(tmp_path, monkeypatch):
+    """Start every test with an empty requirement cache in a temporary directory."""
+    cache = RequirementCache(tmp_path / "requirements.json")
+    monkeypatch.setattr(requirement_cache, "_requirement_cache", cache)
+    return cache
@@ -0,0 +1,141 @@
+"""
+Tests for the artifact store, its endpoint and LLM usage tracking.
+"""
+
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models.review_models import PRReviewRequest, ReviewStats
+from app.routers import pytest_router
+from app.services.artifact_store import artifact_id, save_generation
+from app.services.llm_service import LLMResult, LLMService, track_llm_usage
+
+TEST_CASES = [{"id": "TC001", "title": "Login works", "expected_result": "User is logged in"}]
+
+
+@pytest.fixture
+def client():
+    """Create a test client for the FastAPI app."""
+    return TestClient(app)
+
+
+class TestArtifactStore:
+    """Tests for storing and reading artifacts."""
+
+    def test_round_trip(self, artifact_dir):
+        """A stored artifact should read back with its inputs, metadata and content."""
+        key = artifact_dir.put("pytest", {"module": "m"}, {"code": "x"}, {"model": "m1"})
+
+        stored = artifact_dir.get(key)
+        document = json.loads(stored.body)
+
+        assert document["inputs"] == {"module": "m"}
+        assert document["metadata"] == {"model": "m1"}
+        assert document["content"] == {"code": "x"}
+        assert stored.etag == artifact_dir.get(key).etag
+        assert artifact_dir.get("0" * 64) is None
+        assert artifact_dir.get("../secret") is None
+
+    def test_id_is_hash_of_inputs(self):
+        """The id should depend on kind and inputs, not on key order."""
+        assert artifact_id("pytest", {"a": 1, "b": 2}) == artifact_id("pytest", {"b": 2, "a": 1})
+        assert artifact_id("pytest", {"a": 1}) != artifact_id("testcases", {"a": 1})
+
+    def test_tokens_are_not_stored(self, artifact_dir):
+        """Tokens in the request should not be stored or change the id."""
+        response = ReviewStats(high=1)
+
+        with_token = save_generation(
+            "pr-review", PRReviewRequest(pull_request="octo/shop#1", github_token="t"), response
+        )
+        without = save_generation(
+            "pr-review", PRReviewRequest(pull_request="octo/shop#1"), response
+        )
+
+        document = json.loads(artifact_dir.get(with_token).body)
+        assert with_token == without
+        assert "github_token" not in document["inputs"]
+        assert document["content"] == {"critical": 0, "high": 1, "medium": 0, "low": 0, "info": 0}
+
+
+class TestLLMUsage:
+    """Tests for collecting LLM metadata."""
+
+    async def test_usage_spans_concurrent_calls(self, monkeypatch):
+        """Calls made in tasks started inside the context should all be recorded."""
+        monkeypatch.delenv("GROQ_API_KEY", raising=False)
+        monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+        llm = LLMService()
+
+        async def fake_generate(prompt, system_prompt, max_tokens, temperature):
+            return LLMResult(prompt.upper(), "groq", "model-a", 10.0, len(prompt), 5)
+
+        monkeypatch.setattr(llm, "_generate", fake_generate)
+
+        with track_llm_usage() as usage:
+            texts = await asyncio.gather(llm.generate("ab"), llm.generate("abc"))
+        await llm.generate("outside")
+
+        assert texts == ["AB", "ABC"]
+        assert usage.summary() == {
+            "llm_calls": 2,
+            "providers": ["groq"],
+            "models": ["model-a"],
+            "latency_ms": 20.0,
+            "prompt_tokens": 5,
+            "completion_tokens": 10,
+        }
+
+
+class TestArtifactEndpoint:
+    """Tests for /api/v1/artifacts/{artifact_id}."""
+
+    @pytest.fixture
+    def generated(self, client, monkeypatch):
+        """Generate pytest code with a fake LLM; returns the response JSON."""
+
+        class FakeLLM:
+            _groq_client = object()
+
+            async def generate(self, prompt, **kwargs):
+                return "```python\ndef test_login():\n    assert True\n```"
+
+        monkeypatch.setattr(pytest_router, "get_llm_service", lambda: FakeLLM())
+        response = client.post(
+            "/api/v1/pytest/generate", json={"test_cases": TEST_CASES, "output_path": ""}
+        )
+        assert response.status_code == 200
+        return response.json()
+
+    def test_generation_is_stored(self, client, generated):
+        """A generation should return an artifact id that serves the same content."""
+        response = client.get(f"/api/v1/artifacts/{generated['artifact_id']}")
+
+        assert response.status_code == 200
+        assert response.headers["etag"].startswith('"')
+        assert response.headers["cache-control"] == "private, no-cache"
+        document = response.json()
+        assert document["kind"] == "pytest"
+        assert document["content"]["code"] == generated["code"]
+        assert document["inputs"]["test_cases"][0]["title"] == "Login works"
+
+    def test_revalidation_returns_304(self, client, generated):
+        """If-None-Match with the current ETag should return 304 without a body."""
+        url = f"/api/v1/artifacts/{generated['artifact_id']}"
+        etag = client.get(url).headers["etag"]
+
+        cached = client.get(url, headers={"If-None-Match": f'"other", W/{etag}'})
+        changed = client.get(url, headers={"If-None-Match": '"other"'})
+
+        assert cached.status_code == 304
+        assert cached.content == b""
+        assert cached.headers["etag"] == etag
+        assert changed.status_code == 200
+
+    def test_unknown_artifact(self, client):
+        """A missing artifact should return 404."""
+        assert client.get(f"/api/v1/artifacts/{'0' * 64}").status_code == 404
@@ -0,0 +1,185 @@
+"""
+Tests for the content-addressed blob store.
+"""
+
+import httpx
+import pytest
+
+from app.services.blob_store import MMAP_THRESHOLD_BYTES, BlobStore, git_blob_sha
+from app.services.github_service import GitHubFileSkipped, GitHubService
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Create a blob store backed by a temporary directory."""
+    return BlobStore(cache_dir=tmp_path, max_memory_bytes=1024)
+
+
+class TestGitBlobSha:
+    """Tests for git_blob_sha()."""
+
+    def test_matches_git_hash_object(self):
+        """SHA should match `git hash-object` for the same bytes."""
+        assert git_blob_sha(b"hello\n") == "ce013625030ba8dba906f756967f9e9ca394464a"
+
+
+class TestBlobStore:
+    """Tests for BlobStore."""
+
+    def test_put_then_get(self, store):
+        """Stored blobs should be retrievable by SHA."""
+        sha = store.put(b"print('hi')\n")
+        assert store.get(sha) == b"print('hi')\n"
+
+    def test_disk_tier_survives_memory_clear(self, store):
+        """Blobs should be read back from disk after memory eviction."""
+        sha = store.put(b"x = 1\n")
+        store.clear_memory()
+        assert store.contains(sha)
+        assert store.get(sha) == b"x = 1\n"
+
+    def test_large_blob_read_via_mmap(self, store):
+        """Blobs above the mmap threshold should round-trip intact."""
+        data = b"a" * (MMAP_THRESHOLD_BYTES + 10)
+        sha = store.put(data)
+        store.clear_memory()
+        assert store.get(sha) == data
+
+    def test_large_blob_is_not_copied(self, store):
+        """Mapped blobs come back as a read-only view and stay out of the memory tier."""
+        sha = store.put(b"a" * (MMAP_THRESHOLD_BYTES + 10))
+        store.clear_memory()
+
+        view = store.get(sha)
+
+        assert isinstance(view, memoryview)
+        assert view.readonly
+        assert store._key(sha) not in store._memory
+
+    def test_failed_write_leaves_no_temp_file(self, store, tmp_path, monkeypatch):
+        """A write error removes the temporary file."""
+
+        def fail(*args):
+            raise OSError("disk full")
+
+        monkeypatch.setattr("app.services.blob_store.os.replace", fail)
+
+        sha = store.put(b"x = 1\n")
+
+        assert not list(tmp_path.rglob(".tmp-*"))
+        assert not (tmp_path / sha[:2] / sha[2:]).exists()
+
+    def test_memory_lru_is_bounded(self, tmp_path):
+        """Memory tier should evict the oldest blobs beyond its byte budget."""
+        store = BlobStore(cache_dir=None, max_memory_bytes=10)
+        first = store.put(b"123456")
+        store.put(b"abcdef")
+        assert store.get(first) is None
+
+    def test_content_must_match_sha(self, store):
+        """Content is never stored under a SHA it does not hash to."""
+        with pytest.raises(ValueError):
+            store.put(b"new content\n", sha=git_blob_sha(b"old content\n"))
+
+        assert store.get(git_blob_sha(b"old content\n")) is None
+
+    def test_namespaces_do_not_share_blobs(self, store):
+        """A blob stored in one namespace is not visible from another."""
+        first, second = store.scoped("a" * 64), store.scoped("b" * 64)
+        sha = first.put(b"SECRET = 1\n")
+        store.clear_memory()
+
+        assert first.get(sha) == b"SECRET = 1\n"
+        assert second.get(sha) is None and not second.contains(sha)
+        assert store.get(sha) is None
+
+    def test_missing_blob_returns_none(self, store):
+        """Unknown SHAs should return None."""
+        assert store.get("0" * 40) is None
+
+
+class TestGitHubServiceBlobCache:
+    """Tests for blob cache usage in GitHubService."""
+
+    async def test_known_sha_skips_download(self, store):
+        """A cached SHA should be served without calling the GitHub API."""
+        sha = store.put(b"def f():\n    return 1\n")
+        service = GitHubService(blob_store=store)
+
+        file = await service.get_file_content("octo", "repo", "pkg/mod.py", sha=sha)
+
+        assert file.content == "def f():\n    return 1\n"
+        assert file.name == "mod.py"
+        assert file.sha == sha
+
+
+class TestRawFetch:
+    """Tests for raw media-type fetches and size guards."""
+
+    @pytest.fixture
+    def mock_github(self, monkeypatch):
+        """Route GitHubService HTTP calls to an in-memory handler."""
+        files: dict[str, bytes] = {}
+        real_client = httpx.AsyncClient
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            assert request.headers["Accept"] == GitHubService.RAW_MEDIA_TYPE
+            path = request.url.path.split("/contents/", 1)[1]
+            if path not in files:
+                return httpx.Response(404)
+            return httpx.Response(200, content=files[path])
+
+        monkeypatch.setattr(
+            "app.services.github_service.httpx.AsyncClient",
+            lambda **kwargs: real_client(transport=httpx.MockTransport(handler), **kwargs),
+        )
+        return files
+
+    async def test_raw_content_is_cached_by_git_sha(self, store, mock_github):
+        """Raw fetches should be stored under the git blob SHA and loaded lazily."""
+        mock_github["app/util.py"] = b"VALUE = 42\n"
+        service = GitHubService(blob_store=store)
+
+        file = await service.get_file_content("octo", "repo", "app/util.py")
+
+        assert file.sha == git_blob_sha(b"VALUE = 42\n")
+        assert not file.is_loaded
+        assert file.content == "VALUE = 42\n"
+
+    async def test_stale_listing_sha_is_not_cached(self, store, mock_github):
+        """Fetched content is stored under its own SHA, not a stale one from a listing."""
+        stale = git_blob_sha(b"VALUE = 1\n")
+        mock_github["app/util.py"] = b"VALUE = 42\n"
+        service = GitHubService(blob_store=store)
+
+        file = await service.get_file_content("octo", "repo", "app/util.py", sha=stale)
+
+        assert file.sha == git_blob_sha(b"VALUE = 42\n")
+        assert store.get(stale) is None
+
+    async def test_oversized_file_is_skipped(self, store, mock_github):
+        """Files above max_file_bytes should raise GitHubFileSkipped by default."""
+        mock_github["big.py"] = b"x" * 100
+        service = GitHubService(blob_store=store, max_file_bytes=10)
+
+        with pytest.raises(GitHubFileSkipped):
+            await service.get_file_content("octo", "repo", "big.py")
+
+    async def test_oversized_file_is_truncated(self, store, mock_github):
+        """With oversize='truncate' the content should be cut at the limit."""
+        mock_github["big.py"] = b"x" * 100
+        service = GitHubService(blob_store=store, max_file_bytes=10, oversize="truncate")
+
+        file = await service.get_file_content("octo", "repo", "big.py")
+
+        assert file.truncated
+        assert file.content == "x" * 10
+
+    async def test_generated_file_is_skipped(self, store, mock_github):
+        """Files with a generated-code marker should be skipped when requested."""
+        mock_github["api.py"] = b"# Code generated by protoc. DO NOT EDIT.\n"
+        service = GitHubService(blob_store=store)
+
+        files = await service.get_multiple_files("octo", "repo", ["api.py"])
+
+        assert files == []
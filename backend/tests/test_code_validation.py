@@ -0,0 +1,163 @@
+"""
+Tests for validating and repairing generated pytest code.
+"""
+
+import ast
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.routers import pytest_router
+from app.services.code_validation import (
+    error_window,
+    splice_lines,
+    validate_and_fix,
+    validate_module,
+)
+
+VALID = """import pytest
+
+
+@pytest.fixture
+def cart():
+    return []
+
+
+def test_empty(cart):
+    assert len(cart) == 0
+
+
+class TestCart:
+    def test_add(self, cart):
+        cart.append(1)
+        assert cart == [1]
+"""
+
+BROKEN = VALID.replace("def test_empty(cart):", "def test_empty(cart)")
+
+
+@pytest.fixture
+def client():
+    """Create a test client for the FastAPI app."""
+    return TestClient(app)
+
+
+class TestValidateModule:
+    """Tests for validate_module()."""
+
+    def test_valid_module(self):
+        """A clean module should have no diagnostics and list its tests."""
+        result = validate_module(VALID)
+
+        assert result.syntax_ok
+        assert result.diagnostics == []
+        assert result.test_names == ["test_empty", "TestCart.test_add"]
+
+    def test_syntax_error(self):
+        """A module that does not parse should report the error line."""
+        result = validate_module(BROKEN, "test_cart.py")
+
+        assert not result.syntax_ok
+        assert result.syntax_error.line == 9
+        assert result.syntax_error.file == "test_cart.py"
+
+    def test_undefined_names_and_duplicates(self):
+        """Unbound names and tests defined twice should be reported."""
+        code = VALID + "\n\ndef test_empty():\n    assert checkout(Cart()) is None\n"
+
+        codes = [(d.code, d.line) for d in validate_module(code).diagnostics]
+
+        assert ("duplicate-test", 19) in codes
+        assert ("undefined-name", 20) in codes
+        assert [c for c, _ in codes].count("undefined-name") == 2
+
+    def test_formatting_is_normalized(self):
+        """Formatting changes should keep the module's meaning."""
+        code = "import os\nx=os.sep   \n\n\n\n\ndef test_x():\n  assert x\n"
+
+        result = validate_module(code)
+
+        assert result.formatted
+        assert ast.dump(ast.parse(result.code)) == ast.dump(ast.parse(code))
+
+
+class TestRepair:
+    """Tests for targeted syntax repair."""
+
+    def test_window_and_splice(self):
+        """Only the lines around the error should be replaced."""
+        code = "\n".join(f"line{i}" for i in range(1, 101)) + "\n"
+
+        start, end = error_window(code, 50, radius=2)
+        spliced = splice_lines(code, start, end, "fixed")
+
+        assert (start, end) == (47, 52)
+        assert spliced.splitlines()[46:49] == ["line47", "fixed", "line53"]
+
+    async def test_syntax_error_is_repaired(self):
+        """The fixer should get the error's surroundings and its fix should be spliced in."""
+        seen = []
+
+        async def fix(snippet, error):
+            seen.append((snippet, error.line))
+            return snippet.replace("def test_empty(cart)", "def test_empty(cart):")
+
+        result, fixed = await validate_and_fix(BROKEN, fix)
+
+        assert fixed and result.syntax_ok
+        assert result.test_names == ["test_empty", "TestCart.test_add"]
+        snippet, line = seen[0]
+        assert snippet.splitlines()[line - 1] == "def test_empty(cart)"
+
+    async def test_failed_repair_keeps_diagnostic(self):
+        """A repair that does not help should leave the original code and error."""
+
+        async def fix(snippet, error):
+            return snippet
+
+        result, fixed = await validate_and_fix(BROKEN, fix)
+
+        assert not fixed
+        assert result.code == BROKEN
+        assert result.syntax_error is not None
+
+
+class TestGenerateValidation:
+    """Tests for validation in /api/v1/pytest/generate."""
+
+    def test_broken_output_is_repaired(self, client, monkeypatch):
+        """Broken output should be repaired with a small prompt, not regenerated."""
+        prompts = []
+        extra = "".join(f"\n\ndef test_item_{i}():\n    assert {i} >= 0\n" for i in range(20))
+
+        class FakeLLM:
+            _groq_client = object()
+
+            async def generate(self, prompt, **kwargs):
+                prompts.append(prompt)
+                if len(prompts) == 1:
+                    return BROKEN + extra
+                snippet = prompt.split("```python\n", 1)[1].split("\n```", 1)[0]
+                return snippet.replace("def test_empty(cart)", "def test_empty(cart):")
+
+        monkeypatch.setattr(pytest_router, "get_llm_service", lambda: FakeLLM())
+        response = client.post(
+            "/api/v1/pytest/generate",
+            json={
+                "test_cases": [{"title": "Empty cart", "expected_result": "Cart is empty"}],
+                "output_path": "",
+            },
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        ast.parse(data["code"])
+        assert data["validation"] == {
+            "valid": True,
+            "fixed": True,
+            "formatted": False,
+            "diagnostics": [],
+        }
+        assert len(prompts) == 2
+        assert "test_item_19" in data["code"] and "test_item_19" not in prompts[1]
@@ -0,0 +1,71 @@
+"""
+Tests for the token-budgeted context packer.
+"""
+
+from app.services.context_packer import (
+    ContextPacker,
+    Snippet,
+    estimate_tokens,
+    split_paragraphs,
+)
+
+
+class TestEstimateTokens:
+    """Tests for estimate_tokens."""
+
+    def test_counts_words_and_punctuation(self):
+        """Short words and punctuation should count as one token each."""
+        assert estimate_tokens("a, b.") == 4
+
+    def test_long_words_count_more(self):
+        """Long identifiers should count roughly one token per four characters."""
+        assert estimate_tokens("authentication") == 4
+
+
+class TestContextPacker:
+    """Tests for ContextPacker.pack."""
+
+    def test_required_snippets_are_always_included(self):
+        """Required snippets should be kept even when they exceed the budget."""
+        packer = ContextPacker(context_window=10, reserve_output=5)
+        requirement = Snippet(kind="requirement", text="word " * 50, required=True)
+
+        packed = packer.pack("word", [requirement])
+
+        assert packed.included == [requirement]
+        assert packed.used_tokens > packed.budget
+
+    def test_drops_least_relevant_when_over_budget(self):
+        """Irrelevant context should be dropped first."""
+        packer = ContextPacker(context_window=30, reserve_output=10)
+        relevant = Snippet(kind="context", text="login password lockout rules", label="relevant")
+        irrelevant = Snippet(
+            kind="context", text="billing invoices are emailed monthly", label="irrelevant"
+        )
+
+        packed = packer.pack("login lockout after failed password", [irrelevant, relevant], 12)
+
+        assert packed.report()["included"] == ["relevant"]
+        assert packed.report()["dropped"] == ["irrelevant"]
+
+    def test_keeps_original_order(self):
+        """Included snippets should be joined in the order they were given."""
+        packer = ContextPacker(context_window=1000, reserve_output=0)
+        snippets = split_paragraphs("first paragraph\n\nsecond login paragraph")
+
+        packed = packer.pack("login", snippets)
+
+        assert packed.text() == "first paragraph\n\nsecond login paragraph"
+        assert packed.dropped == []
+
+    def test_text_filters_by_kind(self):
+        """text(kind) should only return snippets of that kind."""
+        packer = ContextPacker(context_window=1000, reserve_output=0)
+        snippets = [
+            Snippet(kind="context", text="some context"),
+            Snippet(kind="code", text="def add(a, b): ..."),
+        ]
+
+        packed = packer.pack("add", snippets)
+
+        assert packed.text("code") == "def add(a, b): ..."
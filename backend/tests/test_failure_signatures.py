@@ -0,0 +1,284 @@
+"""
+Tests for failure signature normalization, clustering and CI log de-duplication.
+"""
+
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.routers import ci_logs
+from app.services.failure_signatures import (
+    FailureSignatureIndex,
+    failure_signature,
+    normalize_failure,
+)
+from app.services.log_parser import analyze_buffer
+from app.services.minhash import LSHIndex, MinHasher, similarity
+
+LOG_TEMPLATE = """2024-01-0{day}T10:1{day}:00.0000000Z Run pytest
+=================================== FAILURES ===================================
+_________________ test_export _________________
+Traceback (most recent call last):
+  File "/home/{user}/work/shop/shop/export.py", line 42, in export
+    write(open("/tmp/pytest-of-runner/pytest-{run}/out.csv"))
+RuntimeError: <Exporter object at 0x7f{addr}> failed after {duration}s
+FAILED tests/test_export.py::test_export - RuntimeError
+==================== 1 failed, 23 passed in 4.52s ====================
+"""
+
+
+def make_log(day=1, user="runner", run=7, addr="3a2b", duration="1.5", extra=""):
+    return (
+        LOG_TEMPLATE.format(day=day, user=user, run=run, addr=addr, duration=duration).encode()
+        + extra.encode()
+    )
+
+
+@pytest.fixture
+def client():
+    """Create a test client for the FastAPI app."""
+    return TestClient(app)
+
+
+@pytest.fixture
+def index(tmp_path, monkeypatch):
+    """A failure index in a temporary directory, used by the router."""
+    index = FailureSignatureIndex(tmp_path / "failures.json")
+    monkeypatch.setattr(ci_logs, "get_failure_index", lambda repository=None: index)
+    return index
+
+
+class TestNormalization:
+    """Tests for run-specific noise removal."""
+
+    def test_strips_addresses_timestamps_and_temp_paths(self):
+        """Addresses, timestamps, temp paths and durations should be replaced."""
+        text = normalize_failure(
+            "2024-05-01T12:00:03.123Z <Obj at 0x7f3a2b> /tmp/pytest-12/x.py took 3.2s"
+        )
+
+        assert "0x7f3a2b" not in text
+        assert "/tmp/pytest-12" not in text
+        assert "2024-05-01" not in text
+        assert "3.2s" not in text
+
+    def test_same_failure_in_different_runs_has_same_fingerprint(self):
+        """Two runs of one failure should produce the same fingerprint."""
+        first = failure_signature(analyze_buffer(make_log()))
+        second = failure_signature(
+            analyze_buffer(make_log(day=2, user="ci", run=99, addr="ffe0", duration="12.25"))
+        )
+
+        assert first.fingerprint == second.fingerprint
+        assert first.marker == f"<!-- failure-signature: {first.fingerprint} -->"
+
+    def test_exit_code_only_failures_use_the_exit_lines(self):
+        """Logs that only fail with an exit code are told apart by the exit line and context."""
+        make = failure_signature(analyze_buffer(b"cc -c main.c\nmake: *** [all] Error 2\n"))
+        killed = failure_signature(
+            analyze_buffer(b"Run ./build.sh\n##[error]Process completed with exit code 137.\n")
+        )
+
+        assert not make.is_empty and not killed.is_empty
+        assert make.fingerprint != killed.fingerprint
+
+
+class TestMinHash:
+    """Tests for MinHash signatures and the LSH index."""
+
+    def test_similar_texts_are_candidates(self):
+        """Near-identical texts should share an LSH band; unrelated ones should not."""
+        hasher = MinHasher()
+        base = " ".join(f"word{i}" for i in range(60))
+        lsh = LSHIndex()
+        lsh.insert("base", hasher.text_signature(base))
+
+        near = hasher.text_signature(base + " extra")
+        far = hasher.text_signature(" ".join(f"other{i}" for i in range(60)))
+
+        assert "base" in lsh.query(near)
+        assert similarity(near, hasher.text_signature(base)) > 0.8
+        assert "base" not in lsh.query(far)
+
+
+class TestFailureSignatureIndex:
+    """Tests for exact and near-duplicate matching."""
+
+    async def test_exact_and_near_duplicate_match(self, tmp_path):
+        """A repeat should match exactly; a slightly different failure should match nearly."""
+        index = FailureSignatureIndex(tmp_path / "failures.json", threshold=0.6)
+        signature = failure_signature(analyze_buffer(make_log()))
+        await index.add(signature, issue_number=12)
+
+        exact = index.match(signature)
+        near = index.match(
+            failure_signature(
+                analyze_buffer(make_log(extra="E       RuntimeError: disk quota exceeded\n"))
+            )
+        )
+
+        assert exact.similarity == 1.0
+        assert near is not None and near.cluster.issue_number == 12
+        assert near.similarity < 1.0
+
+    async def test_unrelated_failure_does_not_match(self, tmp_path):
+        """A different failure should start a new cluster."""
+        index = FailureSignatureIndex(tmp_path / "failures.json")
+        await index.add(failure_signature(analyze_buffer(make_log())))
+        other = analyze_buffer(
+            b"Traceback (most recent call last):\n"
+            b"KeyError: 'customer_id'\n"
+            b"FAILED tests/test_orders.py::test_checkout - KeyError\n"
+        )
+
+        assert index.match(failure_signature(other)) is None
+
+    async def test_empty_signature_never_matches(self, tmp_path):
+        """A failure without any identifying text is neither matched nor indexed."""
+        index = FailureSignatureIndex(tmp_path / "failures.json")
+        empty = failure_signature(analyze_buffer(b"nothing failed here\n"))
+
+        assert empty.is_empty
+        assert index.match(empty) is None
+        with pytest.raises(ValueError):
+            await index.add(empty)
+
+    async def test_persisted_and_reloaded(self, tmp_path):
+        """Clusters and occurrence counts should survive a reload."""
+        path = tmp_path / "failures.json"
+        index = FailureSignatureIndex(path)
+        signature = failure_signature(analyze_buffer(make_log()))
+        cluster = await index.add(signature, issue_url="https://github.com/o/r/issues/3")
+        await index.record_occurrence(cluster)
+
+        reloaded = FailureSignatureIndex(path)
+        match = reloaded.match(signature)
+
+        assert len(reloaded) == 1
+        assert match.cluster.occurrences == 2
+        assert match.cluster.issue_url == "https://github.com/o/r/issues/3"
+
+    async def test_concurrent_occurrences_are_batched(self, tmp_path, monkeypatch):
+        """Occurrences recorded during a write are saved together in one more write."""
+        index = FailureSignatureIndex(tmp_path / "failures.json")
+        cluster = await index.add(failure_signature(analyze_buffer(make_log())))
+        writes = []
+        write = index._write
+        monkeypatch.setattr(
+            index, "_write", lambda clusters: writes.append(clusters) or write(clusters)
+        )
+
+        await asyncio.gather(*(index.record_occurrence(cluster) for _ in range(10)))
+
+        assert len(writes) == 2
+        assert writes[-1][0]["occurrences"] == 11
+        assert (
+            FailureSignatureIndex(tmp_path / "failures.json")
+            .match(failure_signature(analyze_buffer(make_log())))
+            .cluster.occurrences
+            == 11
+        )
+
+
+class TestCILogDeduplication:
+    """Tests for de-duplication in /api/v1/ci-logs/analyze."""
+
+    def test_repeated_failure_skips_llm(self, client, monkeypatch, index):
+        """A repeated failure should return the stored report without an LLM call."""
+        calls = []
+
+        class FakeLLM:
+            _groq_client = object()
+
+            async def generate(self, prompt, **kwargs):
+                calls.append(prompt)
+                return json.dumps({"title": "Export fails", "severity": "High"})
+
+        monkeypatch.setattr(ci_logs, "get_llm_service", lambda: FakeLLM())
+
+        first = client.post(
+            "/api/v1/ci-logs/analyze",
+            files={"file": ("ci.log", make_log())},
+            data={"repository": "o/r"},
+        )
+        second = client.post(
+            "/api/v1/ci-logs/analyze",
+            files={"file": ("ci.log", make_log(day=3, run=41, addr="99"))},
+            data={"repository": "o/r"},
+        )
+
+        assert first.status_code == 200 and second.status_code == 200
+        assert len(calls) == 1
+        assert first.json()["duplicate"] is False
+        data = second.json()
+        assert data["duplicate"] is True
+        assert data["occurrences"] == 2
+        assert data["signature"] == first.json()["signature"]
+        assert data["defect_report"]["title"] == "Export fails"
+
+    def test_existing_issue_is_reused(self, client, monkeypatch, index):
+        """A failure already filed on GitHub should not be drafted or filed again."""
+
+        class FakeGitHub:
+            created = []
+
+            async def find_issue(self, owner, repo, text):
+                assert text.startswith("<!-- failure-signature:")
+                return {"number": 5, "html_url": "https://github.com/o/r/issues/5"}
+
+            async def create_issue(self, *args, **kwargs):
+                self.created.append(args)
+
+        def fail_llm():
+            raise AssertionError("LLM should not be called")
+
+        monkeypatch.setattr(ci_logs, "get_github_service", lambda token: FakeGitHub())
+        monkeypatch.setattr(ci_logs, "get_llm_service", fail_llm)
+
+        response = client.post(
+            "/api/v1/ci-logs/analyze",
+            files={"file": ("ci.log", make_log())},
+            data={"repository": "o/r", "create_issue": "true"},
+        )
+
+        assert response.status_code == 200
+        assert response.json()["issue_number"] == 5
+        assert response.json()["duplicate"] is True
+        assert FakeGitHub.created == []
+        assert len(index) == 1
+
+    def test_failures_without_repository_are_not_deduplicated(self, client, monkeypatch, index):
+        """Logs from unknown repositories are always reported and never indexed."""
+        calls = []
+
+        class FakeLLM:
+            _groq_client = object()
+
+            async def generate(self, prompt, **kwargs):
+                calls.append(prompt)
+                return json.dumps({"title": "Export fails", "severity": "High"})
+
+        monkeypatch.setattr(ci_logs, "get_llm_service", lambda: FakeLLM())
+
+        responses = [
+            client.post("/api/v1/ci-logs/analyze", files={"file": ("ci.log", make_log())})
+            for _ in range(2)
+        ]
+
+        assert len(calls) == 2
+        assert [r.json()["duplicate"] for r in responses] == [False, False]
+        assert responses[1].json()["signature"] is None
+        assert len(index) == 0
+
+    def test_create_issue_requires_repository(self, client, index):
+        """Creating an issue without a repository should be rejected."""
+        response = client.post(
+            "/api/v1/ci-logs/analyze",
+            files={"file": ("ci.log", make_log())},
+            data={"create_issue": "true"},
+        )
+
+        assert response.status_code == 400
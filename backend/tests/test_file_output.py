@@ -0,0 +1,68 @@
+"""
+Tests for atomic, batched file output.
+"""
+
+import asyncio
+
+import pytest
+
+from app.routers.pytest_router import save_code_to_file
+from app.services import file_output
+from app.services.file_output import write_files
+
+
+class TestWriteFiles:
+    """Tests for write_files()."""
+
+    async def test_batch_is_written(self, tmp_path):
+        """Every file should be written, with no temporary files left behind."""
+        written = await write_files(
+            tmp_path / "out", {"test_a.py": "A = 1\n", "conftest.py": "B = 2\n"}
+        )
+
+        assert written["test_a.py"].read_text() == "A = 1\n"
+        assert written["conftest.py"].read_text() == "B = 2\n"
+        assert sorted(p.name for p in (tmp_path / "out").iterdir()) == ["conftest.py", "test_a.py"]
+
+    async def test_failed_batch_leaves_targets_untouched(self, tmp_path, monkeypatch):
+        """If any write fails, no file should be replaced and temporaries removed."""
+        (tmp_path / "conftest.py").write_text("old")
+        real_open = file_output.aiofiles.open
+
+        def failing_open(path, *args, **kwargs):
+            if "conftest" in str(path):
+                raise OSError("disk full")
+            return real_open(path, *args, **kwargs)
+
+        monkeypatch.setattr(file_output.aiofiles, "open", failing_open)
+
+        with pytest.raises(OSError):
+            await write_files(tmp_path, {"test_a.py": "new", "conftest.py": "new"})
+
+        assert [p.name for p in tmp_path.iterdir()] == ["conftest.py"]
+        assert (tmp_path / "conftest.py").read_text() == "old"
+
+    async def test_concurrent_batches_do_not_interleave(self, tmp_path):
+        """Concurrent batches into one directory should leave one batch's files intact."""
+        await asyncio.gather(
+            *(
+                write_files(tmp_path, {"test_x.py": f"# {i}\n", "conftest.py": f"# {i}\n"})
+                for i in range(20)
+            )
+        )
+
+        assert (tmp_path / "test_x.py").read_text() == (tmp_path / "conftest.py").read_text()
+        assert len(list(tmp_path.iterdir())) == 2
+
+    async def test_directory_locks_are_released(self, tmp_path):
+        """A directory's lock should not outlive its writers."""
+        await asyncio.gather(*(write_files(tmp_path / str(i), {"a.py": "x"}) for i in range(5)))
+
+        assert not any(d.is_relative_to(tmp_path) for d in file_output._directory_locks)
+
+    async def test_save_code_to_file(self, tmp_path):
+        """The router helper should return the test module's absolute path."""
+        saved = await save_code_to_file("X = 1\n", str(tmp_path), "test_mod", "Y = 2\n")
+
+        assert saved == str(tmp_path.resolve() / "test_mod.py")
+        assert (tmp_path / "conftest.py").read_text() == "Y = 2\n"
@@ -0,0 +1,146 @@
+"""
+Tests for the GitHub rate limit scheduler.
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.services.github_rate_limit import (
+    RateLimitExceeded,
+    RateLimitScheduler,
+    RequestPriority,
+    request_priority,
+)
+from app.services.github_service import GitHubService
+
+
+class FakeClock:
+    """Controllable clock; sleeping advances time instead of blocking."""
+
+    def __init__(self, now: float = 1_000.0):
+        self.now = now
+        self.slept: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def scheduler(clock):
+    """Create a scheduler driven by the fake clock."""
+    scheduler = RateLimitScheduler()
+    scheduler._clock = clock
+    scheduler._sleep = clock.sleep
+    return scheduler
+
+
+def rate_limited_response(status: int = 200, **headers: str) -> httpx.Response:
+    return httpx.Response(status, headers=headers, request=httpx.Request("GET", "https://x"))
+
+
+class TestRateLimitScheduler:
+    """Tests for RateLimitScheduler budgeting."""
+
+    def test_no_delay_without_budget_info(self, scheduler):
+        """Requests should not be delayed before any headers are seen."""
+        assert scheduler.delay_for("core", RequestPriority.INTERACTIVE) == 0
+
+    def test_paces_when_budget_is_low(self, scheduler, clock):
+        """Requests should be spread over the reset window near the limit."""
+        scheduler.update(
+            rate_limited_response(
+                **{
+                    "x-ratelimit-limit": "5000",
+                    "x-ratelimit-remaining": "100",
+                    "x-ratelimit-reset": str(clock.now + 1000),
+                }
+            )
+        )
+        assert scheduler.delay_for("core", RequestPriority.INTERACTIVE) == pytest.approx(10.0)
+
+    def test_background_respects_reserve(self, scheduler, clock):
+        """Background requests should wait for the reset while the reserve is left."""
+        scheduler.update(
+            rate_limited_response(
+                **{
+                    "x-ratelimit-limit": "5000",
+                    "x-ratelimit-remaining": "900",
+                    "x-ratelimit-reset": str(clock.now + 600),
+                }
+            )
+        )
+        assert scheduler.delay_for("core", RequestPriority.INTERACTIVE) == 0
+        assert scheduler.delay_for("core", RequestPriority.BACKGROUND) == pytest.approx(600)
+
+    def test_retry_after_blocks_resource(self, scheduler):
+        """Secondary limits should block the resource for Retry-After seconds."""
+        delay = scheduler.update(rate_limited_response(403, **{"retry-after": "30"}))
+        assert delay == 30
+        assert scheduler.delay_for("core", RequestPriority.INTERACTIVE) == pytest.approx(30)
+
+    def test_plain_forbidden_is_not_rate_limit(self, scheduler):
+        """A 403 without rate limit signals should not trigger a back-off."""
+        assert scheduler.update(rate_limited_response(403)) is None
+
+    async def test_long_wait_raises_for_interactive(self, scheduler, clock):
+        """Interactive requests should fail fast instead of waiting for a long reset."""
+        scheduler.budget("search").blocked_until = clock.now + 3000
+        with pytest.raises(RateLimitExceeded):
+            async with scheduler.slot("search", RequestPriority.INTERACTIVE):
+                pass
+
+    async def test_interactive_requests_jump_the_queue(self, scheduler):
+        """Queued interactive requests should get slots before background ones."""
+        scheduler.max_concurrency = 1
+        order: list[str] = []
+
+        async def run(name: str, priority: RequestPriority) -> None:
+            async with scheduler.slot(priority=priority):
+                order.append(name)
+
+        async with scheduler.slot():
+            background = asyncio.create_task(run("background", RequestPriority.BACKGROUND))
+            await asyncio.sleep(0)
+            with request_priority(RequestPriority.INTERACTIVE):
+                interactive = asyncio.create_task(run("interactive", RequestPriority.INTERACTIVE))
+            await asyncio.sleep(0)
+
+        await asyncio.gather(background, interactive)
+        assert order == ["interactive", "background"]
+
+
+class TestGitHubServiceRetries:
+    """Tests for rate limit handling in GitHubService requests."""
+
+    async def test_secondary_limit_is_retried(self, clock):
+        """A Retry-After response should be retried after backing off."""
+        calls = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request)
+            if len(calls) == 1:
+                return httpx.Response(403, headers={"retry-after": "5"})
+            return httpx.Response(200, json=[{"name": "a.py"}])
+
+        service = GitHubService()
+        service.scheduler._clock = clock
+        service.scheduler._sleep = clock.sleep
+
+        service._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        response = await service._request("GET", "https://api.github.com/x")
+        await service.aclose()
+
+        assert response.status_code == 200
+        assert len(calls) == 2
+        assert clock.slept == [5]
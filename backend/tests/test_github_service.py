@@ -0,0 +1,191 @@
+"""
+Tests for GitHubService search, issues and the service pool.
+"""
+
+import json
+
+import httpx
+import pytest
+
+from app.services import blob_store
+from app.services.blob_store import BlobStore
+from app.services.github_service import GitHubService, GitHubServiceError, GitHubServicePool
+
+
+@pytest.fixture
+def pool():
+    """Create a small service pool."""
+    return GitHubServicePool(max_size=2)
+
+
+class TestGitHubServicePool:
+    """Tests for GitHubServicePool."""
+
+    def test_same_token_reuses_instance(self, pool):
+        """Requests with the same token should share warm state."""
+        assert pool.get("token-a") is pool.get("token-a")
+
+    def test_tokens_get_separate_instances(self, pool):
+        """Different tokens should never share an instance."""
+        a, b = pool.get("token-a"), pool.get("token-b")
+        assert a is not b
+        assert a.token == "token-a"
+        assert b.token == "token-b"
+        assert a.scheduler is not b.scheduler
+
+    def test_tokens_do_not_share_cached_files(self, pool, tmp_path, monkeypatch):
+        """A blob cached for one token should not be served to another."""
+        monkeypatch.setattr(blob_store, "_blob_store", BlobStore(cache_dir=tmp_path))
+        a, b = pool.get("token-a"), pool.get("token-b")
+        sha = a.blob_store.put(b"PRIVATE = 1\n")
+
+        assert a.blob_store.get(sha) == b"PRIVATE = 1\n"
+        assert b.blob_store.get(sha) is None
+        assert pool.get(None).blob_store.get(sha) is None
+
+    def test_anonymous_is_shared(self, pool):
+        """Unauthenticated requests should share one instance."""
+        assert pool.get(None) is pool.get("")
+
+    def test_least_recently_used_is_evicted(self, pool):
+        """The pool should stay bounded, evicting the least recently used token."""
+        a = pool.get("token-a")
+        pool.get("token-b")
+        pool.get("token-a")
+        pool.get("token-c")
+
+        assert len(pool) == 2
+        assert pool.get("token-a") is a
+        assert a._retired is False
+
+    def test_keys_do_not_contain_raw_tokens(self, pool):
+        """Pool keys should be hashes, not the tokens themselves."""
+        pool.get("ghp_secret")
+        assert all("ghp_secret" not in key for key in pool._services)
+
+
+class TestSearchCode:
+    """Tests for paginated, cached code search."""
+
+    @pytest.fixture
+    def search_calls(self):
+        return []
+
+    @pytest.fixture
+    def service(self, search_calls):
+        """Service whose search API returns two pages with an overlapping hit."""
+        pages = {
+            1: [{"path": f"a{i}.py", "sha": str(i)} for i in range(100)],
+            2: [{"path": "a0.py", "sha": "0"}, {"path": "b.py", "sha": "b"}],
+        }
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            page = int(request.url.params["page"])
+            search_calls.append(page)
+            return httpx.Response(200, json={"items": pages.get(page, [])})
+
+        service = GitHubService(token="t")
+        service._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        return service
+
+    async def test_pages_and_deduplicates(self, service, search_calls):
+        """Results should span pages without repeating a (path, sha) hit."""
+        items = await service.search_code("octo", "repo", "def", max_results=500)
+
+        assert len(items) == 101
+        assert items[-1]["path"] == "b.py"
+        assert search_calls == [1, 2]
+
+    async def test_pages_are_fetched_lazily(self, service, search_calls):
+        """Stopping early should not request further pages."""
+        async for _ in service.iter_search_code("octo", "repo", "def", max_results=500):
+            break
+
+        assert search_calls == [1]
+
+    async def test_repeated_query_is_served_from_cache(self, service, search_calls):
+        """The same query at the same commit should not hit the API again."""
+        first = await service.search_code("octo", "repo", "def", 5, commit_sha="abc")
+        second = await service.search_code("octo", "repo", "def", 5, commit_sha="abc")
+
+        assert first == second
+        assert search_calls == [1]
+
+    async def test_different_commit_is_a_cache_miss(self, service, search_calls):
+        """Results are keyed by commit SHA as well as the query."""
+        await service.search_code("octo", "repo", "def", 5, commit_sha="abc")
+        await service.search_code("octo", "repo", "def", 5, commit_sha="def")
+
+        assert search_calls == [1, 1]
+
+
+def issue_node(number: int, comments: list[str] | None = None) -> dict:
+    return {
+        "number": number,
+        "title": f"Issue {number}",
+        "body": "As a user I want to log in",
+        "url": f"https://github.com/octo/repo/issues/{number}",
+        "updatedAt": "2024-01-01T00:00:00Z",
+        "labels": {"nodes": [{"name": "feature"}]},
+        "milestone": None,
+        "comments": {"nodes": [{"body": c} for c in comments or []]},
+    }
+
+
+class TestGetIssues:
+    """Tests for GraphQL issue listing."""
+
+    @pytest.fixture
+    def queries(self):
+        return []
+
+    @pytest.fixture
+    def service(self, queries):
+        """Service whose GraphQL API returns two pages of issues."""
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            variables = json.loads(request.content)["variables"]
+            queries.append(variables)
+            if variables["after"] is None:
+                nodes = [issue_node(1, ["Also support SSO"]), issue_node(2)]
+                page_info = {"hasNextPage": True, "endCursor": "c1"}
+            else:
+                nodes = [issue_node(3)]
+                page_info = {"hasNextPage": False, "endCursor": None}
+            issues = {"pageInfo": page_info, "nodes": nodes}
+            return httpx.Response(200, json={"data": {"repository": {"issues": issues}}})
+
+        service = GitHubService(token="t")
+        service._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        return service
+
+    async def test_pages_through_issues(self, service, queries):
+        """Issues should be fetched one GraphQL query per page."""
+        issues = await service.get_issues("octo", "repo", labels=["feature"])
+
+        assert [i.number for i in issues] == [1, 2, 3]
+        assert [q["after"] for q in queries] == [None, "c1"]
+        assert queries[0]["labels"] == ["feature"]
+
+    async def test_comments_are_part_of_the_requirement(self, service):
+        """Comments should be included in the requirement text and its hash."""
+        issues = await service.get_issues("octo", "repo", max_issues=2)
+
+        assert "Also support SSO" in issues[0].requirement
+        assert issues[0].content_hash != issues[1].content_hash
+
+    async def test_one_query_per_milestone(self, service, queries):
+        """Each milestone should be filtered in its own query."""
+        await service.get_issues("octo", "repo", milestones=["1", "2"], max_issues=50)
+
+        assert [q["filterBy"] for q in queries] == [
+            {"milestoneNumber": "1"},
+            {"milestoneNumber": "1"},
+            {"milestoneNumber": "2"},
+            {"milestoneNumber": "2"},
+        ]
+
+    async def test_graphql_requires_token(self):
+        """The GraphQL API cannot be used anonymously."""
+        with pytest.raises(GitHubServiceError):
+            await GitHubService().get_issues("octo", "repo")
@@ -0,0 +1,215 @@
+"""
+Tests for AST code units and incremental repository analysis.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.routers import pytest_router
+from app.services import incremental_analysis
+from app.services.code_units import extract_units
+from app.services.github_service import GitHubFile
+from app.services.incremental_analysis import AnalysisStateStore, IncrementalAnalyzer
+
+SOURCE_V1 = """
+import os
+
+
+def add(a, b):
+    return a + b
+
+
+@staticmethod
+def helper():
+    return os.getcwd()
+
+
+class Greeter:
+    def greet(self, name):
+        return f"hi {name}"
+"""
+
+
+class FakeGitHubService:
+    """In-memory stand-in for the GitHub endpoints the analyzer uses."""
+
+    def __init__(self):
+        self.head = "c1"
+        self.files: dict[str, str] = {}
+        self.changed: list[dict] = []
+        self.fetched: list[str] = []
+
+    async def get_commit_sha(self, owner, repo, ref=None):
+        return self.head
+
+    async def compare_commits(self, owner, repo, base, head):
+        return self.changed
+
+    async def find_python_entries(self, owner, repo, path="", branch=None, max_files=50):
+        return [{"path": p, "sha": p} for p in self.files]
+
+    async def get_files_from_entries(self, owner, repo, entries, branch=None):
+        self.fetched.extend(e["path"] for e in entries)
+        return [GitHubFile(e["path"], e["path"], self.files[e["path"]]) for e in entries]
+
+
+class TestExtractUnits:
+    """Tests for extract_units()."""
+
+    def test_extracts_functions_and_classes(self):
+        """Top-level functions and classes should become units."""
+        units = extract_units(SOURCE_V1)
+        assert [(u.name, u.kind) for u in units] == [
+            ("add", "function"),
+            ("helper", "function"),
+            ("Greeter", "class"),
+        ]
+
+    def test_unit_source_includes_decorators(self):
+        """A unit's source should start at its first decorator."""
+        helper = extract_units(SOURCE_V1)[1]
+        assert helper.source.startswith("@staticmethod")
+
+    def test_fingerprint_ignores_formatting(self):
+        """Comments, blank lines and position should not change fingerprints."""
+        moved = "# comment\n\n\n" + SOURCE_V1.replace("return a + b", "return a + b  # sum")
+        assert [u.fingerprint for u in extract_units(moved)] == [
+            u.fingerprint for u in extract_units(SOURCE_V1)
+        ]
+
+
+class TestIncrementalAnalyzer:
+    """Tests for IncrementalAnalyzer."""
+
+    @pytest.fixture
+    def service(self):
+        service = FakeGitHubService()
+        service.files = {"pkg/math.py": SOURCE_V1, "pkg/other.py": "def other():\n    pass\n"}
+        return service
+
+    @pytest.fixture
+    def analyzer(self, service, tmp_path):
+        return IncrementalAnalyzer(service, store=AnalysisStateStore(tmp_path))
+
+    @staticmethod
+    async def generate(path, unit):
+        return f"tests for {unit.name}"
+
+    async def test_first_run_generates_everything(self, analyzer, service):
+        """The first analysis should fetch all files and generate every unit."""
+        result = await analyzer.analyze("octo", "repo", self.generate)
+
+        assert result.base_sha is None
+        assert result.files_fetched == 2
+        assert result.units_generated == 4
+        assert result.units_reused == 0
+
+    async def test_rerun_only_fetches_changed_files(self, analyzer, service):
+        """Follow-up runs should only regenerate units whose AST changed."""
+        await analyzer.analyze("octo", "repo", self.generate)
+
+        service.head = "c2"
+        service.files["pkg/math.py"] = SOURCE_V1.replace("a + b", "b + a")
+        service.changed = [{"filename": "pkg/math.py", "status": "modified", "sha": "x"}]
+        service.fetched.clear()
+
+        result = await analyzer.analyze("octo", "repo", self.generate)
+
+        assert service.fetched == ["pkg/math.py"]
+        assert result.base_sha == "c1"
+        assert result.units_generated == 1
+        assert result.units_reused == 3
+        assert {r.name for r in result.results if not r.reused} == {"add"}
+
+    async def test_removed_files_are_dropped(self, analyzer, service):
+        """Units from deleted files should not appear in later results."""
+        await analyzer.analyze("octo", "repo", self.generate)
+
+        service.head = "c2"
+        service.changed = [{"filename": "pkg/other.py", "status": "removed", "sha": "y"}]
+
+        result = await analyzer.analyze("octo", "repo", self.generate)
+
+        assert result.removed_paths == ["pkg/other.py"]
+        assert all(r.path != "pkg/other.py" for r in result.results)
+
+    async def test_identical_units_in_different_files(self, analyzer, service):
+        """Each file gets its own artifact, even when a unit's code is the same."""
+        service.files["pkg/copy.py"] = "def other():\n    pass\n"
+
+        async def generate(path, unit):
+            return f"from {path} import {unit.name}"
+
+        result = await analyzer.analyze("octo", "repo", generate)
+
+        artifacts = {r.path: r.artifact for r in result.results if r.name == "other"}
+        assert artifacts == {
+            "pkg/copy.py": "from pkg/copy.py import other",
+            "pkg/other.py": "from pkg/other.py import other",
+        }
+        assert result.units_generated == 5
+
+    async def test_other_path_is_analyzed_in_full(self, analyzer, service):
+        """A run for another directory at the same commit does not reuse the first run's state."""
+        service.files["app/main.py"] = "def main():\n    pass\n"
+        await analyzer.analyze("octo", "repo", self.generate, path="pkg")
+        service.fetched.clear()
+
+        result = await analyzer.analyze("octo", "repo", self.generate, path="app")
+
+        assert service.fetched == ["app/main.py"]
+        assert result.base_sha is None
+        assert [r.name for r in result.results] == ["main"]
+
+
+class TestGenerateFromRepositoryEndpoint:
+    """Tests for POST /api/v1/pytest/generate-from-repository."""
+
+    @pytest.fixture
+    def service(self, tmp_path, monkeypatch):
+        service = FakeGitHubService()
+        service.files = {"pkg/math.py": SOURCE_V1}
+        monkeypatch.setattr(pytest_router, "get_github_service", lambda token: service)
+        monkeypatch.setattr(
+            incremental_analysis, "_analysis_state_store", AnalysisStateStore(tmp_path / "state")
+        )
+        return service
+
+    @pytest.fixture
+    def prompts(self, monkeypatch):
+        prompts: list[str] = []
+
+        class FakeLLM:
+            _groq_client = object()
+
+            async def generate(self, prompt, system_prompt=None, max_tokens=0, temperature=0):
+                prompts.append(prompt)
+                return "```python\ndef test_unit():\n    assert True\n```"
+
+        monkeypatch.setattr(pytest_router, "get_llm_service", lambda: FakeLLM())
+        return prompts
+
+    def test_second_request_reuses_unchanged_units(self, service, prompts):
+        """Only units changed since the recorded commit should be generated again."""
+        client = TestClient(app)
+        first = client.post(
+            "/api/v1/pytest/generate-from-repository", json={"repository": "octo/repo"}
+        )
+
+        service.head = "c2"
+        service.files["pkg/math.py"] = SOURCE_V1.replace("a + b", "b + a")
+        service.changed = [{"filename": "pkg/math.py", "status": "modified", "sha": "x"}]
+        second = client.post(
+            "/api/v1/pytest/generate-from-repository", json={"repository": "octo/repo"}
+        )
+
+        assert first.status_code == 200 and second.status_code == 200
+        assert first.json()["units_generated"] == 3
+        body = second.json()
+        assert body["base_sha"] == "c1"
+        assert (body["units_generated"], body["units_reused"]) == (1, 2)
+        assert [u["name"] for u in body["units"] if not u["reused"]] == ["add"]
+        assert body["units"][0]["code"].startswith("def test_unit")
+        assert len(prompts) == 4
+        assert body["artifact_id"]
@@ -0,0 +1,96 @@
+"""
+Tests for test case generation from GitHub issues.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models.testcase import TestCase as GeneratedTestCase
+from app.routers import testcases
+from app.services.github_service import GitHubIssue
+from app.services.requirement_ledger import RequirementLedger
+
+
+class FakeGitHubService:
+    """Returns a fixed list of issues."""
+
+    def __init__(self, issues: list[GitHubIssue]):
+        self.issues = issues
+
+    async def get_issues(self, owner, repo, **kwargs) -> list[GitHubIssue]:
+        return self.issues
+
+
+@pytest.fixture
+def issues():
+    return [
+        GitHubIssue(1, "Login", "Users log in with email", "https://x/1", "2024-01-01"),
+        GitHubIssue(2, "Logout", "Users can log out", "https://x/2", "2024-01-01"),
+    ]
+
+
+@pytest.fixture
+def generated(monkeypatch, tmp_path, issues):
+    """Patch GitHub, the LLM and the ledger; record generated requirements."""
+    calls: list[str] = []
+
+    async def fake_generate(requirement: str, **kwargs) -> list[GeneratedTestCase]:
+        calls.append(requirement)
+        return [
+            GeneratedTestCase(
+                id="TC001",
+                title=requirement.splitlines()[0],
+                description="",
+                steps=["Do it"],
+                expected_result="It works",
+            )
+        ]
+
+    ledger = RequirementLedger(tmp_path)
+    monkeypatch.setattr(testcases, "get_github_service", lambda token: FakeGitHubService(issues))
+    monkeypatch.setattr(testcases, "generate_structured_test_cases", fake_generate)
+    monkeypatch.setattr(testcases, "get_requirement_ledger", lambda: ledger)
+    return calls
+
+
+@pytest.fixture
+def client():
+    """Create a test client for the FastAPI app."""
+    return TestClient(app)
+
+
+class TestIssueIngestion:
+    """Tests for /api/v1/testcases/from-issues."""
+
+    def test_generates_for_every_issue(self, client, generated):
+        """First ingest should generate test cases for each issue."""
+        response = client.post("/api/v1/testcases/from-issues", json={"repository": "octo/repo"})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["generated"] == 2
+        assert [i["status"] for i in data["issues"]] == ["generated", "generated"]
+        assert len(generated) == 2
+
+    def test_unchanged_issues_are_skipped(self, client, generated, issues):
+        """Re-ingesting should only regenerate edited issues."""
+        client.post("/api/v1/testcases/from-issues", json={"repository": "octo/repo"})
+        issues[1].body = "Users can log out from every device"
+
+        response = client.post("/api/v1/testcases/from-issues", json={"repository": "octo/repo"})
+
+        data = response.json()
+        assert [i["status"] for i in data["issues"]] == ["unchanged", "generated"]
+        assert data["issues"][0]["test_cases"][0]["title"] == "Login"
+        assert len(generated) == 3
+
+    def test_changed_settings_regenerate(self, client, generated):
+        """A different number of cases should not reuse stored results."""
+        client.post("/api/v1/testcases/from-issues", json={"repository": "octo/repo"})
+        response = client.post(
+            "/api/v1/testcases/from-issues",
+            json={"repository": "octo/repo", "num_cases": 3},
+        )
+
+        assert response.json()["generated"] == 2
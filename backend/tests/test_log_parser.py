@@ -0,0 +1,143 @@
+"""
+Tests for CI log parsing and the CI log endpoint.
+"""
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.routers import ci_logs
+from app.services.failure_signatures import FailureSignatureIndex
+from app.services.log_parser import analyze_buffer, analyze_log_file
+
+PYTEST_LOG = b"""2024-01-01T00:00:00.0000000Z Run pytest
+============================= test session starts ==============================
+collected 24 items
+
+=================================== FAILURES ===================================
+_________________ TestUserService.test_create_user _________________
+
+    def test_create_user(self, db_session):
+>       assert user.id is not None
+E       AttributeError: 'NoneType' object has no attribute 'id'
+
+tests/test_user_service.py:25: AttributeError
+=========================== short test summary info ============================
+FAILED tests/test_user_service.py::TestUserService::test_create_user - AttributeError
+==================== 1 failed, 23 passed in 4.52s ====================
+2024-01-01T00:00:05.0000000Z ##[error]Process completed with exit code 1.
+"""
+
+
+@pytest.fixture
+def client():
+    """Create a test client for the FastAPI app."""
+    return TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def failure_index(tmp_path, monkeypatch):
+    """Keep failure signatures out of the shared index."""
+    index = FailureSignatureIndex(tmp_path / "failures.json")
+    monkeypatch.setattr(ci_logs, "get_failure_index", lambda repository=None: index)
+    return index
+
+
+class TestAnalyzeBuffer:
+    """Tests for failure extraction."""
+
+    def test_extracts_failures(self):
+        """Failed tests, errors, summary and exit codes should be found."""
+        analysis = analyze_buffer(PYTEST_LOG)
+
+        assert analysis.failed_tests == [
+            "tests/test_user_service.py::TestUserService::test_create_user"
+        ]
+        assert analysis.errors == ["AttributeError: 'NoneType' object has no attribute 'id'"]
+        assert analysis.summary == "1 failed, 23 passed in 4.52s"
+        assert analysis.exit_codes == [1]
+
+    def test_excerpts_have_line_numbers_and_no_timestamps(self):
+        """Excerpts should point at the right lines and strip CI decorations."""
+        analysis = analyze_buffer(PYTEST_LOG, context_lines=1)
+
+        first = analysis.excerpts[0]
+        assert first.start_line == 9
+        assert first.text.splitlines()[0] == ">       assert user.id is not None"
+        assert "2024-01-01T" not in analysis.excerpt_text()
+
+    def test_traceback_on_first_line(self):
+        """A failure on the very first line should not be missed."""
+        analysis = analyze_buffer(
+            b"Traceback (most recent call last):\n  File x\nValueError: boom\n"
+        )
+
+        assert analysis.excerpts[0].kinds == ["traceback", "error"]
+        assert analysis.errors == ["ValueError: boom"]
+
+    def test_excerpts_are_bounded(self):
+        """Many failures should be capped and reported as truncated."""
+        log = b"".join(b"ok\n" * 50 + f"RuntimeError: fail {i}\n".encode() for i in range(10))
+
+        analysis = analyze_buffer(log, context_lines=2, max_excerpts=3, max_excerpt_bytes=64)
+
+        assert len(analysis.excerpts) == 3
+        assert analysis.truncated
+        assert all(len(e.text) <= 64 for e in analysis.excerpts)
+
+    def test_clean_log_has_no_failures(self):
+        """A passing log should produce nothing to report."""
+        analysis = analyze_buffer(b"collected 3 items\n=== 3 passed in 0.1s ===\n")
+        assert not analysis.has_failures
+
+    def test_memory_mapped_file(self, tmp_path):
+        """Files should be scanned through a memory map with the same results."""
+        path = tmp_path / "ci.log"
+        path.write_bytes(PYTEST_LOG)
+
+        assert analyze_log_file(path).failed_tests == analyze_buffer(PYTEST_LOG).failed_tests
+
+    def test_empty_file(self, tmp_path):
+        """An empty log cannot be memory-mapped and should just be empty."""
+        path = tmp_path / "empty.log"
+        path.write_bytes(b"")
+        assert analyze_log_file(path).size_bytes == 0
+
+
+class TestCILogEndpoint:
+    """Tests for /api/v1/ci-logs/analyze."""
+
+    def test_analyze_without_report(self, client):
+        """Failures should be returned without calling the LLM."""
+        response = client.post(
+            "/api/v1/ci-logs/analyze",
+            files={"file": ("ci.log", PYTEST_LOG)},
+            data={"generate_report": "false"},
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["exit_codes"] == [1]
+        assert data["defect_report"] is None
+
+    def test_only_excerpts_are_sent_to_llm(self, client, monkeypatch):
+        """The defect report prompt should carry excerpts, not the whole log."""
+        prompts = []
+
+        class FakeLLM:
+            _groq_client = object()
+
+            async def generate(self, prompt, **kwargs):
+                prompts.append(prompt)
+                return json.dumps({"title": "test_create_user fails", "severity": "High"})
+
+        monkeypatch.setattr(ci_logs, "get_llm_service", lambda: FakeLLM())
+        log = b"build output line\n" * 5000 + PYTEST_LOG
+
+        response = client.post("/api/v1/ci-logs/analyze", files={"file": ("ci.log", log)})
+
+        assert response.status_code == 200
+        assert response.json()["defect_report"]["title"] == "test_create_user fails"
+        assert len(prompts[0]) < 5000
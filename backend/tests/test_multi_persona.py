@@ -0,0 +1,200 @@
+"""
+Tests for concurrent multi-persona test case generation.
+"""
+
+import asyncio
+import json
+import typing
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models.testcase import Persona
+from app.models.testcase import TestCase as GeneratedTestCase
+from app.prompts.testcase_prompt import PERSONAS, get_system_prompt
+from app.routers import testcases
+from app.services import testcase_generation
+from app.services.testcase_generation import merge_test_cases
+
+REQUIREMENT = "Users can reset their password with an emailed link"
+
+
+def make_case(title: str, steps: list[str], expected: str, id: str = "TC001") -> GeneratedTestCase:
+    return GeneratedTestCase(
+        id=id, title=title, description="", steps=steps, expected_result=expected
+    )
+
+
+class FakeLLM:
+    """Answers as the persona whose system prompt it is given, and tracks concurrency."""
+
+    _groq_client = object()
+
+    def __init__(self, failing: set[str] | None = None):
+        self.failing = failing or set()
+        self.running = 0
+        self.max_running = 0
+        self.personas: list[str] = []
+        self._by_prompt = {get_system_prompt(p): p for p in PERSONAS}
+
+    async def generate(self, prompt: str, system_prompt: str | None = None, **kwargs) -> str:
+        persona = self._by_prompt[system_prompt]
+        self.personas.append(persona)
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(0.05)
+        finally:
+            self.running -= 1
+        if persona in self.failing:
+            raise RuntimeError("provider error")
+        shared = {
+            "id": "TC001",
+            "title": "Reset password with a valid link",
+            "description": "Happy path",
+            "steps": ["Request a reset link", "Open the emailed link", "Set a new password"],
+            "expected_result": "The password is changed and the user can log in",
+        }
+        own = {
+            "id": "TC002",
+            "title": f"{persona} check",
+            "description": persona,
+            "steps": [f"Run the {persona} scenario"],
+            "expected_result": f"{persona} expectations hold",
+        }
+        return json.dumps({"test_cases": [shared, own]})
+
+
+@pytest.fixture
+def client():
+    """Create a test client for the FastAPI app."""
+    return TestClient(app)
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    llm = FakeLLM()
+    monkeypatch.setattr(testcase_generation, "get_llm_service", lambda: llm)
+    monkeypatch.setattr(testcases, "get_llm_service", lambda: llm)
+    return llm
+
+
+class TestMergeTestCases:
+    """Tests for merge_test_cases()."""
+
+    def test_near_duplicates_are_removed(self):
+        """A rephrased case from a later persona is dropped."""
+        merged, removed = merge_test_cases(
+            {
+                "qa_engineer": [
+                    make_case(
+                        "Login with valid credentials",
+                        ["Open the login page", "Enter a valid email and password", "Submit"],
+                        "The user is logged in and sees the dashboard",
+                    )
+                ],
+                "api_tester": [
+                    make_case(
+                        "Login with valid credentials succeeds",
+                        ["Open the login page", "Enter a valid email and password", "Submit"],
+                        "The user is logged in and sees the dashboard",
+                    ),
+                    make_case("Rate limit", ["Send 100 requests"], "HTTP 429 is returned"),
+                ],
+            }
+        )
+
+        assert removed == 1
+        assert [tc.title for tc in merged] == ["Login with valid credentials", "Rate limit"]
+
+    def test_ids_are_renumbered_and_personas_tagged(self):
+        """Merged cases are numbered in order and keep their persona."""
+        merged, _ = merge_test_cases(
+            {
+                "qa_engineer": [make_case("A", ["one"], "first", id="TC001")],
+                "security_analyst": [make_case("B", ["two"], "second", id="TC001")],
+            }
+        )
+
+        assert [(tc.id, tc.persona) for tc in merged] == [
+            ("TC001", "qa_engineer"),
+            ("TC002", "security_analyst"),
+        ]
+
+    def test_persona_literal_matches_templates(self):
+        """Every persona accepted by the API has a system prompt template."""
+        assert set(typing.get_args(Persona)) == set(PERSONAS)
+
+
+class TestMultiPersonaEndpoint:
+    """Tests for /api/v1/testcases/generate with personas."""
+
+    def test_personas_run_concurrently_and_merge(self, client, fake_llm):
+        """All personas are called at once; the shared case is kept once."""
+        personas = ["qa_engineer", "security_analyst", "api_tester"]
+        response = client.post(
+            "/api/v1/testcases/generate",
+            json={"requirement": REQUIREMENT, "num_cases": 2, "personas": personas},
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert sorted(fake_llm.personas) == sorted(personas)
+        assert fake_llm.max_running == len(personas)
+        assert data["personas"] == personas
+        assert data["duplicates_removed"] == 2
+        assert data["total_count"] == 4
+        assert [tc["id"] for tc in data["test_cases"]] == ["TC001", "TC002", "TC003", "TC004"]
+        assert [tc["persona"] for tc in data["test_cases"]] == [
+            "qa_engineer",
+            "qa_engineer",
+            "security_analyst",
+            "api_tester",
+        ]
+
+    def test_failed_persona_is_reported(self, client, fake_llm):
+        """A failing persona is left out instead of failing the request."""
+        fake_llm.failing = {"mobile_qa"}
+        response = client.post(
+            "/api/v1/testcases/generate",
+            json={"requirement": REQUIREMENT, "personas": ["qa_engineer", "mobile_qa"]},
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["personas"] == ["qa_engineer"]
+        assert data["failed_personas"] == ["mobile_qa"]
+
+    def test_every_persona_failing_is_an_error(self, client, fake_llm):
+        """If no persona produced test cases the request fails."""
+        fake_llm.failing = {"qa_engineer"}
+        response = client.post(
+            "/api/v1/testcases/generate",
+            json={"requirement": REQUIREMENT, "personas": ["qa_engineer"]},
+        )
+
+        assert response.status_code == 500
+
+    def test_personas_require_json_output(self, client, fake_llm):
+        """Merging needs structured test cases."""
+        response = client.post(
+            "/api/v1/testcases/generate",
+            json={
+                "requirement": REQUIREMENT,
+                "personas": ["qa_engineer"],
+                "output_format": "markdown",
+            },
+        )
+
+        assert response.status_code == 400
+        assert fake_llm.personas == []
+
+    def test_unknown_persona_is_rejected(self, client, fake_llm):
+        """Persona names are validated."""
+        response = client.post(
+            "/api/v1/testcases/generate",
+            json={"requirement": REQUIREMENT, "personas": ["pirate"]},
+        )
+
+        assert response.status_code == 422
@@ -0,0 +1,265 @@
+"""
+Tests for chunked pull request review.
+"""
+
+import json
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models.review_models import ReviewComment
+from app.routers import reviews
+from app.services.github_service import GitHubService, PullRequest
+from app.services.pr_review import (
+    ChunkReview,
+    ReviewCache,
+    ReviewChunk,
+    approval_for,
+    assign_comments,
+    group_hunks,
+    merge_comments,
+    parse_patch,
+    parse_pull_request_ref,
+    unreviewed_files,
+)
+
+AUTH_PATCH = """@@ -1,3 +1,4 @@
+ import os
++import base64
+
+ def login():
+@@ -20,2 +21,3 @@ def login():
+     query = build()
++    run(query)
+     return query"""
+
+CART_PATCH = """@@ -5,2 +5,3 @@ class Cart:
+     def total(self):
++        return sum(self.items)
+         pass"""
+
+
+def comment(**kwargs) -> ReviewComment:
+    return ReviewComment(**{"file": "app/auth.py", "title": "Issue", **kwargs})
+
+
+@pytest.fixture
+def client():
+    """Create a test client for the FastAPI app."""
+    return TestClient(app)
+
+
+class TestDiffHunks:
+    """Tests for patch parsing and chunking."""
+
+    def test_parse_patch(self):
+        """Each @@ header should start a hunk with its new-file range."""
+        hunks = parse_patch("app/auth.py", AUTH_PATCH)
+
+        assert [(h.new_start, h.new_lines) for h in hunks] == [(1, 4), (21, 3)]
+        assert hunks[1].text.startswith("@@ -20,2 +21,3 @@")
+
+    def test_hash_ignores_position(self):
+        """A hunk moved by an earlier edit should keep its content hash."""
+        moved = AUTH_PATCH.replace("@@ -20,2 +21,3 @@", "@@ -30,2 +31,3 @@")
+
+        assert (
+            parse_patch("app/auth.py", AUTH_PATCH)[1].content_hash
+            == parse_patch("app/auth.py", moved)[1].content_hash
+        )
+
+    def test_files_stay_together_within_budget(self):
+        """Hunks of one file should share a chunk and chunks should respect the budget."""
+        hunks = parse_patch("app/auth.py", AUTH_PATCH) + parse_patch("app/cart.py", CART_PATCH)
+
+        one = group_hunks(hunks, budget_tokens=10_000)
+        split = group_hunks(hunks, budget_tokens=120)
+
+        assert len(one) == 1 and one[0].files == ["app/auth.py", "app/cart.py"]
+        assert [c.files for c in split] == [["app/auth.py"], ["app/cart.py"]]
+        assert all(c.tokens <= 120 for c in split)
+        assert "+++ b/app/cart.py" in split[1].diff()
+
+    def test_large_file_is_split_at_hunks(self):
+        """A file over the budget should be split between hunks, not dropped."""
+        hunks = parse_patch("app/auth.py", AUTH_PATCH)
+
+        chunks = group_hunks(hunks, budget_tokens=60)
+
+        assert [len(c.hunks) for c in chunks] == [1, 1]
+
+    def test_parse_pull_request_ref(self):
+        """URLs and owner/repo#number references should be accepted."""
+        assert parse_pull_request_ref("https://github.com/octo/shop/pull/42") == (
+            "octo",
+            "shop",
+            42,
+        )
+        assert parse_pull_request_ref("octo/shop#7") == ("octo", "shop", 7)
+        with pytest.raises(ValueError):
+            parse_pull_request_ref("octo/shop")
+
+
+class TestComments:
+    """Tests for mapping and merging comments."""
+
+    def test_assign_to_nearest_hunk(self):
+        """Comments should attach to the hunk nearest their line."""
+        hunks = parse_patch("app/auth.py", AUTH_PATCH)
+
+        assigned = assign_comments(
+            [comment(line=22), comment(line=2), comment(file="other.py", line=1)], hunks
+        )
+
+        assert [c.line for c in assigned[hunks[0].content_hash]] == [2]
+        assert [c.line for c in assigned[hunks[1].content_hash]] == [22]
+
+    def test_merge_deduplicates_similar_comments(self):
+        """Near-identical comments from different chunks should collapse to the most severe."""
+        merged = merge_comments(
+            [
+                comment(line=10, title="SQL injection in query", severity="Medium"),
+                comment(line=11, title="Possible SQL injection in query", severity="Critical"),
+                comment(line=40, title="Missing docstring", category="Style"),
+            ]
+        )
+
+        assert [(c.line, c.severity) for c in merged] == [(11, "Critical"), (40, "Info")]
+
+    def test_cached_comments_follow_their_hunk(self):
+        """Reused comments should move with their hunk."""
+        hunk = parse_patch("app/auth.py", AUTH_PATCH)[1]
+        moved = parse_patch("app/auth.py", AUTH_PATCH.replace("+21,3", "+31,3"))[1]
+
+        cached = ReviewCache.to_cached([comment(line=22)], hunk)
+
+        assert ReviewCache.from_cached(cached, moved)[0].line == 32
+
+    def test_failed_chunk_is_not_approved(self):
+        """A review with a failed chunk should comment and name the unreviewed files."""
+        reviewed = ChunkReview(ReviewChunk(parse_patch("app/cart.py", CART_PATCH)))
+        failed = ChunkReview(ReviewChunk(parse_patch("app/auth.py", AUTH_PATCH)), error="timeout")
+
+        assert approval_for([], [reviewed]) == "APPROVE"
+        assert approval_for([], [reviewed, failed]) == "COMMENT"
+        assert unreviewed_files([reviewed, failed]) == ["app/auth.py"]
+
+
+class TestPullRequestFiles:
+    """Tests for fetching pull request files."""
+
+    async def test_pages_through_files(self):
+        """Files should be fetched 100 per page until a short page."""
+        pages = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            page = int(request.url.params["page"])
+            pages.append(page)
+            count = 100 if page == 1 else 3
+            return httpx.Response(
+                200, json=[{"filename": f"f{page}_{i}.py", "status": "added"} for i in range(count)]
+            )
+
+        service = GitHubService(token="t")
+        service._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+        files = await service.get_pull_request_files("octo", "shop", 1)
+
+        assert len(files) == 103
+        assert pages == [1, 2]
+
+
+class TestReviewEndpoint:
+    """Tests for /api/v1/reviews/pull-request."""
+
+    @pytest.fixture
+    def setup(self, tmp_path, monkeypatch):
+        """Fake GitHub and LLM services and a temporary review cache."""
+        state = {
+            "files": [
+                {"filename": "app/auth.py", "status": "modified", "patch": AUTH_PATCH},
+                {"filename": "app/cart.py", "status": "modified", "patch": CART_PATCH},
+                {"filename": "logo.png", "status": "added"},
+            ],
+            "prompts": [],
+        }
+
+        class FakeGitHub:
+            async def get_pull_request(self, owner, repo, number):
+                return PullRequest(
+                    number=number,
+                    title="Add login",
+                    body="",
+                    url=f"https://github.com/{owner}/{repo}/pull/{number}",
+                    state="open",
+                    head_sha="head",
+                    base_sha="base",
+                    changed_files=len(state["files"]),
+                )
+
+            async def get_pull_request_files(self, owner, repo, number):
+                return state["files"]
+
+        class FakeLLM:
+            _groq_client = object()
+
+            async def generate(self, prompt, **kwargs):
+                state["prompts"].append(prompt)
+                comments = [
+                    {"severity": "High", "category": "Bug", "file": file, "line": line}
+                    | {"title": f"Bug in {file}"}
+                    for file, line in (("app/auth.py", 22), ("app/cart.py", 6))
+                    if f"+++ b/{file}" in prompt
+                ]
+                comments.append({"category": "Documentation", "file": "app/auth.py", "title": "?"})
+                return json.dumps({"summary": "Reviewed", "comments": comments})
+
+        monkeypatch.setattr(reviews, "get_github_service", lambda token: FakeGitHub())
+        monkeypatch.setattr(reviews, "get_llm_service", lambda: FakeLLM())
+        monkeypatch.setattr(reviews, "get_review_cache", lambda: ReviewCache(tmp_path))
+        return state
+
+    def test_reviews_and_merges_comments(self, client, setup):
+        """Each chunk should be reviewed once and comments merged into one review."""
+        response = client.post(
+            "/api/v1/reviews/pull-request",
+            json={"pull_request": "octo/shop#42", "chunk_tokens": 500},
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["approval_recommendation"] == "REQUEST_CHANGES"
+        assert data["stats"]["high"] == 2
+        assert [c["file"] for c in data["comments"]] == ["app/auth.py", "app/cart.py"]
+        assert data["files_skipped"] == ["logo.png"]
+        assert data["hunks_total"] == 3
+        assert len(setup["prompts"]) == 1
+
+    def test_unchanged_hunks_are_skipped_on_repush(self, client, setup):
+        """A re-push should only review edited hunks and keep the other comments."""
+        client.post(
+            "/api/v1/reviews/pull-request",
+            json={"pull_request": "octo/shop#42", "chunk_tokens": 500},
+        )
+        setup["files"][1]["patch"] = CART_PATCH.replace("sum(self.items)", "sum(self.prices)")
+        setup["prompts"].clear()
+
+        response = client.post(
+            "/api/v1/reviews/pull-request",
+            json={"pull_request": "octo/shop#42", "chunk_tokens": 500},
+        )
+
+        data = response.json()
+        assert len(setup["prompts"]) == 1
+        assert "app/auth.py" not in setup["prompts"][0]
+        assert data["hunks_reused"] == 2
+        assert data["hunks_reviewed"] == 1
+        assert {c["file"] for c in data["comments"]} == {"app/auth.py", "app/cart.py"}
+
+    def test_invalid_reference(self, client):
+        """A reference that is not a pull request should be rejected."""
+        response = client.post("/api/v1/reviews/pull-request", json={"pull_request": "octo"})
+
+        assert response.status_code == 400
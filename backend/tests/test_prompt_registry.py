@@ -0,0 +1,232 @@
+"""
+Tests for the compiled prompt template registry.
+"""
+
+import os
+
+import pytest
+from jinja2 import UndefinedError
+
+from app.prompts.pytest_prompt import (
+    encode_test_cases,
+    get_pytest_from_code_prompt,
+    get_pytest_from_requirement_prompt,
+    get_pytest_generation_prompt,
+    get_pytest_system_prompt,
+)
+from app.prompts.registry import PACKAGED_TEMPLATES_DIR, PromptRegistry
+from app.prompts.testcase_prompt import (
+    PERSONAS,
+    get_system_prompt,
+    get_testcase_generation_prompt,
+)
+
+
+def write_template(path, text, mtime=None):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+
+class TestPromptRegistry:
+    """Tests for PromptRegistry."""
+
+    def test_load_compiles_every_template(self, tmp_path):
+        """load() compiles every packaged template."""
+        registry = PromptRegistry(override_dir=tmp_path)
+
+        count = registry.load()
+
+        assert count == len(list(PACKAGED_TEMPLATES_DIR.rglob("*.j2")))
+        assert count > 0
+
+    def test_override_dir_takes_precedence(self, tmp_path):
+        """A template in the override directory replaces the packaged one."""
+        write_template(tmp_path / "pytest" / "system.j2", "Custom system prompt")
+        registry = PromptRegistry(override_dir=tmp_path)
+
+        assert registry.render_static("pytest/system.j2") == "Custom system prompt"
+        packaged = PromptRegistry(override_dir=None)
+        assert registry.render_static("review/system.j2") == packaged.render_static(
+            "review/system.j2"
+        )
+
+    def test_hot_reload_after_file_change(self, tmp_path):
+        """A changed template file is recompiled without restarting."""
+        path = tmp_path / "greeting.j2"
+        write_template(path, "Hello {{ name }}", mtime=1_000_000)
+        registry = PromptRegistry(override_dir=tmp_path, auto_reload=True)
+        assert registry.render("greeting.j2", name="QA") == "Hello QA"
+
+        write_template(path, "Goodbye {{ name }}", mtime=2_000_000)
+
+        assert registry.render("greeting.j2", name="QA") == "Goodbye QA"
+
+    def test_no_reload_when_disabled(self, tmp_path):
+        """With auto-reload off, the compiled template is kept."""
+        path = tmp_path / "greeting.j2"
+        write_template(path, "Hello", mtime=1_000_000)
+        registry = PromptRegistry(override_dir=tmp_path, auto_reload=False)
+        assert registry.render("greeting.j2") == "Hello"
+
+        write_template(path, "Goodbye", mtime=2_000_000)
+
+        assert registry.render("greeting.j2") == "Hello"
+
+    def test_render_static_is_cached_until_reload(self, tmp_path):
+        """Static renders are reused, and refreshed once the template changes."""
+        path = tmp_path / "static.j2"
+        write_template(path, "Version one", mtime=1_000_000)
+        registry = PromptRegistry(override_dir=tmp_path)
+
+        first = registry.render_static("static.j2")
+        assert registry.render_static("static.j2") is first
+
+        write_template(path, "Version two", mtime=2_000_000)
+
+        assert registry.render_static("static.j2") == "Version two"
+
+    def test_missing_variable_raises(self, tmp_path):
+        """Templates are strict: a missing variable is an error, not an empty string."""
+        write_template(tmp_path / "strict.j2", "Hello {{ name }}")
+        registry = PromptRegistry(override_dir=tmp_path)
+
+        with pytest.raises(UndefinedError):
+            registry.render("strict.j2")
+
+
+class TestPromptBuilders:
+    """Tests for the prompt functions rendered from templates."""
+
+    def test_generation_prompt_contains_every_test_case(self):
+        """Each test case, its steps and the module name are rendered."""
+        test_cases = [
+            {
+                "id": f"TC{i:03d}",
+                "title": f"Case {i}",
+                "steps": [f"step {i}a", f"step {i}b"],
+                "preconditions": ["logged in"],
+            }
+            for i in range(1, 51)
+        ]
+
+        prompt = get_pytest_generation_prompt(test_cases, module_name="test_checkout")
+
+        for i in range(1, 51):
+            assert f"TC{i:03d} Case {i}\n" in prompt
+            assert f" s: step {i}a | step {i}b\n" in prompt
+        assert "## Module\ntest_checkout.py" in prompt
+        assert "## Fixtures" in prompt
+
+    def test_generation_prompt_defaults_missing_fields(self):
+        """Missing test case fields fall back to defaults."""
+        prompt = get_pytest_generation_prompt([{}], include_fixtures=False)
+
+        assert prompt.rstrip().endswith("## Test Cases\nTC001 Untitled")
+        assert "## Fixtures" not in prompt
+
+    def test_personas(self):
+        """Every persona has a template; unknown personas fall back to the QA engineer."""
+        prompts = {persona: get_system_prompt(persona) for persona in PERSONAS}
+
+        assert len(set(prompts.values())) == len(PERSONAS)
+        assert get_system_prompt("unknown") == prompts["qa_engineer"]
+        assert get_system_prompt(custom_prompt="Be brief") == "Be brief"
+        assert get_pytest_system_prompt().startswith("You are")
+
+
+def shared_prefix(a: str, b: str) -> str:
+    length = next((i for i, (x, y) in enumerate(zip(a, b, strict=False)) if x != y), len(a))
+    return a[:length]
+
+
+class TestCompactEncoding:
+    """Tests for the compact test case encoding."""
+
+    def test_omits_defaults_and_empty_fields(self):
+        """Default priority/type, empty fields and a description equal to the title are left out."""
+        text = encode_test_cases(
+            [
+                {
+                    "id": "TC001",
+                    "title": "Login works",
+                    "description": "Login works",
+                    "steps": ["Open the page", "Submit"],
+                    "expected_result": "Dashboard is shown",
+                    "priority": "medium",
+                    "test_type": "functional",
+                }
+            ]
+        )
+
+        assert text == "TC001 Login works\n s: Open the page | Submit\n exp: Dashboard is shown"
+
+    def test_shared_preconditions_are_listed_once(self):
+        """A precondition used by several cases is referenced as @n."""
+        text = encode_test_cases(
+            [
+                {"id": "TC001", "title": "A", "preconditions": ["User is logged in", "Cart empty"]},
+                {"id": "TC002", "title": "B", "preconditions": ["User is logged in"]},
+            ]
+        )
+
+        assert text.count("User is logged in") == 1
+        assert text.startswith("Shared preconditions:\n@1 User is logged in\n")
+        assert " pre: @1 | Cart empty" in text
+        assert "TC002 B\n pre: @1" in text
+
+    def test_values_are_kept_on_one_line(self):
+        """Newlines in values cannot break the line-based format."""
+        text = encode_test_cases([{"title": "Multi\nline   title", "priority": "high"}])
+
+        assert text == "TC001 Multi line title\n p: high"
+
+    def test_compact_prompt_is_smaller(self):
+        """The compact encoding uses far fewer characters than the verbose layout."""
+        test_cases = [
+            {
+                "id": f"TC{i:03d}",
+                "title": f"Checkout step {i}",
+                "preconditions": ["User is logged in", "Cart has items"],
+                "steps": ["Open the cart", "Click checkout"],
+                "expected_result": "Order is created",
+            }
+            for i in range(20)
+        ]
+        verbose = "".join(
+            f"### Test Case {i}: {tc['id']}\n- **Title:** {tc['title']}\n"
+            f"- **Preconditions:** {', '.join(tc['preconditions'])}\n"
+            f"- **Steps:**\n  1. {tc['steps'][0]}\n  2. {tc['steps'][1]}\n"
+            f"- **Expected Result:** {tc['expected_result']}\n"
+            for i, tc in enumerate(test_cases, 1)
+        )
+
+        assert len(encode_test_cases(test_cases)) < len(verbose) * 0.6
+
+
+class TestPrefixLayout:
+    """Static instructions come before request data, so prompts share a prefix."""
+
+    def test_generation_prompts_share_instructions(self):
+        """Different test cases and module names only change the end of the prompt."""
+        first = get_pytest_generation_prompt([{"title": "A"}], module_name="test_a")
+        second = get_pytest_generation_prompt([{"title": "B"}], module_name="test_b", context="x")
+
+        prefix = shared_prefix(first, second)
+        assert "## Output Format" in prefix
+        assert "## Test Case Format" in prefix
+        assert prefix.endswith("## Module\ntest_")
+
+    def test_request_data_comes_last(self):
+        """Requirement, code and context follow every static instruction."""
+        prompts = [
+            get_testcase_generation_prompt("Reset password", context="Web app"),
+            get_pytest_from_requirement_prompt("Reset password", context="Web app"),
+        ]
+        for prompt in prompts:
+            assert prompt.rstrip().endswith("Reset password")
+            assert prompt.index("Web app") > prompt.index("ONLY")
+
+        code_prompt = get_pytest_from_code_prompt("add", "function", "calc", "def add(a, b): ...")
+        assert code_prompt.index("def add") > code_prompt.index("## Output Format")
@@ -0,0 +1,275 @@
+"""
+Tests for the near-duplicate requirement cache.
+"""
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.routers import pytest_router, testcases
+from app.services import requirement_cache, testcase_generation
+from app.services.requirement_cache import (
+    RequirementCache,
+    normalize_context,
+    normalize_text,
+)
+
+REQUIREMENT = (
+    "As a registered user, I want to reset my password through a link sent to my email "
+    "address so that I can regain access to my account."
+)
+# Same requirement, typed differently
+RETYPED = (
+    "as a REGISTERED user  I want to reset my password through a link sent to my email "
+    "address - so that I can regain access to my account"
+)
+# One extra word
+REWORDED = REQUIREMENT.replace("my account.", "my account again.")
+DIFFERENT = "As an admin, I want to export monthly invoices as CSV files for the accountants."
+
+CONTEXT = "FastAPI backend.\nPostgreSQL database. SendGrid sends the emails."
+CONTEXT_REORDERED = "SendGrid sends the emails!\nPostgreSQL database.  FastAPI backend"
+
+
+class FakeLLM:
+    """Counts calls and returns one test case or a pytest module."""
+
+    _groq_client = object()
+
+    def __init__(self):
+        self.calls = 0
+
+    async def generate(self, prompt: str, **kwargs) -> str:
+        self.calls += 1
+        if "pytest" in (kwargs.get("system_prompt") or "").lower():
+            return "```python\ndef test_reset_link():\n    assert True\n```"
+        return json.dumps(
+            {
+                "test_cases": [
+                    {
+                        "id": "TC001",
+                        "title": f"Generated by call {self.calls}",
+                        "description": "",
+                        "steps": ["Request a reset link"],
+                        "expected_result": "An email is sent",
+                    }
+                ]
+            }
+        )
+
+
+def failing_once(generate):
+    """Wrap generate() so that its first call fails."""
+    calls = []
+
+    async def wrapper(prompt: str, **kwargs) -> str:
+        calls.append(prompt)
+        if len(calls) == 1:
+            raise RuntimeError("provider error")
+        return await generate(prompt, **kwargs)
+
+    return wrapper
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    llm = FakeLLM()
+    monkeypatch.setattr(testcases, "get_llm_service", lambda: llm)
+    monkeypatch.setattr(testcase_generation, "get_llm_service", lambda: llm)
+    monkeypatch.setattr(pytest_router, "get_llm_service", lambda: llm)
+    return llm
+
+
+@pytest.fixture
+def client():
+    """Create a test client for the FastAPI app."""
+    return TestClient(app)
+
+
+def generate(client, requirement: str, **fields) -> dict:
+    response = client.post(
+        "/api/v1/testcases/generate", json={"requirement": requirement, **fields}
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+class TestNormalization:
+    """Tests for requirement and context normalization."""
+
+    def test_case_punctuation_and_whitespace_are_ignored(self):
+        """Re-typed requirements normalize to the same text."""
+        assert normalize_text(REQUIREMENT) == normalize_text(RETYPED)
+
+    def test_context_order_is_ignored(self):
+        """Context sentences are compared as a set."""
+        assert normalize_context(CONTEXT) == normalize_context(CONTEXT_REORDERED)
+        assert normalize_context(CONTEXT) != normalize_context("Django backend.")
+
+
+class TestTestCaseCache:
+    """Tests for cached /api/v1/testcases/generate results."""
+
+    def test_retyped_requirement_is_served_from_cache(self, client, fake_llm):
+        """Different casing, punctuation and context order reuse the stored result."""
+        first = generate(client, REQUIREMENT, context=CONTEXT)
+        second = generate(client, RETYPED, context=CONTEXT_REORDERED)
+
+        assert fake_llm.calls == 1
+        assert first["cached_from"] is None
+        assert second["cached_from"] == {
+            "artifact_id": first["artifact_id"],
+            "requirement": REQUIREMENT,
+            "similarity": 1.0,
+        }
+        assert second["requirement"] == RETYPED
+        assert second["test_cases"] == first["test_cases"]
+
+    def test_reworded_requirement_is_a_near_duplicate(self, client, fake_llm):
+        """A close rewording is served with its estimated similarity."""
+        generate(client, REQUIREMENT)
+        cached = generate(client, REWORDED)
+
+        assert fake_llm.calls == 1
+        assert 0.9 <= cached["cached_from"]["similarity"] < 1.0
+
+    def test_different_requirement_is_generated(self, client, fake_llm):
+        """An unrelated requirement is not served from the cache."""
+        generate(client, REQUIREMENT)
+        response = generate(client, DIFFERENT)
+
+        assert fake_llm.calls == 2
+        assert response["cached_from"] is None
+
+    @pytest.mark.parametrize(
+        "fields",
+        [
+            {"num_cases": 3},
+            {"personas": ["security_analyst"]},
+            {"context": "Django backend."},
+            {"output_format": "markdown"},
+        ],
+    )
+    def test_settings_must_match(self, client, fake_llm, fields):
+        """Other settings, personas or context give a new generation."""
+        generate(client, REQUIREMENT)
+        response = generate(client, REQUIREMENT, **fields)
+
+        assert fake_llm.calls == 2
+        assert response["cached_from"] is None
+
+    def test_use_cache_false_generates(self, client, fake_llm):
+        """The cache can be bypassed; the new result then replaces the stored one."""
+        generate(client, REQUIREMENT)
+        fresh = generate(client, REQUIREMENT, use_cache=False)
+        cached = generate(client, REQUIREMENT)
+
+        assert fake_llm.calls == 2
+        assert fresh["cached_from"] is None
+        assert cached["test_cases"][0]["title"] == "Generated by call 2"
+
+    def test_partial_persona_merge_is_not_cached(self, client, fake_llm, monkeypatch):
+        """A result missing a failed persona is generated again next time."""
+        personas = {"personas": ["qa_engineer", "api_tester"]}
+        monkeypatch.setattr(fake_llm, "generate", failing_once(fake_llm.generate))
+        partial = generate(client, REQUIREMENT, **personas)
+        complete = generate(client, REQUIREMENT, **personas)
+        cached = generate(client, REQUIREMENT, **personas)
+
+        assert len(partial["failed_personas"]) == 1
+        assert complete["cached_from"] is None
+        assert cached["cached_from"]["artifact_id"] == complete["artifact_id"]
+
+    def test_missing_artifact_is_not_served(self, client, fake_llm, artifact_dir):
+        """If the stored artifact is gone, the requirement is generated again."""
+        first = generate(client, REQUIREMENT)
+        artifact_dir._path(first["artifact_id"]).unlink()
+
+        response = generate(client, REQUIREMENT)
+
+        assert fake_llm.calls == 2
+        assert response["cached_from"] is None
+
+
+class TestPytestCache:
+    """Tests for cached /api/v1/pytest/generate-from-requirement results."""
+
+    def test_retyped_requirement_is_served_from_cache(self, client, fake_llm):
+        """The stored module is returned without an LLM call."""
+        body = {"requirement": REQUIREMENT, "output_path": ""}
+        first = client.post("/api/v1/pytest/generate-from-requirement", json=body).json()
+        second = client.post(
+            "/api/v1/pytest/generate-from-requirement", json={**body, "requirement": RETYPED}
+        ).json()
+
+        assert fake_llm.calls == 1
+        assert second["code"] == first["code"]
+        assert second["cached_from"]["artifact_id"] == first["artifact_id"]
+
+
+class TestRequirementCache:
+    """Tests for RequirementCache persistence."""
+
+    async def test_entries_survive_reload(self, tmp_path, artifact_dir):
+        """A reopened cache finds the same stored result."""
+        artifact_id = artifact_dir.put("testcases", {"n": 1}, {"test_cases": []})
+        cache = RequirementCache(tmp_path / "cache.json")
+        await cache.add("testcases", REQUIREMENT, CONTEXT, {"num_cases": 5}, artifact_id)
+
+        reopened = RequirementCache(tmp_path / "cache.json")
+        match = reopened.lookup("testcases", REWORDED, CONTEXT_REORDERED, {"num_cases": 5})
+
+        assert len(reopened) == 1
+        assert match.entry.artifact_id == artifact_id
+        assert match.content == {"test_cases": []}
+        assert reopened.lookup("pytest", REQUIREMENT, CONTEXT, {"num_cases": 5}) is None
+
+    @pytest.mark.parametrize(
+        "requirement",
+        [
+            REQUIREMENT.replace("I want to reset", "I must not reset"),
+            REQUIREMENT.replace("so that I can", "so that I cannot"),
+            REQUIREMENT.replace("I can regain", "I can't regain"),
+        ],
+    )
+    async def test_negated_requirement_is_not_a_near_duplicate(
+        self, tmp_path, artifact_dir, requirement
+    ):
+        """Similar wording with other negation or modal words is not served."""
+        artifact_id = artifact_dir.put("testcases", {"n": 1}, {"test_cases": []})
+        cache = RequirementCache(tmp_path / "cache.json", threshold=0.5)
+        await cache.add("testcases", REQUIREMENT, "", {}, artifact_id)
+
+        assert cache.lookup("testcases", REWORDED, "", {}) is not None
+        assert cache.lookup("testcases", requirement, "", {}) is None
+
+    async def test_requirement_with_other_number_is_not_a_near_duplicate(
+        self, tmp_path, artifact_dir
+    ):
+        """Requirements that differ only in a number are not served for each other."""
+        artifact_id = artifact_dir.put("testcases", {"n": 1}, {"test_cases": []})
+        cache = RequirementCache(tmp_path / "cache.json", threshold=0.5)
+        session = "As a user, my session must expire after {} minutes of inactivity"
+        await cache.add("testcases", session.format(30), "", {}, artifact_id)
+
+        assert cache.lookup("testcases", session.format(30).upper(), "", {}) is not None
+        assert cache.lookup("testcases", session.format(5), "", {}) is None
+
+    async def test_least_recently_used_entries_are_dropped(
+        self, tmp_path, artifact_dir, monkeypatch
+    ):
+        """Past the size limit, the entry unused for longest is evicted."""
+        monkeypatch.setattr(requirement_cache, "MAX_CACHE_ENTRIES", 2)
+        artifact_id = artifact_dir.put("testcases", {"n": 1}, {"test_cases": []})
+        cache = RequirementCache(tmp_path / "cache.json")
+        for requirement in (REQUIREMENT, DIFFERENT):
+            await cache.add("testcases", requirement, "", {}, artifact_id)
+        cache.lookup("testcases", REQUIREMENT, "", {})
+
+        await cache.add("testcases", "Users can delete their account", "", {}, artifact_id)
+
+        assert len(cache) == 2
+        assert cache.lookup("testcases", DIFFERENT, "", {}) is None
+        assert cache.lookup("testcases", REQUIREMENT, "", {}) is not None
@@ -0,0 +1,156 @@
+"""
+Tests for single-pass analysis of generated pytest code.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.routers import pytest_router
+from app.services import response_analysis
+from app.services.response_analysis import (
+    analyze_module,
+    analyze_response,
+    extract_code,
+    extract_code_blocks,
+)
+
+MODULE = """import pytest
+
+pytestmark = pytest.mark.integration
+
+
+@pytest.fixture(name="client")
+def make_client():
+    return object()
+
+
+@pytest.mark.parametrize("n", [1, 2])
+def test_numbers(n):
+    assert n
+
+
+class TestCart:
+    @pytest.mark.slow
+    async def test_checkout(self, client):
+        assert client
+
+    def helper(self):
+        pass
+"""
+
+CONFTEST = """import pytest
+
+
+@pytest.fixture
+def db():
+    return {}
+"""
+
+
+@pytest.fixture
+def client():
+    """Create a test client for the FastAPI app."""
+    return TestClient(app)
+
+
+class TestExtractCodeBlocks:
+    """Tests for finding code blocks in a response."""
+
+    def test_fences_and_labels(self):
+        """Blocks should be found with any fence and labelled by a preceding file name."""
+        text = (
+            "Here are the tests:\n```python\ndef test_a():\n    pass\n```\n"
+            "### conftest.py\n~~~~\nimport pytest\n~~~~\n"
+            "Run with:\n```bash\npytest -q\n```"
+        )
+
+        blocks = extract_code_blocks(text)
+
+        assert [(b.language, b.filename) for b in blocks] == [
+            ("python", None),
+            ("", "conftest.py"),
+            ("bash", None),
+        ]
+        assert blocks[0].code == "def test_a():\n    pass"
+
+    def test_unfenced_and_truncated(self):
+        """Plain code and an unclosed fence should both yield their code."""
+        assert extract_code("def test_a():\n    pass\n") == "def test_a():\n    pass"
+        assert extract_code("```python\ndef test_a():\n    pass") == "def test_a():\n    pass"
+
+    def test_indentation_is_kept(self):
+        """A snippet's first-line indentation should survive extraction."""
+        assert extract_code("```\n    return 1\n```") == "    return 1"
+
+
+class TestAnalyzeModule:
+    """Tests for the AST analysis."""
+
+    def test_tests_markers_and_fixtures(self):
+        """Class-based tests, markers and renamed fixtures should be found."""
+        analysis = analyze_module(MODULE)
+
+        assert analysis.test_names == ["test_numbers", "TestCart.test_checkout"]
+        assert analysis.test_count == 2
+        assert sorted(analysis.markers) == ["integration", "parametrize", "slow"]
+        assert analysis.fixtures == ["client"]
+
+    def test_syntax_error(self):
+        """Code that does not parse should report the error and no tests."""
+        analysis = analyze_module("def test_a(:\n")
+
+        assert not analysis.parses
+        assert analysis.test_count == 0
+
+    def test_memoized_by_code(self, monkeypatch):
+        """The same code should be parsed only once."""
+        calls = []
+        real_analyze = response_analysis._analyze
+        monkeypatch.setattr(
+            response_analysis, "_analyze", lambda code: calls.append(code) or real_analyze(code)
+        )
+        code = MODULE + "\n# memo\n"
+
+        assert analyze_module(code) is analyze_module(code)
+        assert len(calls) == 1
+
+    def test_conftest_is_split(self):
+        """A conftest.py block should be returned separately when requested."""
+        text = f"```python\n{MODULE}```\n\n# conftest.py\n```python\n{CONFTEST}```"
+
+        split = analyze_response(text)
+        joined = analyze_response(text, split_conftest=False)
+
+        assert split.conftest.fixtures == ["db"]
+        assert "def db" not in split.code
+        assert joined.conftest is None and "def db" in joined.code
+
+
+class TestGenerateAnalysis:
+    """Tests for the analysis in /api/v1/pytest/generate."""
+
+    def test_response_fields(self, client, monkeypatch):
+        """The response should carry the analysed tests, markers and fixtures."""
+
+        class FakeLLM:
+            _groq_client = object()
+
+            async def generate(self, prompt, **kwargs):
+                return f"```python\n{MODULE}```\n\n**conftest.py**\n```python\n{CONFTEST}```"
+
+        monkeypatch.setattr(pytest_router, "get_llm_service", lambda: FakeLLM())
+        response = client.post(
+            "/api/v1/pytest/generate",
+            json={
+                "test_cases": [{"title": "Checkout", "expected_result": "Order placed"}],
+                "include_conftest": True,
+                "output_path": "",
+            },
+        )
+
+        data = response.json()
+        assert data["test_count"] == 2
+        assert data["test_names"] == ["test_numbers", "TestCart.test_checkout"]
+        assert data["fixtures"] == ["client", "db"]
+        assert "def db" in data["conftest_code"]
@@ -0,0 +1,183 @@
+"""
+Tests for running generated pytest modules in the sandbox.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.routers import pytest_router
+from app.services import sandbox_runner
+from app.services.sandbox_runner import TestRunner, parse_junit_xml
+
+MODULE = """import pytest
+
+
+def test_ok(answer):
+    assert answer == 42
+
+
+def test_bad():
+    assert 1 == 2, "numbers differ"
+
+
+@pytest.mark.skip(reason="later")
+def test_later():
+    pass
+
+
+class TestMath:
+    def test_add(self):
+        assert 1 + 1 == 2
+"""
+
+CONFTEST = """import pytest
+
+
+@pytest.fixture
+def answer():
+    return 42
+"""
+
+
+@pytest.fixture
+def client():
+    """Create a test client for the FastAPI app."""
+    return TestClient(app)
+
+
+@pytest.fixture
+def runner(tmp_path, monkeypatch):
+    """An enabled runner caching into a temporary directory."""
+    runner = TestRunner(workers=2, cache_dir=tmp_path / "runs")
+    monkeypatch.setattr(sandbox_runner, "_test_runner", runner)
+    monkeypatch.setattr(pytest_router, "RUNNER_ENABLED", True)
+    return runner
+
+
+class TestParseJunitXml:
+    """Tests for reading pytest's JUnit XML report."""
+
+    def test_outcomes(self):
+        """Each testcase should map to a node id, outcome and message."""
+        xml = """<testsuites><testsuite>
+            <testcase classname="test_m" name="test_a" time="0.5"/>
+            <testcase classname="test_m.TestX" name="test_b" time="0.1">
+                <failure message="assert 0">trace</failure>
+            </testcase>
+            <testcase classname="test_m" name="test_c" time="0">
+                <error message="fixture 'db' not found"/>
+            </testcase>
+        </testsuite></testsuites>"""
+
+        outcomes = parse_junit_xml(xml)
+
+        assert [(o.nodeid, o.outcome) for o in outcomes] == [
+            ("test_m.py::test_a", "passed"),
+            ("test_m.py::TestX::test_b", "failed"),
+            ("test_m.py::test_c", "error"),
+        ]
+        assert outcomes[0].duration == 0.5
+        assert outcomes[1].message == "assert 0"
+
+
+class TestSandboxRuns:
+    """Tests for sandboxed runs."""
+
+    async def test_run_reports_each_test(self, runner):
+        """A run should report per-test outcomes, using the conftest."""
+        result = await runner.run(MODULE, CONFTEST, module_name="test_math")
+
+        assert result.status == "failed"
+        assert result.exit_code == 1
+        outcomes = {t.nodeid: t.outcome for t in result.tests}
+        assert outcomes == {
+            "test_math.py::test_ok": "passed",
+            "test_math.py::test_bad": "failed",
+            "test_math.py::test_later": "skipped",
+            "test_math.py::TestMath::test_add": "passed",
+        }
+        assert result.counts() == {"passed": 2, "failed": 1, "error": 0, "skipped": 1}
+
+    async def test_timeout_kills_the_run(self, runner):
+        """A run past its wall-clock limit should be killed and not cached."""
+        code = "import time\n\n\ndef test_slow():\n    time.sleep(30)\n"
+
+        result = await runner.run(code, timeout=1)
+
+        assert result.status == "timeout"
+        assert result.duration < 10
+        assert not list(runner.cache_dir.glob("*.json"))
+
+    async def test_environment_has_no_secrets(self, runner, monkeypatch):
+        """API keys in the server environment should not reach the tests."""
+        monkeypatch.setenv("GROQ_API_KEY", "secret")
+        code = "import os\n\n\ndef test_env():\n    assert 'GROQ_API_KEY' not in os.environ\n"
+
+        result = await runner.run(code)
+
+        assert result.status == "passed"
+
+    async def test_limits_apply_to_the_tests(self, runner):
+        """The resource limits should be in force in the pytest process."""
+        code = (
+            "import resource\n\n\ndef test_limits():\n"
+            "    assert resource.getrlimit(resource.RLIMIT_AS)[0] == "
+            f"{sandbox_runner.RUNNER_MEMORY_MB} * 1024 * 1024\n"
+        )
+
+        result = await runner.run(code)
+
+        assert result.status == "passed"
+
+    async def test_missing_pytest_is_an_error(self, runner, tmp_path, monkeypatch):
+        """An interpreter without pytest should give an uncached error, not a failed run."""
+        python = tmp_path / "python"
+        python.write_text("#!/bin/sh\necho 'No module named pytest'\nexit 1\n")
+        python.chmod(0o755)
+        monkeypatch.setattr(sandbox_runner.sys, "executable", str(python))
+
+        result = await runner.run("def test_ok():\n    assert True\n")
+
+        assert result.status == "error"
+        assert result.exit_code == 1
+        assert "No module named pytest" in result.output
+        assert not list(runner.cache_dir.glob("*.json"))
+
+
+class TestRunEndpoint:
+    """Tests for /api/v1/pytest/run and /api/v1/pytest/run/batch."""
+
+    def test_run_is_cached(self, client, runner):
+        """Running identical code again should return the cached result."""
+        body = {"code": MODULE, "conftest_code": CONFTEST, "module_name": "test_math"}
+
+        first = client.post("/api/v1/pytest/run", json=body).json()
+        second = client.post("/api/v1/pytest/run", json=body).json()
+
+        assert first["status"] == "failed"
+        assert (first["passed"], first["failed"], first["skipped"]) == (2, 1, 1)
+        assert not first["cached"] and second["cached"]
+        assert second["tests"] == first["tests"]
+        assert second["code_hash"] == first["code_hash"]
+
+    def test_batch(self, client, runner):
+        """A batch should return results in request order."""
+        passing = {"code": "def test_ok():\n    assert True\n"}
+        broken = {"code": "import missing_module\n\n\ndef test_x():\n    pass\n"}
+
+        data = client.post("/api/v1/pytest/run/batch", json={"modules": [passing, broken]}).json()
+
+        assert [r["status"] for r in data["results"]] == ["passed", "error"]
+        assert (data["total"], data["passed"]) == (2, 1)
+
+    def test_disabled_by_default(self, client, runner, monkeypatch):
+        """Without RUNNER_ENABLED no submitted code is run."""
+        monkeypatch.setattr(pytest_router, "RUNNER_ENABLED", False)
+        body = {"code": "def test_ok():\n    assert True\n"}
+
+        single = client.post("/api/v1/pytest/run", json=body)
+        batch = client.post("/api/v1/pytest/run/batch", json={"modules": [body]})
+
+        assert single.status_code == batch.status_code == 503
+        assert not list(runner.cache_dir.glob("*.json"))
@@ -0,0 +1,181 @@
+"""
+Tests for per-function test generation from source files.
+"""
+
+import ast
+import asyncio
+
+import pytest
+
+from app.services.llm_service import LLMRateLimiter
+from app.services.source_generation import (
+    SourceSpec,
+    UnitTarget,
+    generate_unit_tests,
+    merge_test_modules,
+    parse_source_spec,
+    plan_units,
+)
+
+SOURCE = '''
+import math
+
+
+def area(radius):
+    """Area of a circle."""
+    return math.pi * radius**2
+
+
+def _helper():
+    return 1
+
+
+class Circle:
+    def __init__(self, radius):
+        self.radius = radius
+
+    def area(self):
+        return area(self.radius)
+'''
+
+
+class TestParseSourceSpec:
+    """Tests for parse_source_spec."""
+
+    def test_parses_ref(self):
+        """owner/repo/path@ref should be split into its parts."""
+        spec = parse_source_spec("octo/shop/app/cart.py@main")
+        assert spec == SourceSpec("octo", "shop", "app/cart.py", "main")
+
+    def test_ref_is_optional(self):
+        """A missing ref should mean the default branch."""
+        assert parse_source_spec("octo/shop/cart.py").ref is None
+
+    def test_rejects_non_python_files(self):
+        """Only Python files can be split into units."""
+        with pytest.raises(ValueError):
+            parse_source_spec("octo/shop/README.md@main")
+
+    def test_module_path_drops_src(self):
+        """The import path should not include a src/ layout directory."""
+        assert SourceSpec("o", "r", "src/shop/cart.py").module_path == "shop.cart"
+
+
+class TestPlanUnits:
+    """Tests for plan_units."""
+
+    def test_public_units_only_by_default(self):
+        """Private helpers should be skipped unless requested."""
+        names = [t.unit.name for t in plan_units(SOURCE, "geo.py")]
+        assert names == ["area", "Circle"]
+
+    def test_context_includes_used_imports(self):
+        """Each unit's context should carry the imports it uses."""
+        target = plan_units(SOURCE, "geo.py", names=["area"])[0]
+        assert "import math" in target.context
+        assert "def area(radius)" in target.context
+
+
+class TestGenerateUnitTests:
+    """Tests for generate_unit_tests."""
+
+    async def test_runs_units_concurrently(self):
+        """All units should be in flight at the same time."""
+        targets = plan_units(SOURCE, "geo.py", include_private=True)
+        in_flight = 0
+        peak = 0
+
+        async def generate(target: UnitTarget) -> str:
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return f"def test_{target.unit.name.lower()}():\n    pass\n"
+
+        results = await generate_unit_tests(targets, generate)
+
+        assert peak == len(targets)
+        assert [r.name for r in results] == ["area", "_helper", "Circle"]
+
+    async def test_failures_are_reported_per_unit(self):
+        """An invalid or failed unit should not fail the others."""
+        targets = plan_units(SOURCE, "geo.py")
+
+        async def generate(target: UnitTarget) -> str:
+            if target.unit.name == "Circle":
+                return "def test_circle(:\n"
+            return "def test_area():\n    pass\n"
+
+        results = await generate_unit_tests(targets, generate)
+
+        assert results[0].error is None
+        assert results[1].error.startswith("Generated code is invalid")
+
+
+class TestMergeTestModules:
+    """Tests for merge_test_modules."""
+
+    def test_deduplicates_imports_and_identical_fixtures(self):
+        """Shared imports and verbatim fixtures should appear once."""
+        module = "import pytest\n\n\n@pytest.fixture\ndef radius():\n    return 2\n"
+        merged = merge_test_modules(
+            [
+                module + "\n\ndef test_area(radius):\n    assert radius\n",
+                module + "\n\ndef test_circle(radius):\n    assert radius\n",
+            ]
+        )
+
+        assert merged.count("import pytest") == 1
+        assert merged.count("def radius") == 1
+        ast.parse(merged)
+
+    def test_renames_clashing_definitions_and_references(self):
+        """Different definitions with the same name should get unique names."""
+        first = "import pytest\n\n\n@pytest.fixture\ndef value():\n    return 1\n\n\ndef test_it(value):\n    assert value == 1\n"
+        second = "import pytest\n\n\n@pytest.fixture\ndef value():\n    return 2\n\n\ndef test_it(value):\n    assert value == 2\n"
+
+        merged = merge_test_modules([first, second], docstring="Merged.")
+
+        names = [n.name for n in ast.parse(merged).body if isinstance(n, ast.FunctionDef)]
+        assert names == ["value", "test_it", "value_2", "test_it_2"]
+        assert "def test_it_2(value_2):" in merged
+        assert merged.startswith('"""Merged."""')
+
+    def test_rename_leaves_strings_and_keyword_arguments(self):
+        """Only identifiers are renamed, not text or keyword argument names."""
+        first = "def value():\n    return 1\n"
+        second = (
+            "def value():\n    return 2\n\n\n"
+            "def test_it():\n"
+            "    result = dict(value=value())  # value\n"
+            "    assert result == {'value': 2}, 'value'\n"
+        )
+
+        merged = merge_test_modules([first, second])
+
+        assert "def value_2():" in merged
+        assert "result = dict(value=value_2())  # value\n" in merged
+        assert "assert result == {'value': 2}, 'value'" in merged
+
+
+class TestLLMRateLimiter:
+    """Tests for LLMRateLimiter."""
+
+    async def test_spaces_call_starts(self):
+        """Calls should start at most requests_per_minute times a minute."""
+        now = 0.0
+        slept: list[float] = []
+
+        async def fake_sleep(seconds: float) -> None:
+            slept.append(seconds)
+
+        limiter = LLMRateLimiter(max_concurrency=4, requests_per_minute=60)
+        limiter._clock = lambda: now
+        limiter._sleep = fake_sleep
+
+        for _ in range(3):
+            async with limiter.slot():
+                pass
+
+        assert slept == [pytest.approx(1.0), pytest.approx(2.0)]
@@ -0,0 +1,101 @@
+"""
+Tests for the AST symbol index.
+"""
+
+import pytest
+
+from app.prompts.pytest_prompt import get_pytest_from_requirement_prompt
+from app.services.symbol_index import SymbolIndex
+
+CART_SOURCE = '''
+from decimal import Decimal
+import json
+
+from app.pricing import apply_discount
+
+
+def _round(value):
+    """Round to cents."""
+    return value.quantize(Decimal("0.01"))
+
+
+class Cart:
+    def __init__(self):
+        self.items = []
+
+    def subtotal(self):
+        return sum(item.price for item in self.items)
+
+    def total(self, code=None):
+        return _round(apply_discount(self.subtotal(), code))
+
+
+def unrelated():
+    return json.dumps({})
+'''
+
+PRICING_SOURCE = '''
+def apply_discount(amount, code):
+    """Apply a discount code to an amount."""
+    return amount if code is None else amount * 0.9
+'''
+
+
+@pytest.fixture
+def index():
+    """Index a small two-file project."""
+    return SymbolIndex.build({"app/cart.py": CART_SOURCE, "app/pricing.py": PRICING_SOURCE})
+
+
+class TestSymbolIndex:
+    """Tests for SymbolIndex."""
+
+    def test_indexes_functions_classes_and_methods(self, index):
+        """Every definition should be findable by name or qualname."""
+        assert [s.kind for s in index.find("Cart")] == ["class"]
+        assert index.find("Cart.total")[0].kind == "method"
+        assert index.find("apply_discount")[0].path == "app/pricing.py"
+
+    def test_records_signature_and_docstring(self, index):
+        """Symbols should carry a one-line signature and their docstring."""
+        symbol = index.find("apply_discount")[0]
+        assert symbol.signature == "def apply_discount(amount, code)"
+        assert symbol.docstring == "Apply a discount code to an amount."
+
+    def test_resolves_direct_dependencies(self, index):
+        """Call edges should resolve to same-class, same-file and imported symbols."""
+        total = index.find("Cart.total")[0]
+        deps = {d.qualname for d in index.dependencies(total)}
+        assert deps == {"_round", "apply_discount", "Cart.subtotal"}
+
+    def test_context_contains_only_target_and_dependencies(self, index):
+        """Context should include the target source but not unrelated code."""
+        context = index.context_for("Cart.total")
+
+        assert "def total(self, code=None):" in context
+        assert "from app.pricing import apply_discount" in context
+        assert "def apply_discount(amount, code):" in context
+        assert "unrelated" not in context
+        assert "import json" not in context
+
+    def test_unknown_symbol_has_empty_context(self, index):
+        """Missing symbols should produce no context."""
+        assert index.context_for("missing") == ""
+
+    def test_unparseable_files_are_skipped(self):
+        """Syntax errors should not break the whole index."""
+        index = SymbolIndex.build({"bad.py": "def broken(:\n", "ok.py": "def ok():\n    pass\n"})
+        assert index.paths == ["ok.py"]
+
+
+class TestCodeContextPrompt:
+    """Tests for code context in the requirement prompt."""
+
+    def test_prompt_includes_code_under_test(self, index):
+        """The prompt should embed the packed code context."""
+        prompt = get_pytest_from_requirement_prompt(
+            requirement="Cart totals apply discounts",
+            code_context=index.context_for("Cart.total"),
+        )
+        assert "## Code Under Test" in prompt
+        assert "def total(self, code=None):" in prompt
@@ -0,0 +1,197 @@
+"""
+Tests for hashed n-gram vectors and near-duplicate test case detection.
+"""
+
+import json
+import random
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models.testcase import TestCase as GeneratedTestCase
+from app.routers import testcases
+from app.services.testcase_generation import dedupe_test_cases
+from app.services.text_vectors import HashingVectorizer, find_near_duplicates
+
+LOGIN = (
+    "Login with valid credentials. Open the login page, enter a valid email and password, "
+    "submit. The dashboard is shown."
+)
+LOGIN_REPHRASED = (
+    "Login with valid credentials works. Open the login page, enter a valid email and "
+    "password, then submit. The dashboard is shown."
+)
+LOCKOUT = (
+    "Account locks after five failed attempts. Enter a wrong password five times. "
+    "The account is locked for 15 minutes."
+)
+
+
+def make_case(id: str, title: str, steps: list[str], expected: str) -> GeneratedTestCase:
+    return GeneratedTestCase(
+        id=id, title=title, description="", steps=steps, expected_result=expected
+    )
+
+
+CASES = [
+    make_case(
+        "TC001",
+        "Login with valid credentials",
+        ["Open the login page", "Enter a valid email and password", "Submit"],
+        "The user is logged in and sees the dashboard",
+    ),
+    make_case(
+        "TC002",
+        "Account lockout",
+        ["Enter a wrong password five times"],
+        "The account is locked for 15 minutes",
+    ),
+    make_case(
+        "TC003",
+        "Login with valid credentials succeeds",
+        ["Open the login page", "Enter a valid email and password", "Submit"],
+        "The user is logged in and sees the dashboard",
+    ),
+]
+
+
+class TestHashingVectorizer:
+    """Tests for HashingVectorizer."""
+
+    def test_rows_are_unit_vectors(self):
+        """Rows are L2-normalized float32; empty texts give zero rows."""
+        vectors = HashingVectorizer(dim=256).transform([LOGIN, LOCKOUT, ""])
+
+        assert vectors.shape == (3, 256)
+        assert vectors.dtype == np.float32
+        assert np.linalg.norm(vectors, axis=1) == pytest.approx([1.0, 1.0, 0.0], abs=1e-5)
+
+    def test_vectors_are_stable(self):
+        """The same text always gives the same vector (no per-process hash seed)."""
+        first = HashingVectorizer().transform([LOGIN])
+        second = HashingVectorizer().transform(["unrelated", LOGIN])[1:]
+
+        assert np.array_equal(first, second)
+
+    def test_similar_texts_score_higher(self):
+        """A rephrasing is closer than a different test."""
+        login, rephrased, lockout = HashingVectorizer().transform([LOGIN, LOGIN_REPHRASED, LOCKOUT])
+
+        assert login @ rephrased > 0.8
+        assert login @ lockout < 0.3
+
+
+class TestFindNearDuplicates:
+    """Tests for find_near_duplicates()."""
+
+    def test_reports_later_rows_against_earlier(self):
+        """Duplicates point at the earlier, kept row."""
+        vectors = HashingVectorizer().transform([LOGIN, LOCKOUT, LOGIN_REPHRASED, LOCKOUT])
+
+        duplicates = find_near_duplicates(vectors, threshold=0.8)
+
+        assert [(d.index, d.duplicate_of) for d in duplicates] == [(2, 0), (3, 1)]
+        assert duplicates[1].similarity == pytest.approx(1.0)
+
+    def test_duplicates_only_match_kept_rows(self):
+        """A row similar only to a dropped duplicate is kept."""
+        vectors = np.array([[1.0, 0.0], [0.8, 0.6], [0.28, 0.96]], dtype=np.float32)
+
+        duplicates = find_near_duplicates(vectors, threshold=0.8)
+
+        # Row 2 is close to row 1 (0.8) but row 1 is a duplicate of row 0
+        assert [(d.index, d.duplicate_of) for d in duplicates] == [(1, 0)]
+
+    def test_blocks_match_single_pass(self):
+        """Splitting the comparison into blocks does not change the result."""
+        rng = random.Random(1)
+        words = [f"word{i}" for i in range(200)]
+        texts = [" ".join(rng.choices(words, k=12)) for _ in range(300)]
+        texts += [f"{text} again" for text in texts[:100]]
+        vectors = HashingVectorizer().transform(texts)
+
+        whole = find_near_duplicates(vectors, threshold=0.8, block_size=len(texts))
+        blocked = find_near_duplicates(vectors, threshold=0.8, block_size=37)
+
+        assert whole == blocked
+        assert {d.index for d in whole} == set(range(300, 400))
+
+    def test_thousands_of_cases(self):
+        """Thousands of texts are handled in one call."""
+        rng = random.Random(2)
+        words = [f"w{i}" for i in range(2000)]
+        texts = [" ".join(rng.choices(words, k=30)) for _ in range(3000)]
+        vectors = HashingVectorizer().transform(texts + texts[:10])
+
+        duplicates = find_near_duplicates(vectors, threshold=0.9)
+
+        assert [(d.index, d.duplicate_of) for d in duplicates] == [(3000 + i, i) for i in range(10)]
+
+
+class TestDedupeTestCases:
+    """Tests for dedupe_test_cases()."""
+
+    def test_drop_removes_and_renumbers(self):
+        """Dropped duplicates leave no gaps in the IDs."""
+        cases, count = dedupe_test_cases(CASES, "drop")
+
+        assert count == 1
+        assert [(tc.id, tc.title) for tc in cases] == [
+            ("TC001", "Login with valid credentials"),
+            ("TC002", "Account lockout"),
+        ]
+
+    def test_flag_keeps_every_case(self):
+        """Flagged duplicates name the case they repeat."""
+        cases, count = dedupe_test_cases(CASES, "flag")
+
+        assert count == 1
+        assert [tc.duplicate_of for tc in cases] == [None, None, "TC001"]
+
+    def test_keep_changes_nothing(self):
+        """'keep' skips the similarity stage."""
+        assert dedupe_test_cases(CASES, "keep") == (CASES, 0)
+
+
+class FakeLLM:
+    """Returns the test cases above as JSON."""
+
+    _groq_client = object()
+
+    async def generate(self, prompt: str, **kwargs) -> str:
+        return json.dumps({"test_cases": [tc.model_dump(mode="json") for tc in CASES]})
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(testcases, "get_llm_service", lambda: FakeLLM())
+    return TestClient(app)
+
+
+class TestGenerateDuplicates:
+    """Tests for duplicate handling in /api/v1/testcases/generate."""
+
+    def test_duplicates_are_dropped_by_default(self, client):
+        """A rephrased case is not returned."""
+        response = client.post(
+            "/api/v1/testcases/generate", json={"requirement": "Users can log in securely"}
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total_count"] == 2
+        assert data["duplicates_removed"] == 1
+
+    def test_duplicates_can_be_flagged(self, client):
+        """With duplicates='flag' the case is returned with duplicate_of set."""
+        response = client.post(
+            "/api/v1/testcases/generate",
+            json={"requirement": "Users can log in securely", "duplicates": "flag"},
+        )
+
+        data = response.json()
+        assert data["total_count"] == 3
+        assert data["duplicates_flagged"] == 1
+        assert data["test_cases"][2]["duplicate_of"] == "TC001"
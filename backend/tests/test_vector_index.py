@@ -0,0 +1,226 @@
+"""
+Tests for the local vector index and few-shot examples.
+"""
+
+import json
+import time
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.prompts.testcase_prompt import get_testcase_generation_prompt
+from app.routers import testcases
+from app.services.testcase_generation import find_examples
+from app.services.vector_index import VectorIndex
+
+RESET = "Users can reset their password with an emailed link"
+RESET_SIMILAR = "Users can reset a forgotten password using a link sent by email"
+EXPORT = "Admins can export monthly invoices as CSV files"
+
+ACCEPTED_CASE = {
+    "id": "TC001",
+    "title": "Reset link expires after one hour",
+    "description": "Expired links are rejected",
+    "steps": ["Request a reset link", "Wait one hour", "Open the link"],
+    "expected_result": "The link is rejected as expired",
+    "priority": "high",
+}
+
+
+class TestVectorIndex:
+    """Tests for VectorIndex."""
+
+    def test_search_orders_by_similarity(self, tmp_path):
+        """The most similar text comes first; k and min_score limit the hits."""
+        index = VectorIndex(tmp_path)
+        index.add_many([("reset", RESET, {"n": 1}), ("export", EXPORT, {"n": 2})])
+
+        hits = index.search(RESET_SIMILAR, k=2)
+
+        assert [hit.key for hit in hits] == ["reset", "export"]
+        assert hits[0].score > hits[1].score
+        assert hits[0].payload == {"n": 1}
+        assert [hit.key for hit in index.search(RESET_SIMILAR, k=2, min_score=0.3)] == ["reset"]
+        assert len(index.search(RESET_SIMILAR, k=1)) == 1
+
+    def test_empty_index(self, tmp_path):
+        """Searching an empty index finds nothing and creates no files."""
+        index = VectorIndex(tmp_path / "index")
+
+        assert index.search(RESET) == []
+        assert not (tmp_path / "index").exists()
+
+    def test_reopened_index_has_same_items(self, tmp_path):
+        """Vectors and payloads persist on disk."""
+        index = VectorIndex(tmp_path)
+        index.add("reset", RESET, {"n": 1})
+        index.add("export", EXPORT, {"n": 2})
+
+        reopened = VectorIndex(tmp_path)
+
+        assert len(reopened) == 2
+        assert reopened.get("export") == {"n": 2}
+        assert reopened.search(RESET, k=1)[0].key == "reset"
+        assert reopened.search(RESET, k=1)[0].score == pytest.approx(1.0)
+
+    def test_same_key_replaces_item(self, tmp_path):
+        """Re-adding a key overwrites its vector and payload in place."""
+        index = VectorIndex(tmp_path)
+        index.add("item", RESET, {"version": 1})
+        index.add("item", EXPORT, {"version": 2})
+
+        reopened = VectorIndex(tmp_path)
+
+        assert len(reopened) == 1
+        assert reopened.get("item") == {"version": 2}
+        assert reopened.search(EXPORT, k=1)[0].score == pytest.approx(1.0)
+
+    def test_repeated_key_in_one_batch(self, tmp_path):
+        """A key given twice in one batch is one item with the last text and payload."""
+        index = VectorIndex(tmp_path)
+        index.add_many([("item", RESET, {"version": 1}), ("item", EXPORT, {"version": 2})])
+
+        reopened = VectorIndex(tmp_path)
+
+        assert len(index) == len(reopened) == 1
+        assert reopened.get("item") == {"version": 2}
+        assert reopened.search(EXPORT, k=1)[0].score == pytest.approx(1.0)
+
+    def test_grows_past_initial_capacity(self, tmp_path):
+        """The memory-mapped file grows as items are inserted incrementally."""
+        index = VectorIndex(tmp_path, dim=64)
+        for start in range(0, 3000, 500):
+            index.add_many(
+                [
+                    (f"k{i}", f"requirement number{i} about feature{i}", {})
+                    for i in range(start, start + 500)
+                ]
+            )
+
+        reopened = VectorIndex(tmp_path, dim=64)
+
+        assert len(reopened) == 3000
+        assert reopened.search("requirement number2999 about feature2999", k=1)[0].key == "k2999"
+
+    def test_dim_mismatch_is_an_error(self, tmp_path):
+        """An index cannot be reopened with a different vector size."""
+        VectorIndex(tmp_path, dim=64).add("item", RESET, {})
+
+        with pytest.raises(ValueError):
+            VectorIndex(tmp_path, dim=128)
+
+    def test_custom_embedder(self, tmp_path):
+        """Any embedder returning normalized rows can be plugged in."""
+
+        def embed(texts):
+            return np.array([[1.0, 0.0] if "reset" in t else [0.0, 1.0] for t in texts], np.float32)
+
+        index = VectorIndex(tmp_path, embed=embed, dim=2)
+        index.add_many([("a", "reset", {}), ("b", "export", {})])
+
+        assert index.search("password reset", k=1)[0].key == "a"
+
+    def test_search_is_fast(self, tmp_path):
+        """Top-k over 20,000 items takes a few milliseconds."""
+        index = VectorIndex(tmp_path)
+        index.add_many([(f"k{i}", f"requirement {i} feature {i % 97}", {}) for i in range(20000)])
+
+        start = time.perf_counter()
+        for _ in range(10):
+            index.search(RESET, k=5)
+        elapsed = (time.perf_counter() - start) / 10
+
+        assert elapsed < 0.1
+
+
+class FakeLLM:
+    """Records prompts and returns one test case."""
+
+    _groq_client = object()
+
+    def __init__(self):
+        self.prompts: list[str] = []
+
+    async def generate(self, prompt: str, **kwargs) -> str:
+        self.prompts.append(prompt)
+        return json.dumps({"test_cases": [ACCEPTED_CASE]})
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    llm = FakeLLM()
+    monkeypatch.setattr(testcases, "get_llm_service", lambda: llm)
+    return llm
+
+
+@pytest.fixture
+def client():
+    """Create a test client for the FastAPI app."""
+    return TestClient(app)
+
+
+class TestFewShotExamples:
+    """Tests for accepted test cases used as few-shot examples."""
+
+    def test_accept_indexes_test_cases(self, client):
+        """Accepted test cases are found for a similar requirement."""
+        response = client.post(
+            "/api/v1/testcases/accept", json={"requirement": RESET, "test_cases": [ACCEPTED_CASE]}
+        )
+
+        assert response.status_code == 200
+        assert response.json()["total_examples"] == 1
+        examples = find_examples(RESET_SIMILAR)
+        assert [e["requirement"] for e in examples] == [RESET]
+        assert examples[0]["test_cases"][0]["title"] == ACCEPTED_CASE["title"]
+        assert find_examples(EXPORT) == []
+
+    def test_accepting_again_replaces(self, client):
+        """The same requirement (up to case and whitespace) is one example."""
+        responses = [
+            client.post(
+                "/api/v1/testcases/accept",
+                json={"requirement": requirement, "test_cases": [ACCEPTED_CASE]},
+            ).json()
+            for requirement in (RESET, f"  {RESET.upper()} ")
+        ]
+
+        assert responses[0]["key"] == responses[1]["key"]
+        assert responses[1]["total_examples"] == 1
+
+    def test_examples_are_in_the_prompt(self, client, fake_llm):
+        """Generation for a similar requirement shows the accepted cases to the LLM."""
+        client.post(
+            "/api/v1/testcases/accept", json={"requirement": RESET, "test_cases": [ACCEPTED_CASE]}
+        )
+
+        response = client.post("/api/v1/testcases/generate", json={"requirement": RESET_SIMILAR})
+
+        assert response.json()["few_shot_examples"] == 1
+        prompt = fake_llm.prompts[0]
+        assert f"Requirement: {RESET}\n" in prompt
+        assert '"title":"Reset link expires after one hour"' in prompt
+        assert '"id"' not in prompt.split("Requirement:")[1]
+        assert prompt.index("Reset link expires") < prompt.index(RESET_SIMILAR)
+
+    def test_few_shot_can_be_disabled(self, client, fake_llm):
+        """With few_shot false the prompt has no examples."""
+        client.post(
+            "/api/v1/testcases/accept", json={"requirement": RESET, "test_cases": [ACCEPTED_CASE]}
+        )
+
+        response = client.post(
+            "/api/v1/testcases/generate",
+            json={"requirement": RESET_SIMILAR, "few_shot": False},
+        )
+
+        assert response.json()["few_shot_examples"] == 0
+        assert "Reset link expires" not in fake_llm.prompts[0]
+
+    def test_prompt_without_examples_is_unchanged(self):
+        """No examples renders exactly the plain prompt."""
+        assert get_testcase_generation_prompt(RESET, examples=[]) == get_testcase_generation_prompt(
+            RESET
+        )
@@ -0,0 +1,221 @@
+"""
+Tests for GitHub webhook ingestion and the debounced event queue.
+"""
+
+import asyncio
+import hashlib
+import hmac
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.routers import webhooks
+from app.services.webhooks import (
+    DebouncedEventQueue,
+    WebhookEvent,
+    parse_github_event,
+    verify_signature,
+)
+
+SECRET = "s3cret"
+
+
+def pull_request_payload(number=7, sha="abc", action="synchronize"):
+    return {
+        "action": action,
+        "repository": {"full_name": "octo/shop", "default_branch": "main"},
+        "pull_request": {"number": number, "head": {"sha": sha}},
+    }
+
+
+def sign(body: bytes, secret: str = SECRET) -> str:
+    return "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+def event(key="octo/shop#7", sha="abc", delivery=None) -> WebhookEvent:
+    return WebhookEvent(
+        kind="pull_request",
+        repository="octo/shop",
+        key=key,
+        head_sha=sha,
+        number=7,
+        delivery_id=delivery,
+    )
+
+
+@pytest.fixture
+def client():
+    """Create a test client for the FastAPI app."""
+    return TestClient(app)
+
+
+class TestParseEvents:
+    """Tests for signature checks and event mapping."""
+
+    def test_verify_signature(self):
+        """Only the HMAC of the exact body with the secret should verify."""
+        body = b'{"zen": "hi"}'
+
+        assert verify_signature(SECRET, body, sign(body))
+        assert not verify_signature(SECRET, body + b" ", sign(body))
+        assert not verify_signature(SECRET, body, None)
+
+    def test_pull_request_events(self):
+        """Synchronize should queue a review; closing should cancel it."""
+        queued = parse_github_event("pull_request", pull_request_payload(sha="def"))
+        closed = parse_github_event("pull_request", pull_request_payload(action="closed"))
+
+        assert queued.event.key == "octo/shop#7" and queued.event.head_sha == "def"
+        assert closed.event is None and closed.cancel == "octo/shop#7"
+
+    def test_ignored_events(self):
+        """Pushes to other branches and comments on pull requests need no work."""
+        repository = {"full_name": "octo/shop", "default_branch": "main"}
+        push = {"ref": "refs/heads/feature", "after": "abc", "repository": repository}
+        pr_comment = {
+            "action": "created",
+            "issue": {"number": 7, "pull_request": {}},
+            "repository": repository,
+        }
+
+        assert parse_github_event("push", push).event is None
+        assert parse_github_event("issue_comment", pr_comment).event is None
+        assert parse_github_event("push", push | {"ref": "refs/heads/main"}).event.kind == "push"
+
+
+class TestDebouncedEventQueue:
+    """Tests for debouncing and coalescing."""
+
+    async def test_burst_is_coalesced_to_latest_sha(self):
+        """Rapid events for one key should run once, at the latest head SHA."""
+        handled = []
+
+        async def handler(e):
+            handled.append((e.key, e.head_sha, e.coalesced))
+
+        queue = DebouncedEventQueue(handler, window=0.05, max_delay=1)
+        await queue.start()
+        for sha in ("a", "b", "c"):
+            queue.submit(event(sha=sha))
+        queue.submit(event(key="octo/shop#8", sha="x"))
+        await asyncio.sleep(0.2)
+        await queue.stop()
+
+        assert sorted(handled) == [("octo/shop#7", "c", 2), ("octo/shop#8", "x", 0)]
+        assert queue.stats.coalesced == 2
+
+    async def test_max_delay_bounds_debounce(self):
+        """A continuous burst should not defer a key past max_delay."""
+        now = [0.0]
+        queue = DebouncedEventQueue(lambda e: None, window=10, max_delay=15, clock=lambda: now[0])
+
+        queue.submit(event(sha="a"))
+        now[0] = 9
+        queue.submit(event(sha="b"))
+
+        assert queue._pending["octo/shop#7"].due == 15
+
+    async def test_same_key_never_runs_concurrently(self):
+        """An event arriving while its key runs should wait, then run once more."""
+        active = []
+        handled = []
+
+        async def handler(e):
+            active.append(e.key)
+            assert active.count(e.key) == 1
+            await asyncio.sleep(0.05)
+            handled.append(e.head_sha)
+            active.remove(e.key)
+
+        queue = DebouncedEventQueue(handler, window=0.01, max_delay=1)
+        await queue.start()
+        queue.submit(event(sha="a"))
+        await asyncio.sleep(0.03)
+        queue.submit(event(sha="b"))
+        await asyncio.sleep(0.2)
+        await queue.stop()
+
+        assert handled == ["a", "b"]
+
+    async def test_redelivery_and_processed_sha_are_skipped(self):
+        """Redelivered events and already processed SHAs should not run again."""
+        handled = []
+
+        async def handler(e):
+            handled.append(e.head_sha)
+
+        queue = DebouncedEventQueue(handler, window=0.01, max_delay=1)
+        await queue.start()
+        assert queue.submit(event(delivery="d1"))
+        assert not queue.submit(event(delivery="d1"))
+        await asyncio.sleep(0.05)
+        queue.submit(event(delivery="d2"))
+        await asyncio.sleep(0.05)
+        await queue.stop()
+
+        assert handled == ["abc"]
+        assert queue.stats.duplicates == 1
+        assert queue.stats.skipped == 1
+
+
+class TestWebhookEndpoint:
+    """Tests for /api/v1/webhooks/github."""
+
+    @pytest.fixture
+    def queue(self, monkeypatch):
+        """A queue that is not started, so nothing is processed."""
+        queue = DebouncedEventQueue(lambda e: None)
+        monkeypatch.setattr(webhooks, "get_webhook_queue", lambda: queue)
+        monkeypatch.setenv("GITHUB_WEBHOOK_SECRET", SECRET)
+        return queue
+
+    def post(self, client, name, payload, signature=None):
+        body = json.dumps(payload).encode()
+        return client.post(
+            "/api/v1/webhooks/github",
+            content=body,
+            headers={
+                "X-GitHub-Event": name,
+                "X-Hub-Signature-256": signature or sign(body),
+                "Content-Type": "application/json",
+            },
+        )
+
+    def test_signed_event_is_queued(self, client, queue):
+        """A signed delivery should be queued and acknowledged with 202."""
+        response = self.post(client, "pull_request", pull_request_payload())
+
+        assert response.status_code == 202
+        assert response.json() == {
+            "status": "queued",
+            "event": "pull_request",
+            "key": "octo/shop#7",
+        }
+        assert queue.pending == 1
+
+    def test_bad_signature_is_rejected(self, client, queue):
+        """A delivery with the wrong signature should be rejected."""
+        response = self.post(client, "pull_request", pull_request_payload(), signature="sha256=0")
+
+        assert response.status_code == 401
+        assert queue.pending == 0
+
+    def test_missing_secret(self, client, queue, monkeypatch):
+        """Without a configured secret the endpoint should refuse deliveries."""
+        monkeypatch.delenv("GITHUB_WEBHOOK_SECRET")
+
+        response = self.post(client, "ping", {"zen": "hi"})
+
+        assert response.status_code == 503
+
+    def test_status(self, client, queue):
+        """The status endpoint should report queue counters."""
+        self.post(client, "pull_request", pull_request_payload(sha="a"))
+        self.post(client, "pull_request", pull_request_payload(sha="b"))
+
+        data = client.get("/api/v1/webhooks/status").json()
+
+        assert data["pending"] == 1
+        assert data["coalesced"] == 1